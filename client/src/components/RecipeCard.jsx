@@ -93,6 +93,7 @@ const RecipeCard = memo(
         >
           <RecipeImage
             slug={recipe.slug}
+            imageHash={recipe.imageHash}
             title={recipe.title}
             size="medium"
             sx={{
@@ -24,13 +24,23 @@ const PlaceholderBox = React.memo(() => (
   </Box>
 ));
 
-const RecipeImage = ({ slug, title, size = "medium", sx = {}, onLoad }) => {
+const RecipeImage = ({
+  slug,
+  imageHash,
+  title,
+  size = "medium",
+  sx = {},
+  onLoad,
+}) => {
   const [status, setStatus] = useState("loading"); // "loading", "loaded", "error"
 
-  // Mémoriser l'URL de l'image
+  // Mémoriser l'URL de l'image (versionnée par le hash du contenu quand il
+  // est connu : le navigateur la garde en cache sans revalidation)
   const imageUrl = useMemo(() => {
-    return slug ? `${API_BASE_URL}/api/images/${size}/${slug}` : null;
-  }, [slug, size]);
+    if (!slug) return null;
+    const name = imageHash ? `${slug}.${imageHash}.webp` : slug;
+    return `${API_BASE_URL}/api/images/${size}/${name}`;
+  }, [slug, imageHash, size]);
 
   useEffect(() => {
     // Réinitialiser l'état uniquement si l'URL change
@@ -104,5 +114,9 @@ const RecipeImage = ({ slug, title, size = "medium", sx = {}, onLoad }) => {
 // Exporter le composant avec React.memo pour éviter les re-rendus inutiles
 // et une fonction de comparaison personnalisée pour des performances optimales
 export default React.memo(RecipeImage, (prevProps, nextProps) => {
-  return prevProps.slug === nextProps.slug && prevProps.size === nextProps.size;
+  return (
+    prevProps.slug === nextProps.slug &&
+    prevProps.imageHash === nextProps.imageHash &&
+    prevProps.size === nextProps.size
+  );
 });
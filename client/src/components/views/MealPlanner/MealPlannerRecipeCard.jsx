@@ -141,6 +141,7 @@ const MealPlannerRecipeCard = memo(({ item, isLocked, onToggleLock, onSwap }) =>
           >
             <RecipeImage
               slug={recipe.slug}
+              imageHash={recipe.imageHash}
               title={recipe.title}
               size="medium"
               sx={{
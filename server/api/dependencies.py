@@ -1,15 +1,47 @@
 """Shared FastAPI dependencies — singleton services."""
 
 from repositories import JsonFileRepository
+from services.image_pipeline import ImagePipeline
 from services.recipe_service import RecipeService
 
+_repository: JsonFileRepository | None = None
 _recipe_service: RecipeService | None = None
+_image_pipeline: ImagePipeline | None = None
+
+
+def _get_repository() -> JsonFileRepository:
+    global _repository
+    if _repository is None:
+        _repository = JsonFileRepository()
+    return _repository
 
 
 def get_recipe_service() -> RecipeService:
     """Provide a shared RecipeService singleton across all routes."""
     global _recipe_service
     if _recipe_service is None:
-        repo = JsonFileRepository()
-        _recipe_service = RecipeService(repo)
+        _recipe_service = RecipeService(_get_repository(), image_pipeline=get_image_pipeline())
     return _recipe_service
+
+
+def start_image_pipeline() -> ImagePipeline:
+    """Build the shared image-variant pipeline and its worker pool (app startup)."""
+    global _image_pipeline
+    if _image_pipeline is None:
+        repo = _get_repository()
+        _image_pipeline = ImagePipeline(repo.get_images_path(), repo.get_base_path() / "images" / "cache")
+        _image_pipeline.start()
+    return _image_pipeline
+
+
+def stop_image_pipeline() -> None:
+    """Shut the pipeline's worker pool down (app shutdown)."""
+    if _image_pipeline is not None:
+        _image_pipeline.shutdown()
+
+
+def get_image_pipeline() -> ImagePipeline:
+    """Provide the shared image-variant pipeline (originals next to the recipes)."""
+    if _image_pipeline is None:
+        raise RuntimeError("Image pipeline not started (see the app lifespan in server.py)")
+    return _image_pipeline
@@ -1,11 +1,16 @@
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
-from PIL import Image
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import FileResponse, Response
 import os
+import re
 import urllib.parse
 import logging
 from pathlib import Path
-from typing import Optional, List
+from typing import Dict, NamedTuple, Optional
+
+from api.dependencies import get_image_pipeline
+from repositories.json_file_repository import IMAGE_HASH_LENGTH
+from services.image_index import ImageEntry
+from services.image_pipeline import ImagePipeline
 
 # Configurer le logging
 logging.basicConfig(level=logging.INFO)
@@ -22,142 +27,60 @@ IMAGE_SIZES = {
     "original": None
 }
 
-# Chemins des dossiers
-DATA_DIR = Path("data")  # Chemin relatif depuis server/
-RECIPES_IMAGES_DIR = DATA_DIR / "recipes" / "images"  # Chemin vers les images de recettes
-CACHE_DIR = DATA_DIR / "images" / "cache"  # Dossier pour stocker les versions redimensionnées
-
-# Créer les dossiers nécessaires pour le cache
-for size in IMAGE_SIZES:
-    if size != "original":  # Pas besoin de cache pour les originaux
-        (CACHE_DIR / size).mkdir(parents=True, exist_ok=True)
-
-def resize_image(img: Image.Image, size: tuple[int, int]) -> Image.Image:
-    """Redimensionne une image en conservant son ratio."""
-    # Calculer les dimensions en préservant le ratio
-    img_ratio = img.width / img.height
-    target_ratio = size[0] / size[1]
-
-    if img_ratio > target_ratio:
-        # Image plus large, ajuster la largeur
-        new_width = size[0]
-        new_height = int(new_width / img_ratio)
-    else:
-        # Image plus haute, ajuster la hauteur
-        new_height = size[1]
-        new_width = int(new_height * img_ratio)
-
-    # Redimensionner avec Lanczos (meilleure qualité)
-    return img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-
-def get_all_image_files() -> List[Path]:
-    """Récupère toutes les images dans le dossier des recettes."""
-    if not RECIPES_IMAGES_DIR.exists():
-        logger.warning(f"Le dossier d'images n'existe pas: {RECIPES_IMAGES_DIR}")
-        return []
-    
-    all_files = []
-    for ext in [".jpg", ".jpeg", ".png", ".gif", ".webp", ".svg"]:
-        all_files.extend(list(RECIPES_IMAGES_DIR.glob(f"*{ext}")))
-    
-    logger.info(f"Images trouvées: {len(all_files)}")
-    return all_files
-
-def get_original_image_path(filename: str) -> Optional[Path]:
-    """Trouve le chemin de l'image originale."""
-    # Décoder l'URL au cas où
-    filename = urllib.parse.unquote(filename)
-    
-    logger.info(f"Recherche de l'image originale: {filename}")
-    logger.info(f"Dossier des images: {RECIPES_IMAGES_DIR}, existe: {RECIPES_IMAGES_DIR.exists()}")
-    
-    # Chercher l'original avec différentes extensions
-    for ext in [".jpg", ".jpeg", ".png", ".gif", ".webp", ".svg"]:
-        # Essayer avec le nom exact
-        original_path = RECIPES_IMAGES_DIR / (filename + ext)
-        logger.info(f"Vérification du chemin: {original_path}, existe: {original_path.exists()}")
-        if original_path.exists():
-            return original_path
-    
-    # Si le fichier n'existe pas, récupérer toutes les images et essayer de trouver
-    # une correspondance partielle (insensible à la casse)
-    all_images = get_all_image_files()
-    filename_lower = filename.lower()
-    
-    for img_path in all_images:
-        # Comparer les noms sans extension
-        if img_path.stem.lower() == filename_lower:
-            logger.info(f"Correspondance exacte trouvée: {img_path}")
-            return img_path
-        
-        # Vérifier si le nom du fichier est un préfixe
-        if img_path.stem.lower().startswith(filename_lower[:40]):
-            logger.info(f"Correspondance par préfixe trouvée: {img_path}")
-            return img_path
-    
-    logger.warning(f"Aucune image trouvée pour: {filename}")
-    return None
-
-def get_cached_image_path(filename: str, size: str) -> Optional[Path]:
-    """Trouve le chemin de l'image dans le cache pour une taille donnée."""
-    if size == "original":
-        return get_original_image_path(filename)
-    
-    # Pour les autres tailles, chercher dans le cache
-    for ext in [".webp", ".jpg", ".jpeg", ".png"]:
-        cache_path = CACHE_DIR / size / (filename + ext)
-        if cache_path.exists():
-            return cache_path
-    
-    return None
-
-async def ensure_resized_version(filename: str, size: str) -> Optional[Path]:
-    """S'assure qu'une version redimensionnée existe et la crée si nécessaire."""
-    if size == "original":
-        return get_original_image_path(filename)
+# Types MIME des originaux et des variantes
+MIME_TYPES = {
+    ".svg": "image/svg+xml",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".gif": "image/gif",
+    ".webp": "image/webp",
+    ".avif": "image/avif",
+}
 
-    # Trouver l'original
-    original_path = get_original_image_path(filename)
-    if not original_path:
+# Noms versionnés : {slug}.{hash}.webp, le hash étant celui du contenu de l'original
+_HASHED_NAME = re.compile(rf"^(?P<stem>.+)\.(?P<hash>[0-9a-f]{{{IMAGE_HASH_LENGTH}}})(\.[A-Za-z0-9]+)?$")
+# Une URL versionnée ne change jamais de contenu
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "no-cache"
+
+class ResolvedImage(NamedTuple):
+    path: Path
+    etag: Optional[str]  # Hash du fichier servi
+    sha256: Optional[str]  # Hash de l'original
+
+def get_variant_file(image: ImageEntry, size: str, accept: str = "") -> Optional[Dict[str, str]]:
+    """Fichier de la variante générée par le pipeline (AVIF si le client l'accepte)."""
+    variant = image.variants.get(size)
+    if not variant:
         return None
-
-    # Vérifier si l'image est déjà dans le cache ET toujours à jour
-    cached_path = get_cached_image_path(filename, size)
-    if cached_path and cached_path.stat().st_mtime >= original_path.stat().st_mtime:
-        return cached_path
-
-    # Si c'est un SVG, le retourner tel quel
-    if original_path.suffix.lower() == ".svg":
-        return original_path
-
-    # Créer le dossier de destination si nécessaire
-    target_dir = CACHE_DIR / size
-    target_dir.mkdir(parents=True, exist_ok=True)
-    
-    # Chemin pour la version redimensionnée en WebP (meilleure compression)
-    target_path = target_dir / (filename + ".webp")
-
-    try:
-        # Redimensionner l'image
-        with Image.open(original_path) as img:
-            # Convertir en RGB si nécessaire (pour les images avec transparence)
-            if img.mode in ("RGBA", "LA"):
-                background = Image.new("RGB", img.size, (255, 255, 255))
-                background.paste(img, mask=img.split()[-1])
-                img = background
-            elif img.mode != "RGB":
-                img = img.convert("RGB")
-            
-            target_size = IMAGE_SIZES[size]
-            resized = resize_image(img, target_size)
-            
-            # Sauvegarder en WebP avec une bonne qualité
-            resized.save(target_path, "WEBP", quality=85, method=6)
-            logger.info(f"Image redimensionnée créée: {target_path}")
-            return target_path
-    except Exception as e:
-        logger.error(f"Erreur lors du redimensionnement de l'image {original_path}: {str(e)}")
-        return original_path  # En cas d'erreur, retourner l'original
+    files = variant["files"]
+    return files["avif" if "avif" in files and "image/avif" in accept else "webp"]
+
+async def resolve_image(
+    pipeline: ImagePipeline, filename: str, size: str, accept: str = "",
+) -> Optional[ResolvedImage]:
+    """Trouve le fichier à servir pour une image et une taille.
+
+    Le nom est résolu par l'index en mémoire (aucun accès disque). Les
+    variantes sont générées à l'enregistrement de l'original ; pour les
+    retardataires (variantes absentes ou périmées), la génération est lancée
+    dans le pool de processus et les requêtes concurrentes l'attendent.
+    """
+    image = pipeline.index.find(filename)
+    if image is None:
+        return None
+    # Originaux et SVG servis tels quels
+    if size == "original" or image.is_svg:
+        sha256 = image.sha256 if image.current else None
+        return ResolvedImage(image.original, sha256, sha256)
+
+    image = await pipeline.ensure(image)
+    file = get_variant_file(image, size, accept)
+    if file is None:
+        # En cas d'échec de la génération, retourner l'original
+        return ResolvedImage(image.original, None, None)
+    return ResolvedImage(pipeline.cache_dir / size / file["name"], file["sha256"], image.sha256)
 
 @router.get("/tmp/{filename}")
 async def get_temp_image(filename: str):
@@ -182,10 +105,14 @@ async def get_temp_image(filename: str):
     return FileResponse(temp_image_path, media_type=content_type)
 
 @router.get("/{size}/{filename}")
-async def serve_image(size: str, filename: str):
+async def serve_image(
+    size: str,
+    filename: str,
+    pipeline: ImagePipeline = Depends(get_image_pipeline),
+    accept: str = Header(""),
+    if_none_match: Optional[str] = Header(None),
+):
     """Sert une image dans la taille demandée."""
-    logger.info(f"Demande d'image: size={size}, filename={filename}")
-    
     if size not in IMAGE_SIZES:
         raise HTTPException(status_code=400, detail="Invalid size")
 
@@ -193,32 +120,30 @@ async def serve_image(size: str, filename: str):
     if not filename or filename == "undefined":
         raise HTTPException(status_code=404, detail="Image filename is invalid")
 
-    # Décoder l'URL si nécessaire
+    # Décoder l'URL, extraire le hash éventuel et supprimer l'extension
     decoded_filename = urllib.parse.unquote(filename)
-    
-    # Nettoyer le nom de fichier (supprimer l'extension si présente)
-    clean_filename = Path(decoded_filename).stem
-    logger.info(f"Nom de fichier nettoyé: {clean_filename}")
+    match = _HASHED_NAME.match(decoded_filename)
+    if match:
+        clean_filename, requested_hash = match["stem"], match["hash"]
+    else:
+        clean_filename, requested_hash = Path(decoded_filename).stem, None
 
-    # Trouver ou créer l'image dans la bonne taille
-    image_path = await ensure_resized_version(clean_filename, size)
-    
-    if not image_path or not image_path.exists():
+    resolved = await resolve_image(pipeline, clean_filename, size, accept)
+    if not resolved:
         logger.warning(f"Image non trouvée: {clean_filename}")
         raise HTTPException(status_code=404, detail=f"Image not found: {clean_filename}")
 
-    logger.info(f"Image trouvée: {image_path}")
-
-    # Déterminer le type MIME
-    mime_types = {
-        ".svg": "image/svg+xml",
-        ".jpg": "image/jpeg",
-        ".jpeg": "image/jpeg",
-        ".png": "image/png",
-        ".gif": "image/gif",
-        ".webp": "image/webp"
-    }
-    media_type = mime_types.get(image_path.suffix.lower(), "application/octet-stream")
-    logger.info(f"Type MIME: {media_type}")
-
-    return FileResponse(image_path, media_type=media_type)
\ No newline at end of file
+    # Cache permanent seulement si l'URL désigne bien le contenu actuel
+    immutable = bool(requested_hash and resolved.sha256 and resolved.sha256.startswith(requested_hash))
+    headers = {"Cache-Control": IMMUTABLE_CACHE if immutable else REVALIDATE_CACHE}
+    if pipeline.avif:
+        headers["Vary"] = "Accept"
+    if resolved.etag:
+        etag = f'"{resolved.etag[:32]}"'
+        headers["ETag"] = etag
+        if if_none_match and (if_none_match.strip() == "*" or etag in (t.strip() for t in if_none_match.split(","))):
+            return Response(status_code=304, headers=headers)
+
+    # FileResponse gère les requêtes Range et l'envoi sans copie (pathsend/sendfile)
+    media_type = MIME_TYPES.get(resolved.path.suffix.lower(), "application/octet-stream")
+    return FileResponse(resolved.path, media_type=media_type, headers=headers)
@@ -5,9 +5,12 @@ import os
 import zipfile
 from pathlib import Path
 
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
 from fastapi.responses import FileResponse
 
+from api.dependencies import get_image_pipeline, get_recipe_service
+from services.image_pipeline import ImagePipeline
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/recipe-files", tags=["recipe-files"])
@@ -100,11 +103,18 @@ async def upload_recipe_file(file: UploadFile = File(...)):
 
 
 @router.post("/upload-image")
-async def upload_recipe_image(file: UploadFile = File(...)):
+async def upload_recipe_image(
+    file: UploadFile = File(...),
+    pipeline: ImagePipeline = Depends(get_image_pipeline),
+):
     """Upload a recipe image."""
     try:
         file_path = IMAGES_DIR / file.filename
         await _write_upload(file, file_path)
+        pipeline.submit(file_path)
+        # New content hash for the recipe's image URLs
+        if (RECIPES_DIR / f"{file_path.stem}.recipe.json").exists():
+            get_recipe_service().repo.index_recipe(file_path.stem)
         logger.info(f"Image {file.filename} uploaded successfully to {file_path}")
         return {"message": f"Image {file.filename} uploaded successfully"}
     except Exception as e:
@@ -113,7 +123,10 @@ async def upload_recipe_image(file: UploadFile = File(...)):
 
 
 @router.post("/upload-batch")
-async def upload_recipes_batch(archive: UploadFile = File(...)):
+async def upload_recipes_batch(
+    archive: UploadFile = File(...),
+    pipeline: ImagePipeline = Depends(get_image_pipeline),
+):
     """Upload multiple recipe files in a single ZIP archive."""
     try:
         content = await archive.read()
@@ -133,6 +146,7 @@ async def upload_recipes_batch(archive: UploadFile = File(...)):
                     elif any(filename.endswith(ext) for ext in (".jpg", ".jpeg", ".png", ".gif", ".webp", ".svg")):
                         dest = IMAGES_DIR / basename
                         await asyncio.to_thread(dest.write_bytes, file_content)
+                        pipeline.submit(dest)
                         results["images"].append(basename)
                 except Exception as e:
                     logger.error(f"Error extracting {filename}: {e}")
@@ -153,7 +167,7 @@ async def upload_recipes_batch(archive: UploadFile = File(...)):
 
 
 @router.delete("/clean")
-async def clean_recipe_files():
+async def clean_recipe_files(pipeline: ImagePipeline = Depends(get_image_pipeline)):
     """Clean all recipe files and images."""
     try:
         for file in RECIPES_DIR.glob("*.json"):
@@ -163,6 +177,7 @@ async def clean_recipe_files():
         for file in IMAGES_DIR.glob("*"):
             if file.is_file():
                 file.unlink()
+        pipeline.clear()
 
         logger.info("All recipe files and images have been cleaned")
         return {"message": "All recipe files and images have been cleaned"}
@@ -4,6 +4,7 @@ import logging
 import os
 import random
 import traceback
+from datetime import date
 from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Header
@@ -13,6 +14,7 @@ from models.progress import GenerationProgress
 from models.requests import GenerateRecipeRequest, ManualRecipeRequest
 from models.responses import RecipeListItem, GenerateRecipeResponse, ManualRecipeResponse
 from api.dependencies import get_recipe_service
+from recipe_scraper.enrichment.seasons import MONTHS
 from services.recipe_service import RecipeService, RecipeExistsError
 
 logger = logging.getLogger(__name__)
@@ -103,6 +105,21 @@ async def get_imported_urls(service: RecipeService = Depends(get_recipe_service)
     return service.get_imported_urls()
 
 
+@router.get("/in-season", response_model=List[RecipeListItem])
+async def list_recipes_in_season(
+    month: Optional[str] = None,
+    include_private: bool = False,
+    service: RecipeService = Depends(get_recipe_service),
+    x_private_token: Optional[str] = Header(None),
+):
+    """Recipes at their seasonal peak in a month (English name, default: current month)."""
+    month = month.capitalize() if month else MONTHS[date.today().month - 1]
+    if month not in MONTHS:
+        raise HTTPException(status_code=400, detail=f"Unknown month: {month}")
+    allow_private = include_private and _has_valid_private_token(x_private_token)
+    return await service.list_in_season(month, allow_private)
+
+
 @router.get("/random")
 async def get_random_recipe(
     service: RecipeService = Depends(get_recipe_service),
@@ -28,6 +28,7 @@ class RecipeListItem(BaseModel):
     quick: bool = False
     difficulty: Optional[str] = None
     slug: str
+    imageHash: Optional[str] = None  # Content hash for /api/images/{size}/{slug}.{hash}.webp
     nutritionTags: Optional[List[str]] = None
     nutritionPerServing: Optional[Dict[str, Any]] = None
 
@@ -0,0 +1,89 @@
+"""
+Micro-benchmark of NutritionMatcher.estimate_grams over the recipe corpus.
+
+Replays every (quantity, unit, name_en) of the existing .recipe.json files
+through the compiled WeightEstimator and reports the per-ingredient cost:
+
+- build: one-off compilation of the lookup tables
+- cold:  first resolution of each ingredient (memo empty)
+- warm:  repeated resolutions (memo hits, e.g. re-enrichment of the library)
+
+Usage:
+    cd server/packages/recipe_scraper
+    poetry run python scripts/bench_weight_estimator.py                  # server/data/recipes
+    poetry run python scripts/bench_weight_estimator.py path/to/recipes  # another folder
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from recipe_scraper.services.nutrition_matcher import NutritionMatcher
+
+# scripts/ -> recipe_scraper/ -> packages/ -> server/ -> data/recipes
+_RECIPES_DIR = Path(__file__).parent.parent.parent.parent / "data" / "recipes"
+# Repository root example, used when no recipe library is available
+_EXAMPLE_RECIPE = Path(__file__).parent.parent.parent.parent.parent / "example_recipe.json"
+
+
+def load_ingredients(paths):
+    """Collect (quantity, unit, name_en) triples from recipe files."""
+    items = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            recipe = json.load(f)
+        for ing in recipe.get("ingredients", []):
+            name_en = ing.get("name_en") or ing.get("name") or ""
+            items.append((ing.get("quantity"), ing.get("unit"), name_en))
+    return items
+
+
+def per_item_us(items, repeat: int) -> float:
+    """Best per-ingredient time over *repeat* passes, in microseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for quantity, unit, name_en in items:
+            NutritionMatcher.estimate_grams(quantity, unit, name_en)
+        best = min(best, time.perf_counter() - start)
+    return best / len(items) * 1e6
+
+
+def main():
+    """Entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark gram estimation")
+    parser.add_argument("recipes_dir", nargs="?", type=Path, default=_RECIPES_DIR)
+    parser.add_argument("--repeat", type=int, default=20, help="Warm passes (best time is kept)")
+    args = parser.parse_args()
+
+    paths = sorted(args.recipes_dir.glob("*.recipe.json")) if args.recipes_dir.exists() else []
+    if not paths and _EXAMPLE_RECIPE.exists():
+        paths = [_EXAMPLE_RECIPE]
+    items = load_ingredients(paths)
+    if not items:
+        parser.error(f"no ingredients found in {args.recipes_dir}")
+
+    NutritionMatcher._get_portion_weights()  # JSON load is not part of the estimator
+    start = time.perf_counter()
+    estimator = NutritionMatcher._get_weight_estimator()
+    build_ms = (time.perf_counter() - start) * 1000
+
+    estimator.clear_cache()
+    cold = per_item_us(items, 1)
+    warm = per_item_us(items, args.repeat)
+    resolved = sum(NutritionMatcher.estimate_grams(*item) is not None for item in items)
+
+    print(f"recipes:     {len(paths)}")
+    print(f"ingredients: {len(items)} ({resolved} resolved)")
+    print(f"build:       {build_ms:.2f} ms")
+    print(f"cold:        {cold:.1f} µs/ingredient")
+    print(f"warm:        {warm:.2f} µs/ingredient")
+    print(f"memo:        {estimator.cache_info()['resolve']}")
+
+
+if __name__ == "__main__":
+    main()
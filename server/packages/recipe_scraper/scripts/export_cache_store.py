@@ -0,0 +1,47 @@
+"""
+Export the cache store back to the JSON cache files for review.
+
+The enrichment caches live in data/cache.sqlite3 (see
+recipe_scraper.services.cache_store). This script writes each namespace in
+the historical JSON layout ({"_meta": ..., key: value, ...}), by default
+over the seed files of the data folder so that changes show up in a diff.
+
+Usage:
+    cd server/packages/recipe_scraper
+    poetry run python scripts/export_cache_store.py                      # all namespaces
+    poetry run python scripts/export_cache_store.py nutrition --out /tmp  # one namespace elsewhere
+    poetry run python scripts/export_cache_store.py --purge-expired       # drop expired negatives first
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from recipe_scraper.services.cache_store import NAMESPACES, CacheStore
+
+
+def main():
+    """Entry point."""
+    parser = argparse.ArgumentParser(description="Export cache store namespaces to JSON")
+    parser.add_argument("namespaces", nargs="*", help=f"Namespaces to export (default: all of {', '.join(NAMESPACES)})")
+    parser.add_argument("--out", type=Path, default=None, help="Output folder (default: the data folder)")
+    parser.add_argument("--purge-expired", action="store_true", help="Delete expired entries before exporting")
+    args = parser.parse_args()
+    unknown = set(args.namespaces) - set(NAMESPACES)
+    if unknown:
+        parser.error(f"unknown namespaces: {', '.join(sorted(unknown))}")
+
+    store = CacheStore.shared()
+    if args.purge_expired:
+        print(f"purged:   {store.purge_expired()} expired entries")
+
+    for namespace in args.namespaces or list(NAMESPACES):
+        target = args.out / NAMESPACES[namespace]["file"] if args.out else None
+        path = store.export_json(namespace, target)
+        print(f"exported: {namespace} ({store.count(namespace)} entries) → {path}")
+
+
+if __name__ == "__main__":
+    main()
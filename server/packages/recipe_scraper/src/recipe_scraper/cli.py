@@ -15,6 +15,9 @@ import time
 from pathlib import Path
 from typing import Any, Dict, Optional
 
+from web_scraper import ResponseCache
+from recipe_structurer import LLMResponseCache
+
 from .scraper import RecipeScraper
 
 
@@ -101,6 +104,21 @@ async def main_async(args: argparse.Namespace) -> int:
         scraper._recipe_output_folder = Path(recipe_output_folder)
         scraper._image_output_folder = Path(image_output_folder)
         scraper._debug_output_folder = Path(recipe_output_folder) / "debug"
+
+        # Raw page bodies are cached so --force re-imports and retries
+        # don't hit the origin site again
+        if not args.no_cache:
+            scraper.web_scraper.cache = ResponseCache(scraper._debug_output_folder / "http_cache")
+
+        # LLM answers are cached by content hash so unchanged re-imports
+        # replay Pass 1 / 2 / 3 without spending tokens
+        if not args.no_llm_cache:
+            llm_cache = LLMResponseCache(
+                scraper._debug_output_folder / "llm_cache",
+                read=not args.refresh_llm_cache,
+            )
+            scraper.recipe_structurer.llm_cache = llm_cache
+            scraper.recipe_reviewer.llm_cache = llm_cache
         
         logging.info(f"Recipe output folder: {scraper._recipe_output_folder}")
         logging.info(f"Image output folder: {scraper._image_output_folder}")
@@ -397,6 +415,24 @@ def main() -> int:
         help="Force processing even if recipe already exists"
     )
     
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Bypass the on-disk HTTP response cache and always fetch the page"
+    )
+    
+    parser.add_argument(
+        "--no-llm-cache",
+        action="store_true",
+        help="Disable the LLM response cache (preformat, DAG and review passes)"
+    )
+    
+    parser.add_argument(
+        "--refresh-llm-cache",
+        action="store_true",
+        help="Ignore cached LLM responses but store the new ones"
+    )
+    
     args = parser.parse_args()
     
     # Setup logging
@@ -2,14 +2,20 @@
 
 import json
 import logging
-import re as _re
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Sequence, Union
+
+from ..services.ingredient_dictionary import IngredientDictionary
 
 logger = logging.getLogger(__name__)
 
 _DIET_CLASSIFICATION_PATH = Path(__file__).parent.parent / "data" / "diet_classification.json"
 
+# Lists in match priority: an ingredient gets the first list one of its items matches
+_LIST_ORDER = ("meat", "seafood", "dairy", "egg", "non_vegan_other")
+# Verdict → flag set on the recipe; category fallback when no list matches
+_CATEGORY_VERDICTS = {"meat": "meat", "poultry": "meat", "seafood": "seafood", "dairy": "dairy", "egg": "egg"}
+
 _diet_lists: Optional[Dict[str, List[str]]] = None
 
 
@@ -31,91 +37,147 @@ def _get_diet_lists() -> Dict[str, List[str]]:
     return _diet_lists
 
 
-def _matches_list(name_lower: str, items: List[str]) -> bool:
-    """Check if name matches any item via word-boundary matching."""
-    for item in sorted(items, key=len, reverse=True):
-        if _re.search(rf'\b{_re.escape(item)}\b', name_lower):
-            return True
-    return False
+def _is_word_char(char: str) -> bool:
+    # Same definition as \w for str patterns
+    return char.isalnum() or char == "_"
 
 
-def determine_diets(recipe_json: Dict[str, Any]) -> List[str]:
+class DietClassifier:
     """
-    Determine applicable diets based on ingredient names (curated lists)
-    with LLM category as fallback.
+    Classifies ingredient names against all diet lists in one pass.
 
-    Returns a list of applicable diets (most restrictive first).
+    The list items are compiled into a single trie. Matching walks it from
+    every position of the name and keeps the items bounded like
+    re.search(rf"\\b{item}\\b") would, so a name is scanned once instead of
+    once per list item. Verdicts are memoized per ingredient (by interned id
+    when the name is in the IngredientDictionary).
     """
-    diet_lists = _get_diet_lists()
-
-    has_meat = False
-    has_seafood = False
-    has_dairy = False
-    has_egg = False
-    has_non_vegan_other = False
-
-    ingredients = recipe_json.get("ingredients", [])
-
-    for ingredient in ingredients:
-        name_en = (ingredient.get("name_en") or "").lower().strip()
-        name = (ingredient.get("name") or "").lower().strip()
-        category = (ingredient.get("category") or "").lower()
-        is_optional = ingredient.get("optional", False)
-
-        if not name_en and not name:
-            continue
-
-        check_name = name_en or name
-        matched = False
-
-        if diet_lists.get("meat") and _matches_list(check_name, diet_lists["meat"]):
-            if not is_optional:
-                has_meat = True
-            matched = True
-        elif diet_lists.get("seafood") and _matches_list(check_name, diet_lists["seafood"]):
-            if not is_optional:
-                has_seafood = True
-            matched = True
-        elif diet_lists.get("dairy") and _matches_list(check_name, diet_lists["dairy"]):
-            if not is_optional:
-                has_dairy = True
-            matched = True
-        elif diet_lists.get("egg") and _matches_list(check_name, diet_lists["egg"]):
-            if not is_optional:
-                has_egg = True
-            matched = True
-        elif diet_lists.get("non_vegan_other") and _matches_list(check_name, diet_lists["non_vegan_other"]):
-            if not is_optional:
-                has_non_vegan_other = True
-            matched = True
-
-        if not matched and category:
-            if category in ("meat", "poultry"):
-                if not is_optional:
-                    has_meat = True
-            elif category == "seafood":
-                if not is_optional:
-                    has_seafood = True
-            elif category == "dairy":
-                if not is_optional:
-                    has_dairy = True
-            elif category == "egg":
-                if not is_optional:
-                    has_egg = True
-
-    diets: List[str] = []
+
+    _shared: Optional["DietClassifier"] = None
+
+    def __init__(self, diet_lists: Optional[Dict[str, List[str]]] = None):
+        """
+        Compile the classifier.
+
+        Args:
+            diet_lists: list name → items (default: diet_classification.json)
+        """
+        lists = _get_diet_lists() if diet_lists is None else diet_lists
+        self._lists = [name for name in _LIST_ORDER if lists.get(name)]
+        # Trie node: char → child; "" key holds the bitmask of the lists ending there
+        self._trie: Dict[str, Any] = {}
+        for bit, name in enumerate(self._lists):
+            for item in lists[name]:
+                node = self._trie
+                for char in item:
+                    node = node.setdefault(char, {})
+                node[""] = node.get("", 0) | (1 << bit)
+        self._dictionary = IngredientDictionary.shared()
+        self._memo: Dict[Union[int, str], Optional[str]] = {}
+
+    @classmethod
+    def shared(cls) -> "DietClassifier":
+        """Process-wide classifier built from diet_classification.json."""
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    # ------------------------------------------------------------------
+    # Ingredient verdicts
+    # ------------------------------------------------------------------
+
+    def _match_mask(self, name: str) -> int:
+        """Bitmask of the lists with an item occurring in *name* at word boundaries."""
+        mask = 0
+        length = len(name)
+        for start in range(length):
+            node = self._trie.get(name[start])
+            if node is None:
+                continue
+            # \b before the item: the word-ness of the first char differs from the previous one
+            before = start > 0 and _is_word_char(name[start - 1])
+            if before == _is_word_char(name[start]):
+                continue
+            end = start + 1
+            while node is not None:
+                bits = node.get("", 0)
+                if bits & ~mask:
+                    after = end < length and _is_word_char(name[end])
+                    if after != _is_word_char(name[end - 1]):
+                        mask |= bits
+                if end == length:
+                    break
+                node = node.get(name[end])
+                end += 1
+        return mask
+
+    def verdict(self, name: str) -> Optional[str]:
+        """
+        Diet list matched by a lowercased ingredient name.
+
+        Args:
+            name: Lowercased, stripped English (or source-language) name
+
+        Returns:
+            The first list of _LIST_ORDER with a match, or None.
+        """
+        # Names already in canonical form share the verdict of their ingredient id
+        ing_id = self._dictionary.get(name) if self._dictionary.canonical(name) == name else None
+        key: Union[int, str] = name if ing_id is None else ing_id
+        if key not in self._memo:
+            mask = self._match_mask(name)
+            self._memo[key] = self._lists[(mask & -mask).bit_length() - 1] if mask else None
+        return self._memo[key]
+
+    # ------------------------------------------------------------------
+    # Recipes
+    # ------------------------------------------------------------------
+
+    def flags(self, recipe_json: Dict[str, Any]) -> set:
+        """Diet-relevant contents of a recipe (meat, seafood, dairy, egg, non_vegan_other)."""
+        found: set = set()
+        for ingredient in recipe_json.get("ingredients", []):
+            name_en = (ingredient.get("name_en") or "").lower().strip()
+            name = (ingredient.get("name") or "").lower().strip()
+            if not name_en and not name:
+                continue
+            verdict = self.verdict(name_en or name)
+            if verdict is None:
+                verdict = _CATEGORY_VERDICTS.get((ingredient.get("category") or "").lower())
+            if verdict is not None and not ingredient.get("optional", False):
+                found.add(verdict)
+        return found
+
+    def classify(self, recipe_json: Dict[str, Any]) -> List[str]:
+        """Applicable diets of a recipe (most restrictive first)."""
+        return _diets_from_flags(self.flags(recipe_json))
+
+    def classify_many(self, recipes: Sequence[Dict[str, Any]]) -> List[List[str]]:
+        """Applicable diets of each recipe, sharing the verdict memo."""
+        return [self.classify(recipe) for recipe in recipes]
+
+
+def _diets_from_flags(found: set) -> List[str]:
+    has_meat = "meat" in found
+    has_seafood = "seafood" in found
     if has_meat or has_seafood:
         diets = ["omnivorous"]
-        logger.info("Recipe classified as: omnivorous")
-    elif has_dairy or has_egg or has_non_vegan_other:
+    elif found:
         diets = ["vegetarian", "omnivorous"]
-        logger.info("Recipe classified as: vegetarian (and omnivorous)")
     else:
         diets = ["vegan", "vegetarian", "omnivorous"]
-        logger.info("Recipe classified as: vegan (and vegetarian, omnivorous)")
-
     if not has_meat and has_seafood:
         diets.append("pescatarian")
-        logger.info("Recipe also classified as: pescatarian")
+    return diets
 
+
+def determine_diets(recipe_json: Dict[str, Any]) -> List[str]:
+    """
+    Determine applicable diets based on ingredient names (curated lists)
+    with LLM category as fallback.
+
+    Returns a list of applicable diets (most restrictive first).
+    """
+    diets = DietClassifier.shared().classify(recipe_json)
+    logger.info(f"Recipe classified as: {', '.join(diets)}")
     return diets
@@ -5,12 +5,16 @@ import json
 import logging
 import os
 import re as _re
-from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from ..services.cache_store import CacheStore
+from ..services.ingredient_dictionary import IngredientDictionary
+from ..services.single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
-_DATA_DIR = Path(__file__).parent.parent / "data"
 
 # ---------------------------------------------------------------------------
 # Liquid retention heuristics
@@ -130,12 +134,15 @@ _DEFAULT_QUANTITIES: Dict[str, tuple] = {
 }
 
 
+_DEFAULT_QUANTITY_KEYS = sorted(_DEFAULT_QUANTITIES, key=len, reverse=True)
+
+
 def _lookup_default_quantity(name_en: str) -> Optional[tuple]:
     """Return (quantity, unit) for an ingredient commonly listed without a qty."""
     key = name_en.strip().lower()
     if key in _DEFAULT_QUANTITIES:
         return _DEFAULT_QUANTITIES[key]
-    for dq_key in sorted(_DEFAULT_QUANTITIES, key=len, reverse=True):
+    for dq_key in _DEFAULT_QUANTITY_KEYS:
         if dq_key in key:
             return _DEFAULT_QUANTITIES[dq_key]
     return None
@@ -215,37 +222,52 @@ _SMALL_HERB_UNITS = {
 # Weight estimation
 # ---------------------------------------------------------------------------
 
-_WEIGHT_CACHE_PATH = Path(__file__).parent.parent / "data" / "weight_estimates_cache.json"
+_WEIGHT_NAMESPACE = "weight_estimates"
 
 
-def _load_weight_cache() -> Dict[str, float]:
-    if _WEIGHT_CACHE_PATH.exists():
-        try:
-            with open(_WEIGHT_CACHE_PATH) as f:
-                data = json.load(f)
-            return {k: v for k, v in data.items() if not k.startswith("_")}
-        except (json.JSONDecodeError, OSError):
-            return {}
-    return {}
-
-
-def _save_weight_cache(cache: Dict[str, float]) -> None:
-    data = {
-        "_meta": {
-            "description": "LLM-estimated weight per unit for ingredients (grams).",
-            "format": "cache_key → grams_per_unit.",
-        }
-    }
-    data.update(dict(sorted(cache.items())))
-    _WEIGHT_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with open(_WEIGHT_CACHE_PATH, "w") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+def _load_unit_cache(
+    namespace: str, keys: Optional[List[Tuple[str, int]]] = None,
+) -> Dict[Tuple[str, int], Any]:
+    """
+    Read a "unit|name"-keyed cache store namespace.
+
+    Args:
+        namespace: Cache store namespace
+        keys: (unit, ingredient id) keys to fetch (None = whole namespace)
+
+    Returns:
+        Entries keyed by (unit, ingredient id).
+    """
+    dictionary = IngredientDictionary.shared()
+    store = CacheStore.shared()
+    if keys is None:
+        stored = store.items(namespace)
+        dictionary.intern_many(k.partition("|")[2] for k in stored)
+        return {dictionary.split_unit_key(k): v for k, v in stored.items()}
+    wanted = {dictionary.unit_key(ing_id, unit): (unit, ing_id) for unit, ing_id in keys}
+    return {wanted[k]: v for k, v in store.get_many(namespace, wanted).items()}
+
+
+def _save_unit_cache(namespace: str, entries: Dict[Tuple[str, int], Any]) -> None:
+    """Upsert (unit, ingredient id)-keyed entries into a cache store namespace."""
+    dictionary = IngredientDictionary.shared()
+    CacheStore.shared().set_many(
+        namespace, {dictionary.unit_key(ing_id, unit): v for (unit, ing_id), v in entries.items()}
+    )
+
+
+def _load_weight_cache(keys: Optional[List[Tuple[str, int]]] = None) -> Dict[Tuple[str, int], float]:
+    return _load_unit_cache(_WEIGHT_NAMESPACE, keys)
+
 
+def _save_weight_cache(entries: Dict[Tuple[str, int], float]) -> None:
+    _save_unit_cache(_WEIGHT_NAMESPACE, entries)
 
-def _weight_cache_key(unit: Optional[str], name_en: str) -> str:
+
+def _weight_cache_key(unit: Optional[str], name_en: str) -> Tuple[str, int]:
     from ..services.nutrition_matcher import NutritionMatcher
     normalized = NutritionMatcher._normalize_unit(unit) if unit else "none"
-    return f"{normalized}|{name_en.lower().strip()}"
+    return (normalized, IngredientDictionary.shared().intern(name_en))
 
 
 def _get_weight_llm_client():
@@ -316,15 +338,13 @@ async def fill_missing_weights_llm(
     """
     from ..services.nutrition_matcher import NutritionMatcher
 
-    cache = _load_weight_cache()
-    to_ask: List[Dict[str, Any]] = []
+    unresolved: List[tuple] = []
 
     for ing in ingredients:
         name_en = ing.get("name_en", "")
         if not name_en:
             continue
-        key = name_en.strip().lower()
-        nut = nutrition_data.get(key)
+        nut = nutrition_data.get(IngredientDictionary.shared().canonical(name_en))
         if not nut or nut.get("not_found"):
             continue
         qty = ing.get("quantity")
@@ -334,68 +354,93 @@ async def fill_missing_weights_llm(
             continue
         if qty is None or not isinstance(qty, (int, float)):
             continue
-        ck = _weight_cache_key(unit, name_en)
+        unresolved.append((ing, qty, _weight_cache_key(unit, name_en)))
+
+    if not unresolved:
+        return
+
+    cache = _load_weight_cache([ck for _, _, ck in unresolved])
+    to_ask: List[tuple] = []
+    for ing, qty, ck in unresolved:
         if ck in cache:
             ing["estimatedWeightGrams"] = qty * cache[ck]
-            continue
-        to_ask.append(ing)
+        else:
+            to_ask.append((ing, qty, ck))
 
     if not to_ask:
         return
 
-    logger.info(f"Estimating weights via LLM for {len(to_ask)} unresolved ingredients...")
-    lines = [f"{ing.get('quantity', 1)} {ing.get('unit') or 'piece'} {ing.get('name_en', '')}" for ing in to_ask]
-    estimates = await _batch_estimate_weights_llm(lines)
+    # One line per (unit, ingredient): the answer is cached per unit anyway
+    dictionary = IngredientDictionary.shared()
+    lines: Dict[str, tuple] = {}
+    for ing, _, ck in to_ask:
+        lines.setdefault(
+            dictionary.unit_key(ck[1], ck[0]), (ing.get("quantity", 1), ing.get("unit"), ing.get("name_en", ""))
+        )
+    per_unit = await _WEIGHT_FLIGHT.run(lines, lambda keys: _estimate_weights_per_unit({k: lines[k] for k in keys}))
+
+    for ing, qty, ck in to_ask:
+        grams = per_unit.get(dictionary.unit_key(ck[1], ck[0]))
+        if grams is not None:
+            ing["estimatedWeightGrams"] = round(qty * grams, 1)
+
+
+async def _estimate_weights_per_unit(lines: Dict[str, tuple]) -> Dict[str, float]:
+    """
+    Ask the LLM for the weight of ingredient lines and cache it per unit.
+
+    Args:
+        lines: "unit|name" cache key → (quantity, unit, name_en) of a sample line
 
-    for ing, est_grams in zip(to_ask, estimates):
+    Returns:
+        cache key → grams per unit, for the plausible estimates.
+    """
+    logger.info(f"Estimating weights via LLM for {len(lines)} unresolved ingredients...")
+    keys = list(lines)
+    estimates = await _batch_estimate_weights_llm(
+        [f"{qty} {unit or 'piece'} {name_en}" for qty, unit, name_en in lines.values()]
+    )
+
+    dictionary = IngredientDictionary.shared()
+    new_entries: Dict[Tuple[str, int], float] = {}
+    for key, (qty, unit, name_en), est_grams in zip(keys, lines.values(), estimates):
         if est_grams is None or est_grams <= 0:
             continue
         if est_grams > 2_000:
-            logger.warning(f"LLM weight estimate {est_grams}g for '{ing.get('name_en')}' exceeds 2kg — ignoring")
+            logger.warning(f"LLM weight estimate {est_grams}g for '{name_en}' exceeds 2kg — ignoring")
             continue
-        qty = ing.get("quantity", 1) or 1
+        qty = qty or 1
         if not isinstance(qty, (int, float)):
             try:
                 qty = float(qty)
             except (ValueError, TypeError):
                 qty = 1
-        unit = ing.get("unit")
-        name_en = ing.get("name_en", "")
         per_unit = est_grams / qty
-        ck = _weight_cache_key(unit, name_en)
-        cache[ck] = round(per_unit, 1)
-        ing["estimatedWeightGrams"] = round(est_grams, 1)
-        logger.info(f"LLM weight: '{ck}' → {per_unit:.1f}g/unit (total {est_grams:.1f}g)")
+        new_entries[dictionary.split_unit_key(key)] = round(per_unit, 1)
+        logger.info(f"LLM weight: '{key}' → {per_unit:.1f}g/unit (total {est_grams:.1f}g)")
 
-    _save_weight_cache(cache)
+    _save_weight_cache(new_entries)
+    return {dictionary.unit_key(ing_id, unit): grams for (unit, ing_id), grams in new_entries.items()}
+
+
+# Concurrent estimates of the same (unit, ingredient) key make one LLM call,
+# across processes too (store lease)
+_WEIGHT_FLIGHT = SingleFlight(_WEIGHT_NAMESPACE)
 
 
 # ---------------------------------------------------------------------------
 # LLM quantity estimation (Layer 2 — recipe-context aware)
 # ---------------------------------------------------------------------------
 
-_QTY_ESTIMATE_CACHE_PATH = _DATA_DIR / "qty_estimates_cache.json"
+_QTY_ESTIMATE_NAMESPACE = "qty_estimates"
 
 
-def _load_qty_estimate_cache() -> Dict[str, Dict[str, Any]]:
-    if _QTY_ESTIMATE_CACHE_PATH.exists():
-        with open(_QTY_ESTIMATE_CACHE_PATH) as f:
-            data = json.load(f)
-        return {k: v for k, v in data.items() if not k.startswith("_")}
-    return {}
+def _load_qty_estimate_cache(keys: Optional[List[Tuple[str, int]]] = None) -> Dict[Tuple[str, int], Dict[str, Any]]:
+    return _load_unit_cache(_QTY_ESTIMATE_NAMESPACE, keys)
 
 
-def _save_qty_estimate_cache(cache: Dict[str, Dict[str, Any]]) -> None:
-    data = {
-        "_meta": {
-            "description": "LLM-estimated quantities for ingredients missing qty+unit.",
-            "format": "cache_key → {quantity, unit, rationale}",
-        }
-    }
-    data.update(dict(sorted(cache.items())))
-    _QTY_ESTIMATE_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with open(_QTY_ESTIMATE_CACHE_PATH, "w") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+def _save_qty_estimate_cache(entries: Dict[Tuple[str, int], Dict[str, Any]]) -> None:
+    _save_unit_cache(_QTY_ESTIMATE_NAMESPACE, entries)
 
 
 async def _batch_estimate_quantities_llm(
@@ -694,9 +739,8 @@ async def estimate_missing_quantities_llm(
                 step_lines.append(f"  {i}. {action}")
         steps_text = "\n".join(step_lines)
 
-    cache = _load_qty_estimate_cache()
-    to_ask: List[Dict[str, Any]] = []
-    to_ask_indices: List[int] = []
+    dictionary = IngredientDictionary.shared()
+    candidates: List[Tuple[int, Tuple[str, int]]] = []
 
     for i, ing in enumerate(ingredients):
         name_en = ing.get("name_en", "")
@@ -715,8 +759,14 @@ async def estimate_missing_quantities_llm(
         unit = ing.get("unit")
         if qty is not None:
             continue
+        candidates.append((i, (unit or "none", dictionary.intern(name_en))))
 
-        cache_key = f"{unit or 'none'}|{key}"
+    cache = _load_qty_estimate_cache([cache_key for _, cache_key in candidates]) if candidates else {}
+    to_ask: List[Dict[str, Any]] = []
+    to_ask_indices: List[int] = []
+
+    for i, cache_key in candidates:
+        ing = ingredients[i]
         if cache_key in cache:
             cached = cache[cache_key]
             cached_conf = cached.get("confidence", "high")
@@ -736,8 +786,8 @@ async def estimate_missing_quantities_llm(
             continue
 
         to_ask.append({
-            "name_en": name_en,
-            "unit": unit or "none",
+            "name_en": ing["name_en"],
+            "unit": cache_key[0],
             "notes": ing.get("notes") or "",
             "preparation": ing.get("preparation") or "",
             "all_ingredients_summary": all_ingredients_summary,
@@ -747,19 +797,79 @@ async def estimate_missing_quantities_llm(
     if not to_ask:
         return 0
 
-    logger.info(
-        f"Estimating quantities via LLM for {len(to_ask)} ingredients "
-        f"(recipe: '{title}')"
+    keys = [dictionary.unit_key(dictionary.intern(item["name_en"]), item["unit"]) for item in to_ask]
+    asked = dict(zip(keys, to_ask))
+    entries = await _QTY_FLIGHT.run(
+        asked,
+        lambda owned: _estimate_quantities({k: asked[k] for k in owned}, recipe_context, steps_text, title),
     )
-    estimates = await _batch_estimate_quantities_llm(to_ask, recipe_context, steps_text)
 
     estimated_count = 0
-    for idx, item, estimate in zip(to_ask_indices, to_ask, estimates):
+    for idx, key in zip(to_ask_indices, keys):
         ing = ingredients[idx]
-        cache_key = f"{item['unit']}|{item['name_en'].lower().strip()}"
+        entry = entries.get(key)
+        if entry is None or entry["confidence"] is None:
+            continue
+
+        est_qty = entry["quantity"]
+        est_unit = entry["unit"]
+        est_conf = entry["confidence"]
+        est_rationale = entry.get("rationale", "")
+
+        if est_conf == "high":
+            ing["quantity"] = est_qty
+            ing["unit"] = est_unit
+            ing["quantitySource"] = "estimated"
+            ing["quantityRationale"] = est_rationale
+            estimated_count += 1
+            logger.info(
+                f"Qty estimate (high): '{ing['name_en']}' → "
+                f"{est_qty} {est_unit} ({est_rationale})"
+            )
+        else:
+            ing["quantityEstimate"] = {
+                "quantity": est_qty,
+                "unit": est_unit,
+                "confidence": est_conf,
+                "rationale": est_rationale,
+            }
+            ing["quantitySource"] = "estimated_low"
+            logger.info(
+                f"Qty estimate ({est_conf}, not applied): '{ing['name_en']}' → "
+                f"{est_qty} {est_unit} ({est_rationale})"
+            )
+
+    return estimated_count
+
+
+async def _estimate_quantities(
+    items: Dict[str, Dict[str, Any]],
+    recipe_context: str,
+    steps_text: str,
+    title: str,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Ask the LLM for missing quantities and cache every answer (nulls included).
+
+    Args:
+        items: "unit|name" cache key → ingredient item of the prompt
+        recipe_context: Recipe summary line of the prompt
+        steps_text: Condensed recipe steps
+        title: Recipe title (logging)
+
+    Returns:
+        cache key → cache entry ({quantity, unit, confidence, rationale}).
+    """
+    logger.info(
+        f"Estimating quantities via LLM for {len(items)} ingredients "
+        f"(recipe: '{title}')"
+    )
+    estimates = await _batch_estimate_quantities_llm(list(items.values()), recipe_context, steps_text)
 
+    new_entries: Dict[str, Dict[str, Any]] = {}
+    for (key, item), estimate in zip(items.items(), estimates):
         if estimate is None:
-            cache[cache_key] = {
+            new_entries[key] = {
                 "quantity": None, "unit": None,
                 "confidence": None, "rationale": "LLM returned null",
             }
@@ -767,7 +877,6 @@ async def estimate_missing_quantities_llm(
 
         est_qty = estimate["quantity"]
         est_unit = estimate["unit"]
-        est_conf = estimate.get("confidence", "medium")
         est_rationale = estimate.get("rationale", "")
 
         if est_qty <= 0 or est_qty > 5000:
@@ -775,46 +884,27 @@ async def estimate_missing_quantities_llm(
                 f"LLM qty estimate {est_qty} {est_unit} for "
                 f"'{item['name_en']}' — out of range, treating as null"
             )
-            cache[cache_key] = {
+            new_entries[key] = {
                 "quantity": est_qty, "unit": est_unit,
                 "confidence": None, "rationale": f"out of range: {est_rationale}",
             }
             continue
 
-        cache[cache_key] = {
+        new_entries[key] = {
             "quantity": est_qty,
             "unit": est_unit,
-            "confidence": est_conf,
+            "confidence": estimate.get("confidence", "medium"),
             "rationale": est_rationale,
         }
 
-        if est_conf == "high":
-            ing["quantity"] = est_qty
-            ing["unit"] = est_unit
-            ing["quantitySource"] = "estimated"
-            ing["quantityRationale"] = est_rationale
-            estimated_count += 1
-            logger.info(
-                f"Qty estimate (high): '{item['name_en']}' → "
-                f"{est_qty} {est_unit} ({est_rationale})"
-            )
-        else:
-            ing["quantityEstimate"] = {
-                "quantity": est_qty,
-                "unit": est_unit,
-                "confidence": est_conf,
-                "rationale": est_rationale,
-            }
-            ing["quantitySource"] = "estimated_low"
-            logger.info(
-                f"Qty estimate ({est_conf}, not applied): '{item['name_en']}' → "
-                f"{est_qty} {est_unit} ({est_rationale})"
-            )
+    dictionary = IngredientDictionary.shared()
+    _save_qty_estimate_cache({dictionary.split_unit_key(k): v for k, v in new_entries.items()})
+    return new_entries
 
-    if to_ask:
-        _save_qty_estimate_cache(cache)
 
-    return estimated_count
+# Quantity prompts carry the recipe context, so they are coalesced per key
+# but not merged across recipes
+_QTY_FLIGHT = SingleFlight(_QTY_ESTIMATE_NAMESPACE)
 
 
 # ---------------------------------------------------------------------------
@@ -846,15 +936,46 @@ def default_piece_weight(name_en: str) -> Optional[float]:
 # Profile computation
 # ---------------------------------------------------------------------------
 
-def compute_nutrition_profile(
+# (profile key, nutrition entry key, decimals) — per-100g values scaled per ingredient
+_PROFILE_NUTRIENTS = [
+    ("calories", "energy_kcal", 1),
+    ("protein", "protein_g", 1),
+    ("fat", "fat_g", 1),
+    ("carbs", "carbs_g", 1),
+    ("fiber", "fiber_g", 1),
+    ("sugar", "sugar_g", 1),
+    ("saturatedFat", "saturated_fat_g", 1),
+    ("calcium", "calcium_mg", 1),
+    ("iron", "iron_mg", 2),
+    ("magnesium", "magnesium_mg", 1),
+    ("potassium", "potassium_mg", 1),
+    ("sodium", "sodium_mg", 1),
+    ("zinc", "zinc_mg", 2),
+]
+_MACRO_KEYS = [p for p, _, _ in _PROFILE_NUTRIENTS[:7]]
+_MINERAL_KEYS = [p for p, _, _ in _PROFILE_NUTRIENTS[7:]]
+_MINERAL_SOURCE_KEYS = [n for _, n, _ in _PROFILE_NUTRIENTS[7:]]
+
+_VOL_TO_ML = {"ml": 1.0, "l": 1000.0, "cl": 10.0, "dl": 100.0, "cup": 240.0, "tbsp": 15.0, "tsp": 5.0, "cs": 15.0, "cc": 5.0}
+
+
+def _prepare_profile(
     ingredients: List[Dict[str, Any]],
     nutrition_data: Dict[str, Optional[Dict[str, Any]]],
-    servings: int,
-    metadata: Optional[Dict[str, Any]] = None,
+    servings: Any,
+    metadata: Optional[Dict[str, Any]],
 ) -> Dict[str, Any]:
     """
-    Compute per-serving nutritional profile from ingredient nutrition data.
-    Applies liquid-retention heuristics for cooking liquids.
+    Resolve everything of a nutrition profile except the nutrient arithmetic.
+
+    Classifies each ingredient (negligible, unmatched, no weight…), estimates
+    its weight and liquid retention, and lays out ``ingredientDetails`` with
+    placeholders for the nutrient values of resolved ingredients.
+
+    Returns:
+        Dict with ``servings``, counters, ``issues``, ``details`` and
+        ``resolved``: one (nutrition entry, grams/100 × retention factor,
+        detail dict, has_minerals) tuple per resolved ingredient.
     """
     from ..services.nutrition_matcher import NutritionMatcher
 
@@ -873,46 +994,45 @@ def compute_nutrition_profile(
             return normalized_unit in _SMALL_HERB_UNITS or not unit
         return False
 
-    total = {
-        "calories": 0.0, "protein": 0.0, "fat": 0.0, "carbs": 0.0, "fiber": 0.0,
-        "sugar": 0.0, "saturatedFat": 0.0,
-        "calcium": 0.0, "iron": 0.0, "magnesium": 0.0,
-        "potassium": 0.0, "sodium": 0.0, "zinc": 0.0,
+    prepared: Dict[str, Any] = {
+        "servings": servings,
+        "matched": 0,
+        "total": 0,
+        "negligible": 0,
+        "liquid_retention_applied": False,
+        "issues": [],
+        "details": [],
+        "resolved": [],
     }
-    minerals_available = False
-    resolved_count = 0
-    matched_count = 0
-    total_count = 0
-    negligible_count = 0
-    liquid_retention_applied = False
-    issues: List[Dict[str, str]] = []
-    ingredient_details: List[Dict[str, Any]] = []
+    issues = prepared["issues"]
+    ingredient_details = prepared["details"]
 
     is_soup = _is_soup_recipe(metadata or {})
+    dictionary = IngredientDictionary.shared()
 
     for ing in ingredients:
         name_en = ing.get("name_en", "")
         name_orig = ing.get("name", "")
 
         if not name_en:
-            total_count += 1
+            prepared["total"] += 1
             ingredient_details.append({"name": name_orig or "?", "nameEn": "", "status": "no_translation"})
             issues.append({"ingredient": name_orig or "?", "issue": "no_translation", "detail": "Missing English name"})
             continue
 
         key = name_en.strip().lower()
         if _is_negligible(key, ing):
-            negligible_count += 1
+            prepared["negligible"] += 1
             continue
 
-        total_count += 1
-        nut = nutrition_data.get(key)
+        prepared["total"] += 1
+        nut = nutrition_data.get(dictionary.canonical(name_en))
         if not nut or nut.get("not_found"):
             ingredient_details.append({"name": name_orig or key, "nameEn": key, "status": "no_match"})
             issues.append({"ingredient": key, "issue": "no_match", "detail": "Not found in nutrition index"})
             continue
 
-        matched_count += 1
+        prepared["matched"] += 1
 
         # --- Fix broken fractions (e.g. qty=1, unit="/2 cup" → qty=0.5, unit="cup") ---
         _raw_unit = (ing.get("unit") or "")
@@ -955,61 +1075,22 @@ def compute_nutrition_profile(
         liquid_category = _classify_liquid(key, is_soup)
         if liquid_category is not None:
             unit_norm = (NutritionMatcher._normalize_unit(ing.get("unit") or "") or "").lower()
-            _VOL_TO_ML = {"ml": 1.0, "l": 1000.0, "cl": 10.0, "dl": 100.0, "cup": 240.0, "tbsp": 15.0, "tsp": 5.0, "cs": 15.0, "cc": 5.0}
             qty = ing.get("quantity") or 0
             volume_ml = qty * _VOL_TO_ML.get(unit_norm, 1.0) if unit_norm in _VOL_TO_ML else grams
             threshold = _FRYING_OIL_THRESHOLD_ML if liquid_category in ("frying_oil", "confit_fat") else _LIQUID_VOLUME_THRESHOLD_ML
             if volume_ml > threshold:
                 retention = _LIQUID_RETENTION_FACTORS.get(liquid_category, 1.0)
-                liquid_retention_applied = True
+                prepared["liquid_retention_applied"] = True
 
-        factor = (grams / 100.0) * retention
-        ing_cal = round((nut.get("energy_kcal", 0) or 0) * factor, 1)
-        ing_prot = round((nut.get("protein_g", 0) or 0) * factor, 1)
-        ing_fat = round((nut.get("fat_g", 0) or 0) * factor, 1)
-        ing_carbs = round((nut.get("carbs_g", 0) or 0) * factor, 1)
-        ing_fiber = round((nut.get("fiber_g", 0) or 0) * factor, 1)
-        ing_sugar = round((nut.get("sugar_g", 0) or 0) * factor, 1)
-        ing_sat_fat = round((nut.get("saturated_fat_g", 0) or 0) * factor, 1)
-
-        ing_calcium = round((nut.get("calcium_mg") or 0) * factor, 1)
-        ing_iron = round((nut.get("iron_mg") or 0) * factor, 2)
-        ing_magnesium = round((nut.get("magnesium_mg") or 0) * factor, 1)
-        ing_potassium = round((nut.get("potassium_mg") or 0) * factor, 1)
-        ing_sodium = round((nut.get("sodium_mg") or 0) * factor, 1)
-        ing_zinc = round((nut.get("zinc_mg") or 0) * factor, 2)
-
-        has_minerals = any(nut.get(k) is not None for k in ("calcium_mg", "iron_mg", "magnesium_mg", "potassium_mg", "sodium_mg", "zinc_mg"))
-        if has_minerals:
-            minerals_available = True
-
-        total["calories"] += ing_cal
-        total["protein"] += ing_prot
-        total["fat"] += ing_fat
-        total["carbs"] += ing_carbs
-        total["fiber"] += ing_fiber
-        total["sugar"] += ing_sugar
-        total["saturatedFat"] += ing_sat_fat
-        total["calcium"] += ing_calcium
-        total["iron"] += ing_iron
-        total["magnesium"] += ing_magnesium
-        total["potassium"] += ing_potassium
-        total["sodium"] += ing_sodium
-        total["zinc"] += ing_zinc
-
-        detail_entry: Dict[str, Any] = {
-            "name": name_orig or key, "nameEn": key,
-            "grams": round(grams * retention, 1),
-            "calories": ing_cal, "protein": ing_prot, "fat": ing_fat,
-            "carbs": ing_carbs, "fiber": ing_fiber,
-            "sugar": ing_sugar, "saturatedFat": ing_sat_fat,
-            "status": "resolved",
-        }
+        has_minerals = any(nut.get(k) is not None for k in _MINERAL_SOURCE_KEYS)
+
+        # Nutrient values are filled in by the caller (scalar or batched path);
+        # the placeholders fix the key order of the serialized detail.
+        detail_entry: Dict[str, Any] = {"name": name_orig or key, "nameEn": key, "grams": round(grams * retention, 1)}
+        detail_entry.update(dict.fromkeys(_MACRO_KEYS))
+        detail_entry["status"] = "resolved"
         if has_minerals:
-            detail_entry["minerals"] = {
-                "calcium": ing_calcium, "iron": ing_iron, "magnesium": ing_magnesium,
-                "potassium": ing_potassium, "sodium": ing_sodium, "zinc": ing_zinc,
-            }
+            detail_entry["minerals"] = None
         qty = ing.get("quantity")
         unit = ing.get("unit")
         if qty is not None:
@@ -1019,14 +1100,27 @@ def compute_nutrition_profile(
         if quantity_estimated:
             detail_entry["quantityEstimated"] = True
         ingredient_details.append(detail_entry)
-        resolved_count += 1
 
-    if servings and servings > 0:
-        for key in total:
-            if key in ("iron", "zinc"):
-                total[key] = round(total[key] / servings, 2)
-            else:
-                total[key] = round(total[key] / servings, 1)
+        factor = (grams / 100.0) * retention
+        prepared["resolved"].append((nut, factor, detail_entry, has_minerals))
+
+    return prepared
+
+
+def _fill_detail(detail: Dict[str, Any], values: List[float], has_minerals: bool) -> None:
+    """Write one ingredient's nutrient values (``_PROFILE_NUTRIENTS`` order) into its detail."""
+    for name, value in zip(_MACRO_KEYS, values):
+        detail[name] = value
+    if has_minerals:
+        detail["minerals"] = dict(zip(_MINERAL_KEYS, values[len(_MACRO_KEYS):]))
+
+
+def _assemble_profile(prepared: Dict[str, Any], total: Dict[str, float]) -> Dict[str, Any]:
+    """Build the profile dict from prepared ingredients and per-serving totals."""
+    resolved_count = len(prepared["resolved"])
+    total_count = prepared["total"]
+    ingredient_details = prepared["details"]
+    issues = prepared["issues"]
 
     if total_count == 0:
         confidence = "none"
@@ -1037,35 +1131,23 @@ def compute_nutrition_profile(
     else:
         confidence = "low"
 
-    result = {
-        "calories": total["calories"],
-        "protein": total["protein"],
-        "fat": total["fat"],
-        "carbs": total["carbs"],
-        "fiber": total["fiber"],
-        "sugar": total["sugar"],
-        "saturatedFat": total["saturatedFat"],
+    result = {name: total[name] for name in _MACRO_KEYS}
+    result.update({
         "confidence": confidence,
         "resolvedIngredients": resolved_count,
-        "matchedIngredients": matched_count,
+        "matchedIngredients": prepared["matched"],
         "totalIngredients": total_count,
-        "negligibleIngredients": negligible_count,
+        "negligibleIngredients": prepared["negligible"],
         "source": "OpenNutrition",
-    }
+    })
+    minerals_available = any(has_minerals for _, _, _, has_minerals in prepared["resolved"])
     if minerals_available and resolved_count > 0:
         mineral_details = [d for d in ingredient_details if d.get("status") == "resolved" and d.get("minerals")]
         mineral_coverage = len(mineral_details) / resolved_count
         if mineral_coverage >= 0.5:
-            result["minerals"] = {
-                "calcium": total["calcium"],
-                "iron": total["iron"],
-                "magnesium": total["magnesium"],
-                "potassium": total["potassium"],
-                "sodium": total["sodium"],
-                "zinc": total["zinc"],
-            }
+            result["minerals"] = {name: total[name] for name in _MINERAL_KEYS}
             result["mineralCoverage"] = round(mineral_coverage, 2)
-    if liquid_retention_applied:
+    if prepared["liquid_retention_applied"]:
         result["liquidRetentionApplied"] = True
     if issues:
         result["issues"] = issues
@@ -1074,6 +1156,144 @@ def compute_nutrition_profile(
     return result
 
 
+def compute_nutrition_profile(
+    ingredients: List[Dict[str, Any]],
+    nutrition_data: Dict[str, Optional[Dict[str, Any]]],
+    servings: int,
+    metadata: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Compute per-serving nutritional profile from ingredient nutrition data.
+    Applies liquid-retention heuristics for cooking liquids.
+
+    See compute_nutrition_profiles() for the batched equivalent.
+    """
+    prepared = _prepare_profile(ingredients, nutrition_data, servings, metadata)
+    servings = prepared["servings"]
+
+    total = {name: 0.0 for name, _, _ in _PROFILE_NUTRIENTS}
+    for nut, factor, detail, has_minerals in prepared["resolved"]:
+        values = [round((nut.get(src) or 0) * factor, decimals) for _, src, decimals in _PROFILE_NUTRIENTS]
+        for (name, _, _), value in zip(_PROFILE_NUTRIENTS, values):
+            total[name] += value
+        _fill_detail(detail, values, has_minerals)
+
+    if servings and servings > 0:
+        for name, _, decimals in _PROFILE_NUTRIENTS:
+            total[name] = round(total[name] / servings, decimals)
+
+    return _assemble_profile(prepared, total)
+
+
+# ---------------------------------------------------------------------------
+# Batched profile computation (library-wide recomputes)
+# ---------------------------------------------------------------------------
+
+_NUTRIENT_DECIMALS = np.array([d for _, _, d in _PROFILE_NUTRIENTS], dtype=np.float64)
+
+
+def _round_like_builtin(values: np.ndarray, decimals: np.ndarray) -> np.ndarray:
+    """
+    Vectorized ``round(value, decimals)`` with the exact results of the builtin.
+
+    ``np.round`` scales by 10**decimals before rounding, which can move a
+    value lying (almost) on a rounding boundary to the other side. Such
+    near-ties are rare and are re-rounded with the builtin.
+    """
+    scale = 10.0 ** decimals
+    scaled = values * scale
+    rounded = np.rint(scaled) / scale
+    distance = np.abs(scaled - np.floor(scaled) - 0.5)
+    near_tie = distance <= 1e-6 * np.maximum(1.0, np.abs(scaled))
+    if near_tie.any():
+        digits = np.broadcast_to(decimals, values.shape)
+        for idx in zip(*np.nonzero(near_tie)):
+            rounded[idx] = round(float(values[idx]), int(digits[idx]))
+    return rounded
+
+
+def compute_nutrition_profiles(
+    recipes: List[tuple],
+    nutrition_data: Dict[str, Optional[Dict[str, Any]]],
+) -> List[Dict[str, Any]]:
+    """
+    Compute the nutrition profiles of many recipes at once.
+
+    Same output as calling compute_nutrition_profile() on each recipe, but
+    the nutrient arithmetic runs on arrays: every matched entry becomes a row
+    of a nutrient matrix, resolved ingredients gather their row and scale it
+    by their grams × retention factor, and per-recipe totals are accumulated
+    over a CSR-style ingredient → recipe layout. Totals are summed in
+    ingredient order (like the scalar loop) so results are bit-identical.
+
+    Args:
+        recipes: (ingredients, servings, metadata) per recipe
+        nutrition_data: Nutrition entries keyed by lowercased English name,
+            shared by all recipes
+
+    Returns:
+        One profile per recipe, in input order.
+    """
+    prepared_all = [
+        _prepare_profile(ingredients, nutrition_data, servings, metadata)
+        for ingredients, servings, metadata in recipes
+    ]
+    if not prepared_all:
+        return []
+
+    # Nutrient matrix: one row per distinct matched entry
+    row_of: Dict[int, int] = {}
+    matrix_rows: List[List[float]] = []
+    entry_rows: List[int] = []
+    factors: List[float] = []
+    indptr = [0]
+    for prepared in prepared_all:
+        for nut, factor, _, _ in prepared["resolved"]:
+            row = row_of.get(id(nut))
+            if row is None:
+                row = row_of[id(nut)] = len(matrix_rows)
+                matrix_rows.append([float(nut.get(src) or 0) for _, src, _ in _PROFILE_NUTRIENTS])
+            entry_rows.append(row)
+            factors.append(factor)
+        indptr.append(len(entry_rows))
+
+    n_recipes = len(prepared_all)
+    n_nutrients = len(_PROFILE_NUTRIENTS)
+    indptr_arr = np.asarray(indptr)
+    counts = np.diff(indptr_arr)
+
+    if entry_rows:
+        matrix = np.asarray(matrix_rows, dtype=np.float64)
+        values = matrix[np.asarray(entry_rows)] * np.asarray(factors, dtype=np.float64)[:, None]
+        values = _round_like_builtin(values, _NUTRIENT_DECIMALS)
+
+        # Per-recipe sums in ingredient order: scatter into a zero-padded
+        # (recipe, position, nutrient) block and accumulate along positions.
+        recipe_of = np.repeat(np.arange(n_recipes), counts)
+        position = np.arange(len(entry_rows)) - indptr_arr[recipe_of] + 1
+        block = np.zeros((n_recipes, int(counts.max()) + 1, n_nutrients))
+        block[recipe_of, position] = values
+        sums = np.cumsum(block, axis=1)[:, -1, :]
+    else:
+        values = np.zeros((0, n_nutrients))
+        sums = np.zeros((n_recipes, n_nutrients))
+
+    servings = [prepared["servings"] for prepared in prepared_all]
+    divide = np.array([bool(s and s > 0) for s in servings])
+    divisor = np.array([s if d else 1 for s, d in zip(servings, divide)], dtype=np.float64)
+    per_serving = _round_like_builtin(sums / divisor[:, None], _NUTRIENT_DECIMALS)
+    per_serving = np.where(divide[:, None], per_serving, sums)
+
+    value_lists = values.tolist()
+    profiles = []
+    for i, prepared in enumerate(prepared_all):
+        for offset, (_, _, detail, has_minerals) in enumerate(prepared["resolved"]):
+            _fill_detail(detail, value_lists[indptr[i] + offset], has_minerals)
+        total = dict(zip((name for name, _, _ in _PROFILE_NUTRIENTS), per_serving[i].tolist()))
+        profiles.append(_assemble_profile(prepared, total))
+    return profiles
+
+
 def derive_nutrition_tags(profile: Dict[str, Any]) -> List[str]:
     """Derive qualitative nutrition tags from the nutrition profile."""
     tags = []
@@ -2,7 +2,7 @@
 
 import logging
 import re as _re
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, List, Optional, Tuple, Union
 
 logger = logging.getLogger(__name__)
 
@@ -151,6 +151,93 @@ def repair_ingredient_fractions(ingredients: List[Dict[str, Any]]) -> int:
     return repairs
 
 
+# ---------------------------------------------------------------------------
+# Stored-library coercion (string quantities / servings left by legacy runs)
+# ---------------------------------------------------------------------------
+
+_NULL_VALUES = {"null", "none", "", "unspecified", "to taste", "as needed", "optional"}
+_DEFAULT_SERVINGS = 4
+
+_RANGE_RE = _re.compile(r"^([\d.]+)\s*(?:to|-|–|—)\s*([\d.]+)$")
+_APPROX_RE = _re.compile(r"^[~≈≃]?\s*([\d.]+)$")
+_FRACTION_RE = _re.compile(r"^(\d+)/(\d+)$")
+_MIXED_RE = _re.compile(r"^(\d+)\s+(\d+)/(\d+)$")
+
+
+def coerce_quantity(val: Union[str, int, float, None]) -> Optional[float]:
+    """Coerce a possibly-string quantity to float or None."""
+    if val is None:
+        return None
+    if isinstance(val, (int, float)):
+        return float(val)
+    if not isinstance(val, str):
+        return None
+
+    s = val.strip().lower()
+    if s in _NULL_VALUES:
+        return None
+
+    m = _RANGE_RE.match(s)
+    if m:
+        return round((float(m.group(1)) + float(m.group(2))) / 2, 2)
+
+    m = _APPROX_RE.match(s)
+    if m:
+        return float(m.group(1))
+
+    m = _FRACTION_RE.match(s)
+    if m:
+        return round(int(m.group(1)) / int(m.group(2)), 3)
+
+    m = _MIXED_RE.match(s)
+    if m:
+        return round(int(m.group(1)) + int(m.group(2)) / int(m.group(3)), 3)
+
+    try:
+        return float(s)
+    except ValueError:
+        return None
+
+
+def coerce_servings(val: Union[str, int, float, None]) -> Optional[int]:
+    """Coerce servings to int or None."""
+    result = coerce_quantity(val)
+    if result is None:
+        return None
+    return max(1, round(result))
+
+
+def coerce_string_values(recipe_data: Dict[str, Any]) -> int:
+    """
+    Replace string quantities and servings of a stored recipe by numbers.
+
+    Unlike sanitize_types (lenient, for fresh LLM output), this is exact:
+    "to taste" becomes null, "1/2" becomes 0.5 and servings that cannot
+    be read fall back to 4.
+
+    Returns:
+        Number of values rewritten.
+    """
+    fixed = 0
+    for ing in recipe_data.get("ingredients", []):
+        raw_qty = ing.get("quantity")
+        if isinstance(raw_qty, str):
+            ing["quantity"] = coerce_quantity(raw_qty)
+            fixed += 1
+            if ing["quantity"] is None and raw_qty.strip().lower() not in _NULL_VALUES:
+                logger.warning(
+                    f"[Sanitize] unreadable quantity for '{ing.get('name', '?')}': {raw_qty!r} -> null"
+                )
+
+    metadata = recipe_data.get("metadata") or {}
+    raw_srv = metadata.get("servings")
+    if isinstance(raw_srv, str):
+        servings = coerce_servings(raw_srv)
+        metadata["servings"] = servings if servings is not None else _DEFAULT_SERVINGS
+        fixed += 1
+    return fixed
+
+
 # ---------------------------------------------------------------------------
 # Type coercion
 # ---------------------------------------------------------------------------
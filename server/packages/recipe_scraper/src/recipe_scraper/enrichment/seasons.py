@@ -3,7 +3,7 @@
 import json
 import logging
 from pathlib import Path
-from typing import Dict, Any, List, Tuple, Set, Optional
+from typing import Dict, Any, Iterable, List, Tuple, Set, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -59,26 +59,177 @@ _MONTH_TO_SEASON = {
 }
 
 
-def _months_to_seasons(months: Set[str]) -> List[str]:
-    """Convert months to seasons."""
-    seasons = {_MONTH_TO_SEASON[m] for m in months if m in _MONTH_TO_SEASON}
-    return list(seasons) if seasons else ["all"]
+MONTHS = (
+    "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December",
+)
+_MONTH_BIT = {month: 1 << i for i, month in enumerate(MONTHS)}
+
+# Alphabetical, so that iterating the bits yields sorted season names
+_SEASONS = ("autumn", "spring", "summer", "winter")
+_SEASON_BIT = {season: 1 << i for i, season in enumerate(_SEASONS)}
+_SEASON_MONTHS = {
+    _SEASON_BIT[season]: sum(_MONTH_BIT[m] for m, s in _MONTH_TO_SEASON.items() if s == season)
+    for season in _SEASONS
+}
+# Month names sorted alphabetically (the order of peakMonths)
+_MONTHS_ALPHABETICAL = sorted(MONTHS)
+
+
+def months_mask(months: Iterable[str]) -> int:
+    """12-bit mask of month names (bit 0 = January); unknown names are ignored."""
+    mask = 0
+    for month in months:
+        mask |= _MONTH_BIT.get(month, 0)
+    return mask
+
+
+def _mask_to_months(mask: int) -> List[str]:
+    """Month names of a mask, sorted alphabetically."""
+    return [m for m in _MONTHS_ALPHABETICAL if mask & _MONTH_BIT[m]]
+
+
+def _season_mask(month_mask: int) -> int:
+    return sum(bit for bit, months in _SEASON_MONTHS.items() if month_mask & months)
+
+
+class SeasonalityEngine:
+    """
+    Precompiled seasonal lookup.
+
+    Index names (with their plural forms) are stored in a trie over words,
+    and every produce item carries its peak months as a 12-bit mask and its
+    seasons as a 4-bit mask, so recipe seasons are a few bitwise operations.
+    """
+
+    _shared: Optional["SeasonalityEngine"] = None
+
+    def __init__(self, index: Optional[Dict[str, dict]] = None, staples: Optional[Set[str]] = None):
+        """
+        Compile the engine.
+
+        Args:
+            index: Lowercased name → produce item (default: seasonal_produce.json)
+            staples: Year-round staples, never counted (default: YEAR_ROUND_STAPLES)
+        """
+        index = _SEASONAL_INDEX if index is None else index
+        staples = YEAR_ROUND_STAPLES if staples is None else staples
+        # Trie node: word → child; "" key holds the item ending there
+        self._trie: Dict[str, Any] = {}
+        for key, item in index.items():
+            words = key.split()
+            if " ".join(words) != key:
+                continue  # unreachable from a split name
+            node = self._trie
+            for word in words:
+                node = node.setdefault(word, {})
+            node[""] = item
+
+        # id(item) → (month mask, season mask); 0 months = not seasonal
+        self._masks: Dict[int, Tuple[int, int]] = {}
+        self._items: List[Tuple[str, int]] = []
+        for item in {id(item): item for item in index.values()}.values():
+            peak = months_mask(item.get("peak_months", []))
+            counted = item["name"].lower() not in staples and 0 < len(set(item.get("peak_months", []))) < 12
+            self._masks[id(item)] = (peak, _season_mask(peak)) if counted else (0, 0)
+            self._items.append((item["name"], peak))
+        self._memo: Dict[str, Optional[dict]] = {}
+
+    @classmethod
+    def shared(cls) -> "SeasonalityEngine":
+        """Process-wide engine built from seasonal_produce.json."""
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def match(self, ingredient_name: str) -> Optional[dict]:
+        """
+        Produce item of an ingredient name: the longest matching word
+        sequence, the rightmost one among equally long matches.
+        """
+        if ingredient_name in self._memo:
+            return self._memo[ingredient_name]
+        words = ingredient_name.lower().split()
+        best: Optional[dict] = None
+        best_len = 0
+        for start in range(len(words)):
+            node = self._trie
+            for end in range(start, len(words)):
+                node = node.get(words[end])
+                if node is None:
+                    break
+                item = node.get("")
+                if item is not None and end - start + 1 >= best_len:
+                    best, best_len = item, end - start + 1
+        self._memo[ingredient_name] = best
+        return best
+
+    def produce_in_season(self, month: str) -> List[str]:
+        """Names of the produce items at their peak in *month* (reverse index)."""
+        bit = _MONTH_BIT[month]
+        return [name for name, peak in self._items if peak & bit]
+
+    def determine(self, recipe_json: Dict[str, Any]) -> Tuple[List[str], List[str]]:
+        """Seasons and peak months of a recipe (see determine_seasons)."""
+        # Keyed by display name: repeated ingredients vote once
+        ingredient_seasons: Dict[str, int] = {}
+        all_peak = 0
+
+        for ingredient in recipe_json.get("ingredients", []):
+            name_en = (ingredient.get("name_en") or "").lower()
+            name_orig = (ingredient.get("name") or "").lower()
+            name = name_en if name_en else name_orig
+            if not name or (ingredient.get("category") or "").lower() != "produce":
+                continue
+
+            item = self.match(name)
+            if item is None:
+                continue
+            peak, seasons = self._masks[id(item)]
+            if not peak:
+                continue
+
+            display_name = f"{name_orig} ({name_en})" if name_en and name_en != name_orig else name_orig
+            ingredient_seasons[display_name] = seasons
+            all_peak |= peak
+
+        if not ingredient_seasons:
+            return ["all"], []
+
+        # Intersection of all ingredient seasons
+        common = (1 << len(_SEASONS)) - 1
+        for seasons in ingredient_seasons.values():
+            common &= seasons
+
+        # Majority vote fallback if intersection is empty
+        if not common:
+            threshold = len(ingredient_seasons) / 2
+            for bit in _SEASON_BIT.values():
+                if sum(1 for seasons in ingredient_seasons.values() if seasons & bit) >= threshold:
+                    common |= bit
+            if not common:
+                for seasons in ingredient_seasons.values():
+                    common |= seasons
+
+        if bin(common).count("1") >= len(_SEASONS):
+            return ["all"], _mask_to_months(all_peak)
+
+        months_in_common = 0
+        for bit, months in _SEASON_MONTHS.items():
+            if common & bit:
+                months_in_common |= months
+        seasons_list = [season for season in _SEASONS if common & _SEASON_BIT[season]]
+        return seasons_list, _mask_to_months(all_peak & months_in_common)
 
 
 def match_seasonal_item(ingredient_name: str) -> Optional[dict]:
     """
-    Match an ingredient name against the seasonal index using n-gram lookup.
+    Match an ingredient name against the seasonal index.
 
-    Tries all contiguous sub-phrases by decreasing length for best precision.
+    Picks the longest contiguous sub-phrase found in the index (the
+    rightmost one among equally long sub-phrases).
     """
-    words = ingredient_name.lower().split()
-    n = len(words)
-    for length in range(n, 0, -1):
-        for start in range(n - length, -1, -1):
-            candidate = " ".join(words[start:start + length])
-            if candidate in _SEASONAL_INDEX:
-                return _SEASONAL_INDEX[candidate]
-    return None
+    return SeasonalityEngine.shared().match(ingredient_name)
 
 
 def determine_seasons(recipe_json: Dict[str, Any]) -> Tuple[List[str], List[str]]:
@@ -88,59 +239,4 @@ def determine_seasons(recipe_json: Dict[str, Any]) -> Tuple[List[str], List[str]
 
     Returns (seasons, peak_months).
     """
-    ingredient_seasons: Dict[str, set] = {}
-    all_peak_months: set = set()
-
-    for ingredient in recipe_json.get("ingredients", []):
-        name_en = ingredient.get("name_en", "").lower()
-        name_orig = ingredient.get("name", "").lower()
-        name = name_en if name_en else name_orig
-        display_name = f"{name_orig} ({name_en})" if name_en and name_en != name_orig else name_orig
-        category = ingredient.get("category", "").lower()
-
-        if not name or category != "produce":
-            continue
-
-        item = match_seasonal_item(name)
-        if item is None:
-            continue
-
-        item_name = item["name"].lower()
-        if item_name in YEAR_ROUND_STAPLES:
-            continue
-
-        peak_months = set(item.get("peak_months", []))
-        if not peak_months or len(peak_months) >= 12:
-            continue
-
-        seasons = set(_months_to_seasons(peak_months))
-        ingredient_seasons[display_name] = seasons
-        all_peak_months.update(peak_months)
-
-    if not ingredient_seasons:
-        return ["all"], []
-
-    # Intersection of all ingredient seasons
-    common_seasons = None
-    for seasons in ingredient_seasons.values():
-        common_seasons = seasons if common_seasons is None else common_seasons & seasons
-
-    # Majority vote fallback if intersection is empty
-    if not common_seasons:
-        season_votes: Dict[str, int] = {}
-        for seasons in ingredient_seasons.values():
-            for s in seasons:
-                season_votes[s] = season_votes.get(s, 0) + 1
-        threshold = len(ingredient_seasons) / 2
-        common_seasons = {s for s, c in season_votes.items() if c >= threshold}
-        if not common_seasons:
-            common_seasons = set(season_votes.keys())
-
-    seasons_list = ["all"] if len(common_seasons) >= 4 else sorted(common_seasons)
-
-    final_peak_months = {
-        m for m in all_peak_months
-        if _MONTH_TO_SEASON.get(m) in common_seasons or "all" in seasons_list
-    }
-
-    return seasons_list, sorted(final_peak_months)
+    return SeasonalityEngine.shared().determine(recipe_json)
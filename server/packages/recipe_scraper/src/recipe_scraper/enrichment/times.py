@@ -1,8 +1,9 @@
 """DAG-based time calculation for recipe step graphs."""
 
 import logging
+from functools import lru_cache
 from graphlib import TopologicalSorter, CycleError
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from recipe_structurer.shared import parse_iso8601_minutes, EQUIPMENT_KEYWORDS
 
 logger = logging.getLogger(__name__)
@@ -18,8 +19,12 @@ def _parse_time_to_minutes(time_str: str) -> float:
     """
     if not time_str:
         return 0.0
+    return _parse_duration(str(time_str).strip())
 
-    time_str = str(time_str).strip()
+
+@lru_cache(maxsize=4096)
+def _parse_duration(time_str: str) -> float:
+    # Memoized: a library repeats the same few hundred duration strings
     original_str = time_str
 
     if time_str.upper().startswith("PT"):
@@ -145,110 +150,317 @@ def _calculate_times_linear_fallback(recipe_data: Dict[str, Any]) -> Dict[str, A
     }
 
 
-def calculate_times_from_dag(recipe_data: Dict[str, Any]) -> Dict[str, Any]:
+class StepGraph:
+    """
+    Compiled step DAG of a recipe.
+
+    Steps get integer ids (JSON order, first occurrence of each id); edges
+    are kept as predecessor/successor index lists and durations are parsed
+    once. Earliest finishes are kept up to date incrementally when a step
+    duration or an edge changes (``set_duration``, ``add_edge``,
+    ``remove_edge`` or ``update_step`` after an edit of the step dict): only
+    the steps downstream of the change are recomputed.
     """
-    Calculate recipe times using the critical path through the step DAG.
 
-    Returns dict with ISO 8601 strings + float minutes.
+    def __init__(self, recipe_data: Dict[str, Any]):
+        steps = recipe_data.get("steps", [])
+        self.title: str = recipe_data.get("metadata", {}).get("title", "?")
+
+        self.ids: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.duration: List[float] = []
+        self.passive: List[bool] = []
+        for step in steps:
+            sid = step.get("id", "")
+            if sid not in self.index:
+                self.index[sid] = len(self.ids)
+                self.ids.append(sid)
+                self.duration.append(0.0)
+                self.passive.append(False)
+            node = self.index[sid]
+            self.duration[node] = _step_duration(step)
+            self.passive[node] = bool(step.get("isPassive", False))
+
+        state_producer: Dict[str, str] = {}
+        for step in steps:
+            prod = step.get("produces", "")
+            if prod:
+                state_producer[prod] = step["id"]
+        self._state_producer = state_producer
+        self._final_producer: Optional[int] = None
+        final_state = recipe_data.get("finalState", "")
+        if final_state and final_state in state_producer:
+            self._final_producer = self.index[state_producer[final_state]]
+
+        self._ingredient_ids = {ing.get("id", "") for ing in recipe_data.get("ingredients", [])}
+        self.preds: List[List[int]] = [[] for _ in self.ids]
+        self.succs: List[List[int]] = [[] for _ in self.ids]
+        for step in steps:
+            node = self.index[step["id"]]
+            for pred in self._step_preds(step):
+                if pred not in self.preds[node]:
+                    self.preds[node].append(pred)
+                    self.succs[pred].append(node)
+
+        self.earliest_finish: List[float] = [0.0] * len(self.ids)
+        self.critical_pred: List[Optional[int]] = [None] * len(self.ids)
+        self._sort()
+        self._propagate(self.order)
+
+    def _step_preds(self, step: Dict[str, Any]) -> List[int]:
+        """Producers of the states a step uses or requires (ingredients excluded)."""
+        node = self.index[step["id"]]
+        preds = []
+        for ref in list(step.get("uses", [])) + list(step.get("requires", [])):
+            if ref in self._ingredient_ids or ref not in self._state_producer:
+                continue
+            pred = self.index[self._state_producer[ref]]
+            if pred != node and pred not in preds:
+                preds.append(pred)
+        return preds
+
+    # ------------------------------------------------------------------
+    # Forward pass
+    # ------------------------------------------------------------------
+
+    def _sort(self) -> None:
+        """Topological order of the nodes (JSON order when the graph has a cycle)."""
+        try:
+            self.order: List[int] = list(TopologicalSorter(dict(enumerate(self.preds))).static_order())
+            self.cyclic = False
+        except CycleError:
+            logger.warning(f"[{self.title}] Cycle detected in step DAG, falling back to JSON order")
+            self.order = list(range(len(self.ids)))
+            self.cyclic = True
+        self._position = {node: pos for pos, node in enumerate(self.order)}
+
+    def _relax(self, node: int, done: Optional[set] = None) -> bool:
+        """Recompute the earliest finish of *node*; returns whether it changed."""
+        best_finish, best_pred = 0.0, None
+        for pred in self.preds[node]:
+            # On a cycle, predecessors not reached yet in JSON order count as 0
+            finish = self.earliest_finish[pred] if done is None or pred in done else 0.0
+            if finish > best_finish:
+                best_finish, best_pred = finish, pred
+        finish = best_finish + self.duration[node]
+        changed = finish != self.earliest_finish[node] or best_pred != self.critical_pred[node]
+        self.earliest_finish[node] = finish
+        self.critical_pred[node] = best_pred
+        return changed
+
+    def _propagate(self, dirty_nodes: List[int]) -> None:
+        """Recompute the earliest finishes downstream of *dirty_nodes*."""
+        if self.cyclic:
+            done: set = set()
+            for node in self.order:
+                self._relax(node, done)
+                done.add(node)
+            return
+        if not dirty_nodes:
+            return
+        dirty = set(dirty_nodes)
+        for node in self.order[min(self._position[n] for n in dirty):]:
+            if node in dirty and self._relax(node):
+                dirty.update(self.succs[node])
+
+    # ------------------------------------------------------------------
+    # Incremental updates
+    # ------------------------------------------------------------------
+
+    def set_duration(self, step_id: str, minutes: float) -> None:
+        """Change the duration of a step."""
+        node = self.index[step_id]
+        self.duration[node] = minutes
+        self._propagate([node])
+
+    def add_edge(self, pred_id: str, step_id: str) -> None:
+        """
+        Make *step_id* depend on *pred_id*.
+
+        Raises:
+            ValueError: If the edge would create a cycle.
+        """
+        pred, node = self.index[pred_id], self.index[step_id]
+        if pred == node or pred in self.preds[node]:
+            return
+        self.preds[node].append(pred)
+        self.succs[pred].append(node)
+        if not self.cyclic and self._position[pred] > self._position[node]:
+            try:
+                self.order = list(TopologicalSorter(dict(enumerate(self.preds))).static_order())
+            except CycleError:
+                self.preds[node].remove(pred)
+                self.succs[pred].remove(node)
+                raise ValueError(f"Edge {pred_id} → {step_id} would create a cycle")
+            self._position = {n: pos for pos, n in enumerate(self.order)}
+        self._propagate([node])
+
+    def remove_edge(self, pred_id: str, step_id: str) -> None:
+        """Drop the dependency of *step_id* on *pred_id*."""
+        pred, node = self.index[pred_id], self.index[step_id]
+        if pred not in self.preds[node]:
+            return
+        self.preds[node].remove(pred)
+        self.succs[pred].remove(node)
+        if self.cyclic:
+            # Removing the edge may have broken the cycle: start over
+            self._sort()
+            self._propagate(self.order)
+            return
+        self._propagate([node])
+
+    def update_step(self, step: Dict[str, Any]) -> None:
+        """
+        Re-read the duration, passive flag and uses/requires of an edited step.
+
+        The step must keep its id and what it produces; a change of
+        ``produces`` needs a new graph.
+
+        Raises:
+            ValueError: If the new references would create a cycle (the
+                graph is then partially updated and should be rebuilt).
+        """
+        node = self.index[step["id"]]
+        self.passive[node] = bool(step.get("isPassive", False))
+        self.duration[node] = _step_duration(step)
+        wanted = self._step_preds(step)
+        for pred in [p for p in self.preds[node] if p not in wanted]:
+            self.remove_edge(self.ids[pred], step["id"])
+        for pred in [p for p in wanted if p not in self.preds[node]]:
+            self.add_edge(self.ids[pred], step["id"])
+        self._propagate([node])
+
+    # ------------------------------------------------------------------
+    # Results
+    # ------------------------------------------------------------------
+
+    @property
+    def critical_end(self) -> Optional[int]:
+        """Producer of the final state, else the step finishing last."""
+        if self._final_producer is not None:
+            return self._final_producer
+        if not self.order:
+            return None
+        return max(self.order, key=self.earliest_finish.__getitem__)
+
+    def critical_path(self) -> List[int]:
+        """Nodes of the critical path, first step first."""
+        path = []
+        current = self.critical_end
+        while current is not None:
+            path.append(current)
+            current = self.critical_pred[current]
+        path.reverse()
+        return path
+
+    def times(self) -> Dict[str, Any]:
+        """Total, active and passive times along the critical path."""
+        end = self.critical_end
+        total = self.earliest_finish[end] if end is not None else 0.0
+        active = passive = 0.0
+        for node in self.critical_path():
+            if self.passive[node]:
+                passive += self.duration[node]
+            else:
+                active += self.duration[node]
+        return {
+            "totalTime": _minutes_to_iso8601(total),
+            "totalActiveTime": _minutes_to_iso8601(active),
+            "totalPassiveTime": _minutes_to_iso8601(passive),
+            "totalTimeMinutes": round(total, 1),
+            "totalActiveTimeMinutes": round(active, 1),
+            "totalPassiveTimeMinutes": round(passive, 1),
+        }
+
+    def schedule(self) -> Dict[str, Dict[str, float]]:
+        """
+        Earliest/latest start and finish of every step, in minutes from the
+        start of the recipe, with its slack (0 on the critical path).
+
+        Latest finishes are computed backwards from the finish of the
+        critical end (the producer of the final state), so the critical path
+        has no slack even when a step that does not feed the final state
+        finishes later; such a step may at worst finish where it does now.
+        """
+        end = self.critical_end
+        horizon = self.earliest_finish[end] if end is not None else 0.0
+        latest_finish = [max(horizon, finish) for finish in self.earliest_finish]
+        for node in reversed(self.order):
+            for succ in self.succs[node]:
+                latest_finish[node] = min(latest_finish[node], latest_finish[succ] - self.duration[succ])
+        result = {}
+        for node, sid in enumerate(self.ids):
+            earliest_start = self.earliest_finish[node] - self.duration[node]
+            result[sid] = {
+                "earliestStart": round(earliest_start, 1),
+                "earliestFinish": round(self.earliest_finish[node], 1),
+                "latestStart": round(latest_finish[node] - self.duration[node], 1),
+                "latestFinish": round(latest_finish[node], 1),
+                "slack": round(max(latest_finish[node] - self.earliest_finish[node], 0.0), 1),
+            }
+        return result
+
+
+def _step_duration(step: Dict[str, Any]) -> float:
+    """Parsed duration of a step; 5 min fallback (0 for equipment steps like preheating)."""
+    dur_str = step.get("duration") or step.get("time")
+    if dur_str:
+        return _parse_time_to_minutes(dur_str)
+    action_lower = step.get("action", "").lower()
+    is_equipment = any(kw in action_lower for kw in EQUIPMENT_KEYWORDS)
+    return 0.0 if is_equipment else _FALLBACK_DURATION_MIN
+
+
+def calculate_times_and_schedule(
+    recipe_data: Dict[str, Any], log: bool = True,
+) -> Tuple[Dict[str, Any], Dict[str, Dict[str, float]]]:
+    """
+    Calculate recipe times and the step schedule from one compiled step DAG.
+
+    Args:
+        recipe_data: Recipe dict with steps, ingredients and finalState
+        log: Log the critical path (off in library-wide batch runs)
+
+    Returns:
+        (time info, schedule): ISO 8601 strings + float minutes, and the
+        per-step schedule of ``StepGraph.schedule`` (empty, with linear-sum
+        times, when the recipe has no steps list).
     """
     steps = recipe_data.get("steps", [])
     recipe_title = recipe_data.get("metadata", {}).get("title", "?")
 
     if not steps or not isinstance(steps, list):
-        logger.warning(f"No steps list found for '{recipe_title}', falling back to linear sum")
-        return _calculate_times_linear_fallback(recipe_data)
-
-    step_by_id: Dict[str, Dict] = {}
-    duration_min: Dict[str, float] = {}
-    is_passive: Dict[str, bool] = {}
-
-    for step in steps:
-        sid = step.get("id", "")
-        step_by_id[sid] = step
-        dur_str = step.get("duration") or step.get("time")
-        if dur_str:
-            duration_min[sid] = _parse_time_to_minutes(dur_str)
-        else:
-            action_lower = step.get("action", "").lower()
-            is_equipment = any(kw in action_lower for kw in EQUIPMENT_KEYWORDS)
-            duration_min[sid] = 0.0 if is_equipment else _FALLBACK_DURATION_MIN
-        is_passive[sid] = bool(step.get("isPassive", False))
-
-    state_producer: Dict[str, str] = {}
-    for step in steps:
-        prod = step.get("produces", "")
-        if prod:
-            state_producer[prod] = step["id"]
-
-    ingredient_ids = {ing.get("id", "") for ing in recipe_data.get("ingredients", [])}
-
-    predecessors: Dict[str, set] = {s["id"]: set() for s in steps}
-    for step in steps:
-        sid = step["id"]
-        refs = list(step.get("uses", [])) + list(step.get("requires", []))
-        for ref in refs:
-            if ref in ingredient_ids:
-                continue
-            if ref in state_producer:
-                pred_id = state_producer[ref]
-                if pred_id != sid:
-                    predecessors[sid].add(pred_id)
-
-    earliest_finish: Dict[str, float] = {}
-    critical_pred: Dict[str, Optional[str]] = {}
-
-    try:
-        sorted_ids = list(TopologicalSorter(predecessors).static_order())
-    except CycleError:
-        logger.warning(f"[{recipe_title}] Cycle detected in step DAG, falling back to JSON order")
-        sorted_ids = [s["id"] for s in steps]
-
-    for sid in sorted_ids:
-        max_pred_finish = 0.0
-        best_pred = None
-        for pred in predecessors.get(sid, set()):
-            pf = earliest_finish.get(pred, 0.0)
-            if pf > max_pred_finish:
-                max_pred_finish = pf
-                best_pred = pred
-        earliest_finish[sid] = max_pred_finish + duration_min.get(sid, 0.0)
-        critical_pred[sid] = best_pred
-
-    final_state = recipe_data.get("finalState", "")
-    if final_state and final_state in state_producer:
-        critical_end = state_producer[final_state]
-    else:
-        critical_end = max(earliest_finish, key=earliest_finish.get) if earliest_finish else None
-
-    total_time_min = earliest_finish.get(critical_end, 0.0) if critical_end else 0.0
-
-    critical_path_active = 0.0
-    critical_path_passive = 0.0
-    path_ids = []
-    current = critical_end
-    while current:
-        path_ids.append(current)
-        dur = duration_min.get(current, 0.0)
-        if is_passive.get(current, False):
-            critical_path_passive += dur
-        else:
-            critical_path_active += dur
-        current = critical_pred.get(current)
-    path_ids.reverse()
-
-    linear_total = sum(duration_min.values())
-    logger.info(
-        f"[{recipe_title}] DAG critical path: {total_time_min:.0f}min "
-        f"(active={critical_path_active:.0f}min + passive={critical_path_passive:.0f}min) | "
-        f"Linear sum would be: {linear_total:.0f}min | "
-        f"Path: {' → '.join(path_ids)}"
-    )
+        if log:
+            logger.warning(f"No steps list found for '{recipe_title}', falling back to linear sum")
+        return _calculate_times_linear_fallback(recipe_data), {}
+
+    graph = StepGraph(recipe_data)
+    time_info = graph.times()
+    if log:
+        logger.info(
+            f"[{recipe_title}] DAG critical path: {time_info['totalTimeMinutes']:.0f}min "
+            f"(active={time_info['totalActiveTimeMinutes']:.0f}min + "
+            f"passive={time_info['totalPassiveTimeMinutes']:.0f}min) | "
+            f"Linear sum would be: {sum(graph.duration):.0f}min | "
+            f"Path: {' → '.join(graph.ids[n] for n in graph.critical_path())}"
+        )
+    return time_info, graph.schedule()
+
+
+def calculate_times_from_dag(recipe_data: Dict[str, Any], log: bool = True) -> Dict[str, Any]:
+    """
+    Calculate recipe times using the critical path through the step DAG.
 
-    return {
-        "totalTime": _minutes_to_iso8601(total_time_min),
-        "totalActiveTime": _minutes_to_iso8601(critical_path_active),
-        "totalPassiveTime": _minutes_to_iso8601(critical_path_passive),
-        "totalTimeMinutes": round(total_time_min, 1),
-        "totalActiveTimeMinutes": round(critical_path_active, 1),
-        "totalPassiveTimeMinutes": round(critical_path_passive, 1),
-    }
+    Returns dict with ISO 8601 strings + float minutes.
+    """
+    return calculate_times_and_schedule(recipe_data, log=log)[0]
+
+
+def calculate_library_times(recipes: List[Dict[str, Any]]) -> List[Tuple[Dict[str, Any], Dict[str, Dict[str, float]]]]:
+    """
+    Batch mode: times and step schedule of many recipes.
+
+    Returns one (time info, schedule) pair per recipe; recipes without a
+    steps list get linear-sum times and an empty schedule.
+    """
+    return [calculate_times_and_schedule(recipe, log=False) for recipe in recipes]
@@ -0,0 +1,369 @@
+"""
+Library-wide re-enrichment engine.
+
+Recomputes selected enrichment stages over a folder of ``*.recipe.json``
+files in one run, instead of one ad-hoc loop per script:
+
+  quantities – string quantities and servings coerced to numbers
+  diets      – diet classification
+  seasons    – seasonal availability and peak months
+  times      – DAG-based times (reconciled with schema.org) and step schedule
+  nutrition  – nutritionPerServing, nutritionIssues, nutritionTags
+  minerals   – only the mineral part of nutritionPerServing (+ tags)
+  metadata   – createdAt / creationMode when missing
+
+LIBRARY_DEFAULT_STAGES redo what RecipeEnricher.enrich_recipe writes;
+updatedAt is stamped on every file the engine rewrites.
+
+Design:
+  - Ingredient names are deduplicated across the library and matched once
+    per run in the parent process (one warm NutritionMatcher).
+  - Files are processed in chunks by a process pool; workers inherit the
+    match results and compute nutrition profiles in batches.
+  - A file is rewritten (atomically) only when its content changed.
+
+Stages are deterministic and need no LLM. The LLM-assisted library
+scripts stay outside the engine: scripts/re_enrich_nutrition.py (per-recipe
+quantity and weight estimation) and scripts/fix_servings.py (asks the LLM
+about a filtered subset of suspect recipes, with its own answer cache).
+"""
+
+import copy
+import json
+import logging
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from .enrichment.diet import DietClassifier
+from .enrichment.nutrition import compute_nutrition_profiles, derive_nutrition_tags
+from .enrichment.sanitize import coerce_string_values, sanitize_types
+from .enrichment.seasons import determine_seasons
+from .enrichment.times import calculate_library_times
+from .recipe_enricher import RecipeEnricher
+
+logger = logging.getLogger(__name__)
+
+STAGES = ("quantities", "diets", "seasons", "times", "nutrition", "minerals", "metadata")
+LIBRARY_DEFAULT_STAGES = ("quantities", "diets", "seasons", "times", "metadata")
+_NUTRITION_STAGES = {"nutrition", "minerals"}
+
+DEFAULT_CHUNK_SIZE = 64
+
+# Worker-process state, set by _init_worker (inherited as-is with fork)
+_WORKER: Dict[str, Any] = {}
+
+
+def _names_en(recipe: Dict[str, Any]) -> List[str]:
+    return [ing.get("name_en", "") for ing in recipe.get("ingredients", []) if ing.get("name_en")]
+
+
+def _collect_names(paths: Sequence[Path]) -> List[str]:
+    """Distinct English ingredient names of a chunk of recipe files."""
+    names = set()
+    for path in paths:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                names.update(_names_en(json.load(f)))
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Skipping unreadable recipe {path.name}: {e}")
+    return sorted(names)
+
+
+def _write_json_atomic(path: Path, data: Dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp", prefix=path.stem[:20])
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _apply_profile(meta: Dict[str, Any], profile: Dict[str, Any], minerals_only: bool) -> None:
+    """Store a recomputed nutrition profile (or just its minerals) in metadata."""
+    current = meta.get("nutritionPerServing")
+    if minerals_only and current:
+        merged = dict(current)
+        for key in ("minerals", "mineralCoverage"):
+            if key in profile:
+                merged[key] = profile[key]
+            else:
+                merged.pop(key, None)
+        meta["nutritionPerServing"] = merged
+        meta["nutritionTags"] = derive_nutrition_tags(merged)
+        return
+
+    profile = dict(profile)
+    nutrition_issues = profile.pop("issues", [])
+    meta["nutritionPerServing"] = profile
+    if nutrition_issues:
+        meta["nutritionIssues"] = nutrition_issues
+    else:
+        meta.pop("nutritionIssues", None)
+    meta["nutritionTags"] = derive_nutrition_tags(profile)
+
+
+def enrich_stages(
+    recipes: List[Dict[str, Any]],
+    stages: Iterable[str],
+    nutrition_data: Optional[Dict[str, Optional[Dict[str, Any]]]] = None,
+) -> None:
+    """
+    Apply enrichment stages in place to a batch of recipes.
+
+    Args:
+        recipes: Recipe dicts (modified in place)
+        stages: Subset of STAGES
+        nutrition_data: Match results keyed by lowercased English name
+            (required by the nutrition and minerals stages)
+    """
+    stages = set(stages)
+    for recipe in recipes:
+        recipe.setdefault("metadata", {})
+        if "quantities" in stages:
+            coerce_string_values(recipe)
+
+    if "diets" in stages:
+        try:
+            for recipe, diets in zip(recipes, DietClassifier.shared().classify_many(recipes)):
+                recipe["metadata"]["diets"] = diets
+        except Exception as exc:
+            logger.error(f"[Enrichment] Diet detection failed: {exc}", exc_info=True)
+
+    for recipe in recipes:
+        meta = recipe["metadata"]
+        if "seasons" in stages:
+            try:
+                seasons, peak_months = determine_seasons(recipe)
+                meta["seasons"] = seasons
+                if peak_months:
+                    meta["peakMonths"] = peak_months
+            except Exception as exc:
+                logger.error(f"[Enrichment] Season detection failed: {exc}", exc_info=True)
+
+    if "times" in stages:
+        try:
+            dags = calculate_library_times(recipes)
+        except Exception as exc:
+            # A malformed step graph fails the batch: time recipes one by one
+            logger.error(f"[Enrichment] Batch DAG time calculation failed: {exc}")
+            dags = [None] * len(recipes)
+        for recipe, dag in zip(recipes, dags):
+            meta = recipe["metadata"]
+            RecipeEnricher.apply_times(meta, RecipeEnricher.compute_times(recipe, meta, log=False, dag=dag))
+
+    if stages & _NUTRITION_STAGES:
+        with_ingredients = [r for r in recipes if r.get("ingredients")]
+        # Profiles need numeric servings / quantities, but only the nutrition
+        # fields are written back: the stored ingredients are left as they are
+        sanitized = [
+            sanitize_types({"metadata": dict(r["metadata"]), "ingredients": copy.deepcopy(r["ingredients"])})
+            for r in with_ingredients
+        ]
+        profiles = compute_nutrition_profiles(
+            [(s["ingredients"], s["metadata"].get("servings", 1), s["metadata"]) for s in sanitized],
+            nutrition_data or {},
+        )
+        minerals_only = "nutrition" not in stages
+        for recipe, profile in zip(with_ingredients, profiles):
+            _apply_profile(recipe["metadata"], profile, minerals_only)
+
+    if "metadata" in stages:
+        for recipe in recipes:
+            RecipeEnricher.stamp_metadata(recipe["metadata"])
+
+
+def _init_worker(stages: List[str], nutrition_data: Dict[str, Any], output_dir: Optional[Path],
+                 recipes_dir: Optional[Path], backup_dir: Optional[Path], dry_run: bool,
+                 min_calorie_delta: float = 0.0) -> None:
+    _WORKER.update(
+        stages=stages, nutrition_data=nutrition_data, output_dir=output_dir,
+        recipes_dir=recipes_dir, backup_dir=backup_dir, dry_run=dry_run,
+        min_calorie_delta=min_calorie_delta,
+    )
+
+
+def _calories(recipe: Dict[str, Any]) -> float:
+    return ((recipe.get("metadata") or {}).get("nutritionPerServing") or {}).get("calories") or 0
+
+
+def _process_chunk(paths: Sequence[Path]) -> Dict[str, Any]:
+    """Re-enrich a chunk of recipe files; write those whose content changed."""
+    stats: Dict[str, Any] = {"processed": 0, "changed": [], "errors": []}
+    loaded = []
+    for path in paths:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                loaded.append((path, json.load(f)))
+        except (OSError, json.JSONDecodeError) as e:
+            stats["errors"].append(f"{path.name}: {e}")
+
+    originals = [copy.deepcopy(recipe) for _, recipe in loaded]
+    try:
+        enrich_stages([recipe for _, recipe in loaded], _WORKER["stages"], _WORKER["nutrition_data"])
+    except Exception as e:
+        stats["errors"].extend(f"{path.name}: {e}" for path, _ in loaded)
+        return stats
+
+    output_dir = _WORKER["output_dir"]
+    for (path, recipe), original in zip(loaded, originals):
+        stats["processed"] += 1
+        changed = recipe != original
+        if changed and abs(_calories(recipe) - _calories(original)) < _WORKER.get("min_calorie_delta", 0.0):
+            # Below the threshold the recipe is left as it was
+            changed = False
+            recipe = original
+        if changed:
+            stats["changed"].append(path.name)
+        # In place, untouched files are left alone; an output folder gets every recipe
+        if _WORKER["dry_run"] or (not changed and output_dir is None):
+            continue
+        try:
+            if changed:
+                recipe["metadata"]["updatedAt"] = datetime.now().isoformat()
+                if _WORKER["backup_dir"] is not None:
+                    _write_json_atomic(_WORKER["backup_dir"] / path.name, original)
+            target = path
+            if output_dir is not None:
+                target = output_dir / path.relative_to(_WORKER["recipes_dir"])
+            _write_json_atomic(target, recipe)
+        except OSError as e:
+            stats["errors"].append(f"{path.name}: {e}")
+    return stats
+
+
+class LibraryEnricher:
+    """Re-enrich a recipe library with selected stages, in parallel."""
+
+    def __init__(
+        self,
+        stages: Iterable[str] = STAGES,
+        workers: Optional[int] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        dry_run: bool = False,
+        matcher=None,
+        min_calorie_delta: float = 0.0,
+    ):
+        """
+        Initialize the engine.
+
+        Args:
+            stages: Stages to recompute (see STAGES)
+            workers: Worker processes (default: CPU count, 1 = in-process)
+            chunk_size: Recipes per task (nutrition profiles are batched per chunk)
+            dry_run: Report changed files without writing them
+            matcher: NutritionMatcher to reuse (created lazily if needed)
+            min_calorie_delta: Leave a recipe untouched unless its calories per
+                serving move by at least this much (0 = any change is written)
+        """
+        unknown = set(stages) - set(STAGES)
+        if unknown:
+            raise ValueError(f"Unknown enrichment stages: {', '.join(sorted(unknown))}")
+        self.stages = [s for s in STAGES if s in set(stages)]
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.dry_run = dry_run
+        self._matcher = matcher
+        self.min_calorie_delta = min_calorie_delta
+
+    def _chunks(self, paths: List[Path]) -> List[List[Path]]:
+        return [paths[i:i + self.chunk_size] for i in range(0, len(paths), self.chunk_size)]
+
+    def _map(self, fn, chunks, initargs=None):
+        """Run *fn* over chunks, in a process pool when workers > 1."""
+        if self.workers <= 1 or len(chunks) <= 1:
+            if initargs is not None:
+                _init_worker(*initargs)
+            return [fn(chunk) for chunk in chunks]
+        # fork keeps the parent's warm state (match results, weight tables)
+        # without pickling it for every worker
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("fork" if "fork" in methods else None)
+        with ProcessPoolExecutor(
+            max_workers=min(self.workers, len(chunks)),
+            mp_context=context,
+            initializer=_init_worker if initargs is not None else None,
+            initargs=initargs or (),
+        ) as pool:
+            return list(pool.map(fn, chunks))
+
+    def match_library(self, paths: List[Path]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Match every distinct ingredient name of *paths* once."""
+        names = set()
+        for chunk_names in self._map(_collect_names, self._chunks(paths)):
+            names.update(chunk_names)
+        if not names:
+            return {}
+        if self._matcher is None:
+            from .services.nutrition_matcher import NutritionMatcher
+            self._matcher = NutritionMatcher()
+        logger.info(f"Matching {len(names)} distinct ingredient names")
+        return self._matcher.match_batch(sorted(names))
+
+    def run(
+        self,
+        recipes_dir: Path,
+        pattern: str = "*.recipe.json",
+        output_dir: Optional[Path] = None,
+        backup_dir: Optional[Path] = None,
+        limit: int = 0,
+    ) -> Dict[str, Any]:
+        """
+        Re-enrich the recipes of *recipes_dir*.
+
+        Args:
+            recipes_dir: Library folder
+            pattern: Glob selecting recipe files (e.g. "**/*.recipe.json")
+            output_dir: Write results there instead of in place
+            backup_dir: Save the previous version of every rewritten file
+            limit: Process only the first N files (0 = all)
+
+        Returns:
+            Stats: total, processed, changed (file names), errors.
+        """
+        recipes_dir = Path(recipes_dir)
+        paths = sorted(recipes_dir.glob(pattern))
+        if limit:
+            paths = paths[:limit]
+        logger.info(f"Re-enriching {len(paths)} recipes in {recipes_dir} (stages: {', '.join(self.stages)})")
+
+        nutrition_data: Dict[str, Any] = {}
+        if _NUTRITION_STAGES & set(self.stages):
+            nutrition_data = self.match_library(paths)
+            # Compile the gram-estimation tables before workers fork
+            from .services.nutrition_matcher import NutritionMatcher
+            NutritionMatcher._get_weight_estimator()
+
+        if backup_dir is not None and not self.dry_run:
+            Path(backup_dir).mkdir(parents=True, exist_ok=True)
+
+        initargs = (
+            self.stages, nutrition_data,
+            Path(output_dir) if output_dir is not None else None, recipes_dir,
+            Path(backup_dir) if backup_dir is not None else None, self.dry_run,
+            self.min_calorie_delta,
+        )
+        stats: Dict[str, Any] = {"total": len(paths), "processed": 0, "changed": [], "errors": []}
+        for chunk_stats in self._map(_process_chunk, self._chunks(paths), initargs):
+            stats["processed"] += chunk_stats["processed"]
+            stats["changed"].extend(chunk_stats["changed"])
+            stats["errors"].extend(chunk_stats["errors"])
+
+        for error in stats["errors"]:
+            logger.error(f"Re-enrichment failed: {error}")
+        verb = "would change" if self.dry_run else "changed"
+        logger.info(
+            f"Done: {stats['processed']}/{stats['total']} processed, "
+            f"{len(stats['changed'])} {verb}, {len(stats['errors'])} errors"
+        )
+        return stats
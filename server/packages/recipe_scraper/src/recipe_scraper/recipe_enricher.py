@@ -9,16 +9,16 @@ Delegates to:
   enrichment.sanitize  – type coercion
 """
 
-import json
+import copy
 import logging
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 
 from .observability import observe, langfuse_context
 from .enrichment.diet import determine_diets
 from .enrichment.seasons import determine_seasons
-from .enrichment.times import calculate_times_from_dag, _parse_time_to_minutes
+from .enrichment.times import calculate_times_and_schedule, _parse_time_to_minutes
 from .enrichment.nutrition import (
     compute_nutrition_profile,
     derive_nutrition_tags,
@@ -29,6 +29,18 @@ from .enrichment.sanitize import sanitize_types
 
 logger = logging.getLogger(__name__)
 
+_TIME_FIELDS = (
+    "totalTime", "totalActiveTime", "totalPassiveTime",
+    "totalTimeMinutes", "totalActiveTimeMinutes", "totalPassiveTimeMinutes",
+)
+# Seconds an import waits for USDA / Perplexity resolution of unknown ingredients
+_RESOLVER_TIMEOUT = 20
+
+_EMPTY_TIMES = {
+    "totalTime": "PT0M", "totalActiveTime": "PT0M", "totalPassiveTime": "PT0M",
+    "totalTimeMinutes": 0.0, "totalActiveTimeMinutes": 0.0, "totalPassiveTimeMinutes": 0.0,
+}
+
 
 class RecipeEnricher:
     """Orchestrates all enrichment steps for a recipe."""
@@ -61,13 +73,51 @@ class RecipeEnricher:
             logger.error(f"[Enrichment] Season detection failed: {exc}", exc_info=True)
 
         # DAG times
-        _EMPTY_TIMES = {
-            "totalTime": "PT0M", "totalActiveTime": "PT0M", "totalPassiveTime": "PT0M",
-            "totalTimeMinutes": 0.0, "totalActiveTimeMinutes": 0.0, "totalPassiveTimeMinutes": 0.0,
-        }
+        time_info = self.compute_times(recipe_data, enriched_recipe.setdefault("metadata", {}))
+
+        # Assemble metadata
+        meta = enriched_recipe.setdefault("metadata", {})
+        self.stamp_metadata(meta)
+        meta["updatedAt"] = datetime.now().isoformat()
+
+        meta["diets"] = diets
+        meta["seasons"] = seasons
+        self.apply_times(meta, time_info)
+
+        logger.info(
+            f'Recipe "{recipe_title}" enriched with: {", ".join(diets)} diets, '
+            f'{", ".join(seasons)} seasons, DAG times: {time_info["totalTime"]} total '
+            f'({time_info["totalActiveTime"]} active + {time_info["totalPassiveTime"]} passive)'
+        )
+        return enriched_recipe
+
+    # ── Stage helpers (shared with the library re-enrichment engine) ──
+
+    @staticmethod
+    def compute_times(
+        recipe_data: Dict[str, Any],
+        meta: Dict[str, Any],
+        log: bool = True,
+        dag: Optional[Tuple[Dict[str, Any], Dict[str, Any]]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Compute DAG times, reconciled with the schema.org times when present.
+
+        The step schedule and schema.org prepTime/cookTime are copied into
+        *meta*. *log* enables the per-recipe critical path log line.
+
+        Args:
+            dag: (time info, schedule) already computed by the library batch
+                (``calculate_library_times``); computed here when None
+
+        Returns:
+            Time info dict (ISO durations and minutes).
+        """
         time_info = _EMPTY_TIMES.copy()
         try:
-            time_info = calculate_times_from_dag(recipe_data)
+            time_info, schedule = dag or calculate_times_and_schedule(recipe_data, log=log)
+            time_info = dict(time_info)
+            meta["stepSchedule"] = schedule
 
             schema_data = recipe_data.get("metadata", {}).get("_schema_data")
             if schema_data:
@@ -88,15 +138,16 @@ class RecipeEnricher:
                 for schema_field, meta_field in [("prepTime", "prepTime"), ("cookTime", "cookTime")]:
                     val = schema_data.get(schema_field)
                     if val:
-                        enriched_recipe.setdefault("metadata", {})[meta_field] = val
+                        meta[meta_field] = val
         except Exception as exc:
             logger.error(f"[Enrichment] DAG time calculation failed: {exc}", exc_info=True)
+        return time_info
 
-        # Assemble metadata
-        meta = enriched_recipe.setdefault("metadata", {})
+    @staticmethod
+    def stamp_metadata(meta: Dict[str, Any]) -> None:
+        """Fill in createdAt and creationMode when a recipe has none."""
         if "createdAt" not in meta:
             meta["createdAt"] = datetime.now().isoformat()
-        meta["updatedAt"] = datetime.now().isoformat()
         if "creationMode" not in meta:
             if "contentHash" in meta:
                 meta["creationMode"] = "text"
@@ -105,27 +156,127 @@ class RecipeEnricher:
             else:
                 meta["creationMode"] = "unknown"
 
-        meta["diets"] = diets
-        meta["seasons"] = seasons
-        meta["totalTime"] = time_info["totalTime"]
-        meta["totalActiveTime"] = time_info["totalActiveTime"]
-        meta["totalPassiveTime"] = time_info["totalPassiveTime"]
-        meta["totalTimeMinutes"] = time_info["totalTimeMinutes"]
-        meta["totalActiveTimeMinutes"] = time_info["totalActiveTimeMinutes"]
-        meta["totalPassiveTimeMinutes"] = time_info["totalPassiveTimeMinutes"]
+    @staticmethod
+    def apply_times(meta: Dict[str, Any], time_info: Dict[str, Any]) -> None:
+        """Write time info into recipe metadata."""
+        for field in _TIME_FIELDS:
+            meta[field] = time_info[field]
         meta.pop("totalCookingTime", None)
 
-        logger.info(
-            f'Recipe "{recipe_title}" enriched with: {", ".join(diets)} diets, '
-            f'{", ".join(seasons)} seasons, DAG times: {time_info["totalTime"]} total '
-            f'({time_info["totalActiveTime"]} active + {time_info["totalPassiveTime"]} passive)'
-        )
-        return enriched_recipe
-
     # ── Async enrichment (adds nutrition) ──
 
+    def _get_matcher(self):
+        from .services.nutrition_matcher import NutritionMatcher
+
+        if not hasattr(self, '_nutrition_matcher'):
+            self._nutrition_matcher = NutritionMatcher()
+        return self._nutrition_matcher
+
+    async def match_nutrition(
+        self,
+        names_en: List[str],
+        known: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Match ingredient names to nutrition data, resolving unknowns (USDA → Perplexity).
+
+        Args:
+            names_en: English ingredient names
+            known: Nutrition data already matched (e.g. by prepare_nutrition);
+                only the names it lacks or has as None are matched
+
+        Returns:
+            Dict mapping canonical name to nutrition data (None when unknown).
+        """
+        import asyncio as _aio
+        from .services.ingredient_dictionary import IngredientDictionary
+
+        dictionary = IngredientDictionary.shared()
+        nutrition_data: Dict[str, Any] = dict(known or {})
+        # None entries (unmatched so far) are looked up again: the store may know them by now
+        missing = [name for name in names_en if nutrition_data.get(dictionary.canonical(name)) is None]
+        if missing:
+            matcher = self._get_matcher()
+            loop = _aio.get_running_loop()
+            nutrition_data.update(await loop.run_in_executor(None, matcher.match_batch, missing))
+
+        unknown_names = [
+            name for name in missing
+            if nutrition_data.get(dictionary.canonical(name)) is None
+        ]
+        if unknown_names:
+            try:
+                from .services.nutrition_resolver import NutritionResolver
+                # Names still resolving at the deadline are left for retry_expired
+                resolved = await NutritionResolver.shared().resolve_batch(
+                    unknown_names, timeout=_RESOLVER_TIMEOUT,
+                )
+                for key, entry in resolved.items():
+                    if entry is not None:
+                        nutrition_data[key] = {
+                            "energy_kcal": entry.get("kcal", 0),
+                            "protein_g": entry.get("protein", 0),
+                            "fat_g": entry.get("fat", 0),
+                            "carbs_g": entry.get("carbs", 0),
+                            "fiber_g": entry.get("fiber", 0),
+                            "sugar_g": entry.get("sugar", 0),
+                            "saturated_fat_g": entry.get("sat_fat", 0),
+                            "source": entry.get("source", "resolved"),
+                            "matching": "auto-resolved",
+                        }
+            except Exception as e:
+                logger.warning(f"Nutrition resolver failed (non-blocking): {e}")
+        return nutrition_data
+
+    @observe(name="prepare_nutrition")
+    async def prepare_nutrition(
+        self,
+        ingredients: List[Dict[str, Any]],
+        metadata: Optional[Dict[str, Any]] = None,
+        steps: Optional[List[Dict[str, Any]]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Ingredient-only part of the nutrition pipeline, runnable before the
+        recipe graph exists (while Pass 2 builds the DAG).
+
+        Matches and resolves nutrition data, then runs the LLM quantity and
+        weight estimations on a copy of *ingredients*: their answers are
+        cached per (unit, ingredient), so the same calls made by
+        enrich_recipe_async on the final recipe are served from the cache
+        (or join the request still in flight).
+
+        Args:
+            ingredients: Ingredient dicts of the recipe
+            metadata: Title / servings / recipe type known so far
+            steps: Step dicts known so far ("action" only)
+
+        Returns:
+            Nutrition data for enrich_recipe_async, or None on failure.
+        """
+        names_en = [ing.get("name_en", "") for ing in ingredients if ing.get("name_en")]
+        try:
+            nutrition_data = await self.match_nutrition(names_en)
+            draft = copy.deepcopy(ingredients)
+            await estimate_missing_quantities_llm(draft, metadata=metadata, steps=steps)
+            await fill_missing_weights_llm(draft, nutrition_data)
+            return nutrition_data
+        except Exception as exc:
+            logger.warning(f"[Enrichment] Early nutrition stage failed (non-blocking): {exc}")
+            return None
+
     @observe(name="enrich_recipe")
-    async def enrich_recipe_async(self, recipe_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def enrich_recipe_async(
+        self,
+        recipe_data: Dict[str, Any],
+        nutrition_data: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Full enrichment: diets, seasons, DAG times and nutrition.
+
+        Args:
+            recipe_data: Structured recipe dict
+            nutrition_data: Result of prepare_nutrition for these ingredients, if run
+        """
         enriched = self.enrich_recipe(recipe_data)
         recipe_title = enriched.get("metadata", {}).get("title", "Untitled recipe")
         ingredients = enriched.get("ingredients", [])
@@ -136,56 +287,21 @@ class RecipeEnricher:
         try:
             logger.info(f'Starting async nutrition enrichment for "{recipe_title}"')
 
-            from .services.nutrition_matcher import NutritionMatcher
             import asyncio as _aio
 
-            if not hasattr(self, '_nutrition_matcher'):
-                self._nutrition_matcher = NutritionMatcher()
-            matcher = self._nutrition_matcher
-
             names_en = [ing.get("name_en", "") for ing in ingredients if ing.get("name_en")]
 
             async def _seasons_task():
                 return determine_seasons(enriched)
 
-            async def _nutrition_task():
-                loop = _aio.get_running_loop()
-                return await loop.run_in_executor(None, matcher.match_batch, names_en)
-
-            (seasons_peak, nutrition_data) = await _aio.gather(_seasons_task(), _nutrition_task())
+            (seasons_peak, nutrition_data) = await _aio.gather(
+                _seasons_task(), self.match_nutrition(names_en, known=nutrition_data),
+            )
             seasons, peak_months = seasons_peak
             enriched["metadata"]["seasons"] = seasons
             if peak_months:
                 enriched["metadata"]["peakMonths"] = peak_months
 
-            # Auto-resolve unknowns (USDA → Perplexity)
-            unknown_names = [
-                name for name in names_en
-                if name.strip().lower() not in nutrition_data
-                or nutrition_data.get(name.strip().lower()) is None
-            ]
-            if unknown_names:
-                try:
-                    from .services.nutrition_resolver import NutritionResolver
-                    if not hasattr(self, '_nutrition_resolver'):
-                        self._nutrition_resolver = NutritionResolver()
-                    resolved = await self._nutrition_resolver.resolve_batch(unknown_names)
-                    for key, entry in resolved.items():
-                        if entry is not None:
-                            nutrition_data[key] = {
-                                "energy_kcal": entry.get("kcal", 0),
-                                "protein_g": entry.get("protein", 0),
-                                "fat_g": entry.get("fat", 0),
-                                "carbs_g": entry.get("carbs", 0),
-                                "fiber_g": entry.get("fiber", 0),
-                                "sugar_g": entry.get("sugar", 0),
-                                "saturated_fat_g": entry.get("sat_fat", 0),
-                                "source": entry.get("source", "resolved"),
-                                "matching": "auto-resolved",
-                            }
-                except Exception as e:
-                    logger.warning(f"Nutrition resolver failed (non-blocking): {e}")
-
             # Layer 2: LLM quantity estimation for ingredients with qty=None
             try:
                 n_estimated = await estimate_missing_quantities_llm(
@@ -263,7 +379,29 @@ class RecipeEnricher:
 
 # ── CLI re-enrichment ──
 
-def re_enrich_all_recipes(recipes_dir: str, output_dir: Optional[str] = None, should_backup: bool = True) -> int:
+def re_enrich_all_recipes(
+    recipes_dir: str,
+    output_dir: Optional[str] = None,
+    should_backup: bool = True,
+    stages: Optional[List[str]] = None,
+    workers: Optional[int] = None,
+) -> int:
+    """
+    Re-run enrichment stages over a recipe folder (see LibraryEnricher).
+
+    Args:
+        recipes_dir: Folder searched recursively for *.recipe.json
+        output_dir: Write results there (default: in place)
+        should_backup: Back up rewritten files to <recipes_dir>_backup (in place only)
+        stages: Stages to recompute (default: LIBRARY_DEFAULT_STAGES, which
+            redo what enrich_recipe writes)
+        workers: Worker processes (default: CPU count)
+
+    Returns:
+        Number of recipes processed.
+    """
+    from .library_enricher import LIBRARY_DEFAULT_STAGES, LibraryEnricher
+
     if output_dir is None:
         output_dir = recipes_dir
 
@@ -272,46 +410,19 @@ def re_enrich_all_recipes(recipes_dir: str, output_dir: Optional[str] = None, sh
         logger.error(f"Le répertoire {recipes_dir} n'existe pas")
         return 0
 
-    Path(output_dir).mkdir(parents=True, exist_ok=True)
-
     backup_dir = None
     if should_backup and output_dir == recipes_dir:
         backup_dir = recipes_path.parent / f"{recipes_path.name}_backup"
-        backup_dir.mkdir(parents=True, exist_ok=True)
 
-    enricher = RecipeEnricher()
-    processed_count = 0
-    recipe_files = list(recipes_path.glob('**/*.recipe.json'))
-    total_files = len(recipe_files)
-    logger.info(f"Début du traitement de {total_files} fichiers de recettes")
-
-    for i, recipe_file in enumerate(recipe_files):
-        logger.info(f"[{i+1}/{total_files}] Traitement de {recipe_file.name}")
-        try:
-            with open(recipe_file, 'r', encoding='utf-8') as f:
-                recipe_data = json.load(f)
-            if backup_dir:
-                with open(backup_dir / recipe_file.name, 'w', encoding='utf-8') as f:
-                    json.dump(recipe_data, f, ensure_ascii=False, indent=2)
-
-            enriched_data = enricher.enrich_recipe(recipe_data)
-
-            if output_dir == recipes_dir:
-                output_file = recipe_file
-            else:
-                rel_path = recipe_file.relative_to(recipes_path)
-                output_file = Path(output_dir) / rel_path
-                output_file.parent.mkdir(parents=True, exist_ok=True)
-
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(enriched_data, f, ensure_ascii=False, indent=2)
-
-            processed_count += 1
-        except Exception as e:
-            logger.error(f"Erreur lors du traitement de {recipe_file}: {str(e)}")
-
-    logger.info(f"Terminé: {processed_count} recettes traitées sur {total_files}")
-    return processed_count
+    engine = LibraryEnricher(stages=stages or LIBRARY_DEFAULT_STAGES, workers=workers)
+    stats = engine.run(
+        recipes_path,
+        pattern="**/*.recipe.json",
+        output_dir=None if output_dir == recipes_dir else Path(output_dir),
+        backup_dir=backup_dir,
+    )
+    logger.info(f"Terminé: {stats['processed']} recettes traitées sur {stats['total']}")
+    return stats["processed"]
 
 
 def configure_logger():
@@ -338,9 +449,18 @@ def main():
     parser.add_argument('--recipes_dir', type=str, default=default_recipes_dir)
     parser.add_argument('--output_dir', type=str, default=None)
     parser.add_argument('--no-backup', action='store_true')
+    from .library_enricher import LIBRARY_DEFAULT_STAGES, STAGES
+
+    parser.add_argument('--stages', type=str, default=",".join(LIBRARY_DEFAULT_STAGES),
+                        help=f"Étapes à recalculer: {','.join(STAGES)}")
+    parser.add_argument('--workers', type=int, default=None)
     args = parser.parse_args()
 
-    count = re_enrich_all_recipes(args.recipes_dir, args.output_dir, not args.no_backup)
+    count = re_enrich_all_recipes(
+        args.recipes_dir, args.output_dir, not args.no_backup,
+        stages=[s.strip() for s in args.stages.split(",") if s.strip()],
+        workers=args.workers,
+    )
     logger.info(f"Enrichissement terminé: {count} recettes traitées")
     return 0
 
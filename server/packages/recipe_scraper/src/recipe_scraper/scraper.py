@@ -11,7 +11,6 @@ from typing import Dict, Any, Optional, List, Callable
 import uuid
 from dotenv import load_dotenv
 from datetime import datetime
-import base64
 
 # Load environment variables
 load_dotenv()
@@ -25,11 +24,14 @@ from web_scraper.models import WebContent, AuthPreset
 from recipe_structurer import RecipeStructurer
 from .recipe_enricher import RecipeEnricher
 from .services.recipe_reviewer import RecipeReviewer
+from .services.image_ingest import CHUNK_SIZE, ImageSink, write_data_url
 from .observability import observe, langfuse_context
 
 logger = logging.getLogger(__name__)
 
 MAX_INPUT_CHARS = 50_000
+# Accept header of image downloads (formats stored as-is)
+IMAGE_ACCEPT = "image/webp,image/png,image/jpeg,image/gif,image/svg+xml;q=0.9,*/*;q=0.5"
 
 class RecipeScraper:
     """
@@ -271,10 +273,38 @@ class RecipeScraper:
                     await progress_callback(message)
                     logger.debug(f"Recipe structurer progress: {message}")
             
-            recipe_obj = await self.recipe_structurer.structure(
-                web_content,
-                progress_callback=structurer_callback
-            )
+            # Ingredient-only work (nutrition, estimations) and the image
+            # download start as soon as Pass 1.5 has parsed the ingredients,
+            # overlapping Pass 2; DAG-dependent enrichment waits for the graph
+            auth_values = web_content.auth_values if hasattr(web_content, 'auth_values') else None
+            early_tasks: Dict[str, asyncio.Task] = {}
+            early_image: Dict[str, str] = {}
+
+            async def ingredients_callback(parsed):
+                ingredients = [ing.model_dump() for ing in parsed.ingredients]
+                early_tasks["nutrition"] = asyncio.create_task(
+                    self.recipe_enricher.prepare_nutrition(ingredients, parsed.metadata, parsed.steps)
+                )
+                image_url = parsed.metadata.get("imageUrl")
+                if image_url:
+                    early_image["url"] = image_url
+                    early_image["slug"] = self._generate_slug(parsed.metadata.get("title", ""))
+                    early_tasks["image"] = asyncio.create_task(
+                        self._download_image(image_url, early_image["slug"], auth_values=auth_values)
+                    )
+
+            try:
+                recipe_obj = await self.recipe_structurer.structure(
+                    web_content,
+                    progress_callback=structurer_callback,
+                    ingredients_callback=ingredients_callback,
+                )
+            except BaseException:
+                if "nutrition" in early_tasks:
+                    early_tasks["nutrition"].cancel()
+                if "image" in early_tasks:
+                    self._discard_image_task(early_tasks["image"])
+                raise
             
             # Convert to dictionary
             recipe_data = self.recipe_structurer.to_dict(recipe_obj)
@@ -320,18 +350,28 @@ class RecipeScraper:
             source_url = recipe_data.get("metadata", {}).get("sourceUrl")
             source_text = web_content.main_content if web_content else None
 
+            early_image_task = early_tasks.get("image")
+            if early_image_task and early_image["url"] != source_image_url:
+                self._discard_image_task(early_image_task)
+                early_image_task = None
+
             async def _image_task():
+                if early_image_task:
+                    image_filename = await early_image_task
+                    if image_filename and early_image["slug"] != slug:
+                        image_filename = self._rename_image(image_filename, slug)
+                    return image_filename
                 if not source_image_url:
                     logger.warning("No source image URL found in metadata")
                     return None
                 logger.info(f"Downloading image: {source_image_url}")
-                return await self._download_image(
-                    source_image_url, slug,
-                    auth_values=web_content.auth_values if hasattr(web_content, 'auth_values') else None,
-                )
+                return await self._download_image(source_image_url, slug, auth_values=auth_values)
 
             async def _enrich_task():
-                return await self.recipe_enricher.enrich_recipe_async(recipe_data)
+                nutrition_data = None
+                if "nutrition" in early_tasks:
+                    nutrition_data = await early_tasks["nutrition"]
+                return await self.recipe_enricher.enrich_recipe_async(recipe_data, nutrition_data)
 
             async def _review_task():
                 from .services.recipe_reviewer import run_deterministic_assertions
@@ -395,6 +435,14 @@ class RecipeScraper:
                 langfuse_context.score_current_trace(
                     name="review_score", value=float(review_score),
                 )
+            graph_repair = getattr(recipe_obj, "_graph_repair", None)
+            if graph_repair is not None:
+                langfuse_context.score_current_trace(
+                    name="pass2_graph_repairs", value=float(len(graph_repair.repairs)),
+                )
+                langfuse_context.score_current_trace(
+                    name="pass2_llm_retries", value=float(graph_repair.llm_retries),
+                )
 
             return recipe_data
             
@@ -602,6 +650,37 @@ class RecipeScraper:
 
         return candidate
     
+    def _rename_image(self, image_path: str, slug: str) -> str:
+        """
+        Rename a downloaded image to another recipe slug, keeping its extension.
+
+        Args:
+            image_path: Image path relative to the recipes folder
+            slug: The final recipe slug
+
+        Returns:
+            The new image path relative to the recipes folder
+        """
+        source = self._image_output_folder / Path(image_path).name
+        target = source.with_name(f"{slug}{source.suffix}")
+        os.replace(source, target)
+        logger.debug(f"Image renamed to {target.name}")
+        return f"images/{target.name}"
+
+    def _discard_image_task(self, task: asyncio.Task) -> None:
+        """
+        Drop an early image download: cancel it, or delete its file when it
+        already finished (otherwise it would stay orphaned in images/).
+        """
+        if not task.done():
+            task.cancel()
+            return
+        if task.cancelled() or task.exception() is not None or not task.result():
+            return
+        image = self._image_output_folder / Path(task.result()).name
+        image.unlink(missing_ok=True)
+        logger.debug(f"Discarded early image {image.name}")
+
     async def _download_image(self, image_url: str, slug: str, auth_values: Optional[Dict[str, Any]] = None) -> Optional[str]:
         """
         Download an image from a URL and save it locally.
@@ -617,49 +696,22 @@ class RecipeScraper:
         """
         logger.info(f"Downloading image from: {image_url}")
         
-        # Si c'est une data URL, on la traite directement
+        # Si c'est une data URL, on la décode par morceaux
         if image_url.startswith("data:"):
+            sink = ImageSink(self._image_output_folder, slug)
             try:
-                # Extraire le type MIME et les données
-                header, encoded = image_url.split(",", 1)
-                mime_type = header.split(":")[1].split(";")[0]
-                
-                # Déterminer l'extension
-                if mime_type == "image/svg+xml":
-                    ext = "svg"
-                else:
-                    ext = mime_type.split("/")[1]
-                    if ext == "jpeg":
-                        ext = "jpg"
-                
-                # Créer le nom du fichier
-                image_filename = f"{slug}.{ext}"
-                
-                # Créer le dossier de sortie s'il n'existe pas
-                output_dir = self._image_output_folder
-                output_dir.mkdir(parents=True, exist_ok=True)
-                
-                # Sauvegarder l'image
-                image_path = output_dir / image_filename
-                with open(image_path, "wb") as f:
-                    f.write(base64.b64decode(encoded))
-                
+                write_data_url(image_url, sink)
+                image_path = await asyncio.to_thread(sink.finish)
                 logger.info(f"Data URL image successfully saved to {image_path}")
-                return f"images/{image_filename}"
-                
+                return image_path
             except Exception as e:
+                sink.abort()
                 logger.error(f"Failed to process data URL image: {str(e)}")
                 return None
         
-        # Pour les URLs normales, on continue avec le code existant
         try:
             logger.debug("Attempting to download image without authentication")
-            async with httpx.AsyncClient(follow_redirects=True) as client:
-                response = await client.get(image_url)
-                response.raise_for_status()
-                
-                # Process the successful response
-                return await self._process_image_response(response, image_url, slug)
+            return await self._stream_image(image_url, slug)
                 
         except httpx.HTTPStatusError as e:
             # Si erreur 403, le fichier existe mais l'accès est interdit
@@ -693,73 +745,49 @@ class RecipeScraper:
             if auth_values.get("type") == "cookie" and auth_values.get("values"):
                 cookies = auth_values.get("values", {})
             
-            # Download the image with cookies
-            async with httpx.AsyncClient(follow_redirects=True, cookies=cookies) as client:
-                response = await client.get(image_url)
-                response.raise_for_status()
-                return await self._process_image_response(response, image_url, slug)
+            return await self._stream_image(image_url, slug, cookies=cookies)
                 
         except Exception as e:
             logger.error(f"Failed to download image with authentication: {str(e)}")
             return None
     
-    async def _process_image_response(self, response: httpx.Response, image_url: str, slug: str) -> Optional[str]:
+    async def _stream_image(self, image_url: str, slug: str, cookies: Optional[Dict[str, str]] = None) -> str:
         """
-        Process an image response and save the image to disk.
+        Stream an image to disk through the WebScraper connection pool.
+
+        The body is written in chunks to a temp file (ImageSink): the size and
+        pixel caps reject oversized images before they are fully received, and
+        the file type is sniffed from the content rather than trusted from the
+        Content-Type header or the URL.
         
         Args:
-            response: The HTTP response containing the image
-            image_url: The URL of the image (for extension fallback)
+            image_url: The URL of the image
             slug: The recipe slug to use in the filename
+            cookies: Optional cookies sent with this request only
             
         Returns:
-            The filename of the downloaded image, or None if processing failed
-        """
-        try:
-            # Determine the content type from the headers
-            content_type = response.headers.get("content-type", "").lower()
-            
-            # Determine the extension based on content-type
-            if content_type.startswith("image/"):
-                mime_ext = content_type.split("/")[1].split(";")[0]  # Extract extension from MIME type
-                if mime_ext in ["jpeg", "jpg", "png", "gif", "webp", "svg+xml", "svg"]:
-                    ext = mime_ext if mime_ext != "jpeg" else "jpg"
-                    # Handle SVG content type
-                    if mime_ext in ["svg+xml", "svg"]:
-                        ext = "svg"
-                else:
-                    ext = "jpg"  # Default to jpg
-            else:
-                # Fallback to URL extension if content-type is not helpful
-                ext = image_url.split(".")[-1].lower()
-                if ext not in ["jpg", "jpeg", "png", "webp", "gif", "svg"]:
-                    ext = "jpg"  # Default to jpg if extension is not recognized
-                if ext == "jpeg":
-                    ext = "jpg"  # Normalize jpeg to jpg
-            
-            logger.debug(f"Image content type: {content_type}, using extension: {ext}")
+            The image path relative to the recipes folder
             
-            # Create a filename
-            image_filename = f"{slug}.{ext}"
-            
-            # Create the output directory if it doesn't exist
-            output_dir = self._image_output_folder
-            output_dir.mkdir(parents=True, exist_ok=True)
-            
-            # Save the image to disk
-            image_path = output_dir / image_filename
-            with open(image_path, "wb") as f:
-                f.write(response.content)
-            
-            # Verify file size to ensure it was downloaded correctly
-            file_size = image_path.stat().st_size
-            if file_size < 100:  # If file is too small, it's probably corrupted
-                logger.error(f"Downloaded image is too small ({file_size} bytes), possibly corrupted")
-                return None
-            
-            logger.info(f"Image successfully downloaded to {image_path} ({file_size} bytes)")
-            return f"images/{image_filename}"
-        
-        except Exception as e:
-            logger.error(f"Failed to process image response: {str(e)}")
-            return None 
\ No newline at end of file
+        Raises:
+            httpx.HTTPStatusError: If the server answers with an error status
+            ImageRejected: If the content is not an acceptable image
+        """
+        headers = {"Accept": IMAGE_ACCEPT}
+        if cookies:
+            headers["Cookie"] = "; ".join(f"{name}={value}" for name, value in cookies.items())
+
+        async with self.web_scraper.client.stream("GET", image_url, headers=headers) as response:
+            response.raise_for_status()
+            sink = ImageSink(self._image_output_folder, slug)
+            try:
+                sink.check_length(response.headers.get("content-length"))
+                async for chunk in response.aiter_bytes(CHUNK_SIZE):
+                    sink.write(chunk)
+            except BaseException:
+                sink.abort()
+                raise
+
+        logger.debug(f"Image content type: {response.headers.get('content-type', '')}, sniffed: {sink.ext}")
+        image_path = await asyncio.to_thread(sink.finish)
+        logger.info(f"Image successfully downloaded to {image_path} ({sink.size} bytes)")
+        return image_path 
\ No newline at end of file
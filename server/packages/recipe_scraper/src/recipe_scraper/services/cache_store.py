@@ -0,0 +1,473 @@
+"""
+Shared key-value cache store (SQLite in WAL mode).
+
+Replaces the JSON cache files that every process loaded whole, mutated and
+rewrote on save — concurrent imports overwrote each other's additions and
+each save cost O(cache) I/O. The store keeps all caches in one database:
+
+- namespaces: one per former cache file (see NAMESPACES)
+- per-key upserts inside short IMMEDIATE transactions
+- TTL on negative entries (not_found, null estimates) so they get retried
+- safe concurrent access: WAL lets readers run while one process writes,
+  busy_timeout serializes writers, connections are per process and thread
+
+The JSON files remain the review format: an empty namespace is seeded from
+its file once, and export_json() writes a namespace back in the original
+layout (scripts/export_cache_store.py).
+
+Ingredient ids of the IngredientDictionary are allocated here as well, so
+that every process gets the same id for the same canonical name, and short
+leases let processes agree on who computes a missing entry (SingleFlight).
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_DATA_DIR = Path(__file__).parent.parent / "data"
+_STORE_FILE = _DATA_DIR / "cache.sqlite3"
+
+# Negative results are retried after this delay (seconds)
+NEGATIVE_TTL = 30 * 24 * 3600
+
+_BUSY_TIMEOUT_MS = 30_000
+# SQLite's default limit on bound parameters is 999 on older builds
+_SQL_CHUNK = 500
+
+
+def _not_found(value: Any) -> bool:
+    return isinstance(value, dict) and bool(value.get("not_found"))
+
+
+def _null_estimate(value: Any) -> bool:
+    # Entries without "confidence" predate it and count as "high"
+    return isinstance(value, dict) and "confidence" in value and value["confidence"] is None
+
+
+def _canonical_name(key: str) -> str:
+    from .ingredient_dictionary import normalize_ingredient_name
+    return normalize_ingredient_name(key)
+
+
+def _canonical_unit_key(key: str) -> str:
+    unit, _, name = key.partition("|")
+    return f"{unit}|{_canonical_name(name)}"
+
+
+# namespace → seed/export file, _meta description, negative-entry predicate,
+# key normalization applied to seeded keys
+NAMESPACES: Dict[str, Dict[str, Any]] = {
+    "nutrition": {
+        "file": "nutrition_cache.json",
+        "description": "Cache of embedding-matched and USDA nutrition lookups.",
+        "negative": _not_found,
+        "key": _canonical_name,
+    },
+    "resolved_ingredients": {
+        "file": "resolved_ingredients.json",
+        "description": "Auto-resolved nutrition entries. source field indicates data provenance.",
+        "negative": None,
+        "key": None,
+    },
+    "weight_estimates": {
+        "file": "weight_estimates_cache.json",
+        "description": "LLM-estimated weight per unit for ingredients (grams).",
+        "format": "cache_key → grams_per_unit.",
+        "negative": None,
+        "key": _canonical_unit_key,
+    },
+    "qty_estimates": {
+        "file": "qty_estimates_cache.json",
+        "description": "LLM-estimated quantities for ingredients missing qty+unit.",
+        "format": "cache_key → {quantity, unit, rationale}",
+        "negative": _null_estimate,
+        "key": _canonical_unit_key,
+    },
+    "nutrition_aliases": {
+        "file": "nutrition_aliases_cache.json",
+        "description": "Maps ingredient names not found by embedding to USDA canonical names.",
+        "format": "ingredient_name → usda_name (or null if genuinely unmatchable).",
+        # null is a verdict, not a failed lookup: it is never retried
+        "negative": None,
+        "key": _canonical_name,
+    },
+}
+
+# Written into every exported file: the JSON files are no longer read once
+# their namespace is seeded
+SNAPSHOT_NOTE = (
+    "Snapshot of the cache store (data/cache.sqlite3), which is authoritative. "
+    "Only read to seed an empty namespace; regenerate with scripts/export_cache_store.py."
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    namespace  TEXT NOT NULL,
+    key        TEXT NOT NULL,
+    value      TEXT NOT NULL,
+    expires_at REAL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS seeded (
+    namespace TEXT PRIMARY KEY,
+    seeded_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS ingredients (
+    id   INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS leases (
+    namespace  TEXT NOT NULL,
+    key        TEXT NOT NULL,
+    owner      TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+) WITHOUT ROWID;
+"""
+
+_UPSERT = (
+    "INSERT INTO entries (namespace, key, value, expires_at, updated_at) VALUES (?, ?, ?, ?, ?) "
+    "ON CONFLICT (namespace, key) DO UPDATE SET "
+    "value = excluded.value, expires_at = excluded.expires_at, updated_at = excluded.updated_at"
+)
+
+
+class CacheStore:
+    """Namespaced, TTL-aware key-value store shared by all processes."""
+
+    _shared: Optional["CacheStore"] = None
+
+    def __init__(self, path: Optional[Path] = None, seed_dir: Optional[Path] = _DATA_DIR):
+        """
+        Open (or create) a store.
+
+        Args:
+            path: SQLite database file.
+            seed_dir: Folder of the JSON files seeding empty namespaces
+                (None = start empty).
+        """
+        self._path = Path(path or _STORE_FILE)
+        self._seed_dir = Path(seed_dir) if seed_dir is not None else None
+        self._local = threading.local()
+        self._seeded: set = set()
+        self._seed_lock = threading.Lock()
+
+    @classmethod
+    def shared(cls) -> "CacheStore":
+        """Process-wide store backed by data/cache.sqlite3."""
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    # ------------------------------------------------------------------
+    # Connections & transactions
+    # ------------------------------------------------------------------
+
+    def _connection(self) -> sqlite3.Connection:
+        """Connection of the current thread (re-opened after a fork)."""
+        local = self._local
+        if getattr(local, "pid", None) != os.getpid():
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self._path), timeout=_BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+            conn.execute(f"PRAGMA busy_timeout = {_BUSY_TIMEOUT_MS}")
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.executescript(_SCHEMA)
+            local.conn = conn
+            local.pid = os.getpid()
+        return local.conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Write transaction; IMMEDIATE takes the write lock up front."""
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _ensure_seeded(self, namespace: str) -> None:
+        """Import the namespace's JSON file the first time it is used."""
+        if namespace in self._seeded:
+            return
+        with self._seed_lock:
+            if namespace in self._seeded:
+                return
+            spec = NAMESPACES.get(namespace)
+            seed_file = self._seed_dir / spec["file"] if spec and self._seed_dir else None
+            with self._transaction() as conn:
+                done = conn.execute("SELECT 1 FROM seeded WHERE namespace = ?", (namespace,)).fetchone()
+                if not done:
+                    if seed_file is not None and seed_file.exists():
+                        count = self._import_file(conn, namespace, seed_file)
+                        logger.info(f"Seeded cache namespace '{namespace}' with {count} entries from {seed_file.name}")
+                    conn.execute("INSERT INTO seeded (namespace, seeded_at) VALUES (?, ?)", (namespace, time.time()))
+            self._seeded.add(namespace)
+
+    def _import_file(self, conn: sqlite3.Connection, namespace: str, path: Path) -> int:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning(f"Could not import {path.name}: {e}")
+            return 0
+        normalize = NAMESPACES.get(namespace, {}).get("key") or (lambda key: key)
+        items = ((normalize(k), v) for k, v in data.items() if not k.startswith("_"))
+        rows = self._rows(namespace, items, None)
+        # Spellings sharing a canonical key: the first one wins
+        conn.executemany(
+            "INSERT OR IGNORE INTO entries (namespace, key, value, expires_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+            rows,
+        )
+        return len(rows)
+
+    def _rows(self, namespace: str, items: Iterable[Tuple[str, Any]], ttl: Optional[float]) -> List[tuple]:
+        now = time.time()
+        negative: Optional[Callable[[Any], bool]] = NAMESPACES.get(namespace, {}).get("negative")
+        rows = []
+        for key, value in items:
+            expiry = ttl
+            if expiry is None and negative is not None and negative(value):
+                expiry = NEGATIVE_TTL
+            rows.append((
+                namespace, key, json.dumps(value, ensure_ascii=False),
+                now + expiry if expiry is not None else None, now,
+            ))
+        return rows
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        """Value of *key*, or None if missing or expired."""
+        return self.get_many(namespace, [key]).get(key)
+
+    def get_many(self, namespace: str, keys: Iterable[str]) -> Dict[str, Any]:
+        """Live values of the given keys (missing and expired keys are omitted)."""
+        self._ensure_seeded(namespace)
+        keys = list(dict.fromkeys(keys))
+        conn = self._connection()
+        now = time.time()
+        found: Dict[str, Any] = {}
+        for start in range(0, len(keys), _SQL_CHUNK):
+            chunk = keys[start:start + _SQL_CHUNK]
+            marks = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                f"SELECT key, value FROM entries WHERE namespace = ? AND key IN ({marks}) "
+                "AND (expires_at IS NULL OR expires_at > ?)",
+                (namespace, *chunk, now),
+            )
+            for key, value in rows:
+                found[key] = json.loads(value)
+        return found
+
+    def items(self, namespace: str) -> Dict[str, Any]:
+        """All live entries of a namespace, sorted by key."""
+        self._ensure_seeded(namespace)
+        rows = self._connection().execute(
+            "SELECT key, value FROM entries WHERE namespace = ? "
+            "AND (expires_at IS NULL OR expires_at > ?) ORDER BY key",
+            (namespace, time.time()),
+        )
+        return {key: json.loads(value) for key, value in rows}
+
+    def expired_items(self, namespace: str, limit: Optional[int] = None) -> Dict[str, Any]:
+        """Expired entries not purged yet (oldest first), e.g. negatives due for a retry."""
+        self._ensure_seeded(namespace)
+        rows = self._connection().execute(
+            "SELECT key, value FROM entries WHERE namespace = ? AND expires_at <= ? ORDER BY expires_at LIMIT ?",
+            (namespace, time.time(), -1 if limit is None else limit),
+        )
+        return {key: json.loads(value) for key, value in rows}
+
+    def count(self, namespace: str) -> int:
+        """Number of live entries of a namespace."""
+        self._ensure_seeded(namespace)
+        (count,) = self._connection().execute(
+            "SELECT COUNT(*) FROM entries WHERE namespace = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (namespace, time.time()),
+        ).fetchone()
+        return count
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Upsert one entry (see set_many)."""
+        self.set_many(namespace, {key: value}, ttl)
+
+    def set_many(self, namespace: str, items: Dict[str, Any], ttl: Optional[float] = None) -> None:
+        """
+        Upsert entries in one transaction.
+
+        Args:
+            namespace: Cache namespace
+            items: key → JSON-serializable value
+            ttl: Lifetime in seconds (default: NEGATIVE_TTL for the negative
+                entries of the namespace, no expiry otherwise)
+        """
+        if not items:
+            return
+        self._ensure_seeded(namespace)
+        rows = self._rows(namespace, items.items(), ttl)
+        with self._transaction() as conn:
+            conn.executemany(_UPSERT, rows)
+
+    def delete(self, namespace: str, keys: Iterable[str]) -> None:
+        """Remove entries."""
+        self._ensure_seeded(namespace)
+        with self._transaction() as conn:
+            conn.executemany("DELETE FROM entries WHERE namespace = ? AND key = ?", [(namespace, k) for k in keys])
+
+    def purge_expired(self) -> int:
+        """Delete expired entries of all namespaces; returns how many."""
+        with self._transaction() as conn:
+            return conn.execute(
+                "DELETE FROM entries WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),)
+            ).rowcount
+
+    # ------------------------------------------------------------------
+    # Ingredient ids
+    # ------------------------------------------------------------------
+
+    def ingredient_names(self) -> Dict[int, str]:
+        """All interned ingredient names, by id."""
+        return dict(self._connection().execute("SELECT id, name FROM ingredients"))
+
+    def intern_ingredients(self, names: Iterable[str]) -> Dict[str, int]:
+        """Ids of canonical ingredient names, allocated on first use."""
+        names = list(dict.fromkeys(names))
+        ids: Dict[str, int] = {}
+        with self._transaction() as conn:
+            conn.executemany("INSERT OR IGNORE INTO ingredients (name) VALUES (?)", [(n,) for n in names])
+            for start in range(0, len(names), _SQL_CHUNK):
+                chunk = names[start:start + _SQL_CHUNK]
+                marks = ",".join("?" * len(chunk))
+                ids.update(conn.execute(f"SELECT name, id FROM ingredients WHERE name IN ({marks})", chunk))
+        return ids
+
+    # ------------------------------------------------------------------
+    # Leases
+    # ------------------------------------------------------------------
+
+    def acquire_leases(self, namespace: str, keys: Iterable[str], owner: str, ttl: float) -> List[str]:
+        """
+        Take the leases of the keys nobody else holds.
+
+        Args:
+            namespace: Cache namespace of the entries being computed
+            keys: Entry keys
+            owner: Token identifying the caller
+            ttl: Lease lifetime in seconds (a crashed owner's lease lapses)
+
+        Returns:
+            The keys now leased to *owner*.
+        """
+        keys = list(dict.fromkeys(keys))
+        now = time.time()
+        with self._transaction() as conn:
+            conn.executemany(
+                "DELETE FROM leases WHERE namespace = ? AND key = ? AND expires_at <= ?",
+                [(namespace, k, now) for k in keys],
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO leases (namespace, key, owner, expires_at) VALUES (?, ?, ?, ?)",
+                [(namespace, k, owner, now + ttl) for k in keys],
+            )
+            mine = []
+            for start in range(0, len(keys), _SQL_CHUNK):
+                chunk = keys[start:start + _SQL_CHUNK]
+                marks = ",".join("?" * len(chunk))
+                mine.extend(k for (k,) in conn.execute(
+                    f"SELECT key FROM leases WHERE namespace = ? AND owner = ? AND key IN ({marks})",
+                    (namespace, owner, *chunk),
+                ))
+        return mine
+
+    def release_leases(self, namespace: str, keys: Iterable[str], owner: str) -> None:
+        """Drop the leases *owner* holds on the keys."""
+        with self._transaction() as conn:
+            conn.executemany(
+                "DELETE FROM leases WHERE namespace = ? AND key = ? AND owner = ?",
+                [(namespace, k, owner) for k in keys],
+            )
+
+    def leased_keys(self, namespace: str, keys: Iterable[str]) -> List[str]:
+        """The keys under a live lease."""
+        keys = list(dict.fromkeys(keys))
+        conn = self._connection()
+        now = time.time()
+        leased: List[str] = []
+        for start in range(0, len(keys), _SQL_CHUNK):
+            chunk = keys[start:start + _SQL_CHUNK]
+            marks = ",".join("?" * len(chunk))
+            leased.extend(k for (k,) in conn.execute(
+                f"SELECT key FROM leases WHERE namespace = ? AND key IN ({marks}) AND expires_at > ?",
+                (namespace, *chunk, now),
+            ))
+        return leased
+
+    # ------------------------------------------------------------------
+    # JSON export
+    # ------------------------------------------------------------------
+
+    def export_json(self, namespace: str, path: Optional[Path] = None) -> Path:
+        """
+        Write a namespace as a JSON file in its historical layout.
+
+        Args:
+            namespace: Cache namespace
+            path: Target file (default: the namespace's file in the data folder)
+
+        Returns:
+            The written path.
+        """
+        spec = NAMESPACES.get(namespace, {})
+        if path is None:
+            path = _DATA_DIR / spec.get("file", f"{namespace}.json")
+        path = Path(path)
+        entries = self.items(namespace)
+        meta: Dict[str, Any] = {
+            "description": spec.get("description", f"Cache namespace '{namespace}'."),
+            "note": SNAPSHOT_NOTE,
+        }
+        if "format" in spec:
+            meta["format"] = spec["format"]
+        meta["last_updated"] = datetime.now().isoformat()
+        meta["total_entries"] = len(entries)
+        data: Dict[str, Any] = {"_meta": meta}
+        data.update(entries)
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp", prefix=path.stem)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+        return path
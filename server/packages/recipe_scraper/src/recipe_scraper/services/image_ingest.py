@@ -0,0 +1,279 @@
+"""
+Streaming ingest of recipe images.
+
+Downloads used to buffer the whole response in memory (and data URLs were
+decoded in one go), so importing several recipes with high-resolution hero
+images at once spiked the memory of the scraper process. An ImageSink
+receives the image in chunks instead and writes them to a temp file:
+
+- byte cap: checked against Content-Length before the body is read, then
+  while counting the received chunks
+- pixel cap: the dimensions are read from the first chunks with a lazy
+  Pillow open (header only, no pixel buffer allocated)
+- file type: sniffed from the magic bytes, which also chooses the extension
+- oversized originals are downscaled on ingest, so the stored original and
+  the server variants generated from it stay reasonably sized
+
+The file only replaces ``{slug}.{ext}`` once it is complete and valid.
+"""
+
+import base64
+import binascii
+import io
+import logging
+import uuid
+import warnings
+from pathlib import Path
+from typing import Optional, Tuple
+from urllib.parse import unquote_to_bytes
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+MAX_IMAGE_BYTES = 20 * 1024 * 1024
+MAX_IMAGE_PIXELS = 40_000_000
+# Longest edge of a stored original (twice the largest server variant)
+MAX_IMAGE_EDGE = 2400
+# Files smaller than this are error pages or tracking pixels
+MIN_IMAGE_BYTES = 100
+
+CHUNK_SIZE = 64 * 1024
+# Bytes kept in memory to read the image header; dimensions not found by
+# then are checked once the file is complete
+_PROBE_LIMIT = 512 * 1024
+# Bytes looked at to recognize the file type
+_SNIFF_LENGTH = 1024
+_JPEG_QUALITY = 90
+_WEBP_QUALITY = 90
+
+
+class ImageRejected(ValueError):
+    """The downloaded content is not an acceptable image."""
+
+
+def sniff_image_type(head: bytes) -> Optional[str]:
+    """
+    File extension of an image from its first bytes.
+
+    Returns:
+        "jpg", "png", "gif", "webp" or "svg", or None when the bytes are not
+        one of these formats.
+    """
+    if head.startswith(b"\xff\xd8\xff"):
+        return "jpg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return "gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    text = head[:_SNIFF_LENGTH].lstrip(b"\xef\xbb\xbf \t\r\n").lower()
+    if text.startswith((b"<?xml", b"<svg", b"<!--", b"<!doctype svg")) and b"<svg" in text:
+        return "svg"
+    return None
+
+
+def probe_dimensions(head: bytes) -> Optional[Tuple[int, int]]:
+    """
+    Dimensions of a raster image from its first bytes, without decoding it.
+
+    Returns:
+        (width, height), or None when the header is not complete yet.
+
+    Raises:
+        ImageRejected: If the image is a decompression bomb
+    """
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", Image.DecompressionBombWarning)
+            with Image.open(io.BytesIO(head)) as img:
+                return img.size
+    except Image.DecompressionBombError as e:
+        raise ImageRejected(str(e)) from e
+    except (OSError, SyntaxError, ValueError):
+        return None
+
+
+class ImageSink:
+    """Writes an image received in chunks to ``{directory}/{slug}.{ext}``."""
+
+    def __init__(
+        self,
+        directory: Path,
+        slug: str,
+        max_bytes: int = MAX_IMAGE_BYTES,
+        max_pixels: int = MAX_IMAGE_PIXELS,
+        max_edge: int = MAX_IMAGE_EDGE,
+    ):
+        """
+        Open the temp file.
+
+        Args:
+            directory: Images folder
+            slug: Recipe slug (file stem)
+            max_bytes: Size above which the image is rejected
+            max_pixels: Pixel count above which the image is rejected
+            max_edge: Longest edge above which the image is downscaled
+        """
+        self.directory = Path(directory)
+        self.slug = slug
+        self.max_bytes = max_bytes
+        self.max_pixels = max_pixels
+        self.max_edge = max_edge
+        self.size = 0
+        self.ext: Optional[str] = None
+        self.dimensions: Optional[Tuple[int, int]] = None
+        self._head = bytearray()
+        self._probing = True
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._tmp_path = self.directory / f".{slug}.{uuid.uuid4().hex[:8]}.part"
+        self._file = open(self._tmp_path, "wb")
+
+    def check_length(self, content_length: Optional[str]) -> None:
+        """Reject early from a Content-Length header."""
+        if content_length and content_length.isdigit() and int(content_length) > self.max_bytes:
+            raise ImageRejected(f"image too large ({int(content_length)} bytes > {self.max_bytes})")
+
+    def write(self, chunk: bytes) -> None:
+        """
+        Append a chunk.
+
+        Raises:
+            ImageRejected: Over the byte or pixel cap, or not an image
+        """
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            raise ImageRejected(f"image too large (over {self.max_bytes} bytes)")
+        self._file.write(chunk)
+        if self._probing:
+            self._probe(chunk)
+
+    def _probe(self, chunk: bytes, final: bool = False) -> None:
+        self._head += chunk
+        if self.ext is None:
+            self.ext = sniff_image_type(bytes(self._head))
+            if self.ext is None:
+                # An SVG root element may come after a prolog
+                if len(self._head) < _SNIFF_LENGTH and not final:
+                    return
+                raise ImageRejected("content is not a supported image type")
+            if self.ext == "svg":
+                self._stop_probing()
+                return
+        self.dimensions = probe_dimensions(bytes(self._head))
+        if self.dimensions is not None:
+            self._check_pixels(self.dimensions)
+            self._stop_probing()
+        elif len(self._head) >= _PROBE_LIMIT:
+            self._stop_probing()
+
+    def _stop_probing(self) -> None:
+        self._probing = False
+        self._head = bytearray()
+
+    def _check_pixels(self, dimensions: Tuple[int, int]) -> None:
+        width, height = dimensions
+        if width * height > self.max_pixels:
+            raise ImageRejected(f"image too large ({width}x{height} > {self.max_pixels} pixels)")
+
+    def finish(self) -> str:
+        """
+        Validate the complete file, downscale it if needed and move it in place.
+
+        Blocking (decodes oversized images): run it off the event loop.
+
+        Returns:
+            The image path relative to the recipes folder ("images/{slug}.{ext}")
+
+        Raises:
+            ImageRejected: If the file is too small, truncated or not an image
+        """
+        self._file.close()
+        try:
+            if self._probing:
+                # Files shorter than the probe window
+                self._probe(b"", final=True)
+            if self.size < MIN_IMAGE_BYTES or self.ext is None:
+                raise ImageRejected(f"image too small ({self.size} bytes), possibly corrupted")
+            if self.ext != "svg":
+                self._validate_raster()
+            target = self.directory / f"{self.slug}.{self.ext}"
+            self._tmp_path.replace(target)
+        except BaseException:
+            self.abort()
+            raise
+        return f"images/{target.name}"
+
+    def _validate_raster(self) -> None:
+        try:
+            with Image.open(self._tmp_path) as img:
+                self._check_pixels(img.size)
+                self.dimensions = img.size
+                if max(img.size) <= self.max_edge or getattr(img, "is_animated", False):
+                    img.verify()
+                    return
+                self._downscale(img)
+        except ImageRejected:
+            raise
+        except Exception as e:
+            raise ImageRejected(f"invalid {self.ext} image: {e}") from e
+
+    def _downscale(self, img: Image.Image) -> None:
+        width, height = img.size
+        scale = self.max_edge / max(width, height)
+        size = (max(int(width * scale), 1), max(int(height * scale), 1))
+        # JPEG: decode directly at a reduced scale (bounded memory)
+        img.draft(img.mode, size)
+        if img.mode == "P":
+            img = img.convert("RGBA")
+        resized = img.resize(size, Image.Resampling.LANCZOS)
+        options = {
+            "jpg": {"format": "JPEG", "quality": _JPEG_QUALITY, "optimize": True},
+            "png": {"format": "PNG", "optimize": True},
+            "webp": {"format": "WEBP", "quality": _WEBP_QUALITY},
+        }[self.ext]
+        if options["format"] == "JPEG" and resized.mode not in ("RGB", "L"):
+            resized = resized.convert("RGB")
+        scaled_path = self._tmp_path.with_suffix(".scaled")
+        try:
+            resized.save(scaled_path, **options)
+            scaled_path.replace(self._tmp_path)
+        finally:
+            scaled_path.unlink(missing_ok=True)
+        logger.info(f"Image {self.slug} downscaled on ingest: {width}x{height} -> {size[0]}x{size[1]}")
+        self.dimensions = size
+
+    def abort(self) -> None:
+        """Drop the temp file."""
+        self._file.close()
+        self._tmp_path.unlink(missing_ok=True)
+
+
+def write_data_url(data_url: str, sink: ImageSink) -> None:
+    """
+    Feed the payload of a ``data:`` URL to *sink*, decoded in chunks.
+
+    Raises:
+        ImageRejected: If the payload is over the byte cap or malformed
+    """
+    header, _, payload = data_url.partition(",")
+    if not header.endswith(";base64"):
+        # Percent-encoded payload (usually SVG)
+        if len(payload) > sink.max_bytes * 3:
+            raise ImageRejected("data URL image too large")
+        data = unquote_to_bytes(payload)
+        for start in range(0, len(data), CHUNK_SIZE):
+            sink.write(data[start:start + CHUNK_SIZE])
+        return
+
+    payload = "".join(payload.split())
+    if len(payload) * 3 // 4 > sink.max_bytes:
+        raise ImageRejected(f"data URL image too large (~{len(payload) * 3 // 4} bytes)")
+    # 4 base64 characters per 3 bytes: chunks aligned on quadruplets decode independently
+    step = CHUNK_SIZE // 3 * 4
+    try:
+        for start in range(0, len(payload), step):
+            sink.write(base64.b64decode(payload[start:start + step], validate=True))
+    except binascii.Error as e:
+        raise ImageRejected(f"malformed data URL: {e}") from e
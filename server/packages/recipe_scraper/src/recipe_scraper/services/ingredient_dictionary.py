@@ -0,0 +1,126 @@
+"""
+Global dictionary of interned ingredient names.
+
+Every enrichment stage keys its data by English ingredient name: the match
+cache, the resolved-ingredient DB, LLM weight estimates (per unit) and LLM
+quantity estimates (per unit). They used to normalize names on their own
+("boneless, skinless" vs "boneless skinless"), so the same ingredient could
+hit one cache and miss another.
+
+The dictionary normalizes a name once and gives it a canonical integer id;
+the caches are keyed by that id in memory and by the canonical name in the
+cache store. Ids are allocated by the CacheStore so that they stay stable
+across runs and worker processes.
+"""
+
+import logging
+import re
+from typing import Dict, Iterable, Optional, Tuple
+
+from .cache_store import CacheStore
+
+logger = logging.getLogger(__name__)
+
+_PUNCTUATION_RE = re.compile(r"[,;.()]+")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_ingredient_name(name_en: str) -> str:
+    """Canonical form of an English ingredient name.
+
+    Strips whitespace, lowercases, and removes punctuation that causes
+    cache misses (e.g. "boneless, skinless" vs "boneless skinless").
+    """
+    key = _PUNCTUATION_RE.sub(" ", name_en.strip().lower())
+    return _WHITESPACE_RE.sub(" ", key).strip()
+
+
+class IngredientDictionary:
+    """Interns English ingredient names to stable integer ids."""
+
+    _shared: Optional["IngredientDictionary"] = None
+
+    def __init__(self, store: Optional[CacheStore] = None):
+        """
+        Initialize the dictionary.
+
+        Args:
+            store: Cache store allocating the ids (None = in-memory only).
+        """
+        self._store = store
+        self._names: Dict[int, str] = {}   # id → canonical name
+        self._ids: Dict[str, int] = {}     # canonical name → id
+        self._raw: Dict[str, str] = {}     # raw spelling → canonical name
+        if store is not None:
+            self._names = store.ingredient_names()
+            self._ids = {name: ing_id for ing_id, name in self._names.items()}
+
+    @classmethod
+    def shared(cls) -> "IngredientDictionary":
+        """Process-wide dictionary backed by the shared CacheStore."""
+        if cls._shared is None:
+            cls._shared = cls(CacheStore.shared())
+        return cls._shared
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def _allocate(self, keys: Iterable[str]) -> None:
+        """Give ids to new canonical names (one store transaction)."""
+        new = [key for key in dict.fromkeys(keys) if key not in self._ids]
+        if not new:
+            return
+        if self._store is not None:
+            ids = self._store.intern_ingredients(new)
+        else:
+            ids = {key: len(self._names) + i for i, key in enumerate(new)}
+        for key, ing_id in ids.items():
+            self._names[ing_id] = key
+            self._ids[key] = ing_id
+
+    def intern(self, name_en: str) -> int:
+        """Id of *name_en*, allocating one for a new canonical name."""
+        key = self.canonical(name_en)
+        if key not in self._ids:
+            self._allocate([key])
+        return self._ids[key]
+
+    def intern_many(self, names_en: Iterable[str]) -> Dict[int, str]:
+        """Distinct ids of *names_en*, mapped to the first spelling seen."""
+        names = [name for name in names_en if name]
+        self._allocate(self.canonical(name) for name in names)
+        ids: Dict[int, str] = {}
+        for name in names:
+            ids.setdefault(self._ids[self.canonical(name)], name)
+        return ids
+
+    def get(self, name_en: str) -> Optional[int]:
+        """Id of *name_en* if its canonical name has one (never allocates)."""
+        return self._ids.get(self.canonical(name_en))
+
+    def key(self, ing_id: int) -> str:
+        """Canonical name of an id."""
+        return self._names[ing_id]
+
+    def canonical(self, name_en: str) -> str:
+        """Canonical name of *name_en* (the key of match results), without allocating an id."""
+        key = self._raw.get(name_en)
+        if key is None:
+            key = self._raw[name_en] = normalize_ingredient_name(name_en)
+        return key
+
+    def unit_key(self, ing_id: int, unit: Optional[str]) -> str:
+        """On-disk key of a per-unit estimate ("unit|canonical name")."""
+        return f"{unit or 'none'}|{self._names[ing_id]}"
+
+    def split_unit_key(self, cache_key: str) -> Tuple[str, int]:
+        """Parse an on-disk "unit|name" key into (unit, id)."""
+        unit, _, name = cache_key.partition("|")
+        return unit, self.intern(name)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, name_en: str) -> bool:
+        return self.canonical(name_en) in self._ids
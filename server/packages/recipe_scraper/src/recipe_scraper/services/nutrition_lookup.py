@@ -2,29 +2,29 @@
 Nutrition lookup service using USDA FoodData Central API.
 
 Searches for raw/minimally processed ingredients (Foundation Foods)
-and returns macronutrient data per 100g with local JSON caching.
+and returns macronutrient data per 100g, cached in the shared CacheStore.
 
 Matching strategy:
 - Primary: LLM-based selection among USDA search candidates
 - Fallback: heuristic scoring if LLM is unavailable
 """
 
-import json
 import logging
 import os
 import re
 from datetime import datetime
-from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set
 
 import httpx
 from openai import AsyncOpenAI
 
+from .cache_store import CacheStore
+from .ingredient_dictionary import IngredientDictionary
+
 logger = logging.getLogger(__name__)
 
-# Path to the nutrition cache
-_DATA_DIR = Path(__file__).parent.parent / "data"
-_CACHE_FILE = _DATA_DIR / "nutrition_cache.json"
+# Cache store namespace (shared with NutritionMatcher)
+_CACHE_NAMESPACE = "nutrition"
 
 # USDA FDC API
 _FDC_BASE_URL = "https://api.nal.usda.gov/fdc/v1"
@@ -410,7 +410,7 @@ class NutritionLookup:
 
     Features:
     - Searches Foundation Foods (raw/unprocessed ingredients)
-    - Caches results locally in JSON to minimize API calls
+    - Caches results in the shared CacheStore to minimize API calls
     - Returns macros per 100g
     - Rate-limited to respect USDA's 1000 req/hour limit
     """
@@ -418,7 +418,7 @@ class NutritionLookup:
     def __init__(
         self,
         api_key: Optional[str] = None,
-        cache_path: Optional[Path] = None,
+        store: Optional[CacheStore] = None,
         openrouter_api_key: Optional[str] = None,
         llm_model: str = "deepseek/deepseek-v3.2",
     ):
@@ -427,7 +427,7 @@ class NutritionLookup:
 
         Args:
             api_key: USDA FDC API key. Defaults to USDA_API_KEY env var.
-            cache_path: Path to the cache JSON file.
+            store: Cache store of lookup results (default: shared store).
             openrouter_api_key: API key for OpenRouter (LLM matching).
             llm_model: Model to use for LLM-based ingredient matching.
         """
@@ -435,65 +435,48 @@ class NutritionLookup:
         if not self._api_key:
             logger.warning("No USDA_API_KEY found — nutrition lookup will be unavailable")
 
-        self._cache_path = cache_path or _CACHE_FILE
+        self._store = store or CacheStore.shared()
         self._cache: Dict[str, Dict[str, Any]] = {}
-        self._dirty = False
+        self._fetched: Set[str] = set()
+        self._dirty: Set[str] = set()
 
         # LLM client for intelligent USDA candidate matching (lazy init)
         self._llm_api_key = openrouter_api_key or os.getenv("OPENROUTER_API_KEY")
         self._llm_model = llm_model
         self._llm_client: Optional[AsyncOpenAI] = None
 
-        self._load_cache()
 
-    def _load_cache(self) -> None:
-        """Load nutrition cache from disk."""
-        if self._cache_path.exists():
-            with open(self._cache_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            self._cache = {
-                k: v for k, v in data.items()
-                if not k.startswith("_")
-            }
-            logger.info(f"Loaded {len(self._cache)} cached nutrition entries")
-        else:
-            self._cache = {}
+    def _cached(self, key: str) -> Optional[Dict[str, Any]]:
+        """Cached entry of a key, read from the store on first use."""
+        if key not in self._cache and key not in self._fetched:
+            self._fetched.add(key)
+            stored = self._store.get(_CACHE_NAMESPACE, key)
+            if stored is not None:
+                self._cache[key] = stored
+        return self._cache.get(key)
 
     def save_cache(self) -> None:
-        """Persist cache to disk if changed."""
+        """Write new lookup results to the cache store."""
         if not self._dirty:
             return
-
-        data = {
-            "_meta": {
-                "description": "Cache of USDA FoodData Central nutrition lookups.",
-                "source": "USDA FoodData Central - Foundation Foods",
-                "last_updated": datetime.now().isoformat(),
-                "total_entries": len(self._cache),
-            }
-        }
-        data.update(dict(sorted(self._cache.items())))
-
-        self._cache_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(self._cache_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-
-        self._dirty = False
-        logger.info(f"Saved {len(self._cache)} nutrition entries to cache")
+        self._store.set_many(_CACHE_NAMESPACE, {k: self._cache[k] for k in self._dirty})
+        logger.info(f"Saved {len(self._dirty)} nutrition entries to cache")
+        self._dirty.clear()
 
     def _normalize_key(self, name_en: str) -> str:
-        """Normalize an English name for cache key."""
-        return name_en.strip().lower()
+        """Canonical cache key of an English name (see IngredientDictionary)."""
+        return IngredientDictionary.shared().canonical(name_en)
 
     def get_cached(self, name_en: str) -> Optional[Dict[str, Any]]:
         """Get nutrition data from cache, or None."""
-        return self._cache.get(self._normalize_key(name_en))
+        return self._cached(self._normalize_key(name_en))
 
     async def lookup_ingredient(self, name_en: str) -> Optional[Dict[str, Any]]:
         """
         Look up nutrition data for a single ingredient.
 
-        1. Check local cache
+        1. Check local cache (not_found entries expire after the store's
+           NEGATIVE_TTL and are looked up again)
         2. If miss, query USDA FDC API
         3. Cache the result
 
@@ -506,10 +489,10 @@ class NutritionLookup:
         key = self._normalize_key(name_en)
 
         # 1. Cache hit?
-        cached = self._cache.get(key)
+        cached = self._cached(key)
         if cached is not None:
             logger.debug(f"Cache hit: '{name_en}'")
-            return cached
+            return None if cached.get("not_found") else cached
 
         # 2. API lookup
         if not self._api_key:
@@ -520,12 +503,12 @@ class NutritionLookup:
 
         if result:
             self._cache[key] = result
-            self._dirty = True
+            self._dirty.add(key)
             logger.info(f"Cached nutrition for '{name_en}': {result.get('energy_kcal', '?')} kcal/100g")
         else:
             # Cache negative result to avoid repeated failed lookups
             self._cache[key] = {"not_found": True, "cached_at": datetime.now().isoformat()}
-            self._dirty = True
+            self._dirty.add(key)
             logger.info(f"No USDA data found for '{name_en}' — cached as not_found")
 
         return result if result else None
@@ -22,10 +22,14 @@ import logging
 import re
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Set
 
 import numpy as np
 
+from .cache_store import CacheStore
+from .ingredient_dictionary import IngredientDictionary
+from .weight_estimator import WeightEstimator
+
 logger = logging.getLogger(__name__)
 
 # ---------------------------------------------------------------------------
@@ -36,7 +40,7 @@ _INDEX_FILE = _DATA_DIR / "opennutrition_index.json"
 _CIQUAL_INDEX_FILE = _DATA_DIR / "ciqual_index.json"
 _MEXT_INDEX_FILE = _DATA_DIR / "mext_index.json"
 _EMBEDDINGS_FILE = _DATA_DIR / "nutrition_embeddings.npy"
-_CACHE_FILE = _DATA_DIR / "nutrition_cache.json"
+_CACHE_NAMESPACE = "nutrition"
 
 # ---------------------------------------------------------------------------
 # Embedding config
@@ -322,7 +326,7 @@ class NutritionMatcher:
     Features:
     - Semantic search via cosine similarity (BAAI/bge-small-en-v1.5)
     - Zero false positives via keyword validation (v3)
-    - Local JSON caching of match results
+    - Match results cached in the shared CacheStore
     - Pre-computed embeddings for the 5K+ food database (cached as .npy)
     """
 
@@ -330,7 +334,7 @@ class NutritionMatcher:
         self,
         index_path: Optional[Path] = None,
         embeddings_path: Optional[Path] = None,
-        cache_path: Optional[Path] = None,
+        store: Optional[CacheStore] = None,
         similarity_threshold: float = _SIMILARITY_THRESHOLD,
     ):
         """
@@ -339,12 +343,12 @@ class NutritionMatcher:
         Args:
             index_path: Path to the slim OpenNutrition JSON index.
             embeddings_path: Path to pre-computed .npy embeddings.
-            cache_path: Path to the match cache JSON.
+            store: Cache store of match results (default: shared store).
             similarity_threshold: Minimum cosine similarity for a match.
         """
         self._index_path = index_path or _INDEX_FILE
         self._embeddings_path = embeddings_path or _EMBEDDINGS_FILE
-        self._cache_path = cache_path or _CACHE_FILE
+        self._store = store or CacheStore.shared()
         self._threshold = similarity_threshold
 
         # Lazy-loaded resources
@@ -353,80 +357,43 @@ class NutritionMatcher:
         self._db_texts: Optional[List[str]] = None
         self._model = None
 
-        # Cache
-        self._cache: Dict[str, Dict[str, Any]] = {}
-        self._dirty = False
-        self._load_cache()
+        # Cache, keyed by interned ingredient id: read from the store on
+        # first use of an ingredient, new results written back per key
+        self._dictionary = IngredientDictionary.shared()
+        self._cache: Dict[int, Dict[str, Any]] = {}
+        self._fetched: Set[int] = set()
+        self._dirty: Set[int] = set()
 
     # ------------------------------------------------------------------
     # Cache management
     # ------------------------------------------------------------------
 
-    def _load_cache(self) -> None:
-        """Load match cache from disk, filtering out legacy USDA entries."""
-        if self._cache_path.exists():
-            try:
-                with open(self._cache_path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                # Only keep entries matched by the new embedding system.
-                # Skip legacy USDA entries (including their not_found markers)
-                # so they get re-matched with the better embedding approach.
-                self._cache = {}
-                skipped = 0
-                for k, v in data.items():
-                    if k.startswith("_"):
-                        continue
-                    if v.get("matching") == "bge-small-embedding":
-                        self._cache[k] = v
-                    else:
-                        skipped += 1
-                if skipped:
-                    logger.info(
-                        f"Skipped {skipped} legacy USDA cache entries "
-                        f"(will re-match with embeddings)"
-                    )
-                    self._dirty = True  # Will save the cleaned cache
-                logger.info(f"Loaded {len(self._cache)} cached nutrition entries")
-            except (json.JSONDecodeError, OSError) as e:
-                logger.warning(f"Could not load nutrition cache: {e}")
-                self._cache = {}
-        else:
-            self._cache = {}
+    def _load_cached(self, ing_ids: Iterable[int]) -> None:
+        """Fetch stored matches of ingredients not looked up yet."""
+        missing = [i for i in ing_ids if i not in self._fetched]
+        if not missing:
+            return
+        self._fetched.update(missing)
+        keys = {self._dictionary.key(i): i for i in missing}
+        stored = self._store.get_many(_CACHE_NAMESPACE, keys)
+        for k, v in stored.items():
+            # Only keep entries matched by the embedding system; legacy USDA
+            # entries (and not_found markers) get re-matched.
+            if v.get("matching") == "bge-small-embedding":
+                self._cache.setdefault(keys[k], v)
 
     def save_cache(self) -> None:
-        """Persist cache to disk if changed."""
+        """Write new match results to the cache store."""
         if not self._dirty:
             return
-
-        data = {
-            "_meta": {
-                "description": "Cache of OpenNutrition embedding-matched nutrition data.",
-                "source": "OpenNutrition (BGE-small embedding match)",
-                "matching": "BAAI/bge-small-en-v1.5 + validation v3",
-                "last_updated": datetime.now().isoformat(),
-                "total_entries": len(self._cache),
-            }
-        }
-        data.update(dict(sorted(self._cache.items())))
-
-        self._cache_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(self._cache_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-
-        self._dirty = False
-        logger.info(f"Saved {len(self._cache)} nutrition entries to cache")
+        key = self._dictionary.key
+        self._store.set_many(_CACHE_NAMESPACE, {key(i): self._cache[i] for i in self._dirty})
+        logger.info(f"Saved {len(self._dirty)} nutrition entries to cache")
+        self._dirty.clear()
 
     def _normalize_key(self, name_en: str) -> str:
-        """Normalize an English name for cache key.
-
-        Strips whitespace, lowercases, and removes punctuation that causes
-        cache misses (e.g. "boneless, skinless" vs "boneless skinless").
-        """
-        import re
-        key = name_en.strip().lower()
-        key = re.sub(r"[,;.()]+", " ", key)
-        key = re.sub(r"\s+", " ", key).strip()
-        return key
+        """Canonical cache key of an English name (see IngredientDictionary)."""
+        return self._dictionary.canonical(name_en)
 
     # ------------------------------------------------------------------
     # Index & model loading (lazy)
@@ -558,7 +525,7 @@ class NutritionMatcher:
         """Build a lowercased name -> entry dict for O(1) exact lookup.
 
         Loads both the OpenNutrition index and any auto-resolved entries
-        from resolved_ingredients.json.
+        (resolved_ingredients namespace of the cache store).
         """
         if hasattr(self, "_exact_index") and self._exact_index is not None:
             return
@@ -581,23 +548,13 @@ class NutritionMatcher:
         )
 
     def _load_resolved_into_index(self) -> int:
-        """Load resolved_ingredients.json into the exact index.
+        """Load the resolved ingredients into the exact index.
 
         Maps the resolved format (kcal, protein, fat, ...) to the
         OpenNutrition format (kcal, protein, fat, ...) expected by _build_result.
         """
-        resolved_file = _DATA_DIR / "resolved_ingredients.json"
-        if not resolved_file.exists():
-            return 0
-
-        with open(resolved_file, "r", encoding="utf-8") as f:
-            data = json.load(f)
-
         count = 0
-        for key, entry in data.items():
-            if key.startswith("_"):
-                continue
-
+        for key, entry in self._store.items("resolved_ingredients").items():
             on_entry = {
                 "id": f"resolved_{key}",
                 "name": entry.get("name", key),
@@ -618,15 +575,17 @@ class NutritionMatcher:
                 "source": entry.get("source", "resolved"),
             }
 
-            name_lower = key.lower().strip()
-            if name_lower and name_lower not in self._exact_index:
-                self._exact_index[name_lower] = on_entry
+            # Resolved names come from recipes: index them under the same
+            # canonical form as the queries
+            name_key = self._dictionary.canonical(key)
+            if name_key and name_key not in self._exact_index:
+                self._exact_index[name_key] = on_entry
                 count += 1
 
             for alt in on_entry.get("alt", []):
-                alt_lower = alt.lower().strip()
-                if alt_lower and alt_lower not in self._exact_index:
-                    self._exact_index[alt_lower] = on_entry
+                alt_key = self._dictionary.canonical(alt)
+                if alt_key and alt_key not in self._exact_index:
+                    self._exact_index[alt_key] = on_entry
 
         return count
 
@@ -637,8 +596,7 @@ class NutritionMatcher:
         (e.g. "fresh green beans" -> "green beans" -> "beans").
         """
         self._build_exact_index()
-        query = re.sub(r"[,;.()]+", " ", name_en.lower().strip())
-        query = re.sub(r"\s+", " ", query).strip()
+        query = self._dictionary.canonical(name_en)
 
         # Direct lookup
         if query in self._exact_index:
@@ -674,10 +632,11 @@ class NutritionMatcher:
             Dict with macros per 100g (energy_kcal, protein_g, fat_g,
             carbs_g, fiber_g, etc.), or None if no good match.
         """
-        key = self._normalize_key(name_en)
+        ing_id = self._dictionary.intern(name_en)
+        self._load_cached([ing_id])
 
         # Cache hit?
-        cached = self._cache.get(key)
+        cached = self._cache.get(ing_id)
         if cached is not None:
             if cached.get("not_found"):
                 return None
@@ -686,8 +645,8 @@ class NutritionMatcher:
         # --- Step 0: Skip composite ingredients (sauces, dressings, etc.) ---
         if _is_composite_ingredient(name_en):
             logger.info(f"Skipping composite ingredient '{name_en}' (unreliable match)")
-            self._cache[key] = {"not_found": True, "reason": "composite", "cached_at": datetime.now().isoformat()}
-            self._dirty = True
+            self._cache[ing_id] = {"not_found": True, "reason": "composite", "cached_at": datetime.now().isoformat()}
+            self._dirty.add(ing_id)
             return None
 
         # --- Step 1: Exact name match (fast, no model) ---
@@ -695,8 +654,8 @@ class NutritionMatcher:
         if exact_entry is not None:
             result = self._build_result(exact_entry, score=1.0)
             result["matching"] = "exact-name-lookup"
-            self._cache[key] = result
-            self._dirty = True
+            self._cache[ing_id] = result
+            self._dirty.add(ing_id)
             logger.info(
                 f"Exact match '{name_en}' -> '{exact_entry['name']}' "
                 f"({result['energy_kcal']} kcal/100g)"
@@ -727,19 +686,19 @@ class NutritionMatcher:
             entry_kcal = entry.get("kcal") or entry.get("energy_kcal")
             if _validate_match(name_en, entry["name"], kcal_per_100g=entry_kcal):
                 result = self._build_result(entry, score)
-                self._cache[key] = result
-                self._dirty = True
+                self._cache[ing_id] = result
+                self._dirty.add(ing_id)
                 logger.info(
                     f"Embedding match '{name_en}' -> '{entry['name']}' "
                     f"(cos={score:.3f}, {result['energy_kcal']} kcal/100g)"
                 )
                 return result
 
-        self._cache[key] = {
+        self._cache[ing_id] = {
             "not_found": True,
             "cached_at": datetime.now().isoformat(),
         }
-        self._dirty = True
+        self._dirty.add(ing_id)
         logger.info(f"No valid match for '{name_en}'")
         return None
 
@@ -759,17 +718,18 @@ class NutritionMatcher:
         """
         results: Dict[str, Optional[Dict[str, Any]]] = {}
         need_embedding_names: List[str] = []
-        need_embedding_keys: List[str] = []
+        need_embedding_ids: List[int] = []
 
         exact_hits = 0
 
-        for name in names_en:
-            if not name:
-                continue
-            key = self._normalize_key(name)
+        # Each distinct ingredient is matched once, however often it repeats
+        distinct = self._dictionary.intern_many(names_en)
+        self._load_cached(distinct)
+        for ing_id, name in distinct.items():
+            key = self._dictionary.key(ing_id)
 
             # 0. Cache hit
-            cached = self._cache.get(key)
+            cached = self._cache.get(ing_id)
             if cached is not None:
                 results[key] = None if cached.get("not_found") else cached
                 continue
@@ -777,8 +737,8 @@ class NutritionMatcher:
             # 1. Skip composite ingredients
             if _is_composite_ingredient(name):
                 logger.info(f"Skipping composite ingredient '{name}'")
-                self._cache[key] = {"not_found": True, "reason": "composite", "cached_at": datetime.now().isoformat()}
-                self._dirty = True
+                self._cache[ing_id] = {"not_found": True, "reason": "composite", "cached_at": datetime.now().isoformat()}
+                self._dirty.add(ing_id)
                 results[key] = None
                 continue
 
@@ -787,8 +747,8 @@ class NutritionMatcher:
             if exact_entry is not None:
                 result = self._build_result(exact_entry, score=1.0)
                 result["matching"] = "exact-name-lookup"
-                self._cache[key] = result
-                self._dirty = True
+                self._cache[ing_id] = result
+                self._dirty.add(ing_id)
                 results[key] = result
                 exact_hits += 1
                 logger.debug(f"Exact match '{name}' -> '{exact_entry['name']}'")
@@ -796,7 +756,7 @@ class NutritionMatcher:
 
             # 3. Need embedding
             need_embedding_names.append(name)
-            need_embedding_keys.append(key)
+            need_embedding_ids.append(ing_id)
 
         if exact_hits:
             logger.info(f"Exact name lookup resolved {exact_hits} ingredients")
@@ -824,9 +784,10 @@ class NutritionMatcher:
         # Compute similarity matrix
         sim_matrix = q_emb @ self._db_embeddings.T
 
-        for i, (name, key) in enumerate(
-            zip(need_embedding_names, need_embedding_keys)
+        for i, (name, ing_id) in enumerate(
+            zip(need_embedding_names, need_embedding_ids)
         ):
+            key = self._dictionary.key(ing_id)
             scores = sim_matrix[i]
             top_indices = np.argsort(scores)[::-1][:10]
 
@@ -840,8 +801,8 @@ class NutritionMatcher:
                 entry_kcal = entry.get("kcal") or entry.get("energy_kcal")
                 if _validate_match(name, entry["name"], kcal_per_100g=entry_kcal):
                     result = self._build_result(entry, score)
-                    self._cache[key] = result
-                    self._dirty = True
+                    self._cache[ing_id] = result
+                    self._dirty.add(ing_id)
                     results[key] = result
                     found = True
                     logger.debug(
@@ -851,11 +812,11 @@ class NutritionMatcher:
                     break
 
             if not found:
-                self._cache[key] = {
+                self._cache[ing_id] = {
                     "not_found": True,
                     "cached_at": datetime.now().isoformat(),
                 }
-                self._dirty = True
+                self._dirty.add(ing_id)
                 results[key] = None
                 logger.debug(f"No valid match for '{name}'")
 
@@ -1062,6 +1023,30 @@ class NutritionMatcher:
 
         return candidate
 
+    # Gram-estimation engine (built once from the lookup tables, lazily)
+    _weight_estimator: Optional[WeightEstimator] = None
+
+    @classmethod
+    def _get_weight_estimator(cls) -> WeightEstimator:
+        """Build the compiled estimator on first use."""
+        if cls._weight_estimator is None:
+            from .nutrition_lookup import (
+                COMMON_PORTION_WEIGHTS, LIQUID_DENSITIES, PIECE_WEIGHTS, UNIT_TO_GRAMS, _VOLUME_UNITS,
+            )
+
+            cls._weight_estimator = WeightEstimator(
+                unit_to_grams=UNIT_TO_GRAMS,
+                piece_weights=PIECE_WEIGHTS,
+                liquid_densities=LIQUID_DENSITIES,
+                common_portion_weights=COMMON_PORTION_WEIGHTS,
+                portion_weights=cls._get_portion_weights(),
+                volume_units=_VOLUME_UNITS,
+                piece_like_units=cls._PIECE_LIKE_UNITS,
+                default_unit_grams=cls._DEFAULT_UNIT_GRAMS,
+                normalize_unit=cls._normalize_unit,
+            )
+        return cls._weight_estimator
+
     @staticmethod
     def estimate_grams(
         quantity: Optional[float],
@@ -1086,180 +1071,4 @@ class NutritionMatcher:
         Returns:
             Estimated weight in grams, or None if can't determine.
         """
-        import re as _re
-        from .nutrition_lookup import UNIT_TO_GRAMS, PIECE_WEIGHTS, LIQUID_DENSITIES, _VOLUME_UNITS
-
-        def _lookup_liquid_density(en_name: str) -> float:
-            """Return density (g/ml) for a liquid ingredient, default 1.0."""
-            name_lower = en_name.lower().strip()
-            for key in sorted(LIQUID_DENSITIES, key=len, reverse=True):
-                if key in name_lower:
-                    return LIQUID_DENSITIES[key]
-            return 1.0
-
-        if quantity is None:
-            return None
-        if not isinstance(quantity, (int, float)):
-            try:
-                quantity = float(quantity)
-            except (ValueError, TypeError):
-                return None
-
-        # Pre-sort keys longest-first so "cherry tomato" matches before "tomato"
-        _PIECE_KEYS_SORTED = sorted(PIECE_WEIGHTS, key=len, reverse=True)
-
-        def _lookup_piece_weight(en_name: str) -> Optional[float]:
-            name_lower = en_name.lower().strip()
-            # 1. Exact match (fast path)
-            if name_lower in PIECE_WEIGHTS:
-                return quantity * PIECE_WEIGHTS[name_lower]
-            # 1b. Try depluralized (shallots → shallot, tomatoes → tomato)
-            dep = name_lower
-            if dep.endswith("ies") and len(dep) > 4:
-                dep = dep[:-3] + "y"
-            elif dep.endswith("oes") and len(dep) > 4:
-                dep = dep[:-2]
-            elif dep.endswith("ves") and len(dep) > 4:
-                dep = dep[:-1]
-            elif dep.endswith("s") and not dep.endswith("ss") and len(dep) > 3:
-                dep = dep[:-1]
-            if dep != name_lower and dep in PIECE_WEIGHTS:
-                return quantity * PIECE_WEIGHTS[dep]
-            # 2. Word-boundary match (longest key first to prefer specific matches)
-            for key in _PIECE_KEYS_SORTED:
-                if _re.search(rf'\b{_re.escape(key)}\b', name_lower):
-                    return quantity * PIECE_WEIGHTS[key]
-            return None
-
-        def _depluralize_name(name: str) -> str:
-            if name.endswith("ies") and len(name) > 4:
-                return name[:-3] + "y"
-            if name.endswith("oes") and len(name) > 4:
-                return name[:-2]
-            if name.endswith("ves") and len(name) > 4:
-                return name[:-1]
-            if name.endswith("s") and not name.endswith("ss") and len(name) > 3:
-                return name[:-1]
-            return name
-
-        def _lookup_common_portion_weight(en_name: str, unit_key: str) -> Optional[float]:
-            """Look up from hand-curated COMMON_PORTION_WEIGHTS (USDA values)."""
-            from .nutrition_lookup import COMMON_PORTION_WEIGHTS
-            name_lower = en_name.lower().strip()
-            # Exact match
-            entry = COMMON_PORTION_WEIGHTS.get(name_lower)
-            if entry and unit_key in entry:
-                return quantity * entry[unit_key]
-            dep = _depluralize_name(name_lower)
-            if dep != name_lower:
-                entry = COMMON_PORTION_WEIGHTS.get(dep)
-                if entry and unit_key in entry:
-                    return quantity * entry[unit_key]
-            # Word-by-word (last word first: "fresh lemon juice" → "juice" then "lemon")
-            for word in reversed(name_lower.split()):
-                entry = COMMON_PORTION_WEIGHTS.get(word)
-                if entry and unit_key in entry:
-                    return quantity * entry[unit_key]
-            # Substring match (longest key first) for compound names
-            for key in sorted(COMMON_PORTION_WEIGHTS, key=len, reverse=True):
-                if key in name_lower:
-                    entry = COMMON_PORTION_WEIGHTS[key]
-                    if unit_key in entry:
-                        return quantity * entry[unit_key]
-            return None
-
-        def _lookup_portion_weight(en_name: str, unit_key: str) -> Optional[float]:
-            """Look up ingredient-specific unit conversion from USDA portion data."""
-            portion_data = NutritionMatcher._get_portion_weights()
-            name_lower = en_name.lower().strip()
-
-            # Try both original and depluralized forms at each step
-            def _try(key: str) -> Optional[float]:
-                entry = portion_data.get(key)
-                if entry and unit_key in entry:
-                    return quantity * entry[unit_key]
-                dep = _depluralize_name(key)
-                if dep != key:
-                    entry = portion_data.get(dep)
-                    if entry and unit_key in entry:
-                        return quantity * entry[unit_key]
-                return None
-
-            # 1) Exact match
-            result = _try(name_lower)
-            if result is not None:
-                return result
-
-            # 2) Try each word (e.g. "fresh cilantro" → "cilantro")
-            words = name_lower.split()
-            for word in reversed(words):
-                result = _try(word)
-                if result is not None:
-                    return result
-
-            # 3) Multi-word sub-phrases
-            for length in range(len(words) - 1, 0, -1):
-                for start in range(len(words) - length + 1):
-                    candidate = " ".join(words[start:start + length])
-                    if len(candidate) >= 4:
-                        result = _try(candidate)
-                        if result is not None:
-                            return result
-
-            return None
-
-        if unit is None:
-            return _lookup_piece_weight(name_en)
-
-        # Normalize unit: strip adjectives, resolve aliases, depluralize
-        normalized = NutritionMatcher._normalize_unit(unit)
-
-        # ── Mass units: fixed physical constants, never ingredient-specific ──
-        # oz/lb/g/kg are absolute weight measurements. Portion weights must
-        # NOT override them (USDA data mislabels package weights as "oz").
-        _MASS_UNITS = {"g", "kg", "oz", "lb"}
-        if normalized in _MASS_UNITS and normalized in UNIT_TO_GRAMS:
-            return quantity * UNIT_TO_GRAMS[normalized]
-
-        # 0. For piece-like units, prefer curated PIECE_WEIGHTS over auto-generated
-        #    USDA portion data (avoids "cherry tomato" → 182g instead of 15g)
-        if normalized in NutritionMatcher._PIECE_LIKE_UNITS:
-            pw = _lookup_piece_weight(name_en)
-            if pw is not None:
-                return pw
-
-        # 0b. Ingredient-specific unit conversion (USDA portion measures)
-        #     e.g., "1 cup flour" = 125g, not 240g
-        portion_result = _lookup_portion_weight(name_en, normalized)
-        if portion_result is not None:
-            return portion_result
-
-        # 0b2. Common ingredient portion weights (USDA, hand-curated fallback)
-        #      Covers frequent misses from portion_weights.json (olive oil, honey, etc.)
-        _common_result = _lookup_common_portion_weight(name_en, normalized)
-        if _common_result is not None:
-            return _common_result
-
-        # 0c. Density-corrected volume conversion (FAO/INFOODS)
-        #     For volume units, apply ingredient-specific density before
-        #     falling through to the generic 1ml=1g approximation.
-        if normalized in _VOLUME_UNITS:
-            density = _lookup_liquid_density(name_en)
-            if density != 1.0:
-                volume_ml = quantity * UNIT_TO_GRAMS[normalized]
-                return volume_ml * density
-
-        # 1. Generic unit conversion (fallback — uses density=1.0 for volume)
-        if normalized in UNIT_TO_GRAMS and UNIT_TO_GRAMS[normalized] is not None:
-            return quantity * UNIT_TO_GRAMS[normalized]
-
-        # 2. Piece-like unit fallback → default weight per unit type
-        if normalized in NutritionMatcher._PIECE_LIKE_UNITS:
-            if normalized in NutritionMatcher._DEFAULT_UNIT_GRAMS:
-                return quantity * NutritionMatcher._DEFAULT_UNIT_GRAMS[normalized]
-
-        # 3b. Units with default weights that aren't piece-like (handful, knob, drop)
-        if normalized in NutritionMatcher._DEFAULT_UNIT_GRAMS:
-            return quantity * NutritionMatcher._DEFAULT_UNIT_GRAMS[normalized]
-
-        return None
+        return NutritionMatcher._get_weight_estimator().estimate(quantity, unit, name_en)
@@ -6,24 +6,36 @@ Tier 2: Perplexity sonar x2 via OpenRouter (web search, double-validated)
 
 The LLM never generates nutrition values — it only selects USDA candidates
 or extracts data from web search results. All entries are persisted in
-resolved_ingredients.json with full provenance tracking.
+the resolved_ingredients namespace of the CacheStore with full provenance
+tracking.
+
+Names that no tier can resolve are cached as not_found in the nutrition
+namespace; the store expires them after NEGATIVE_TTL and retry_expired()
+re-resolves them in batch. Names an import stopped waiting for (timeout)
+are recorded as already-expired not_found entries: the next lookup resolves
+them again and retry_expired() picks them up meanwhile. Concurrent requests for the same name share one
+in-flight resolution (across processes too, see SingleFlight), and provider
+calls are bounded per provider.
 """
 
 import asyncio
-import json
 import logging
 import os
 import re
 from datetime import datetime
-from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 from openai import AsyncOpenAI
 
+from .cache_store import CacheStore, _not_found
+from .ingredient_dictionary import IngredientDictionary
+from .single_flight import SingleFlight
+
 logger = logging.getLogger(__name__)
 
-_DATA_DIR = Path(__file__).parent.parent / "data"
-_RESOLVED_FILE = _DATA_DIR / "resolved_ingredients.json"
+_RESOLVED_NAMESPACE = "resolved_ingredients"
+# not_found entries, shared with NutritionLookup
+_NEGATIVE_NAMESPACE = "nutrition"
 
 _GARBAGE_PATTERNS = re.compile(
     r"^\[|"
@@ -38,7 +50,10 @@ _GARBAGE_PATTERNS = re.compile(
 )
 
 _MAX_CONCURRENT_USDA = 5
+# Perplexity queries and alias generation
+_MAX_CONCURRENT_OPENROUTER = 4
 _USDA_DELAY = 0.15
+_TIMEOUT_PER_INGREDIENT = 30
 
 
 def _is_garbage(name: str) -> bool:
@@ -77,21 +92,52 @@ class NutritionResolver:
     """
     Resolves unknown ingredients by querying external sources (USDA, Perplexity).
 
-    Results are stored in resolved_ingredients.json and loaded by
+    Results are stored in the CacheStore and loaded by
     NutritionMatcher into its exact-match index on next startup.
     """
 
-    def __init__(self):
+    _shared: Optional["NutritionResolver"] = None
+
+    def __init__(self, store: Optional[CacheStore] = None):
         self._openrouter_key = os.getenv("OPENROUTER_API_KEY")
         self._llm_client: Optional[AsyncOpenAI] = None
 
+        self._cache_store = store or CacheStore.shared()
         self._resolved: Dict[str, Dict[str, Any]] = {}
-        self._dirty = False
+        # Interned ingredient id (name or alias) / fdc_id -> key in _resolved
+        self._dictionary = IngredientDictionary.shared()
+        self._name_index: Dict[int, str] = {}
+        self._fdc_index: Dict[int, str] = {}
+        self._dirty: Set[str] = set()
         self._load_resolved()
 
+        # Running resolutions, awaited by every concurrent caller
+        self._flight = SingleFlight(_RESOLVED_NAMESPACE, store)
+        # Per-provider semaphores, bound to the running event loop
+        self._limits: Dict[str, asyncio.Semaphore] = {}
+        self._limits_loop: Optional[asyncio.AbstractEventLoop] = None
+
         from .nutrition_lookup import NutritionLookup
         self._usda = NutritionLookup()
 
+    @classmethod
+    def shared(cls) -> "NutritionResolver":
+        """Process-wide resolver, so that concurrent imports share in-flight lookups."""
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def _limit(self, provider: str) -> asyncio.Semaphore:
+        """Concurrency limit of a provider ("usda" or "openrouter")."""
+        loop = asyncio.get_running_loop()
+        if self._limits_loop is not loop:
+            self._limits_loop = loop
+            self._limits = {
+                "usda": asyncio.Semaphore(_MAX_CONCURRENT_USDA),
+                "openrouter": asyncio.Semaphore(_MAX_CONCURRENT_OPENROUTER),
+            }
+        return self._limits[provider]
+
     def _get_llm_client(self) -> Optional[AsyncOpenAI]:
         if not self._openrouter_key:
             return None
@@ -111,41 +157,29 @@ class NutritionResolver:
     # ------------------------------------------------------------------
 
     def _load_resolved(self) -> None:
-        if _RESOLVED_FILE.exists():
-            with open(_RESOLVED_FILE, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            self._resolved = {
-                k: v for k, v in data.items() if not k.startswith("_")
-            }
-            logger.info(f"Loaded {len(self._resolved)} resolved ingredients")
-        else:
-            self._resolved = {}
+        self._resolved = self._cache_store.items(_RESOLVED_NAMESPACE)
+        logger.info(f"Loaded {len(self._resolved)} resolved ingredients")
+        self._dictionary.intern_many(
+            [*self._resolved, *(alias for entry in self._resolved.values() for alias in entry.get("alt", []))]
+        )
+        # Names take precedence over aliases of other entries
+        for key in self._resolved:
+            self._name_index.setdefault(self._dictionary.intern(key), key)
+        for key, entry in self._resolved.items():
+            self._index_entry(key, entry)
 
     def _save_resolved(self) -> None:
+        """Write new and updated entries to the cache store."""
         if not self._dirty:
             return
+        changed = {k: self._resolved[k] for k in self._dirty}
+        self._cache_store.set_many(_RESOLVED_NAMESPACE, changed)
+        self._dirty.clear()
 
-        usda_count = sum(1 for v in self._resolved.values() if v.get("source") == "usda")
-        ppx_count = sum(1 for v in self._resolved.values() if v.get("source") == "perplexity")
-
-        data: Dict[str, Any] = {
-            "_meta": {
-                "description": "Auto-resolved nutrition entries. source field indicates data provenance.",
-                "total_entries": len(self._resolved),
-                "usda_entries": usda_count,
-                "perplexity_entries": ppx_count,
-                "last_updated": datetime.now().isoformat(),
-            }
-        }
-        data.update(dict(sorted(self._resolved.items())))
-
-        _RESOLVED_FILE.parent.mkdir(parents=True, exist_ok=True)
-        with open(_RESOLVED_FILE, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-
-        self._dirty = False
+        usda_count = sum(1 for v in changed.values() if v.get("source") == "usda")
+        ppx_count = sum(1 for v in changed.values() if v.get("source") == "perplexity")
         logger.info(
-            f"Saved {len(self._resolved)} resolved ingredients "
+            f"Saved {len(changed)} resolved ingredients "
             f"(usda={usda_count}, perplexity={ppx_count})"
         )
 
@@ -153,41 +187,63 @@ class NutritionResolver:
     # Deduplication helpers
     # ------------------------------------------------------------------
 
+    def _index_entry(self, key: str, entry: Dict[str, Any]) -> None:
+        """Register the aliases and fdc_id of a resolved entry."""
+        for alias in entry.get("alt", []):
+            self._name_index.setdefault(self._dictionary.intern(alias), key)
+        fdc_id = entry.get("fdc_id")
+        if fdc_id:
+            self._fdc_index.setdefault(fdc_id, key)
+
+    def _remember(self, name_en: str, entry: Dict[str, Any]) -> None:
+        """Store a resolved entry under name_en."""
+        self._resolved[name_en] = entry
+        self._name_index[self._dictionary.intern(name_en)] = name_en
+        self._index_entry(name_en, entry)
+
     def _find_by_name_or_alias(self, name_en: str) -> Optional[Dict[str, Any]]:
         """Check if name_en (or a known alias) already exists in resolved DB."""
-        key = name_en.strip().lower()
-        if key in self._resolved:
-            return self._resolved[key]
-        for entry in self._resolved.values():
-            if key in [a.lower() for a in entry.get("alt", [])]:
-                return entry
-        return None
+        key = self._name_index.get(self._dictionary.intern(name_en))
+        return self._resolved[key] if key is not None else None
 
     def _find_by_fdc_id(self, fdc_id: int) -> Optional[Tuple[str, Dict[str, Any]]]:
         """Check if a given fdc_id already exists in resolved DB."""
-        for entry_key, entry in self._resolved.items():
-            if entry.get("fdc_id") == fdc_id:
-                return (entry_key, entry)
-        return None
+        entry_key = self._fdc_index.get(fdc_id)
+        if entry_key is None:
+            return None
+        return (entry_key, self._resolved[entry_key])
 
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
 
     async def resolve_batch(
-        self, unknown_names: List[str]
+        self,
+        unknown_names: List[str],
+        timeout: Optional[float] = None,
+        retry_negative: bool = False,
     ) -> Dict[str, Optional[Dict[str, Any]]]:
         """
         Resolve a batch of unknown ingredient names.
 
-        Returns a dict mapping name_en (lowered) to resolved nutrition data,
-        or None if resolution failed.
+        Args:
+            unknown_names: English ingredient names.
+            timeout: Seconds to wait for the resolutions (None = until done).
+                Names still resolving are left out of the result and recorded
+                for retry_expired (see _defer). Their resolution only goes on
+                while the event loop runs: a CLI import cancels it on exit.
+            retry_negative: Also resolve names cached as not_found.
+
+        Returns:
+            Dict mapping name_en (canonical key, as returned by
+            NutritionMatcher.match_batch) to resolved nutrition data, or None
+            if resolution failed.
         """
         results: Dict[str, Optional[Dict[str, Any]]] = {}
         to_resolve: List[str] = []
 
-        for name in unknown_names:
-            key = name.strip().lower()
+        for ing_id in self._dictionary.intern_many(unknown_names):
+            key = self._dictionary.key(ing_id)
             if not key:
                 continue
 
@@ -204,41 +260,26 @@ class NutritionResolver:
 
             to_resolve.append(key)
 
+        if to_resolve and not retry_negative:
+            negatives = self._cache_store.get_many(_NEGATIVE_NAMESPACE, to_resolve)
+            for key in to_resolve:
+                if _not_found(negatives.get(key)):
+                    results[key] = None
+            to_resolve = [key for key in to_resolve if key not in results]
+
         if not to_resolve:
             return results
 
         logger.info(f"Resolving {len(to_resolve)} unknown ingredients...")
-
-        _BATCH_SIZE = 20
-        _TIMEOUT_PER_INGREDIENT = 30
-
-        for batch_start in range(0, len(to_resolve), _BATCH_SIZE):
-            batch = to_resolve[batch_start:batch_start + _BATCH_SIZE]
-            batch_num = batch_start // _BATCH_SIZE + 1
-            total_batches = (len(to_resolve) + _BATCH_SIZE - 1) // _BATCH_SIZE
-            logger.info(
-                f"Batch {batch_num}/{total_batches}: "
-                f"resolving {len(batch)} ingredients..."
-            )
-
-            for name in batch:
-                try:
-                    data = await asyncio.wait_for(
-                        self._resolve_single(name),
-                        timeout=_TIMEOUT_PER_INGREDIENT,
-                    )
-                    results[name] = data
-                except asyncio.TimeoutError:
-                    logger.warning(f"Timeout resolving '{name}' — skipping")
-                    results[name] = None
-                except Exception as e:
-                    logger.error(f"Error resolving '{name}': {e}")
-                    results[name] = None
-
-                await asyncio.sleep(_USDA_DELAY)
-
-            self._save_resolved()
-            self._usda.save_cache()
+        tasks = {name: self._resolution(name) for name in to_resolve}
+        done, pending = await asyncio.wait(tasks.values(), timeout=timeout)
+        for name, task in tasks.items():
+            if task in done:
+                results[name] = task.result()
+        if pending:
+            late = [name for name, task in tasks.items() if task in pending]
+            self._defer(late)
+            logger.info(f"{len(late)} ingredients not resolved in time, left for retry_expired: {', '.join(late)}")
 
         resolved_count = sum(1 for v in results.values() if v is not None)
         logger.info(
@@ -246,6 +287,76 @@ class NutritionResolver:
         )
         return results
 
+    async def retry_expired(self, limit: Optional[int] = None) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Re-resolve not_found entries whose TTL has expired.
+
+        Args:
+            limit: Maximum number of names to retry (oldest first).
+
+        Returns:
+            Same as resolve_batch.
+        """
+        expired = self._cache_store.expired_items(_NEGATIVE_NAMESPACE, limit)
+        names = [k for k, v in expired.items() if _not_found(v) and v.get("reason") != "composite"]
+        if not names:
+            return {}
+        logger.info(f"Retrying {len(names)} expired not_found ingredients")
+        return await self.resolve_batch(names, retry_negative=True)
+
+    def _defer(self, names: List[str]) -> None:
+        """
+        Record names whose resolution was not awaited to the end.
+
+        The not_found entry is born expired: lookups ignore it (the next import
+        resolves the name again) and retry_expired picks it up. A resolution
+        that still completes overwrites it (entry or regular not_found).
+        """
+        cached_at = datetime.now().isoformat()
+        self._cache_store.set_many(
+            _NEGATIVE_NAMESPACE,
+            {name: {"not_found": True, "reason": "timeout", "cached_at": cached_at} for name in names},
+            ttl=0,
+        )
+
+    def _resolution(self, name_en: str) -> "asyncio.Future[Optional[Dict[str, Any]]]":
+        """In-flight resolution of name_en, started if none is running."""
+        return self._flight.task(name_en, lambda: self._resolve_leased(name_en))
+
+    async def _resolve_leased(self, name_en: str) -> Optional[Dict[str, Any]]:
+        """Resolve name_en unless another process already is; then reuse its entry."""
+        if not self._flight.claim([name_en]):
+            entry = (await self._flight.wait_released([name_en])).get(name_en)
+            if entry is not None:
+                self._remember(name_en, entry)
+            return entry
+        try:
+            return await self._resolve_and_record(name_en)
+        finally:
+            self._flight.release([name_en])
+
+    async def _resolve_and_record(self, name_en: str) -> Optional[Dict[str, Any]]:
+        """Resolve one name and persist the outcome (entry or not_found)."""
+        try:
+            data = await asyncio.wait_for(self._resolve_single(name_en), timeout=_TIMEOUT_PER_INGREDIENT)
+        except asyncio.TimeoutError:
+            # Transient: not cached as not_found
+            logger.warning(f"Timeout resolving '{name_en}' — skipping")
+            return None
+        except Exception as e:
+            logger.error(f"Error resolving '{name_en}': {e}")
+            return None
+
+        if data is None:
+            self._cache_store.set(
+                _NEGATIVE_NAMESPACE, name_en,
+                {"not_found": True, "reason": "unresolved", "cached_at": datetime.now().isoformat()},
+            )
+        else:
+            self._save_resolved()
+            self._cache_store.delete(_NEGATIVE_NAMESPACE, [name_en])
+        return data
+
     # ------------------------------------------------------------------
     # Single ingredient resolution
     # ------------------------------------------------------------------
@@ -275,7 +386,9 @@ class NutritionResolver:
 
     async def _try_usda(self, name_en: str) -> Optional[Dict[str, Any]]:
         """Query USDA and validate the result."""
-        result = await self._usda._search_usda(name_en)
+        async with self._limit("usda"):
+            result = await self._usda._search_usda(name_en)
+            await asyncio.sleep(_USDA_DELAY)
         if not result:
             return None
 
@@ -298,12 +411,13 @@ class NutritionResolver:
                 entry_key, entry = existing
                 if name_en not in [a.lower() for a in entry.get("alt", [])]:
                     entry["alt"].append(name_en)
-                    self._dirty = True
+                    self._dirty.add(entry_key)
+                    self._index_entry(entry_key, entry)
                     logger.info(
                         f"Added '{name_en}' as alias to existing entry '{entry_key}' "
                         f"(same fdc_id={fdc_id})"
                     )
-                self._resolved[name_en] = entry
+                self._remember(name_en, entry)
                 return entry
 
         entry = {
@@ -328,8 +442,8 @@ class NutritionResolver:
         if aliases:
             entry["alt"] = aliases
 
-        self._resolved[name_en] = entry
-        self._dirty = True
+        self._remember(name_en, entry)
+        self._dirty.add(name_en)
         logger.info(f"Resolved '{name_en}' via USDA (fdc_id={fdc_id})")
         return entry
 
@@ -361,8 +475,10 @@ class NutritionResolver:
             f"kcal=X protein=X fat=X carbs=X fiber=X sugar=X sat_fat=X"
         )
 
-        data1 = await self._perplexity_query(client, query1)
-        data2 = await self._perplexity_query(client, query2)
+        data1, data2 = await asyncio.gather(
+            self._perplexity_query(client, query1),
+            self._perplexity_query(client, query2),
+        )
 
         if not data1 or not data2:
             logger.info(f"Perplexity returned no data for '{name_en}'")
@@ -416,8 +532,8 @@ class NutritionResolver:
         if aliases:
             entry["alt"] = aliases
 
-        self._resolved[name_en] = entry
-        self._dirty = True
+        self._remember(name_en, entry)
+        self._dirty.add(name_en)
         logger.info(f"Resolved '{name_en}' via Perplexity (delta={delta_pct:.1f}%)")
         return entry
 
@@ -426,21 +542,22 @@ class NutritionResolver:
     ) -> Optional[Dict[str, float]]:
         """Send a single Perplexity query and parse the structured response."""
         try:
-            response = await client.chat.completions.create(
-                model="perplexity/sonar",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": (
-                            "You are a nutrition data assistant. "
-                            "Reply ONLY with the requested format. No explanation."
-                        ),
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-                max_tokens=100,
-                temperature=0.0,
-            )
+            async with self._limit("openrouter"):
+                response = await client.chat.completions.create(
+                    model="perplexity/sonar",
+                    messages=[
+                        {
+                            "role": "system",
+                            "content": (
+                                "You are a nutrition data assistant. "
+                                "Reply ONLY with the requested format. No explanation."
+                            ),
+                        },
+                        {"role": "user", "content": prompt},
+                    ],
+                    max_tokens=100,
+                    temperature=0.0,
+                )
             text = (response.choices[0].message.content or "").strip()
             return self._parse_nutrition_response(text)
         except Exception as e:
@@ -475,30 +592,31 @@ class NutritionResolver:
             return []
 
         try:
-            response = await client.chat.completions.create(
-                model="deepseek/deepseek-v3.2",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": (
-                            "You generate alternative English names for cooking "
-                            "ingredients. Reply ONLY with a comma-separated list. "
-                            "No explanation."
-                        ),
-                    },
-                    {
-                        "role": "user",
-                        "content": (
-                            f"List 3-5 alternative names a recipe might use for: "
-                            f"{name_en}\n\n"
-                            f"Include common synonyms, spelling variants, and "
-                            f"abbreviated forms. No duplicates."
-                        ),
-                    },
-                ],
-                max_tokens=80,
-                temperature=0.0,
-            )
+            async with self._limit("openrouter"):
+                response = await client.chat.completions.create(
+                    model="deepseek/deepseek-v3.2",
+                    messages=[
+                        {
+                            "role": "system",
+                            "content": (
+                                "You generate alternative English names for cooking "
+                                "ingredients. Reply ONLY with a comma-separated list. "
+                                "No explanation."
+                            ),
+                        },
+                        {
+                            "role": "user",
+                            "content": (
+                                f"List 3-5 alternative names a recipe might use for: "
+                                f"{name_en}\n\n"
+                                f"Include common synonyms, spelling variants, and "
+                                f"abbreviated forms. No duplicates."
+                            ),
+                        },
+                    ],
+                    max_tokens=80,
+                    temperature=0.0,
+                )
             text = (response.choices[0].message.content or "").strip()
             aliases = [a.strip().lower() for a in text.split(",") if a.strip()]
             aliases = [a for a in aliases if a != name_en.lower() and len(a) >= 2]
@@ -13,6 +13,12 @@ Robustness features (SOTA Feb 2026):
     prompt so the LLM can self-correct (Instructor/DSPy pattern)
   - Dual-call consensus: 2 independent reviewer calls, only corrections that
     BOTH agree on are kept (cross-call intersection)
+  - Adaptive mode (opt-in, REVIEW_MODE=adaptive): one call first, the
+    consensus call only when that review is not confident (low score, many
+    corrections, assertion errors); clean schema.org-backed recipes can skip
+    the review entirely (REVIEW_SKIP_SCHEMA)
+  - Token-budgeted source compaction: the source text is cut to its most
+    recipe-like lines; quotes in missing items map back to source offsets
   - Time-related metadata corrections are IGNORED — times are computed
     deterministically from the step DAG at enrichment.
 """
@@ -23,17 +29,29 @@ import logging
 import os
 import re
 from collections import Counter
+from functools import partial
 from typing import Any, Dict, List, Optional, Tuple
 
 from pydantic import BaseModel, Field, ValidationError
+from pydantic.json_schema import SkipJsonSchema
 
+from recipe_scraper.enrichment.times import StepGraph
 from recipe_scraper.observability import observe, langfuse_context, get_async_openai_class
+from recipe_structurer.services.llm_cache import LLMResponseCache
+from recipe_structurer.services.source_compaction import (
+    compact_and_log,
+    schema_vocabulary,
+    vocabulary,
+)
 from recipe_structurer.shared import is_valid_iso8601_duration, parse_iso8601_minutes
 
 AsyncOpenAI = get_async_openai_class()
 
 logger = logging.getLogger(__name__)
 
+# Step fields a correction can change the DAG times through
+_STEP_TIMING_FIELDS = {"duration", "time", "isPassive", "action", "uses", "requires", "produces"}
+
 
 # ── Pydantic models for structured review output ────────────────────
 
@@ -60,6 +78,8 @@ class MissingItem(BaseModel):
     item_type: str = Field(description="'ingredient' or 'step'")
     description: str = ""
     where_in_source: str = ""
+    # Offset of where_in_source in the full source text (set by the reviewer, not the LLM)
+    source_offset: SkipJsonSchema[Optional[int]] = None
 
 
 class MetadataCorrection(BaseModel):
@@ -114,6 +134,17 @@ REVIEWER_MODEL = "deepseek/deepseek-v3.2"
 MAX_REVIEW_RETRIES = 2
 CONSENSUS_CALLS = 2
 CONSENSUS_TEMPERATURE = 0.3
+# Source text sent to the reviewer is compacted to this many tokens
+REVIEW_SOURCE_TOKENS = 6000
+
+# "consensus" always runs CONSENSUS_CALLS calls; "adaptive" runs one call and
+# adds the others only when its review is not confident (REVIEW_MODE env var)
+REVIEW_MODES = ("adaptive", "consensus")
+DEFAULT_REVIEW_MODE = "consensus"
+# A single review is confident with a score of at least ADAPTIVE_MIN_SCORE,
+# at most ADAPTIVE_MAX_CORRECTIONS corrections and no assertion error
+ADAPTIVE_MIN_SCORE = 8
+ADAPTIVE_MAX_CORRECTIONS = 3
 
 
 # ── System prompt ───────────────────────────────────────────────────
@@ -182,6 +213,9 @@ _SCHEMA_EXAMPLE = ReviewResult(
     culinary_issues=[],
 ).model_dump()
 
+# Everything fixed by the code that shapes a review (LLM cache key)
+_REVIEW_CACHE_TEMPLATE = REVIEWER_SYSTEM_PROMPT + json.dumps(ReviewResult.model_json_schema(), sort_keys=True)
+
 
 # ═══════════════════════════════════════════════════════════════════════
 # Deterministic assertions (P0) — run BEFORE LLM reviewer
@@ -444,6 +478,34 @@ def merge_reviews_by_consensus(reviews: list[ReviewResult]) -> ReviewResult:
     )
 
 
+# ═══════════════════════════════════════════════════════════════════════
+# Adaptive mode — when one reviewer call is not enough
+# ═══════════════════════════════════════════════════════════════════════
+
+def _correction_count(review: ReviewResult) -> int:
+    return (
+        len(review.ingredient_corrections) + len(review.step_corrections)
+        + len(review.missing_items) + len(review.metadata_corrections)
+    )
+
+
+def low_confidence_reason(
+    review: Optional[ReviewResult],
+    assertions: DeterministicAssertionResult,
+) -> Optional[str]:
+    """Why a single review needs a consensus call, or None when it is confident."""
+    if review is None:
+        return "first call failed"
+    if review.overall_score < ADAPTIVE_MIN_SCORE:
+        return f"score {review.overall_score}/10"
+    corrections = _correction_count(review)
+    if corrections > ADAPTIVE_MAX_CORRECTIONS:
+        return f"{corrections} corrections"
+    if assertions.error_count:
+        return f"{assertions.error_count} assertion errors"
+    return None
+
+
 # ═══════════════════════════════════════════════════════════════════════
 # Main reviewer class
 # ═══════════════════════════════════════════════════════════════════════
@@ -458,11 +520,33 @@ class RecipeReviewer:
     Robustness features:
       - Deterministic pre-assertions (structural, quantity, format, reference)
       - Retry with Pydantic validation feedback (max 2 retries)
-      - Dual-call consensus (only keeps corrections both calls agree on)
+      - Dual-call consensus (only keeps corrections both calls agree on),
+        always or only on low confidence (adaptive mode)
     """
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        llm_cache: Optional[LLMResponseCache] = None,
+        mode: Optional[str] = None,
+        skip_schema: Optional[bool] = None,
+    ):
+        """
+        Args:
+            api_key: OpenRouter API key. Defaults to OPENROUTER_API_KEY env var.
+            llm_cache: Optional LLM response cache (default: LLM_CACHE_DIR).
+            mode: "adaptive" or "consensus" (default: REVIEW_MODE env var, else consensus).
+            skip_schema: Skip the LLM review of schema.org-backed recipes that pass
+                every deterministic assertion (default: REVIEW_SKIP_SCHEMA env var).
+        """
         self.api_key = api_key or os.getenv("OPENROUTER_API_KEY")
+        self.llm_cache = llm_cache or LLMResponseCache.from_env()
+        self.mode = (mode or os.getenv("REVIEW_MODE") or DEFAULT_REVIEW_MODE).lower()
+        if self.mode not in REVIEW_MODES:
+            raise ValueError(f"Unknown review mode '{self.mode}' (expected one of {REVIEW_MODES})")
+        if skip_schema is None:
+            skip_schema = os.getenv("REVIEW_SKIP_SCHEMA", "").lower() in ("1", "true", "yes")
+        self.skip_schema = skip_schema
         if not self.api_key:
             logger.warning("No OPENROUTER_API_KEY — reviewer will be disabled")
             self._client = None
@@ -488,11 +572,9 @@ class RecipeReviewer:
         If validation_error is set, it is appended as a follow-up message
         so the LLM can self-correct (Instructor retry pattern).
         """
-        source_text_truncated = source_text[:24000]
-
         user_prompt = f"""## ORIGINAL SOURCE TEXT{f' (from {source_url})' if source_url else ''}
 
-{source_text_truncated}
+{source_text}
 
 ---
 
@@ -549,14 +631,36 @@ Return ONLY the JSON object, no markdown fences."""
         source_text: str,
         source_url: Optional[str],
         temperature: float = 0.1,
+        variant: int = 0,
+        spent: Optional[Counter] = None,
     ) -> Optional[ReviewResult]:
         """Execute a single review call with retry-on-validation-error.
 
         On Pydantic validation failure, the error is injected back into
         the conversation and the LLM retries (up to MAX_REVIEW_RETRIES).
+
+        With an LLM cache, each ``variant`` (consensus call index) has its
+        own entry so cached consensus still merges independent samples.
+
+        ``spent`` counts the LLM "calls" and "tokens" used (cache hits are free).
         """
+        if spent is None:
+            spent = Counter()
         validation_error: Optional[str] = None
 
+        cache_key = None
+        if self.llm_cache:
+            user_prompt = self._build_messages(recipe_json, source_text, source_url)[1]["content"]
+            cache_key = self.llm_cache.make_key(
+                "review", REVIEWER_MODEL, _REVIEW_CACHE_TEMPLATE, user_prompt, temperature, variant,
+            )
+            cached = self.llm_cache.get("review", cache_key)
+            if cached:
+                try:
+                    return ReviewResult.model_validate_json(cached)
+                except ValidationError as e:
+                    logger.warning(f"[Pass 3] Ignoring invalid cached review: {e}")
+
         for attempt in range(1 + MAX_REVIEW_RETRIES):
             try:
                 messages = self._build_messages(
@@ -569,6 +673,10 @@ Return ONLY the JSON object, no markdown fences."""
                     temperature=temperature,
                     response_format={"type": "json_object"},
                 )
+                spent["calls"] += 1
+                usage = getattr(response, "usage", None)
+                if usage is not None:
+                    spent["tokens"] += usage.total_tokens or 0
 
                 raw = self._strip_fences(response.choices[0].message.content)
                 review_data = json.loads(raw)
@@ -577,6 +685,8 @@ Return ONLY the JSON object, no markdown fences."""
                 if attempt > 0:
                     logger.info(f"[Pass 3] Retry {attempt} succeeded")
 
+                if self.llm_cache:
+                    self.llm_cache.put("review", cache_key, review.model_dump_json(), model=REVIEWER_MODEL)
                 return review
 
             except (json.JSONDecodeError, ValidationError) as e:
@@ -607,8 +717,10 @@ Return ONLY the JSON object, no markdown fences."""
         """
         Review a structured recipe against its original source text.
 
-        Runs deterministic assertions first, then dual LLM reviewer calls
-        with consensus merging.
+        Runs deterministic assertions first, then the LLM reviewer calls
+        with consensus merging: all CONSENSUS_CALLS calls in consensus mode,
+        in adaptive mode the others only when the first review is not
+        confident (see low_confidence_reason).
 
         Returns:
             Tuple of (ReviewResult or None, DeterministicAssertionResult)
@@ -621,7 +733,11 @@ Return ONLY the JSON object, no markdown fences."""
             return None, assertions
 
         title = recipe_data.get("metadata", {}).get("title", "Unknown")
-        logger.info(f"[Pass 3] Reviewing recipe: {title}")
+        if self.skip_schema and recipe_data.get("metadata", {}).get("_schema_data") and not assertions.failures:
+            logger.info(f"[Pass 3] Skipping review of clean schema.org recipe: {title}")
+            return None, assertions
+
+        logger.info(f"[Pass 3] Reviewing recipe: {title} ({self.mode})")
 
         # Build compact recipe JSON for the reviewer
         recipe_summary = {
@@ -642,17 +758,36 @@ Return ONLY the JSON object, no markdown fences."""
         }
         recipe_json = json.dumps(recipe_summary, indent=2, ensure_ascii=False)
 
-        # ── Phase 2: Dual LLM reviewer calls (consensus) ─────────
-        calls = [
-            self._single_review_call(
-                recipe_json, source_text, source_url,
-                temperature=CONSENSUS_TEMPERATURE,
-            )
-            for _ in range(CONSENSUS_CALLS)
-        ]
-        results = await asyncio.gather(*calls, return_exceptions=True)
-
-        reviews = [
+        # Stories and comments of the page are cut; lines sharing words with
+        # the JSON-LD or the structured recipe are kept first
+        words = schema_vocabulary(recipe_data.get("metadata", {}).get("_schema_data")) | vocabulary(
+            [ing.get("name") for ing in recipe_data.get("ingredients", [])]
+            + [s.get("action") for s in recipe_data.get("steps", [])]
+        )
+        compacted = compact_and_log(source_text, REVIEW_SOURCE_TOKENS, "Pass 3", words)
+
+        # ── Phase 2: LLM reviewer calls (consensus) ──────────────
+        spent: Counter = Counter()
+        review_call = partial(
+            self._single_review_call,
+            recipe_json, compacted.text, source_url,
+            temperature=CONSENSUS_TEMPERATURE,
+            spent=spent,
+        )
+        variants = range(CONSENSUS_CALLS)
+        reviews: list[ReviewResult] = []
+        if self.mode == "adaptive":
+            first = await review_call(variant=0)
+            reviews = [first] if first is not None else []
+            reason = low_confidence_reason(first, assertions)
+            if reason is None:
+                variants = range(0)
+            else:
+                logger.info(f"[Pass 3] Low confidence ({reason}) — adding consensus call")
+                variants = range(1, CONSENSUS_CALLS)
+
+        results = await asyncio.gather(*(review_call(variant=i) for i in variants), return_exceptions=True)
+        reviews += [
             r for r in results
             if isinstance(r, ReviewResult)
         ]
@@ -663,6 +798,8 @@ Return ONLY the JSON object, no markdown fences."""
 
         # ── Phase 3: Consensus merge ─────────────────────────────
         review = merge_reviews_by_consensus(reviews)
+        for item in review.missing_items:
+            item.source_offset = compacted.locate(item.where_in_source)
 
         total_issues = (
             len(review.ingredient_corrections)
@@ -676,7 +813,8 @@ Return ONLY the JSON object, no markdown fences."""
             f"[Pass 3] Review complete for '{title}': "
             f"score={review.overall_score}/10, "
             f"consensus_issues={total_issues}, "
-            f"assertions={assertions.error_count}err/{assertions.warning_count}warn"
+            f"assertions={assertions.error_count}err/{assertions.warning_count}warn, "
+            f"{len(reviews)} reviews, {spent['calls']} calls, {spent['tokens']} tokens"
         )
 
         # ── Langfuse observation-level scoring ───────────────────
@@ -689,6 +827,12 @@ Return ONLY the JSON object, no markdown fences."""
         langfuse_context.score_current_span(
             name="pass3_assertion_errors", value=float(assertions.error_count),
         )
+        langfuse_context.score_current_span(
+            name="pass3_calls", value=float(spent["calls"]),
+        )
+        langfuse_context.score_current_span(
+            name="pass3_tokens", value=float(spent["tokens"]),
+        )
 
         return review, assertions
 
@@ -705,7 +849,9 @@ Return ONLY the JSON object, no markdown fences."""
 
         Handles:
         - ingredient_corrections: patch fields on matching ingredient
-        - step_corrections: patch fields on matching step
+        - step_corrections: patch fields on matching step; when durations or
+          edges change, the enrichment times and step schedule are updated
+          incrementally on the step DAG
         - metadata_corrections: patch metadata fields (excluding time fields)
         - missing_items: logged as warnings (not auto-added)
         - culinary_issues: logged as warnings (not auto-fixable)
@@ -731,6 +877,15 @@ Return ONLY the JSON object, no markdown fences."""
             """
             if original is None:
                 return value or None
+            if isinstance(original, list):
+                # uses / requires: a JSON list or comma-separated ids
+                try:
+                    parsed = json.loads(value)
+                except (json.JSONDecodeError, TypeError):
+                    parsed = value.strip("[]").split(",")
+                if not isinstance(parsed, list):
+                    parsed = [parsed]
+                return [str(v).strip().strip("'\"") for v in parsed if str(v).strip()]
             if isinstance(original, (int, float)):
                 try:
                     return type(original)(value)
@@ -792,6 +947,10 @@ Return ONLY the JSON object, no markdown fences."""
         steps_by_id = {
             step["id"]: step for step in recipe_data.get("steps", [])
         }
+        # Compiled on the first timing-relevant correction, then kept up to date
+        graph: Optional[StepGraph] = None
+        dag_total: Optional[float] = None
+        rebuild = False
         for corr in review.step_corrections:
             step = steps_by_id.get(corr.step_id)
             if not step:
@@ -812,14 +971,31 @@ Return ONLY the JSON object, no markdown fences."""
                 skipped += 1
                 continue
 
+            if corr.field in _STEP_TIMING_FIELDS and graph is None:
+                graph = StepGraph(recipe_data)
+                dag_total = graph.times()["totalTimeMinutes"]
+
             new_value = _coerce_value(corr.field, corr.suggested_value, step.get(corr.field))
             step[corr.field] = new_value
             applied += 1
+            if corr.field == "produces":
+                rebuild = True
+            elif corr.field in _STEP_TIMING_FIELDS and not rebuild:
+                try:
+                    graph.update_step(step)
+                except ValueError as exc:
+                    logger.warning(f"[Pass 3 Apply] {exc} — recompiling the step DAG")
+                    rebuild = True
             logger.info(
                 f"[Pass 3 Apply] Step '{corr.step_id}'.{corr.field}: "
                 f"'{actual}' → '{corr.suggested_value}' ({corr.reason})"
             )
 
+        if graph is not None:
+            if rebuild:
+                graph = StepGraph(recipe_data)
+            RecipeReviewer._retime(recipe_data, graph, dag_total)
+
         # ── 3. Metadata corrections (skip time fields) ───────────────
         TIME_FIELDS = {"prepTime", "cookTime", "totalTime", "prepTimeMinutes",
                        "cookTimeMinutes", "totalTimeMinutes"}
@@ -871,3 +1047,21 @@ Return ONLY the JSON object, no markdown fences."""
         )
 
         return recipe_data
+
+    @staticmethod
+    def _retime(recipe_data: Dict[str, Any], graph: StepGraph, dag_total: Optional[float]) -> None:
+        """
+        Rewrite the enrichment times and step schedule from the corrected step DAG.
+
+        A totalTime that enrichment took from schema.org (it no longer
+        matches the DAG total before corrections) is kept.
+        """
+        from recipe_scraper.recipe_enricher import RecipeEnricher
+
+        meta = recipe_data.setdefault("metadata", {})
+        time_info = graph.times()
+        if "totalTimeMinutes" in meta and meta["totalTimeMinutes"] != dag_total:
+            time_info["totalTime"] = meta.get("totalTime", time_info["totalTime"])
+            time_info["totalTimeMinutes"] = meta["totalTimeMinutes"]
+        RecipeEnricher.apply_times(meta, time_info)
+        meta["stepSchedule"] = graph.schedule()
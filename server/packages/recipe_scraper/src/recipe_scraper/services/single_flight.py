@@ -0,0 +1,176 @@
+"""
+Request coalescing for the LLM-backed estimators.
+
+When several recipes are imported at once, they often ask the same question
+before any of them has written the answer to the cache: "how much does a
+clove of garlic weigh?". Each one then paid for its own LLM call.
+
+SingleFlight: concurrent requests for the same key await one computation.
+Given a cache store namespace, it also coordinates processes through store
+leases: a key leased by another process is read back from the store once
+that process is done instead of being computed again. Imports run as
+separate processes, so the lease is what actually saves the calls.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, TypeVar
+
+from .cache_store import CacheStore
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# A lease outlives the slowest estimator call; a crashed owner's lease lapses
+_LEASE_TTL = 120.0
+_POLL_INTERVAL = 0.25
+
+
+class SingleFlight:
+    """Coalesces concurrent computations of the same keys."""
+
+    def __init__(self, namespace: Optional[str] = None, store: Optional[CacheStore] = None):
+        """
+        Initialize the coalescer.
+
+        Args:
+            namespace: Cache store namespace the computed values are written
+                to. Enables cross-process coalescing (None = in-process only).
+            store: Cache store holding the leases (default: shared store).
+        """
+        self._namespace = namespace
+        self._store = store
+        self._inflight: Dict[str, "asyncio.Future[Any]"] = {}
+
+    @property
+    def _owner(self) -> str:
+        # Evaluated per call: a forked worker must not reuse its parent's token
+        return f"{os.getpid()}:{id(self)}"
+
+    def _cache_store(self) -> CacheStore:
+        return self._store or CacheStore.shared()
+
+    # ------------------------------------------------------------------
+    # In-process
+    # ------------------------------------------------------------------
+
+    def task(self, key: str, factory: Callable[[], Awaitable[T]]) -> "asyncio.Future[T]":
+        """Running computation of *key*, started with *factory* if there is none."""
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(factory())
+            self._track(key, future)
+        return future
+
+    def _track(self, key: str, future: "asyncio.Future[Any]") -> None:
+        self._inflight[key] = future
+        future.add_done_callback(lambda f: self._inflight.pop(key, None) if self._inflight.get(key) is f else None)
+
+    async def run(
+        self,
+        keys: Iterable[str],
+        compute: Callable[[List[str]], Awaitable[Dict[str, Any]]],
+    ) -> Dict[str, Any]:
+        """
+        Values of *keys*, computing only those nobody is computing yet.
+
+        Args:
+            keys: Keys to compute (store keys when a namespace is set).
+            compute: Computes a list of keys; returns key → value (missing
+                keys count as None). It must persist the values it returns
+                in the namespace for other processes to see them.
+
+        Returns:
+            key → value (None when the computation failed).
+        """
+        loop = asyncio.get_running_loop()
+        waiting: Dict[str, "asyncio.Future[Any]"] = {}
+        owned: List[str] = []
+        for key in dict.fromkeys(keys):
+            future = self._inflight.get(key)
+            if future is None:
+                future = loop.create_future()
+                self._track(key, future)
+                owned.append(key)
+            waiting[key] = future
+
+        if owned:
+            try:
+                values = await self._compute_owned(owned, compute)
+            except BaseException as e:
+                for key in owned:
+                    if waiting[key].done():
+                        continue
+                    if isinstance(e, asyncio.CancelledError):
+                        waiting[key].cancel()
+                    else:
+                        waiting[key].set_exception(e)
+                raise
+            for key in owned:
+                if not waiting[key].done():
+                    waiting[key].set_result(values.get(key))
+
+        results: Dict[str, Any] = {}
+        for key, future in waiting.items():
+            try:
+                results[key] = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # The computing caller was cancelled, not this one
+                if not future.cancelled():
+                    raise
+                results[key] = None
+            except Exception:
+                results[key] = None
+        return results
+
+    # ------------------------------------------------------------------
+    # Cross-process
+    # ------------------------------------------------------------------
+
+    async def _compute_owned(
+        self, keys: List[str], compute: Callable[[List[str]], Awaitable[Dict[str, Any]]],
+    ) -> Dict[str, Any]:
+        if self._namespace is None:
+            return await compute(keys)
+
+        leased = self.claim(keys)
+        foreign = [key for key in keys if key not in set(leased)]
+        try:
+            values, foreign_done = await asyncio.gather(
+                compute(leased) if leased else _empty(),
+                self.wait_released(foreign),
+            )
+        finally:
+            self.release(leased)
+        return {**values, **foreign_done}
+
+    def claim(self, keys: List[str]) -> List[str]:
+        """Lease the keys no other process is computing; returns the leased ones."""
+        if not keys:
+            return []
+        return self._cache_store().acquire_leases(self._namespace, keys, self._owner, _LEASE_TTL)
+
+    def release(self, keys: List[str]) -> None:
+        if keys:
+            self._cache_store().release_leases(self._namespace, keys, self._owner)
+
+    async def wait_released(self, keys: List[str]) -> Dict[str, Any]:
+        """Wait for other processes to finish the keys; returns the values they stored."""
+        if not keys:
+            return {}
+        store = self._cache_store()
+        logger.debug(f"Waiting for {len(keys)} keys computed by another process ({self._namespace})")
+        pending = list(keys)
+        while True:
+            leased = set(store.leased_keys(self._namespace, pending))
+            pending = [key for key in pending if key in leased]
+            if not pending:
+                break
+            await asyncio.sleep(_POLL_INTERVAL)
+        return store.get_many(self._namespace, keys)
+
+
+async def _empty() -> Dict[str, Any]:
+    return {}
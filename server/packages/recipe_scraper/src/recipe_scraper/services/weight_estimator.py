@@ -0,0 +1,307 @@
+"""
+Compiled gram-estimation engine behind ``NutritionMatcher.estimate_grams``.
+
+The layered resolution (piece weights, USDA portion data, curated portion
+weights, liquid densities, generic unit conversions) only depends on the
+ingredient name and the normalized unit — never on the quantity. The
+estimator is therefore built once from the lookup tables:
+
+- keys sorted longest-first once, not on every call
+- one compiled alternation per table instead of one ``re.search`` per key
+- depluralization and unit normalization memoized
+- ``(name_en, normalized_unit) → grams per unit`` memoized (LRU)
+
+and ``estimate()`` only multiplies the memoized factor by the quantity.
+Results are identical to the original per-call lookups, including the
+tie-breaking between keys of equal length (table order).
+"""
+
+import re
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Optional, Set, Tuple
+
+# (grams per unit, density applied on top of it or None)
+Resolution = Tuple[float, Optional[float]]
+
+# oz/lb/g/kg are absolute weight measurements. Portion weights must
+# NOT override them (USDA data mislabels package weights as "oz").
+_MASS_UNITS = {"g", "kg", "oz", "lb"}
+
+DEFAULT_MEMO_SIZE = 8192
+
+
+def depluralize(name: str) -> str:
+    """Naive English singular: shallots → shallot, tomatoes → tomato, cherries → cherry."""
+    if name.endswith("ies") and len(name) > 4:
+        return name[:-3] + "y"
+    if name.endswith("oes") and len(name) > 4:
+        return name[:-2]
+    if name.endswith("ves") and len(name) > 4:
+        return name[:-1]
+    if name.endswith("s") and not name.endswith("ss") and len(name) > 3:
+        return name[:-1]
+    return name
+
+
+class _RankedMatcher:
+    """
+    Find the best-ranked table key occurring in a name, in one regex scan.
+
+    Keys are ranked longest-first (ties keep table order), which is the
+    order the original per-key loops tried them in. The alternation sits in
+    a lookahead so every start position is examined: at each position the
+    regex engine returns the first alternative that matches, i.e. the
+    best-ranked key starting there, and the overall winner is the
+    best-ranked of those.
+    """
+
+    def __init__(self, keys: Iterable[str], word_boundary: bool):
+        ordered = sorted(keys, key=len, reverse=True)
+        self._rank = {key: i for i, key in enumerate(ordered)}
+        self._pattern = None
+        if ordered:
+            body = "|".join(re.escape(key) for key in ordered)
+            if word_boundary:
+                body = rf"\b({body})\b"
+            else:
+                body = f"({body})"
+            self._pattern = re.compile(f"(?={body})")
+
+    def best(self, text: str) -> Optional[str]:
+        """Return the best-ranked key found in *text*, or None."""
+        if self._pattern is None:
+            return None
+        best_key = None
+        best_rank = len(self._rank)
+        for match in self._pattern.finditer(text):
+            key = match.group(1)
+            rank = self._rank[key]
+            if rank < best_rank:
+                best_key, best_rank = key, rank
+                if rank == 0:
+                    break
+        return best_key
+
+
+class WeightEstimator:
+    """Unit/ingredient → grams resolution compiled from the lookup tables."""
+
+    def __init__(
+        self,
+        unit_to_grams: Dict[str, Optional[float]],
+        piece_weights: Dict[str, float],
+        liquid_densities: Dict[str, float],
+        common_portion_weights: Dict[str, Dict[str, float]],
+        portion_weights: Dict[str, Dict[str, float]],
+        volume_units: Set[str],
+        piece_like_units: Set[str],
+        default_unit_grams: Dict[str, float],
+        normalize_unit: Callable[[str], str],
+        memo_size: int = DEFAULT_MEMO_SIZE,
+    ):
+        """
+        Build the estimator.
+
+        Args:
+            unit_to_grams: Generic unit conversions (None = no fixed weight)
+            piece_weights: Weight of one piece per ingredient (curated)
+            liquid_densities: Density in g/ml per ingredient (FAO/INFOODS)
+            common_portion_weights: Curated ingredient → {unit: grams}
+            portion_weights: USDA ingredient → {unit: grams}
+            volume_units: Units converted through a density
+            piece_like_units: Units resolved through piece weights first
+            default_unit_grams: Fallback weight per unit type (handful, knob…)
+            normalize_unit: Unit normalizer ("heaped tablespoons" → "tbsp")
+            memo_size: Size of each LRU memo
+        """
+        self.unit_to_grams = unit_to_grams
+        self.piece_weights = piece_weights
+        self.liquid_densities = liquid_densities
+        self.common_portion_weights = common_portion_weights
+        self.portion_weights = portion_weights
+        self.volume_units = volume_units
+        self.piece_like_units = piece_like_units
+        self.default_unit_grams = default_unit_grams
+
+        self._piece_matcher = _RankedMatcher(piece_weights, word_boundary=True)
+        self._density_matcher = _RankedMatcher(liquid_densities, word_boundary=False)
+        # The curated substring fallback skips keys lacking the requested
+        # unit, so there is one matcher per unit over the keys that have it.
+        units = {u for entry in common_portion_weights.values() for u in entry}
+        self._common_matchers = {
+            unit: _RankedMatcher(
+                [k for k, entry in common_portion_weights.items() if unit in entry],
+                word_boundary=False,
+            )
+            for unit in units
+        }
+
+        self._depluralize = lru_cache(maxsize=memo_size)(depluralize)
+        self._normalize_unit = lru_cache(maxsize=memo_size)(normalize_unit)
+        self._resolve_memo = lru_cache(maxsize=memo_size)(self._resolve)
+
+    # ── Per-table lookups (grams per unit) ──
+
+    def piece_weight(self, name_en: str) -> Optional[float]:
+        """Weight of one piece: exact, depluralized, then longest whole-word key."""
+        name_lower = name_en.lower().strip()
+        if name_lower in self.piece_weights:
+            return self.piece_weights[name_lower]
+        dep = self._depluralize(name_lower)
+        if dep != name_lower and dep in self.piece_weights:
+            return self.piece_weights[dep]
+        key = self._piece_matcher.best(name_lower)
+        if key is not None:
+            return self.piece_weights[key]
+        return None
+
+    def liquid_density(self, name_en: str) -> float:
+        """Density (g/ml) of the longest matching liquid, default 1.0."""
+        key = self._density_matcher.best(name_en.lower().strip())
+        if key is not None:
+            return self.liquid_densities[key]
+        return 1.0
+
+    def _common_portion_weight(self, name_en: str, unit_key: str) -> Optional[float]:
+        table = self.common_portion_weights
+        name_lower = name_en.lower().strip()
+        entry = table.get(name_lower)
+        if entry and unit_key in entry:
+            return entry[unit_key]
+        dep = self._depluralize(name_lower)
+        if dep != name_lower:
+            entry = table.get(dep)
+            if entry and unit_key in entry:
+                return entry[unit_key]
+        # Word-by-word (last word first: "fresh lemon juice" → "juice" then "lemon")
+        for word in reversed(name_lower.split()):
+            entry = table.get(word)
+            if entry and unit_key in entry:
+                return entry[unit_key]
+        matcher = self._common_matchers.get(unit_key)
+        if matcher is not None:
+            key = matcher.best(name_lower)
+            if key is not None:
+                return table[key][unit_key]
+        return None
+
+    def _portion_weight(self, name_en: str, unit_key: str) -> Optional[float]:
+        table = self.portion_weights
+        if not table:
+            return None
+
+        def _try(key: str) -> Optional[float]:
+            entry = table.get(key)
+            if entry and unit_key in entry:
+                return entry[unit_key]
+            dep = self._depluralize(key)
+            if dep != key:
+                entry = table.get(dep)
+                if entry and unit_key in entry:
+                    return entry[unit_key]
+            return None
+
+        name_lower = name_en.lower().strip()
+        result = _try(name_lower)
+        if result is not None:
+            return result
+
+        # Each word, last first ("fresh cilantro" → "cilantro")
+        words = name_lower.split()
+        for word in reversed(words):
+            result = _try(word)
+            if result is not None:
+                return result
+
+        # Multi-word sub-phrases, longest first (single words were tried above)
+        for length in range(len(words) - 1, 1, -1):
+            for start in range(len(words) - length + 1):
+                candidate = " ".join(words[start:start + length])
+                if len(candidate) >= 4:
+                    result = _try(candidate)
+                    if result is not None:
+                        return result
+        return None
+
+    # ── Layered resolution ──
+
+    def _resolve(self, name_en: str, unit: Optional[str]) -> Optional[Resolution]:
+        if unit is None:
+            grams = self.piece_weight(name_en)
+            return None if grams is None else (grams, None)
+
+        if unit in _MASS_UNITS and unit in self.unit_to_grams:
+            return self.unit_to_grams[unit], None
+
+        # Curated piece weights beat USDA portion data for piece-like units
+        # (avoids "cherry tomato" → 182g instead of 15g)
+        if unit in self.piece_like_units:
+            grams = self.piece_weight(name_en)
+            if grams is not None:
+                return grams, None
+
+        # Ingredient-specific conversions ("1 cup flour" = 125g, not 240g)
+        grams = self._portion_weight(name_en, unit)
+        if grams is not None:
+            return grams, None
+        grams = self._common_portion_weight(name_en, unit)
+        if grams is not None:
+            return grams, None
+
+        if unit in self.volume_units:
+            density = self.liquid_density(name_en)
+            if density != 1.0:
+                return self.unit_to_grams[unit], density
+
+        if unit in self.unit_to_grams and self.unit_to_grams[unit] is not None:
+            return self.unit_to_grams[unit], None
+
+        if unit in self.default_unit_grams:
+            return self.default_unit_grams[unit], None
+        return None
+
+    def resolve(self, name_en: str, unit: Optional[str]) -> Optional[Resolution]:
+        """
+        Memoized grams-per-unit resolution.
+
+        Args:
+            name_en: English ingredient name
+            unit: Raw unit string, or None for a count of pieces
+
+        Returns:
+            (grams per unit, density or None), or None if unresolvable.
+        """
+        normalized = None if unit is None else self._normalize_unit(unit)
+        return self._resolve_memo(name_en, normalized)
+
+    def estimate(self, quantity, unit: Optional[str], name_en: str) -> Optional[float]:
+        """Estimate grams for *quantity* *unit* of *name_en* (see ``NutritionMatcher.estimate_grams``)."""
+        if quantity is None:
+            return None
+        if not isinstance(quantity, (int, float)):
+            try:
+                quantity = float(quantity)
+            except (ValueError, TypeError):
+                return None
+
+        resolution = self.resolve(name_en, unit)
+        if resolution is None:
+            return None
+        per_unit, density = resolution
+        grams = quantity * per_unit
+        if density is not None:
+            grams = grams * density
+        return grams
+
+    def cache_info(self) -> Dict[str, object]:
+        """Memo statistics (for benchmarks and logs)."""
+        return {
+            "resolve": self._resolve_memo.cache_info(),
+            "normalize_unit": self._normalize_unit.cache_info(),
+        }
+
+    def clear_cache(self) -> None:
+        """Drop memoized resolutions (e.g. after reloading the tables)."""
+        self._resolve_memo.cache_clear()
+        self._normalize_unit.cache_clear()
+        self._depluralize.cache_clear()
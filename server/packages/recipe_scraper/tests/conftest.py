@@ -9,4 +9,16 @@ def pytest_collection_modifyitems(items):
     for item in items:
         if item.get_closest_marker("asyncio") is None:
             if "async" in item.name or "await" in item.name:
-                item.add_marker(pytest.mark.asyncio) 
\ No newline at end of file
+                item.add_marker(pytest.mark.asyncio) 
+
+@pytest.fixture(autouse=True, scope="session")
+def _isolated_cache_store(tmp_path_factory):
+    """Cache store temporaire (amorcé depuis les JSON de data/) pour ne pas toucher data/cache.sqlite3"""
+    from recipe_scraper.services.cache_store import CacheStore
+    from recipe_scraper.services.ingredient_dictionary import IngredientDictionary
+
+    CacheStore._shared = CacheStore(tmp_path_factory.mktemp("cache") / "cache.sqlite3")
+    IngredientDictionary._shared = None
+    yield CacheStore._shared
+    CacheStore._shared = None
+    IngredientDictionary._shared = None
@@ -0,0 +1,92 @@
+"""Tests for the SQLite cache store shared by the enrichment caches."""
+
+import json
+import multiprocessing
+
+import pytest
+
+from recipe_scraper.services.cache_store import SNAPSHOT_NOTE, CacheStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CacheStore(tmp_path / "cache.sqlite3", seed_dir=None)
+
+
+def test_upsert_and_get_many(store):
+    store.set_many("weight_estimates", {"clove|garlic": 5.0, "piece|egg": 50.0})
+    store.set("weight_estimates", "clove|garlic", 4.0)
+
+    assert store.get("weight_estimates", "clove|garlic") == 4.0
+    assert store.get_many("weight_estimates", ["piece|egg", "cup|rice"]) == {"piece|egg": 50.0}
+    assert store.count("weight_estimates") == 2
+    assert store.get("nutrition", "clove|garlic") is None
+
+
+def test_negative_entries_expire(store):
+    store.set_many("nutrition", {"tofu": {"not_found": True}, "leek": {"energy_kcal": 31}}, ttl=-1)
+    assert store.items("nutrition") == {}
+    assert store.purge_expired() == 2
+
+    store.set_many("nutrition", {"tofu": {"not_found": True}, "leek": {"energy_kcal": 31}})
+    rows = dict(store._connection().execute("SELECT key, expires_at FROM entries"))
+    assert rows["leek"] is None and rows["tofu"] is not None
+
+
+def test_seed_normalizes_keys(tmp_path):
+    seed = {"_meta": {"total_entries": 2}, "Chicken, Boneless": {"energy_kcal": 120}, "tomato": {"energy_kcal": 18}}
+    (tmp_path / "nutrition_cache.json").write_text(json.dumps(seed), encoding="utf-8")
+    store = CacheStore(tmp_path / "cache.sqlite3", seed_dir=tmp_path)
+
+    assert store.items("nutrition") == {"chicken boneless": {"energy_kcal": 120}, "tomato": {"energy_kcal": 18}}
+    store.delete("nutrition", ["tomato"])
+    # the seed is imported once per database
+    assert CacheStore(tmp_path / "cache.sqlite3", seed_dir=tmp_path).count("nutrition") == 1
+
+
+def test_alias_seed_keeps_unmatchable_names(tmp_path):
+    seed = {"_meta": {}, "Acai Powder": "acai berries, dried", "activated charcoal": None}
+    (tmp_path / "nutrition_aliases_cache.json").write_text(json.dumps(seed), encoding="utf-8")
+    store = CacheStore(tmp_path / "cache.sqlite3", seed_dir=tmp_path)
+
+    assert store.items("nutrition_aliases") == {"acai powder": "acai berries, dried", "activated charcoal": None}
+    rows = dict(store._connection().execute("SELECT key, expires_at FROM entries"))
+    assert rows["activated charcoal"] is None
+
+
+def test_export_round_trip(store, tmp_path):
+    store.set_many("qty_estimates", {"none|salt": {"quantity": 1, "unit": "pinch", "confidence": "low"}})
+    path = store.export_json("qty_estimates", tmp_path / "out.json")
+
+    data = json.loads(path.read_text(encoding="utf-8"))
+    assert data["_meta"]["total_entries"] == 1
+    assert data["_meta"]["note"] == SNAPSHOT_NOTE
+    assert data["none|salt"]["unit"] == "pinch"
+
+    reseeded = CacheStore(tmp_path / "other.sqlite3", seed_dir=None)
+    reseeded._import_file(reseeded._connection(), "qty_estimates", path)
+    assert reseeded.items("qty_estimates") == store.items("qty_estimates")
+
+
+def test_ingredient_ids_are_stable(store):
+    ids = store.intern_ingredients(["salt", "egg"])
+    assert store.intern_ingredients(["egg", "leek"])["egg"] == ids["egg"]
+    assert CacheStore(store.path, seed_dir=None).ingredient_names()[ids["salt"]] == "salt"
+
+
+def _write_keys(args):
+    path, worker = args
+    store = CacheStore(path, seed_dir=None)
+    for i in range(20):
+        store.set("weight_estimates", f"piece|food{worker}-{i}", float(i))
+    store.intern_ingredients([f"food{worker}-{i}" for i in range(20)] + ["shared"])
+    return worker
+
+
+def test_concurrent_processes_keep_every_write(store):
+    ctx = multiprocessing.get_context("fork")
+    with ctx.Pool(4) as pool:
+        pool.map(_write_keys, [(store.path, w) for w in range(4)])
+
+    assert store.count("weight_estimates") == 80
+    assert len(store.ingredient_names()) == 81
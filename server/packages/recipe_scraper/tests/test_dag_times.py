@@ -5,11 +5,16 @@ totalTime, totalActiveTime, and totalPassiveTime from the recipe
 step graph.
 """
 
+import copy
+import random
+
 import pytest
 
 from recipe_scraper.enrichment.times import (
+    StepGraph,
     _parse_time_to_minutes,
     _minutes_to_iso8601,
+    calculate_library_times,
     calculate_times_from_dag,
 )
 
@@ -234,3 +239,197 @@ class TestParseTimeFormats:
     ])
     def test_parse_formats(self, input_str, expected):
         assert _parse_time_to_minutes(input_str) == expected
+
+
+# ── Compiled graph: incremental updates and slack ───────────────────
+
+def _random_recipe(rng, n_steps):
+    steps = []
+    for i in range(n_steps):
+        uses = [f"s{j}" for j in rng.sample(range(i), min(i, rng.randint(0, 3)))] + ["flour"]
+        steps.append({
+            "id": f"step{i}", "action": rng.choice(["Mix", "Bake", "Preheat the oven", "Rest"]),
+            "duration": rng.choice([None, "PT5M", "PT12M", "PT1H", "45 minutes", "1h30min"]),
+            "isPassive": rng.random() < 0.3, "uses": uses, "produces": f"s{i}",
+        })
+    return {
+        "metadata": {"title": "Random"},
+        "ingredients": [{"id": "flour", "name": "flour"}],
+        "steps": steps,
+        "finalState": f"s{n_steps - 1}",
+    }
+
+
+def _reference_total(recipe_data):
+    """Critical path length with one recursive max per step."""
+    steps = {step["id"]: step for step in recipe_data["steps"]}
+    producer = {step["produces"]: step["id"] for step in recipe_data["steps"]}
+    memo = {}
+
+    def finish(sid):
+        if sid not in memo:
+            step = steps[sid]
+            preds = {producer[ref] for ref in step["uses"] if ref in producer}
+            if step["duration"]:
+                duration = _parse_time_to_minutes(step["duration"])
+            else:
+                duration = 0.0 if "oven" in step["action"] else 5.0
+            memo[sid] = max((finish(p) for p in preds), default=0.0) + duration
+        return memo[sid]
+
+    return round(finish(producer[recipe_data["finalState"]]), 1)
+
+
+class TestStepGraph:
+
+    def test_matches_reference_on_random_dags(self):
+        rng = random.Random(40)
+        for _ in range(200):
+            recipe = _random_recipe(rng, rng.randint(1, 15))
+            result = calculate_times_from_dag(recipe)
+            assert result["totalTimeMinutes"] == _reference_total(recipe)
+            assert result["totalTimeMinutes"] == pytest.approx(
+                result["totalActiveTimeMinutes"] + result["totalPassiveTimeMinutes"], abs=0.11
+            )
+
+    def test_incremental_updates_match_recompilation(self):
+        rng = random.Random(41)
+        for _ in range(100):
+            recipe = _random_recipe(rng, 12)
+            graph = StepGraph(recipe)
+            edited = copy.deepcopy(recipe)
+            for _ in range(5):
+                step = rng.choice(edited["steps"])
+                if rng.random() < 0.5:
+                    step["duration"] = f"PT{rng.randint(1, 90)}M"
+                    graph.set_duration(step["id"], float(step["duration"][2:-1]))
+                else:
+                    i = int(step["id"][4:])
+                    j = rng.randrange(i) if i else None
+                    if j is None:
+                        continue
+                    if f"s{j}" in step["uses"]:
+                        step["uses"].remove(f"s{j}")
+                        graph.remove_edge(f"step{j}", step["id"])
+                    else:
+                        step["uses"].append(f"s{j}")
+                        graph.add_edge(f"step{j}", step["id"])
+            fresh = StepGraph(edited)
+            assert graph.earliest_finish == fresh.earliest_finish
+            assert graph.times() == fresh.times()
+
+    def test_update_step_matches_recompilation(self):
+        rng = random.Random(42)
+        for _ in range(50):
+            recipe = _random_recipe(rng, 10)
+            graph = StepGraph(recipe)
+            edited = copy.deepcopy(recipe)
+            for step in rng.sample(edited["steps"], 4):
+                i = int(step["id"][4:])
+                step["duration"] = rng.choice([None, "PT3M", "PT40M"])
+                step["isPassive"] = not step["isPassive"]
+                step["uses"] = [f"s{j}" for j in rng.sample(range(i), min(i, 2))] + ["flour"]
+                graph.update_step(step)
+            fresh = StepGraph(edited)
+            assert graph.earliest_finish == fresh.earliest_finish
+            assert graph.times() == fresh.times()
+            assert graph.schedule() == fresh.schedule()
+
+    def test_add_edge_rejects_cycles(self):
+        graph = StepGraph(LINEAR_RECIPE)
+        with pytest.raises(ValueError):
+            graph.add_edge("cool", "mix")
+        assert graph.times() == calculate_times_from_dag(LINEAR_RECIPE)
+
+    def test_schedule_slack(self):
+        schedule = StepGraph(PARALLEL_RECIPE).schedule()
+        # Both branches take 25 min before assembling: no slack anywhere
+        assert all(step["slack"] == 0.0 for step in schedule.values())
+        assert schedule["make_sauce"] == {
+            "earliestStart": 10.0, "earliestFinish": 25.0,
+            "latestStart": 10.0, "latestFinish": 25.0, "slack": 0.0,
+        }
+        assert schedule["assemble"]["latestFinish"] == 30.0
+
+    def test_schedule_slack_off_critical_path(self):
+        graph = StepGraph(PARALLEL_RECIPE)
+        graph.set_duration("cook_chicken", 5.0)
+        schedule = graph.schedule()
+        assert schedule["cook_chicken"]["slack"] == 15.0
+        assert schedule["season"]["latestStart"] == 15.0
+        assert schedule["make_sauce"]["slack"] == 0.0
+
+    def test_schedule_ends_at_final_state(self):
+        recipe = copy.deepcopy(PARALLEL_RECIPE)
+        # A garnish that does not feed the plated dish and finishes after it
+        recipe["steps"].append({"id": "garnish", "action": "Fry garnish", "duration": "PT40M",
+                                "uses": ["onion"], "produces": "garnish"})
+        schedule = StepGraph(recipe).schedule()
+        assert schedule["assemble"]["latestFinish"] == 30.0
+        assert all(schedule[sid]["slack"] == 0.0 for sid in ("season", "make_sauce", "assemble"))
+        assert schedule["garnish"]["latestFinish"] == 40.0
+        assert schedule["garnish"]["slack"] == 0.0
+
+    def test_library_batch(self):
+        results = calculate_library_times([LINEAR_RECIPE, {"metadata": {"title": "Empty"}}])
+        assert results[0][0] == calculate_times_from_dag(LINEAR_RECIPE)
+        assert results[1] == (calculate_times_from_dag({"metadata": {"title": "Empty"}}), {})
+
+    def test_cycle_falls_back_to_json_order(self):
+        recipe = {
+            "metadata": {"title": "Cycle"},
+            "ingredients": [],
+            "steps": [
+                {"id": "a", "action": "Mix", "duration": "PT10M", "uses": ["b_out"], "produces": "a_out"},
+                {"id": "b", "action": "Rest", "duration": "PT5M", "uses": ["a_out"], "produces": "b_out"},
+            ],
+            "finalState": "b_out",
+        }
+        graph = StepGraph(recipe)
+        assert graph.order == [0, 1]
+        assert graph.times()["totalTimeMinutes"] == 15.0
+
+
+# ── Reviewer corrections update the times incrementally ─────────────
+
+class TestReviewerRetime:
+
+    def _review(self, *corrections):
+        from recipe_scraper.services.recipe_reviewer import ReviewResult, StepCorrection
+        return ReviewResult(recipe_title="?", overall_score=8, summary="", step_corrections=[
+            StepCorrection(step_id=sid, field=field, current_value=current, suggested_value=value)
+            for sid, field, current, value in corrections
+        ])
+
+    def _enriched(self, recipe):
+        recipe = copy.deepcopy(recipe)
+        time_info, schedule = calculate_library_times([recipe])[0]
+        recipe["metadata"].update(time_info, stepSchedule=schedule)
+        return recipe
+
+    def test_duration_and_edge_corrections_retime(self):
+        from recipe_scraper.services.recipe_reviewer import RecipeReviewer
+        recipe = self._enriched(PARALLEL_RECIPE)
+        review = self._review(
+            ("cook_chicken", "duration", "PT20M", "PT45M"),
+            ("make_sauce", "uses", "", "chopped_onion, cream, cooked_chicken"),
+        )
+
+        RecipeReviewer.apply_corrections(recipe, review)
+
+        expected = self._enriched(recipe)["metadata"]
+        assert recipe["steps"][3]["uses"] == ["chopped_onion", "cream", "cooked_chicken"]
+        assert recipe["metadata"]["totalTimeMinutes"] == 70.0
+        for field in ("totalTime", "totalActiveTimeMinutes", "totalPassiveTimeMinutes", "stepSchedule"):
+            assert recipe["metadata"][field] == expected[field]
+
+    def test_schema_total_is_kept(self):
+        from recipe_scraper.services.recipe_reviewer import RecipeReviewer
+        recipe = self._enriched(LINEAR_RECIPE)
+        recipe["metadata"].update(totalTime="PT1H30M", totalTimeMinutes=90.0)
+
+        RecipeReviewer.apply_corrections(recipe, self._review(("mix", "duration", "PT5M", "PT15M")))
+
+        assert recipe["metadata"]["totalTimeMinutes"] == 90.0
+        assert recipe["metadata"]["totalActiveTimeMinutes"] == 15.0
+        assert recipe["metadata"]["stepSchedule"]["cool"]["earliestFinish"] == 55.0
@@ -0,0 +1,89 @@
+"""Tests for the precompiled diet classifier."""
+
+import random
+import re
+
+from recipe_scraper.enrichment.diet import DietClassifier, _get_diet_lists, determine_diets
+
+
+def _reference_diets(recipe_json):
+    """determine_diets as it was with one regex search per list item."""
+    diet_lists = _get_diet_lists()
+
+    def matches(name_lower, items):
+        return any(re.search(rf"\b{re.escape(item)}\b", name_lower) for item in sorted(items, key=len, reverse=True))
+
+    flags = set()
+    for ingredient in recipe_json.get("ingredients", []):
+        name_en = (ingredient.get("name_en") or "").lower().strip()
+        name = (ingredient.get("name") or "").lower().strip()
+        category = (ingredient.get("category") or "").lower()
+        is_optional = ingredient.get("optional", False)
+        if not name_en and not name:
+            continue
+        check_name = name_en or name
+        matched = None
+        for list_name in ("meat", "seafood", "dairy", "egg", "non_vegan_other"):
+            if diet_lists.get(list_name) and matches(check_name, diet_lists[list_name]):
+                matched = list_name
+                break
+        if matched is None:
+            matched = {"meat": "meat", "poultry": "meat", "seafood": "seafood", "dairy": "dairy", "egg": "egg"}.get(category)
+        if matched and not is_optional:
+            flags.add(matched)
+
+    if "meat" in flags or "seafood" in flags:
+        diets = ["omnivorous"]
+    elif flags:
+        diets = ["vegetarian", "omnivorous"]
+    else:
+        diets = ["vegan", "vegetarian", "omnivorous"]
+    if "meat" not in flags and "seafood" in flags:
+        diets.append("pescatarian")
+    return diets
+
+
+def _corpus_names():
+    names = [
+        "eggplant", "butternut squash", "peanut butter", "coconut milk", "oat milk", "vegan cheese",
+        "fish sauce", "anchovy paste", "chicken-of-the-woods mushroom", "(beef)", "ham-hock",
+        "crème fraîche", "gruyère", "  Chicken Breast  ", "chicken  breast", "2% milk", "eggs",
+        "egg whites", "buttermilk", "butterhead lettuce", "honey", "gelatin sheets", "cod_fillet",
+        "tomato", "olive oil", "salt", "",
+    ]
+    for items in _get_diet_lists().values():
+        for item in items:
+            names += [item, item.upper(), f"smoked {item}", f"{item}s", f"{item} stock", item[:-1], f"{item},"]
+    return names
+
+
+def test_classifier_matches_regex_reference():
+    rng = random.Random(38)
+    names = _corpus_names()
+    categories = ["", "meat", "poultry", "seafood", "dairy", "egg", "produce", "spices"]
+    recipes = [
+        {"ingredients": [
+            {"name_en": rng.choice(names), "name": rng.choice(["poulet", "beurre", ""]),
+             "category": rng.choice(categories), "optional": rng.random() < 0.15}
+            for _ in range(rng.randint(0, 8))
+        ]}
+        for _ in range(1500)
+    ]
+    # One ingredient per recipe pins down every single-name verdict as well
+    recipes += [{"ingredients": [{"name_en": name}]} for name in names]
+
+    assert DietClassifier().classify_many(recipes) == [_reference_diets(r) for r in recipes]
+
+
+def test_word_boundaries():
+    classifier = DietClassifier({"meat": ["ham"], "dairy": ["milk", "half and half"]})
+    assert classifier.verdict("ham") == "meat"
+    assert classifier.verdict("smoked ham-hock") == "meat"
+    assert classifier.verdict("graham crackers") is None
+    assert classifier.verdict("buttermilk") is None
+    assert classifier.verdict("half and half cream") == "dairy"
+
+
+def test_determine_diets_uses_list_priority():
+    recipe = {"ingredients": [{"name_en": "anchovy butter", "category": "dairy"}]}
+    assert determine_diets(recipe) == _reference_diets(recipe)
@@ -353,6 +353,44 @@ class TestEstimateGramsDensity:
         assert result == pytest.approx(31.5, abs=1)
 
 
+class TestWeightEstimator:
+    """The compiled estimator keeps the per-key lookup semantics."""
+
+    @staticmethod
+    def _estimator(**tables):
+        from recipe_scraper.services.weight_estimator import WeightEstimator
+
+        defaults = dict(
+            unit_to_grams={"g": 1.0, "ml": 1.0, "cup": 240.0, "piece": None},
+            piece_weights={}, liquid_densities={}, common_portion_weights={}, portion_weights={},
+            volume_units={"ml", "cup"}, piece_like_units={"piece"}, default_unit_grams={},
+            normalize_unit=NutritionMatcher._normalize_unit,
+        )
+        return WeightEstimator(**{**defaults, **tables})
+
+    def test_longest_whole_word_key_wins(self):
+        est = self._estimator(piece_weights={"tomato": 150.0, "cherry tomato": 15.0, "cherry": 8.0, "to": 1.0})
+        assert est.estimate(2, None, "Cherry tomato, halved") == 30.0
+        assert est.estimate(1, None, "potato") is None  # "to" is not a whole word
+
+    def test_equal_length_keys_keep_table_order(self):
+        est = self._estimator(liquid_densities={"milk": 1.03, "wine": 0.99})
+        assert est.liquid_density("wine and milk") == 1.03
+
+    def test_curated_substring_skips_keys_without_unit(self):
+        est = self._estimator(common_portion_weights={"olive oil": {"tbsp": 13.5}, "oil": {"cup": 218.0}})
+        assert est.estimate(1, "cup", "extra virgin olive oil") == 218.0
+
+    def test_resolution_is_memoized_per_normalized_unit(self):
+        est = self._estimator(piece_weights={"egg": 50.0})
+        assert est.estimate(2, "pieces", "egg") == est.estimate(2, "piece", "egg") == 100.0
+        assert est.cache_info()["resolve"].hits == 1
+
+    def test_matches_estimate_grams(self):
+        est = NutritionMatcher._get_weight_estimator()
+        assert est.estimate(50, "ml", "cognac") == NutritionMatcher.estimate_grams(50, "ml", "cognac")
+
+
 # ---------------------------------------------------------------------------
 # compute_nutrition_profile tests (fix 4.5)
 # ---------------------------------------------------------------------------
@@ -526,6 +564,94 @@ class TestComputeNutritionProfile:
         assert result["calories"] > 0
 
 
+class TestComputeNutritionProfiles:
+    """The batched path reproduces the scalar one exactly."""
+
+    def test_batch_matches_scalar(self):
+        import copy
+
+        from recipe_scraper.enrichment.nutrition import compute_nutrition_profiles
+
+        minerals = {"calcium_mg": 11.5, "iron_mg": 1.255, "magnesium_mg": None,
+                    "potassium_mg": 223, "sodium_mg": 74.05, "zinc_mg": 1.3}
+        nut_data = {
+            "chicken": {**CHICKEN_NUT, **minerals}, "rice": RICE_NUT,
+            "olive oil": OLIVE_OIL_NUT, "chicken broth": BROTH_NUT, "truffle": {"not_found": True},
+        }
+        recipes = [
+            ([
+                {"name": "poulet", "name_en": "chicken", "quantity": 333, "unit": "g"},
+                {"name": "riz", "name_en": "rice", "quantity": 0.75, "unit": "cup"},
+                {"name": "huile", "name_en": "olive oil", "quantity": 3, "unit": "tbsp"},
+                {"name": "sel", "name_en": "salt", "quantity": 5, "unit": "g"},
+                {"name": "truffe", "name_en": "truffle", "quantity": 20, "unit": "g"},
+            ], 3, {"title": "Poulet au riz"}),
+            ([
+                {"name": "bouillon", "name_en": "chicken broth", "quantity": 1.5, "unit": "l"},
+                {"name": "riz", "name_en": "rice", "quantity": 1, "unit": "/2 cup"},
+            ], "4", {"title": "Soupe de riz"}),
+            ([], 2, None),
+            ([{"name": "truc", "quantity": 1, "unit": "g"}], 0, {}),
+        ]
+
+        expected = [compute_nutrition_profile(copy.deepcopy(i), nut_data, s, m) for i, s, m in recipes]
+        batched = compute_nutrition_profiles(copy.deepcopy(recipes), nut_data)
+
+        assert json.dumps(batched) == json.dumps(expected)
+        assert expected[0]["ingredientDetails"][0]["minerals"]["iron"] > 0
+        assert expected[1]["liquidRetentionApplied"] is True
+
+    def test_round_like_builtin_on_ties(self):
+        import numpy as np
+
+        from recipe_scraper.enrichment.nutrition import _round_like_builtin
+
+        values = np.array([[0.15, 2.675, 1.005, 0.25, 1e6 + 0.05, 7.0]])
+        decimals = np.array([1, 2, 2, 1, 1, 1], dtype=float)
+        expected = [round(v, int(d)) for v, d in zip(values[0].tolist(), decimals)]
+        assert _round_like_builtin(values, decimals)[0].tolist() == expected
+
+
+class TestIngredientDictionary:
+    """One canonical id per ingredient, shared by all caches."""
+
+    def test_spellings_share_an_id(self):
+        from recipe_scraper.services.ingredient_dictionary import IngredientDictionary
+
+        dictionary = IngredientDictionary()
+        ing_id = dictionary.intern("Chicken breast, boneless (skinless)")
+        assert dictionary.intern("  chicken breast boneless skinless ") == ing_id
+        assert dictionary.intern("olive oil") != ing_id
+        assert dictionary.key(ing_id) == "chicken breast boneless skinless"
+        assert dictionary.intern_many(["olive oil", "", "Olive Oil", "salt"]) == {
+            dictionary.intern("olive oil"): "olive oil",
+            dictionary.intern("salt"): "salt",
+        }
+        assert dictionary.split_unit_key(dictionary.unit_key(ing_id, "/2 cup")) == ("/2 cup", ing_id)
+
+    def test_ids_persist(self, tmp_path):
+        from recipe_scraper.services.cache_store import CacheStore
+        from recipe_scraper.services.ingredient_dictionary import IngredientDictionary
+
+        store = CacheStore(tmp_path / "cache.sqlite3", seed_dir=None)
+        dictionary = IngredientDictionary(store)
+        ids = [dictionary.intern(name) for name in ("salt", "Green Beans", "egg")]
+        assert dictionary.intern_many(["leek", "Salt"]) == {dictionary.intern("leek"): "leek", ids[0]: "Salt"}
+
+        reloaded = IngredientDictionary(CacheStore(tmp_path / "cache.sqlite3", seed_dir=None))
+        assert [reloaded.intern(name) for name in ("salt", "green beans", "Egg")] == ids
+        assert len(reloaded) == 4
+
+    def test_profile_uses_canonical_match_keys(self):
+        # match_batch keys results by canonical name; punctuation in the
+        # recipe's name_en must not turn a match into "no_match"
+        ingredients = [{"name": "poulet", "name_en": "Chicken, boneless", "quantity": 200, "unit": "g"}]
+        result = compute_nutrition_profile(ingredients, {"chicken boneless": CHICKEN_NUT}, servings=2)
+
+        assert result["resolvedIngredients"] == 1
+        assert result["calories"] > 0
+
+
 def test_enrich_recipe():
     enricher = RecipeEnricher()
     enriched = enricher.enrich_recipe(SAMPLE_RECIPE)
@@ -768,6 +894,87 @@ class TestParseNutritionResponse:
         assert result["carbs"] == 13.8
 
 
+class TestResolverScheduling:
+    """Negative cache, coalescing and deadline of NutritionResolver.resolve_batch."""
+
+    @staticmethod
+    def _resolver(tmp_path, monkeypatch, outcome, delay=0.0):
+        import asyncio
+        from recipe_scraper.services.cache_store import CacheStore
+
+        resolver = NutritionResolver(CacheStore(tmp_path / "cache.sqlite3", seed_dir=None))
+        calls = []
+
+        async def fake_resolve_single(name_en):
+            calls.append(name_en)
+            await asyncio.sleep(delay)
+            return outcome
+
+        monkeypatch.setattr(resolver, "_resolve_single", fake_resolve_single)
+        return resolver, calls
+
+    def test_concurrent_requests_share_one_lookup(self, tmp_path, monkeypatch):
+        import asyncio
+
+        resolver, calls = self._resolver(tmp_path, monkeypatch, {"kcal": 10}, delay=0.05)
+
+        async def run():
+            return await asyncio.gather(
+                resolver.resolve_batch(["Yuzu Kosho"]), resolver.resolve_batch(["yuzu kosho", "yuzu kosho"]),
+            )
+
+        first, second = asyncio.run(run())
+        assert calls == ["yuzu kosho"]
+        assert first["yuzu kosho"] == second["yuzu kosho"] == {"kcal": 10}
+
+    def test_unresolved_names_are_cached_as_not_found(self, tmp_path, monkeypatch):
+        import asyncio
+
+        resolver, calls = self._resolver(tmp_path, monkeypatch, None)
+        assert asyncio.run(resolver.resolve_batch(["dragon fruit powder"])) == {"dragon fruit powder": None}
+        assert asyncio.run(resolver.resolve_batch(["dragon fruit powder"])) == {"dragon fruit powder": None}
+        assert calls == ["dragon fruit powder"]
+
+        asyncio.run(resolver.resolve_batch(["dragon fruit powder"], retry_negative=True))
+        assert len(calls) == 2
+
+    def test_expired_negatives_are_retried(self, tmp_path, monkeypatch):
+        import asyncio
+
+        resolver, calls = self._resolver(tmp_path, monkeypatch, None)
+        resolver._cache_store.set("nutrition", "sumac", {"not_found": True}, ttl=-1)
+        resolver._cache_store.set("nutrition", "stock cube", {"not_found": True, "reason": "composite"}, ttl=-1)
+
+        assert asyncio.run(resolver.retry_expired()) == {"sumac": None}
+        assert calls == ["sumac"]
+        assert resolver._cache_store.get("nutrition", "sumac")["reason"] == "unresolved"
+
+    def test_timeout_leaves_resolution_running(self, tmp_path, monkeypatch):
+        import asyncio
+
+        resolver, calls = self._resolver(tmp_path, monkeypatch, None, delay=0.2)
+
+        async def run():
+            partial = await resolver.resolve_batch(["black garlic"], timeout=0.01)
+            await asyncio.sleep(0.3)
+            return partial
+
+        assert asyncio.run(run()) == {}
+        assert resolver._cache_store.get("nutrition", "black garlic")["not_found"] is True
+
+    def test_timed_out_names_are_left_for_retry(self, tmp_path, monkeypatch):
+        import asyncio
+
+        resolver, calls = self._resolver(tmp_path, monkeypatch, {"kcal": 10}, delay=0.2)
+        # asyncio.run cancels the unfinished resolution, as when a CLI import exits
+        assert asyncio.run(resolver.resolve_batch(["black garlic"], timeout=0.01)) == {}
+        assert resolver._cache_store.get("nutrition", "black garlic") is None
+        assert resolver._cache_store.expired_items("nutrition")["black garlic"]["reason"] == "timeout"
+
+        assert asyncio.run(resolver.retry_expired()) == {"black garlic": {"kcal": 10}}
+        assert calls == ["black garlic", "black garlic"]
+
+
 class TestAtwaterCheck:
 
     def test_valid_chicken(self):
@@ -811,3 +1018,190 @@ class TestAtwaterCheck:
         """Well above 20% deviation — should fail."""
         # Atwater = 4*10 + 9*5 + 4*20 = 165, kcal=210 → deviation = 45/210 = 21.4%
         assert _atwater_check(210, 10, 5, 20) is False
+
+
+class TestEarlyNutrition:
+    """Ingredient-only nutrition stage run while Pass 2 builds the DAG."""
+
+    @staticmethod
+    def _enricher(monkeypatch):
+        import recipe_scraper.recipe_enricher as recipe_enricher
+
+        enricher = RecipeEnricher()
+        matched = []
+
+        class FakeMatcher:
+            def match_batch(self, names_en):
+                matched.append(list(names_en))
+                return {name.lower(): {"energy_kcal": 40} for name in names_en}
+
+        estimated = []
+
+        async def fake_quantities(ingredients, metadata=None, steps=None):
+            estimated.append((metadata, steps))
+            for ing in ingredients:
+                ing["quantity"] = ing.get("quantity") or 1
+            return len(ingredients)
+
+        async def fake_weights(ingredients, nutrition_data):
+            for ing in ingredients:
+                ing["estimatedWeightGrams"] = 100
+
+        enricher._nutrition_matcher = FakeMatcher()
+        monkeypatch.setattr(recipe_enricher, "estimate_missing_quantities_llm", fake_quantities)
+        monkeypatch.setattr(recipe_enricher, "fill_missing_weights_llm", fake_weights)
+        return enricher, matched, estimated
+
+    def test_prepare_warms_estimations_on_a_copy(self, monkeypatch):
+        import asyncio
+
+        enricher, matched, estimated = self._enricher(monkeypatch)
+        ingredients = [{"id": "onion", "name_en": "onion"}, {"id": "leek", "name_en": "leek"}]
+        metadata = {"title": "Soupe", "servings": 4}
+        steps = [{"action": "Émincer"}]
+
+        nutrition_data = asyncio.run(enricher.prepare_nutrition(ingredients, metadata, steps))
+
+        assert set(nutrition_data) == {"onion", "leek"}
+        assert matched == [["onion", "leek"]]
+        assert estimated == [(metadata, steps)]
+        assert ingredients == [{"id": "onion", "name_en": "onion"}, {"id": "leek", "name_en": "leek"}]
+
+    def test_enrichment_reuses_prepared_nutrition(self, monkeypatch):
+        import asyncio
+
+        enricher, matched, _ = self._enricher(monkeypatch)
+        prepared = asyncio.run(enricher.prepare_nutrition(
+            [{"id": "cucumber", "name_en": "cucumber"}, {"id": "tomato", "name_en": "tomato"}],
+        ))
+        recipe = json.loads(json.dumps(SAMPLE_RECIPE))
+        for ing in recipe["ingredients"]:
+            ing["name_en"] = ing["name"]
+
+        enriched = asyncio.run(enricher.enrich_recipe_async(recipe, prepared))
+
+        # Only the ingredients the early stage did not see are matched again
+        assert matched[1] == ["onion", "olive oil", "salt", "pepper"]
+        assert "nutritionPerServing" in enriched["metadata"]
+
+    def test_unmatched_prepared_names_are_looked_up_again(self, monkeypatch):
+        import asyncio
+
+        enricher, matched, _ = self._enricher(monkeypatch)
+        nutrition_data = asyncio.run(enricher.match_nutrition(
+            ["tomato", "yuzu"], known={"tomato": {"energy_kcal": 18}, "yuzu": None},
+        ))
+
+        assert matched == [["yuzu"]]
+        assert nutrition_data["yuzu"] == {"energy_kcal": 40}
+
+
+# ---------------------------------------------------------------------------
+# Adaptive reviewer mode
+# ---------------------------------------------------------------------------
+
+from recipe_scraper.services.recipe_reviewer import RecipeReviewer, ReviewResult, IngredientCorrection
+
+
+class TestAdaptiveReview:
+
+    @staticmethod
+    def _reviewer(monkeypatch, scores, corrections=0, **kwargs):
+        """Reviewer whose call *variant* answers a review scored scores[variant]."""
+        reviewer = RecipeReviewer(api_key="test", llm_cache=None, **kwargs)
+        variants = []
+
+        async def fake_call(recipe_json, source_text, source_url, temperature=0.1, variant=0, spent=None):
+            variants.append(variant)
+            spent["calls"] += 1
+            spent["tokens"] += 1000
+            return ReviewResult(
+                recipe_title="Test", overall_score=scores[variant], summary="ok",
+                ingredient_corrections=[
+                    IngredientCorrection(ingredient_id=f"ing_{i}", field="quantity", suggested_value="2")
+                    for i in range(corrections)
+                ],
+            )
+
+        monkeypatch.setattr(reviewer, "_single_review_call", fake_call)
+        return reviewer, variants
+
+    def test_confident_review_is_a_single_call(self, monkeypatch):
+        import asyncio
+
+        reviewer, variants = self._reviewer(monkeypatch, [9, 9], corrections=1, mode="adaptive")
+        review, _ = asyncio.run(reviewer.review(VALID_RECIPE, "source"))
+        assert variants == [0]
+        assert len(review.ingredient_corrections) == 1
+
+    def test_low_score_adds_the_consensus_call(self, monkeypatch):
+        import asyncio
+
+        reviewer, variants = self._reviewer(monkeypatch, [6, 9], mode="adaptive")
+        review, _ = asyncio.run(reviewer.review(VALID_RECIPE, "source"))
+        assert variants == [0, 1]
+        assert review.overall_score == 6
+
+    def test_many_corrections_or_assertion_errors_escalate(self, monkeypatch):
+        import asyncio
+
+        reviewer, variants = self._reviewer(monkeypatch, [9, 9], corrections=4, mode="adaptive")
+        asyncio.run(reviewer.review(VALID_RECIPE, "source"))
+        assert variants == [0, 1]
+
+        reviewer, variants = self._reviewer(monkeypatch, [9, 9], mode="adaptive")
+        broken = {**VALID_RECIPE, "ingredients": VALID_RECIPE["ingredients"] * 2}
+        asyncio.run(reviewer.review(broken, "source"))
+        assert variants == [0, 1]
+
+    def test_consensus_mode_always_runs_every_call(self, monkeypatch):
+        import asyncio
+
+        reviewer, variants = self._reviewer(monkeypatch, [9, 9], mode="consensus")
+        asyncio.run(reviewer.review(VALID_RECIPE, "source"))
+        assert sorted(variants) == [0, 1]
+
+    def test_clean_schema_recipe_can_skip_review(self, monkeypatch):
+        import asyncio
+
+        recipe = {**VALID_RECIPE, "metadata": {**VALID_RECIPE["metadata"], "_schema_data": {"name": "Test"}}}
+        reviewer, variants = self._reviewer(monkeypatch, [9, 9], mode="adaptive", skip_schema=True)
+        review, assertions = asyncio.run(reviewer.review(recipe, "source"))
+        assert review is None and not assertions.failures
+        assert variants == []
+
+        reviewer, variants = self._reviewer(monkeypatch, [9, 9], mode="adaptive", skip_schema=False)
+        asyncio.run(reviewer.review(recipe, "source"))
+        assert variants == [0]
+
+    def test_mode_from_env(self, monkeypatch):
+        monkeypatch.delenv("REVIEW_MODE", raising=False)
+        assert RecipeReviewer(api_key="test").mode == "consensus"
+        monkeypatch.setenv("REVIEW_MODE", "adaptive")
+        assert RecipeReviewer(api_key="test").mode == "adaptive"
+        monkeypatch.setenv("REVIEW_MODE", "sometimes")
+        with pytest.raises(ValueError):
+            RecipeReviewer(api_key="test")
+
+    def test_source_is_compacted_and_quotes_map_back(self, monkeypatch):
+        import asyncio
+        from recipe_scraper.services.recipe_reviewer import MissingItem, REVIEW_SOURCE_TOKENS
+
+        story = "Une longue histoire de famille, racontée au fil des saisons et des vacances. " * 200
+        source = f"Poulet aux oignons\n{story}\n- 500 g de poulet\n- 1 oignon\nFaire revenir l'oignon 5 min.\n{story}"
+        reviewer = RecipeReviewer(api_key="test", llm_cache=None, mode="consensus")
+        prompts = []
+
+        async def fake_call(recipe_json, source_text, source_url, temperature=0.1, variant=0, spent=None):
+            prompts.append(source_text)
+            return ReviewResult(
+                recipe_title="Test", overall_score=9, summary="ok",
+                missing_items=[MissingItem(item_type="step", where_in_source="Faire revenir l'oignon")],
+            )
+
+        monkeypatch.setattr(reviewer, "_single_review_call", fake_call)
+        review, _ = asyncio.run(reviewer.review(VALID_RECIPE, source))
+
+        assert all(len(p) <= REVIEW_SOURCE_TOKENS * 4 and "- 500 g de poulet" in p for p in prompts)
+        assert review.missing_items[0].source_offset == source.index("Faire revenir")
+        assert "source_offset" not in json.dumps(ReviewResult.model_json_schema())
@@ -0,0 +1,149 @@
+"""Tests for the streaming image ingest."""
+
+import asyncio
+import base64
+import io
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from PIL import Image
+
+from recipe_scraper.scraper import RecipeScraper
+from recipe_scraper.services.image_ingest import (
+    ImageRejected,
+    ImageSink,
+    sniff_image_type,
+    write_data_url,
+)
+
+
+def _image_bytes(size, fmt="PNG"):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, (200, 80, 40)).save(buffer, fmt)
+    return buffer.getvalue()
+
+
+def _scraper(tmp_path, handler):
+    scraper = RecipeScraper.__new__(RecipeScraper)
+    scraper._image_output_folder = tmp_path
+    scraper.web_scraper = SimpleNamespace(client=httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    return scraper
+
+
+def _feed(sink, data, chunk=1000):
+    for start in range(0, len(data), chunk):
+        sink.write(data[start:start + chunk])
+
+
+def test_sniff_image_type():
+    assert sniff_image_type(_image_bytes((4, 4), "JPEG")) == "jpg"
+    assert sniff_image_type(_image_bytes((4, 4), "PNG")) == "png"
+    assert sniff_image_type(_image_bytes((4, 4), "GIF")) == "gif"
+    assert sniff_image_type(_image_bytes((4, 4), "WEBP")) == "webp"
+    assert sniff_image_type(b'<?xml version="1.0"?>\n<svg xmlns="http://www.w3.org/2000/svg"/>') == "svg"
+    assert sniff_image_type(b"<!DOCTYPE html><html><body>Not found</body></html>") is None
+
+
+def test_sink_names_file_after_sniffed_type(tmp_path):
+    sink = ImageSink(tmp_path, "tarte")
+    _feed(sink, _image_bytes((300, 200), "JPEG"))
+    assert sink.finish() == "images/tarte.jpg"
+    assert sink.dimensions == (300, 200)
+    assert [p.name for p in tmp_path.iterdir()] == ["tarte.jpg"]
+
+
+def test_sink_rejects_before_reading_everything(tmp_path):
+    sink = ImageSink(tmp_path, "big", max_pixels=10_000)
+    with pytest.raises(ImageRejected):
+        # The header alone gives the dimensions away
+        _feed(sink, _image_bytes((200, 200)), chunk=64)
+    sink.abort()
+
+    sink = ImageSink(tmp_path, "heavy", max_bytes=1000)
+    with pytest.raises(ImageRejected):
+        sink.check_length("5000")
+    with pytest.raises(ImageRejected):
+        _feed(sink, b"\x89PNG\r\n\x1a\n" + bytes(2000))
+    sink.abort()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_sink_downscales_oversized_originals(tmp_path):
+    sink = ImageSink(tmp_path, "hero", max_edge=500)
+    _feed(sink, _image_bytes((2000, 1000), "JPEG"), chunk=4096)
+    path = sink.finish()
+    with Image.open(tmp_path / "hero.jpg") as img:
+        assert img.size == (500, 250)
+    assert path == "images/hero.jpg"
+
+
+def test_sink_rejects_html_and_truncated_images(tmp_path):
+    sink = ImageSink(tmp_path, "page")
+    with pytest.raises(ImageRejected):
+        _feed(sink, b"<!DOCTYPE html><html>" + b" " * 2000)
+    sink.abort()
+
+    sink = ImageSink(tmp_path, "cut", max_edge=100)
+    _feed(sink, _image_bytes((400, 400), "PNG")[:300])
+    with pytest.raises(ImageRejected):
+        sink.finish()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_data_url_decoded_in_chunks(tmp_path):
+    data = _image_bytes((600, 400), "PNG")
+    url = "data:image/png;base64," + base64.b64encode(data).decode()
+
+    sink = ImageSink(tmp_path, "inline")
+    write_data_url(url, sink)
+    assert sink.finish() == "images/inline.png"
+    assert (tmp_path / "inline.png").read_bytes() == data
+
+    sink = ImageSink(tmp_path, "inline-big", max_bytes=len(data) // 2)
+    with pytest.raises(ImageRejected):
+        write_data_url(url, sink)
+    sink.abort()
+
+
+def test_download_streams_through_shared_client(tmp_path):
+    data = _image_bytes((320, 240), "WEBP")
+    seen = []
+
+    def handler(request):
+        seen.append(request)
+        if "cookie" not in request.headers:
+            return httpx.Response(403)
+        # Mislabelled content type: the extension comes from the bytes
+        return httpx.Response(200, content=data, headers={"content-type": "image/jpeg"})
+
+    scraper = _scraper(tmp_path, handler)
+    auth = {"type": "cookie", "values": {"session": "abc"}}
+    path = asyncio.run(scraper._download_image("https://example.com/photo.jpg", "soupe", auth_values=auth))
+
+    assert path == "images/soupe.webp"
+    assert (tmp_path / "soupe.webp").read_bytes() == data
+    assert seen[-1].headers["cookie"] == "session=abc"
+    assert seen[-1].headers["accept"].startswith("image/")
+
+
+def test_download_rejects_oversized_content_length(tmp_path):
+    def handler(request):
+        return httpx.Response(200, content=b"x" * 200, headers={"content-length": str(10**9)})
+
+    scraper = _scraper(tmp_path, handler)
+    assert asyncio.run(scraper._download_image("https://example.com/huge.jpg", "huge")) is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_discarded_early_download_leaves_no_file(tmp_path):
+    data = _image_bytes((320, 240), "JPEG")
+    scraper = _scraper(tmp_path, lambda request: httpx.Response(200, content=data))
+
+    async def run():
+        task = asyncio.create_task(scraper._download_image("https://example.com/early.jpg", "soupe"))
+        assert await task == "images/soupe.jpg"
+        scraper._discard_image_task(task)
+
+    asyncio.run(run())
+    assert list(tmp_path.iterdir()) == []
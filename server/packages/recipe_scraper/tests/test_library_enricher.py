@@ -0,0 +1,162 @@
+"""Tests for the library-wide re-enrichment engine."""
+
+import copy
+import json
+
+import pytest
+
+from recipe_scraper.library_enricher import LIBRARY_DEFAULT_STAGES, LibraryEnricher
+
+RECIPE = {
+    "metadata": {"title": "Salade de concombre et tomates", "servings": 2},
+    "ingredients": [
+        {"id": "cucumber", "name": "concombre", "name_en": "cucumber", "category": "produce",
+         "quantity": 1, "unit": "piece"},
+        {"id": "tomato", "name": "tomate", "name_en": "tomato", "category": "produce",
+         "quantity": 2, "unit": "piece"},
+        {"id": "olive_oil", "name": "huile d'olive", "name_en": "olive oil", "category": "oils",
+         "quantity": 2, "unit": "tbsp"},
+    ],
+    "steps": [
+        {"id": "s1", "action": "Couper les légumes", "duration": "PT5M",
+         "uses": ["cucumber", "tomato"], "produces": "cut_vegetables"},
+        {"id": "s2", "action": "Assaisonner", "duration": "PT1M",
+         "uses": ["cut_vegetables", "olive_oil"], "produces": "salad"},
+    ],
+    "finalState": "salad",
+}
+NUTRITION = {
+    "cucumber": {"energy_kcal": 15, "protein_g": 0.7, "fat_g": 0.1, "carbs_g": 3.6, "fiber_g": 0.5,
+                 "calcium_mg": 16, "potassium_mg": 147},
+    "tomato": {"energy_kcal": 18, "protein_g": 0.9, "fat_g": 0.2, "carbs_g": 3.9, "fiber_g": 1.2,
+               "calcium_mg": 10, "iron_mg": 0.27, "potassium_mg": 237},
+    "olive oil": {"energy_kcal": 884, "protein_g": 0, "fat_g": 100, "carbs_g": 0, "fiber_g": 0},
+}
+
+
+class FakeMatcher:
+    """Records the names it is asked to match."""
+
+    def __init__(self):
+        self.calls = []
+
+    def match_batch(self, names):
+        self.calls.append(list(names))
+        return {n.lower(): NUTRITION.get(n.lower()) for n in names}
+
+
+def _write_library(folder, count=3):
+    for i in range(count):
+        recipe = copy.deepcopy(RECIPE)
+        (folder / f"r{i}.recipe.json").write_text(json.dumps(recipe), encoding="utf-8")
+
+
+def test_only_changed_files_are_rewritten(tmp_path):
+    _write_library(tmp_path)
+    engine = LibraryEnricher(stages=["diets", "seasons", "times"], workers=1)
+
+    first = engine.run(tmp_path)
+    assert first["processed"] == 3 and len(first["changed"]) == 3
+    recipe = json.loads((tmp_path / "r0.recipe.json").read_text(encoding="utf-8"))
+    assert "vegan" in recipe["metadata"]["diets"]
+    assert recipe["metadata"]["totalTime"] == "PT6M"
+    assert recipe["metadata"]["stepSchedule"]
+
+    mtimes = {p.name: p.stat().st_mtime_ns for p in tmp_path.glob("*.json")}
+    second = engine.run(tmp_path)
+    assert second["changed"] == []
+    assert {p.name: p.stat().st_mtime_ns for p in tmp_path.glob("*.json")} == mtimes
+
+
+def test_names_matched_once_per_run(tmp_path):
+    _write_library(tmp_path)
+    matcher = FakeMatcher()
+
+    stats = LibraryEnricher(stages=["nutrition"], workers=1, matcher=matcher).run(tmp_path)
+
+    assert len(matcher.calls) == 1
+    assert sorted(matcher.calls[0]) == ["cucumber", "olive oil", "tomato"]
+    assert len(stats["changed"]) == 3
+    meta = json.loads((tmp_path / "r1.recipe.json").read_text(encoding="utf-8"))["metadata"]
+    assert meta["nutritionPerServing"]["calories"] > 0
+    assert "issues" not in meta["nutritionPerServing"]
+
+
+def test_minerals_stage_keeps_macros(tmp_path):
+    _write_library(tmp_path, count=1)
+    path = tmp_path / "r0.recipe.json"
+    recipe = json.loads(path.read_text(encoding="utf-8"))
+    recipe["metadata"]["nutritionPerServing"] = {"calories": 999.0, "confidence": "high"}
+    path.write_text(json.dumps(recipe), encoding="utf-8")
+
+    LibraryEnricher(stages=["minerals"], workers=1, matcher=FakeMatcher()).run(tmp_path)
+
+    profile = json.loads(path.read_text(encoding="utf-8"))["metadata"]["nutritionPerServing"]
+    assert profile["calories"] == 999.0
+    assert profile["minerals"]["potassium"] > 0
+
+
+def test_nutrition_stage_leaves_other_fields_alone(tmp_path):
+    _write_library(tmp_path, count=1)
+    path = tmp_path / "r0.recipe.json"
+    recipe = json.loads(path.read_text(encoding="utf-8"))
+    recipe["metadata"]["servings"] = "2 personnes"
+    recipe["ingredients"][1]["quantity"] = "2 à 3"
+    path.write_text(json.dumps(recipe), encoding="utf-8")
+
+    LibraryEnricher(stages=["nutrition"], workers=1, matcher=FakeMatcher()).run(tmp_path)
+
+    saved = json.loads(path.read_text(encoding="utf-8"))
+    assert saved["metadata"]["servings"] == "2 personnes"
+    assert saved["ingredients"] == recipe["ingredients"]
+    assert saved["metadata"]["nutritionPerServing"]["calories"] > 0
+
+
+def test_small_calorie_changes_are_skipped(tmp_path):
+    _write_library(tmp_path, count=1)
+    LibraryEnricher(stages=["nutrition"], workers=1, matcher=FakeMatcher()).run(tmp_path)
+    path = tmp_path / "r0.recipe.json"
+    recipe = json.loads(path.read_text(encoding="utf-8"))
+    recipe["metadata"]["nutritionPerServing"]["calories"] += 0.5
+    path.write_text(json.dumps(recipe), encoding="utf-8")
+    before = path.read_text(encoding="utf-8")
+
+    stats = LibraryEnricher(stages=["nutrition"], workers=1, matcher=FakeMatcher(),
+                            min_calorie_delta=1.0).run(tmp_path)
+
+    assert stats["changed"] == []
+    assert path.read_text(encoding="utf-8") == before
+
+
+def test_default_stages_stamp_metadata_and_coerce_quantities(tmp_path):
+    recipe = copy.deepcopy(RECIPE)
+    recipe["metadata"].update(servings="4 people", sourceUrl="https://example.com/salade")
+    recipe["ingredients"][0]["quantity"] = "1/2"
+    recipe["ingredients"][2]["quantity"] = "to taste"
+    path = tmp_path / "r0.recipe.json"
+    path.write_text(json.dumps(recipe), encoding="utf-8")
+
+    LibraryEnricher(stages=LIBRARY_DEFAULT_STAGES, workers=1).run(tmp_path)
+
+    result = json.loads(path.read_text(encoding="utf-8"))
+    meta = result["metadata"]
+    assert meta["creationMode"] == "url"
+    assert meta["createdAt"] and meta["updatedAt"]
+    assert meta["servings"] == 4
+    assert [ing["quantity"] for ing in result["ingredients"]] == [0.5, 2, None]
+    assert "vegan" in meta["diets"]
+
+
+def test_process_pool_and_dry_run(tmp_path):
+    _write_library(tmp_path, count=5)
+    before = {p.name: p.read_text(encoding="utf-8") for p in tmp_path.glob("*.json")}
+
+    stats = LibraryEnricher(stages=["diets", "times"], workers=2, chunk_size=2, dry_run=True).run(tmp_path)
+
+    assert stats["processed"] == 5 and len(stats["changed"]) == 5
+    assert {p.name: p.read_text(encoding="utf-8") for p in tmp_path.glob("*.json")} == before
+
+
+def test_unknown_stage_rejected():
+    with pytest.raises(ValueError):
+        LibraryEnricher(stages=["diets", "colours"])
@@ -0,0 +1,117 @@
+"""Tests for the precompiled seasonality engine."""
+
+import random
+
+from recipe_scraper.enrichment.seasons import (
+    SEASONAL_DATA,
+    YEAR_ROUND_STAPLES,
+    SeasonalityEngine,
+    _SEASONAL_INDEX,
+    _MONTH_TO_SEASON,
+    determine_seasons,
+    months_mask,
+)
+
+
+def _reference_match(ingredient_name):
+    """match_seasonal_item as it was, with one dict probe per sub-phrase."""
+    words = ingredient_name.lower().split()
+    for length in range(len(words), 0, -1):
+        for start in range(len(words) - length, -1, -1):
+            candidate = " ".join(words[start:start + length])
+            if candidate in _SEASONAL_INDEX:
+                return _SEASONAL_INDEX[candidate]
+    return None
+
+
+def _reference_seasons(recipe_json):
+    """determine_seasons as it was, with season sets."""
+    def to_seasons(months):
+        seasons = {_MONTH_TO_SEASON[m] for m in months if m in _MONTH_TO_SEASON}
+        return list(seasons) if seasons else ["all"]
+
+    ingredient_seasons = {}
+    all_peak_months = set()
+    for ingredient in recipe_json.get("ingredients", []):
+        name_en = (ingredient.get("name_en") or "").lower()
+        name_orig = (ingredient.get("name") or "").lower()
+        name = name_en if name_en else name_orig
+        if not name or (ingredient.get("category") or "").lower() != "produce":
+            continue
+        item = _reference_match(name)
+        if item is None or item["name"].lower() in YEAR_ROUND_STAPLES:
+            continue
+        peak_months = set(item.get("peak_months", []))
+        if not peak_months or len(peak_months) >= 12:
+            continue
+        display_name = f"{name_orig} ({name_en})" if name_en and name_en != name_orig else name_orig
+        ingredient_seasons[display_name] = set(to_seasons(peak_months))
+        all_peak_months.update(peak_months)
+
+    if not ingredient_seasons:
+        return ["all"], []
+    common = set.intersection(*ingredient_seasons.values())
+    if not common:
+        counts = {}
+        for seasons in ingredient_seasons.values():
+            for season in seasons:
+                counts[season] = counts.get(season, 0) + 1
+        common = {s for s, c in counts.items() if c >= len(ingredient_seasons) / 2}
+        if not common:
+            common = set.union(*ingredient_seasons.values())
+    seasons_list = ["all"] if len(common) >= 4 else sorted(common)
+    months = {m for m in all_peak_months if "all" in seasons_list or _MONTH_TO_SEASON.get(m) in common}
+    return seasons_list, sorted(months)
+
+
+def _produce_names():
+    names = ["", "salt", "olive oil", "  Green   Beans ", "lemon", "garlic cloves", "sweet potatoes"]
+    for produce_type in ("vegetables", "fruits"):
+        for item in SEASONAL_DATA["produce"][produce_type]:
+            name = item["name"]
+            names += [name, name.upper(), f"{name}s", f"fresh {name}", f"{name} puree", f"baby {name} leaves"]
+    return names
+
+
+def test_engine_matches_reference():
+    rng = random.Random(39)
+    names = _produce_names()
+    engine = SeasonalityEngine()
+    for name in names:
+        assert engine.match(name.lower()) is _reference_match(name.lower())
+
+    recipes = [
+        {"ingredients": [
+            {"name_en": rng.choice(names), "name": rng.choice(["courgette", "", "tomate"]),
+             "category": rng.choice(["produce", "produce", "Produce", "spices", ""])}
+            for _ in range(rng.randint(0, 7))
+        ]}
+        for _ in range(2000)
+    ]
+    for recipe in recipes:
+        assert engine.determine(recipe) == _reference_seasons(recipe)
+
+
+def test_repeated_ingredient_votes_once():
+    recipe = {"ingredients": [
+        {"name_en": "tomato", "category": "produce"},
+        {"name_en": "tomato", "category": "produce"},
+        {"name_en": "leek", "category": "produce"},
+    ]}
+    assert determine_seasons(recipe) == _reference_seasons(recipe)
+
+
+def test_produce_in_season():
+    engine = SeasonalityEngine.shared()
+    for month in ("January", "July"):
+        expected = [
+            item["name"]
+            for produce_type in ("vegetables", "fruits")
+            for item in SEASONAL_DATA["produce"][produce_type]
+            if month in item.get("peak_months", [])
+        ]
+        assert sorted(engine.produce_in_season(month)) == sorted(expected)
+
+
+def test_months_mask():
+    assert months_mask(["January", "March", "Smarch"]) == 0b101
@@ -0,0 +1,71 @@
+"""Tests for request coalescing in front of the LLM estimators."""
+
+import asyncio
+
+from recipe_scraper.enrichment import nutrition
+from recipe_scraper.services.cache_store import CacheStore
+from recipe_scraper.services.single_flight import SingleFlight
+
+
+def test_concurrent_runs_compute_each_key_once():
+    flight = SingleFlight()
+    calls = []
+
+    async def compute(keys):
+        calls.append(sorted(keys))
+        await asyncio.sleep(0.02)
+        return {k: k.upper() for k in keys}
+
+    async def run():
+        return await asyncio.gather(flight.run(["a", "b"], compute), flight.run(["b", "c"], compute))
+
+    first, second = asyncio.run(run())
+    assert first == {"a": "A", "b": "B"} and second == {"b": "B", "c": "C"}
+    assert calls == [["a", "b"], ["c"]]
+
+
+def test_leased_keys_are_read_back_from_the_store(tmp_path):
+    store = CacheStore(tmp_path / "cache.sqlite3", seed_dir=None)
+    # Two instances stand for two processes sharing the store
+    owner, peer = SingleFlight("weight_estimates", store), SingleFlight("weight_estimates", store)
+    calls = []
+
+    async def compute(keys):
+        calls.append(list(keys))
+        await asyncio.sleep(0.3)
+        store.set_many("weight_estimates", {k: 5.0 for k in keys})
+        return {k: 5.0 for k in keys}
+
+    async def run():
+        first = asyncio.ensure_future(owner.run(["clove|garlic"], compute))
+        await asyncio.sleep(0.05)
+        return await asyncio.gather(first, peer.run(["clove|garlic"], compute))
+
+    assert asyncio.run(run()) == [{"clove|garlic": 5.0}, {"clove|garlic": 5.0}]
+    assert calls == [["clove|garlic"]]
+    assert store.leased_keys("weight_estimates", ["clove|garlic"]) == []
+
+
+def test_weight_estimates_shared_across_recipes(monkeypatch):
+    calls = []
+
+    async def fake_llm(lines):
+        calls.append(list(lines))
+        return [20.0 * float(line.split()[0]) for line in lines]
+
+    monkeypatch.setattr(nutrition, "_batch_estimate_weights_llm", fake_llm)
+    nutrition_data = {"kombu": {"energy_kcal": 43}, "mystery berry": {"energy_kcal": 60}}
+    recipes = [
+        [{"name_en": "kombu", "quantity": 2, "unit": "bunch"}],
+        [{"name_en": "Kombu", "quantity": 1, "unit": "bunch"}, {"name_en": "mystery berry", "quantity": 3, "unit": "zorblet"}],
+    ]
+
+    async def run():
+        await asyncio.gather(*(nutrition.fill_missing_weights_llm(r, nutrition_data) for r in recipes))
+
+    asyncio.run(run())
+    # kombu|bunch is asked once, by whichever recipe gets there first
+    assert sorted(line for call in calls for line in call) == ["2 bunch kombu", "3 zorblet mystery berry"]
+    assert recipes[0][0]["estimatedWeightGrams"] == 40.0
+    assert recipes[1][0]["estimatedWeightGrams"] == 20.0
+    assert recipes[1][1]["estimatedWeightGrams"] == 60.0
@@ -0,0 +1,87 @@
+"""
+Report of source-text compaction over saved scraped pages.
+
+For each budget (Pass 1 preformat, Pass 3 review), over the {slug}.raw.txt
+traces:
+  - source tokens before / after compaction (~4 chars per token)
+  - compaction time
+  - estimated prompt latency removed, at --prefill-tps prompt tokens/second
+  - recall: share of the ingredient names of the Pass 1 output
+    ({slug}.preformat.txt, «name») still found in the compacted text,
+    relative to the full text
+
+Usage:
+    cd server/packages/recipe_structurer
+    poetry run python scripts/bench_compaction.py                      # ../../data/recipes/debug
+    poetry run python scripts/bench_compaction.py path/to/debug --prefill-tps 1500
+"""
+
+import argparse
+import re
+import statistics
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from recipe_structurer.generator import PREFORMAT_SOURCE_TOKENS
+from recipe_structurer.services.source_compaction import CompactionStats, compact_and_log
+
+_DEBUG_DIR = Path(__file__).parent.parent.parent.parent / "data" / "recipes" / "debug"
+# Reviewer budget (recipe_scraper.services.recipe_reviewer.REVIEW_SOURCE_TOKENS)
+REVIEW_SOURCE_TOKENS = 6000
+
+_NAME_RE = re.compile(r"«([^»]+)»")
+
+
+def ingredient_names(preformat_path: Path) -> list[str]:
+    """Original-language ingredient names of a Pass 1 trace."""
+    if not preformat_path.exists():
+        return []
+    return [n.strip().lower() for n in _NAME_RE.findall(preformat_path.read_text(encoding="utf-8"))]
+
+
+def report(name: str, budget: int, sources: dict[Path, str], prefill_tps: float) -> None:
+    stats = CompactionStats(name)
+    recalls = []
+    for path, text in sources.items():
+        result = compact_and_log(text, budget, name, stats=stats)
+        names = [n for n in ingredient_names(path.with_name(path.name.replace(".raw.txt", ".preformat.txt")))
+                 if n in text.lower()]
+        if result.compacted and names:
+            compacted = result.text.lower()
+            recalls.append(sum(n in compacted for n in names) / len(names))
+
+    print(f"{name} (budget {budget} tokens)")
+    print(f"  {stats.summary()}")
+    print(f"  ~{stats.tokens_saved / prefill_tps:.1f} s of prompt processing removed at {prefill_tps:.0f} tokens/s")
+    if recalls:
+        print(f"  ingredient recall of compacted sources: mean {statistics.fmean(recalls):.1%}, "
+              f"min {min(recalls):.1%} ({len(recalls)} recipes)")
+    print()
+
+
+def main():
+    """Entry point."""
+    parser = argparse.ArgumentParser(description="Report source-text compaction savings")
+    parser.add_argument("debug_dir", nargs="?", type=Path, default=_DEBUG_DIR,
+                        help="Folder of {slug}.raw.txt traces")
+    parser.add_argument("--limit", type=int, default=0, help="Only the first N recipes")
+    parser.add_argument("--prefill-tps", type=float, default=2000.0,
+                        help="Prompt tokens processed per second by the provider")
+    args = parser.parse_args()
+
+    paths = sorted(args.debug_dir.glob("*.raw.txt"))
+    if args.limit:
+        paths = paths[:args.limit]
+    if not paths:
+        parser.error(f"no *.raw.txt traces in {args.debug_dir}")
+
+    sources = {p: p.read_text(encoding="utf-8") for p in paths}
+    print(f"{len(sources)} sources, {sum(map(len, sources.values()))} chars\n")
+    report("Pass 1", PREFORMAT_SOURCE_TOKENS, sources, args.prefill_tps)
+    report("Pass 3", REVIEW_SOURCE_TOKENS, sources, args.prefill_tps)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark of Pass 1.5 (CRF ingredient parsing) over saved Pass 1 outputs.
+
+Compares, per recipe:
+  - per line:  one CRF call per ingredient line, no memo (former path)
+  - batched:   one CRF batch per recipe, cold memo
+  - warm memo: one CRF batch per recipe, memo filled by the previous run
+               (what a re-import or a bulk import of similar recipes sees)
+
+Usage:
+    cd server/packages/recipe_structurer
+    poetry run python scripts/bench_pass15.py                      # ../../data/recipes/debug
+    poetry run python scripts/bench_pass15.py path/to/debug --limit 200
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from recipe_structurer.services import ingredient_parser
+from recipe_structurer.services.crf_memo import CRFMemo
+from recipe_structurer.services.ingredient_parser import (
+    parse_ingredient_line,
+    parse_ingredients_from_preformat,
+)
+
+_DEBUG_DIR = Path(__file__).parent.parent.parent.parent / "data" / "recipes" / "debug"
+
+
+def per_line(text: str) -> None:
+    """Former implementation: parse_ingredient_line on each line."""
+    for line in ingredient_parser._ingredient_lines(text) or []:
+        parse_ingredient_line(line)
+
+
+def run(fn, texts: list[str]) -> list[float]:
+    """Per-text wall times of *fn*, in milliseconds."""
+    times = []
+    for text in texts:
+        start = time.perf_counter()
+        fn(text)
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def summary(name: str, times: list[float]) -> str:
+    p95 = sorted(times)[int(len(times) * 0.95)] if times else 0.0
+    return (
+        f"{name:<10} mean {statistics.fmean(times):8.2f} ms   median {statistics.median(times):8.2f} ms"
+        f"   p95 {p95:8.2f} ms   total {sum(times) / 1000:7.2f} s"
+    )
+
+
+def main():
+    """Entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark Pass 1.5 ingredient parsing")
+    parser.add_argument("debug_dir", nargs="?", type=Path, default=_DEBUG_DIR,
+                        help="Folder of {slug}.preformat.txt traces")
+    parser.add_argument("--limit", type=int, default=0, help="Only the first N recipes")
+    args = parser.parse_args()
+
+    paths = sorted(args.debug_dir.glob("*.preformat.txt"))
+    if args.limit:
+        paths = paths[:args.limit]
+    if not paths:
+        parser.error(f"no *.preformat.txt traces in {args.debug_dir}")
+    if ingredient_parser._ensure_parser() is None:
+        parser.error("ingredient-parser-nlp is not installed")
+
+    texts = [p.read_text(encoding="utf-8") for p in paths]
+    lines = sum(len(ingredient_parser._ingredient_lines(t) or []) for t in texts)
+    print(f"{len(texts)} recipes, {lines} ingredient lines\n")
+
+    ingredient_parser.set_crf_memo(CRFMemo(maxsize=0))
+    print(summary("per line", run(per_line, texts)))
+
+    memo = CRFMemo()
+    ingredient_parser.set_crf_memo(memo)
+    print(summary("batched", run(parse_ingredients_from_preformat, texts)))
+    print(summary("warm memo", run(parse_ingredients_from_preformat, texts)))
+    print(f"\nmemo: {len(memo._lru)} distinct lines, {memo.hits} hits / {memo.misses} misses")
+
+
+if __name__ == "__main__":
+    main()
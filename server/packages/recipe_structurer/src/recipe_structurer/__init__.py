@@ -20,7 +20,8 @@ import logging
 from typing import Optional, Callable, Awaitable
 
 from .exceptions import RecipeRejectedError
-from .generator import RecipeGenerator, generate_recipe, PIPELINE_VERSION
+from .generator import RecipeGenerator, ParsedIngredients, generate_recipe, PIPELINE_VERSION
+from .services.llm_cache import LLMResponseCache
 from .models.recipe import Recipe, Metadata, Ingredient, Step
 
 logger = logging.getLogger(__name__)
@@ -59,22 +60,36 @@ class RecipeStructurer:
     def pipeline_version(self) -> str:
         return PIPELINE_VERSION
 
+    @property
+    def llm_cache(self) -> Optional[LLMResponseCache]:
+        """LLM response cache used by Pass 1 and Pass 2 (None = disabled)."""
+        return self._generator.llm_cache
+
+    @llm_cache.setter
+    def llm_cache(self, cache: Optional[LLMResponseCache]) -> None:
+        self._generator.llm_cache = cache
+
     async def structure(
         self,
         content,
         progress_callback: Optional[Callable[[str], Awaitable[None]]] = None,
+        ingredients_callback: Optional[Callable[[ParsedIngredients], Awaitable[None]]] = None,
     ) -> Recipe:
         """
         Structure recipe content.
 
         When content.structured_data (schema.org/Recipe JSON-LD) is available,
         a cleaner recipe text is built from it before sending to the LLM pipeline.
-        This significantly improves structuring accuracy.
+        This significantly improves structuring accuracy. When that data is
+        complete, Pass 1 skips the LLM altogether (schema.org fast path).
 
         Args:
             content: Content object with main_content, image_urls, and
                      optional structured_data attributes
             progress_callback: Optional async callback for progress updates
+            ingredients_callback: Optional async callback given the parsed
+                ingredients as soon as they exist, while the recipe graph
+                is still being built (see RecipeGenerator.generate)
 
         Returns:
             Recipe: Validated and structured recipe
@@ -98,6 +113,8 @@ class RecipeStructurer:
             recipe_text=recipe_text,
             image_urls=getattr(content, "image_urls", None),
             progress_callback=progress_callback,
+            structured_data=structured_data,
+            ingredients_callback=ingredients_callback,
         )
 
         # Store the schema.org data in the recipe for downstream use (times, servings)
@@ -238,7 +255,9 @@ __all__ = [
     "RecipeStructurer",
     "RecipeGenerator",
     "generate_recipe",
+    "ParsedIngredients",
     "PIPELINE_VERSION",
+    "LLMResponseCache",
     "Recipe",
     "Metadata",
     "Ingredient",
@@ -10,10 +10,14 @@ Pass 1.5 uses strangetom/ingredient-parser (CRF v2.5.0, deterministic parsing).
 Pass 2 uses Instructor (structured JSON output with Pydantic validation).
 """
 
+import json
 import os
 import re
 import logging
-from typing import Optional, Callable, Awaitable, Literal
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Optional, Callable, Awaitable, Literal
 
 import instructor
 from pydantic import ValidationError
@@ -25,13 +29,14 @@ try:
 except ImportError:
     from openai import AsyncOpenAI
 
-from .models.recipe import Recipe
+from .models.recipe import Ingredient, Recipe
 from .prompts.unified import SYSTEM_PROMPT, get_user_prompt
+from .services.llm_cache import LLMResponseCache
 from .services.preformat import preformat_recipe
-from .services.ingredient_parser import (
-    parse_ingredients_from_preformat,
-    correct_step_references,
-)
+from .services.schema_preformat import IngredientAnnotationCache, preformat_from_schema
+from .services.graph_repair import REPAIR_CONTEXT_KEY, GraphRepairReport
+from .services.ingredient_parser import parse_ingredients_from_preformat
+from .services.source_compaction import compact_and_log, schema_vocabulary
 from .exceptions import RecipeRejectedError
 from .shared import clean_title
 
@@ -39,6 +44,9 @@ logger = logging.getLogger(__name__)
 
 _LANG_RE = re.compile(r"^LANGUAGE:\s*(\w+)", re.MULTILINE)
 
+# Report of the Pass 2 call running in the current task (filled by the instructor hooks)
+_DAG_REPORT: ContextVar[Optional[GraphRepairReport]] = ContextVar("dag_report", default=None)
+
 
 def _extract_language(preformatted: str) -> str:
     """Extract ISO 639-1 language code from Pass 1 preformatted output."""
@@ -47,6 +55,44 @@ def _extract_language(preformatted: str) -> str:
         return match.group(1).strip().lower()[:2]
     return "en"
 
+
+_HEADER_RE = re.compile(r"^(TITLE|SERVINGS|TYPE|IMAGE_URL):[ \t]*(.*)$", re.MULTILINE)
+_INSTRUCTION_RE = re.compile(r"^\s*\d+\.\s+(.+)$", re.MULTILINE)
+_HEADER_FIELDS = {"TITLE": "title", "SERVINGS": "servings", "TYPE": "recipeType", "IMAGE_URL": "imageUrl"}
+
+
+@dataclass
+class ParsedIngredients:
+    """
+    Pass 1.5 output, handed to ``ingredients_callback`` while Pass 2 runs.
+
+    ``metadata`` and ``steps`` are read from the Pass 1 text (header fields
+    and numbered instructions), so that ingredient-only work can start
+    before the DAG exists.
+    """
+
+    ingredients: list[Ingredient]
+    metadata: dict[str, Any] = field(default_factory=dict)
+    steps: list[dict[str, str]] = field(default_factory=list)
+
+    @classmethod
+    def from_preformat(cls, ingredients: list[Ingredient], preformatted: str) -> "ParsedIngredients":
+        metadata: dict[str, Any] = {}
+        for name, value in _HEADER_RE.findall(preformatted):
+            value = value.strip()
+            if value and _HEADER_FIELDS[name] not in metadata:
+                metadata[_HEADER_FIELDS[name]] = value
+        if "title" in metadata:
+            metadata["title"] = clean_title(metadata["title"])
+        try:
+            metadata["servings"] = int(metadata["servings"])
+        except (KeyError, ValueError):
+            metadata.pop("servings", None)
+
+        _, _, instructions = preformatted.partition("INSTRUCTIONS:")
+        steps = [{"action": action.strip()} for action in _INSTRUCTION_RE.findall(instructions)]
+        return cls(ingredients=ingredients, metadata=metadata, steps=steps)
+
 # Provider configurations
 PROVIDERS = {
     "deepseek": {
@@ -65,7 +111,13 @@ DEFAULT_PROVIDER = "openrouter"  # OpenRouter by default for convenience
 PIPELINE_VERSION = "3.0.0"
 MAX_RETRIES = 3
 MAX_TOKENS_PREFORMAT = 4096
+# Source text sent to Pass 1 is compacted to this many tokens (blog stories, comments)
+PREFORMAT_SOURCE_TOKENS = 6000
 MAX_TOKENS_DAG = 8192
+DAG_TEMPERATURE = 0.1
+
+# Everything fixed by the code that shapes the Pass 2 answer (LLM cache key)
+_DAG_CACHE_TEMPLATE = SYSTEM_PROMPT + json.dumps(Recipe.model_json_schema(), sort_keys=True)
 
 
 class RecipeGenerator:
@@ -80,14 +132,16 @@ class RecipeGenerator:
     - 3-pass architecture: LLM preformat → NER ingredient parsing → LLM DAG construction
     - CRF parser (strangetom/ingredient-parser v2.5.0) for deterministic ingredient extraction
     - Deterministic ID resolution (suffix strip + name lookup) for robust reference correction
-    - Automatic Pydantic validation with retries on Pass 2
+    - Deterministic graph repair before validation; LLM retries on Pass 2 only when it fails
+    - Source text compacted to a token budget before Pass 1 (stories, comments dropped)
     - Supports DeepSeek direct or OpenRouter
     """
 
     def __init__(
         self,
         api_key: Optional[str] = None,
-        provider: Literal["deepseek", "openrouter"] = DEFAULT_PROVIDER
+        provider: Literal["deepseek", "openrouter"] = DEFAULT_PROVIDER,
+        llm_cache: Optional[LLMResponseCache] = None,
     ):
         """
         Initialize the generator.
@@ -95,6 +149,8 @@ class RecipeGenerator:
         Args:
             api_key: API key. If not provided, reads from env var based on provider.
             provider: "deepseek" for direct API or "openrouter" for OpenRouter (default).
+            llm_cache: Optional LLM response cache for Pass 1 and Pass 2.
+                Defaults to the one configured by LLM_CACHE_DIR, if any.
         """
         self.provider = provider
         config = PROVIDERS[provider]
@@ -138,13 +194,37 @@ class RecipeGenerator:
         # Wrap with Instructor for structured outputs (for Pass 2)
         self.client = instructor.from_openai(self._base_client)
 
+        # Deterministic graph repairs vs LLM retries of Pass 2, per recipe
+        self.client.on("completion:kwargs", self._count_dag_attempt)
+        self.client.on("parse:error", self._count_dag_retry)
+
+        self.llm_cache = llm_cache or LLMResponseCache.from_env()
+
+        # Ingredient annotations learned by the schema.org fast path (Pass 1)
+        self._annotation_cache = IngredientAnnotationCache.from_env()
+
         logger.info(f"RecipeGenerator initialized with {provider}: {self.model}")
 
+    @staticmethod
+    def _count_dag_attempt(*args, **kwargs) -> None:
+        report = _DAG_REPORT.get()
+        if report is not None:
+            report.llm_attempts += 1
+
+    @staticmethod
+    def _count_dag_retry(*args, **kwargs) -> None:
+        # A parse error is a graph the repair could not fix: the LLM is asked again
+        report = _DAG_REPORT.get()
+        if report is not None:
+            report.llm_retries += 1
+
     async def generate(
         self,
         recipe_text: str,
         image_urls: Optional[list[str]] = None,
-        progress_callback: Optional[Callable[[str], Awaitable[None]]] = None
+        progress_callback: Optional[Callable[[str], Awaitable[None]]] = None,
+        structured_data: Optional[dict] = None,
+        ingredients_callback: Optional[Callable[[ParsedIngredients], Awaitable[None]]] = None,
     ) -> Recipe:
         """
         Generate a structured recipe from raw text using the 3-pass pipeline.
@@ -152,10 +232,19 @@ class RecipeGenerator:
         Pass 1: Preformat raw text into clean structured text.
         Pass 2: Build Recipe JSON graph from structured text.
 
+        When complete schema.org/Recipe data is given, Pass 1 is built from it
+        deterministically instead of calling the LLM (see schema_preformat).
+
         Args:
             recipe_text: Raw recipe content (from web scraping or user input)
             image_urls: Optional list of image URLs found with the recipe
             progress_callback: Optional async callback for progress updates
+            structured_data: Optional schema.org/Recipe JSON-LD dict
+            ingredients_callback: Optional async callback given the Pass 1.5
+                ingredients before Pass 2 starts. Only called when the CRF
+                ingredients are the ones the recipe will keep; it should
+                schedule its work rather than wait for it, since Pass 2
+                waits for the callback to return.
 
         Returns:
             Recipe: Validated and structured recipe
@@ -168,22 +257,40 @@ class RecipeGenerator:
         if progress_callback:
             await progress_callback("Cleaning and preformatting recipe...")
 
-        logger.info(f"[Pass 1] Preformatting recipe ({len(recipe_text)} chars)")
-
-        preformat_max_tokens = MAX_TOKENS_PREFORMAT
-        if len(recipe_text) > 30_000:
-            preformat_max_tokens = 8192
-        elif len(recipe_text) > 15_000:
-            preformat_max_tokens = 6144
-
-        preformatted = await preformat_recipe(
-            client=self._base_client,
-            model=self.model,
-            recipe_text=recipe_text,
-            image_urls=image_urls,
-            max_tokens=preformat_max_tokens,
-            extra_body=self._provider_routing or None,
-        )
+        preformatted = None
+        if structured_data:
+            preformatted = await preformat_from_schema(
+                client=self._base_client,
+                model=self.model,
+                data=structured_data,
+                image_urls=image_urls,
+                cache=self._annotation_cache,
+                extra_body=self._provider_routing or None,
+            )
+            if preformatted is None:
+                logger.info("[Pass 1] schema.org data incomplete — falling back to LLM preformat")
+
+        if preformatted is None:
+            logger.info(f"[Pass 1] Preformatting recipe ({len(recipe_text)} chars)")
+
+            source_text = compact_and_log(
+                recipe_text, PREFORMAT_SOURCE_TOKENS, "Pass 1", schema_vocabulary(structured_data),
+            ).text
+
+            # Compacted sources stay under ~24k chars (PREFORMAT_SOURCE_TOKENS)
+            preformat_max_tokens = MAX_TOKENS_PREFORMAT
+            if len(source_text) > 15_000:
+                preformat_max_tokens = 6144
+
+            preformatted = await preformat_recipe(
+                client=self._base_client,
+                model=self.model,
+                recipe_text=source_text,
+                image_urls=image_urls,
+                max_tokens=preformat_max_tokens,
+                extra_body=self._provider_routing or None,
+                cache=self.llm_cache,
+            )
 
         logger.info(f"[Pass 1] Complete — {len(preformatted)} chars output")
         logger.debug(f"[Pass 1] Preview:\n{preformatted[:500]}")
@@ -212,9 +319,14 @@ class RecipeGenerator:
                 f"[Pass 1.5] Parsed {len(ner_ingredients)} ingredients "
                 f"({sum(1 for i in ner_ingredients if i.quantity is not None)} with quantities)"
             )
+            if ingredients_callback:
+                # Ingredient-only work (nutrition, estimations) overlaps Pass 2
+                try:
+                    await ingredients_callback(ParsedIngredients.from_preformat(ner_ingredients, preformatted))
+                except Exception as e:
+                    logger.warning(f"[Pass 1.5] Ingredients callback failed (non-blocking): {e}")
 
         # Build ingredients JSON for the Pass 2 prompt
-        import json
         ingredients_json = json.dumps(
             [ing.model_dump(exclude_none=True) for ing in ner_ingredients],
             indent=2,
@@ -233,15 +345,46 @@ class RecipeGenerator:
         ]
 
         try:
-            recipe = await self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                response_model=Recipe,
-                max_tokens=MAX_TOKENS_DAG,
-                max_retries=MAX_RETRIES,
-                temperature=0.1,
-                **({"extra_body": self._provider_routing} if self._provider_routing else {}),
-            )
+            recipe = None
+            dag_cache_key = None
+            graph_repair: Optional[GraphRepairReport] = None
+            if self.llm_cache:
+                dag_cache_key = self.llm_cache.make_key(
+                    "dag", self.model, _DAG_CACHE_TEMPLATE, messages[1]["content"], DAG_TEMPERATURE,
+                )
+                cached = self.llm_cache.get("dag", dag_cache_key)
+                if cached:
+                    try:
+                        recipe = Recipe.model_validate_json(cached)
+                        logger.info("[Pass 2] DAG served from LLM cache")
+                    except ValidationError as e:
+                        logger.warning(f"[Pass 2] Ignoring invalid cached DAG: {e}")
+
+            if recipe is None:
+                # Graph errors are repaired deterministically before validation;
+                # instructor only retries with the LLM when the repair is not enough
+                graph_repair = GraphRepairReport()
+                report_token = _DAG_REPORT.set(graph_repair)
+                started = time.perf_counter()
+                try:
+                    recipe = await self.client.chat.completions.create(
+                        model=self.model,
+                        messages=messages,
+                        response_model=Recipe,
+                        max_tokens=MAX_TOKENS_DAG,
+                        max_retries=MAX_RETRIES,
+                        temperature=DAG_TEMPERATURE,
+                        context={REPAIR_CONTEXT_KEY: graph_repair.repairs},
+                        **({"extra_body": self._provider_routing} if self._provider_routing else {}),
+                    )
+                finally:
+                    graph_repair.llm_seconds = time.perf_counter() - started
+                    _DAG_REPORT.reset(report_token)
+                if graph_repair.repairs or graph_repair.llm_retries:
+                    logger.info(f"[Pass 2] {graph_repair.summary()}")
+                # Cache the raw Pass 2 answer, before post-processing mutates it
+                if self.llm_cache:
+                    self.llm_cache.put("dag", dag_cache_key, recipe.model_dump_json(), model=self.model)
 
             # Replace LLM-generated ingredients with CRF-parsed ones
             # (only if CRF produced results; otherwise keep LLM ingredients)
@@ -249,17 +392,13 @@ class RecipeGenerator:
                 recipe.ingredients = ner_ingredients
                 recipe.metadata.ingredientSource = "ner"
 
-                # Correct step references using deterministic resolution
-                ingredient_ids = {ing.id for ing in ner_ingredients}
-                produced_states = {step.produces for step in recipe.steps}
-                correct_step_references(
-                    recipe.steps, ingredient_ids, produced_states,
-                    ingredients=ner_ingredients,
-                )
-
-                # Re-validate graph integrity after post-processing
+                # Re-validate graph integrity against the CRF ingredients, after
+                # deterministic repair (ref resolution, unused ingredients…)
+                post_repairs: list[str] = []
                 try:
-                    Recipe.model_validate(recipe.model_dump())
+                    recipe = Recipe.model_validate(
+                        recipe.model_dump(), context={REPAIR_CONTEXT_KEY: post_repairs},
+                    )
                 except ValidationError as e:
                     logger.error(f"[Post-processing] Graph invalid after corrections: {e}")
                     raise
@@ -280,6 +419,8 @@ class RecipeGenerator:
             if progress_callback:
                 await progress_callback("Recipe structured successfully!")
 
+            # Per-import numbers, reported by the caller (None when the DAG came from cache)
+            recipe._graph_repair = graph_repair
             return recipe
 
         except ValidationError as e:
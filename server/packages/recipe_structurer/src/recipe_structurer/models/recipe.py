@@ -10,7 +10,7 @@ The frontend can reconstruct the DAG automatically from these relationships.
 """
 
 from typing import List, Literal, Optional, get_args
-from pydantic import BaseModel, Field, model_validator
+from pydantic import BaseModel, Field, ValidationInfo, model_validator
 
 from ..shared import EQUIPMENT_KEYWORDS, INGREDIENT_CATEGORIES
 
@@ -232,6 +232,16 @@ class Recipe(BaseModel):
         description="Preformatted text from Pass 1 (added post-generation, not by LLM)"
     )
 
+    @model_validator(mode='before')
+    @classmethod
+    def repair_graph(cls, data, info: ValidationInfo):
+        """Deterministically repair the graph first, when the validation context asks for it."""
+        context = info.context
+        if not isinstance(data, dict) or not context or "graph_repairs" not in context:
+            return data
+        from ..services.graph_repair import repair_recipe_data
+        return repair_recipe_data(data, context["graph_repairs"])
+
     @model_validator(mode='after')
     def validate_graph(self) -> 'Recipe':
         """Validate the recipe graph is complete and connected."""
@@ -15,54 +15,8 @@ from ..shared import INGREDIENT_CATEGORIES
 
 _CATEGORIES_CSV = ", ".join(INGREDIENT_CATEGORIES)
 
-PREFORMAT_SYSTEM_PROMPT = """#ROLE
-You are an expert recipe content extractor. Your job is to take raw recipe text
-(which may come from web scraping, OCR, user input, or cookbooks) and produce
-a clean, standardized structured text output.
-
-You do NOT build JSON or graphs. You simply clean, extract, and organize.
-
-#GOAL
-Transform messy raw recipe content into a clean, well-structured text format
-that separates metadata, ingredients, and instructions clearly.
-
-#CRITICAL RULES
-
-## 1. VALIDATION — Do this FIRST
-If the content is NOT a valid recipe, respond with ONLY:
-REJECT: [Clear explanation of why this is not a recipe]
-
-Reject: login pages, error pages, empty content, articles without recipe,
-pages requiring authentication, product listings, etc.
-
-Also REJECT **recipe compilations / roundups**: pages that list MULTIPLE independent
-recipes (e.g., "Top 10 vinaigrettes", "5 recettes de soupes", "Nos meilleures recettes de…").
-These are NOT a single recipe — they are collections. A compilation typically has:
-- Multiple complete recipes each with their own title, ingredients, and instructions
-- A "listicle" structure ("Recette 1: …", "Recette 2: …")
-- A meta-title that references a category rather than a specific dish
-
-⚠️ Do NOT confuse compilations with sub-recipes:
-- Recipes with sub-recipes (sauce, dough, garnish) are VALID — they produce ONE final dish.
-- Compilations list SEPARATE dishes that are NOT combined into one — REJECT those.
-
-## 2. LANGUAGE — STRICT: keep original language everywhere
-- The `«clean_name»` MUST be in the SAME language as the source recipe
-- If the recipe is in English, write English in `«»`: `«olive oil»`, `«chicken thighs»`
-- If the recipe is in French, write French in `«»`: `«huile d'olive»`, `«cuisses de poulet»`
-- Title, description, ingredients, instructions: ALL stay in the ORIGINAL language
-- The `[full english translation]` is ALWAYS in English regardless of source language
-- Only the section headers (TITLE, INGREDIENTS, etc.) are in English (structural markers)
-- If the recipe mixes languages, keep both as-is
-- NEVER translate an English recipe's ingredients to French or vice versa
-
-## 3. TEXT PRESERVATION
-- Keep all measurements and temperatures EXACTLY as written
-- Do NOT invent or add information not present in the source
-- Do NOT change quantities or units
-- Keep original ingredient names (do not substitute or "improve")
-
-## 4. INGREDIENTS EXTRACTION
+# Ingredient rules — shared with the schema.org fast path annotation prompt
+_INGREDIENT_RULES = """## 4. INGREDIENTS EXTRACTION
 - List each ingredient on its own line with: quantity, unit, name, preparation state
 - CRITICAL: for each ingredient, add THREE annotations:
   * `«clean_name»` — the ingredient name ONLY in original language, stripped of quantity/unit/preparation
@@ -156,7 +110,56 @@ These are NOT a single recipe — they are collections. A compilation typically
 - Group optional toppings under a separate sub-section if they belong to a distinct part:
   e.g., "**Toppings (optionnel):**"
 
-## 5. INSTRUCTIONS EXTRACTION
+"""
+
+PREFORMAT_SYSTEM_PROMPT = """#ROLE
+You are an expert recipe content extractor. Your job is to take raw recipe text
+(which may come from web scraping, OCR, user input, or cookbooks) and produce
+a clean, standardized structured text output.
+
+You do NOT build JSON or graphs. You simply clean, extract, and organize.
+
+#GOAL
+Transform messy raw recipe content into a clean, well-structured text format
+that separates metadata, ingredients, and instructions clearly.
+
+#CRITICAL RULES
+
+## 1. VALIDATION — Do this FIRST
+If the content is NOT a valid recipe, respond with ONLY:
+REJECT: [Clear explanation of why this is not a recipe]
+
+Reject: login pages, error pages, empty content, articles without recipe,
+pages requiring authentication, product listings, etc.
+
+Also REJECT **recipe compilations / roundups**: pages that list MULTIPLE independent
+recipes (e.g., "Top 10 vinaigrettes", "5 recettes de soupes", "Nos meilleures recettes de…").
+These are NOT a single recipe — they are collections. A compilation typically has:
+- Multiple complete recipes each with their own title, ingredients, and instructions
+- A "listicle" structure ("Recette 1: …", "Recette 2: …")
+- A meta-title that references a category rather than a specific dish
+
+⚠️ Do NOT confuse compilations with sub-recipes:
+- Recipes with sub-recipes (sauce, dough, garnish) are VALID — they produce ONE final dish.
+- Compilations list SEPARATE dishes that are NOT combined into one — REJECT those.
+
+## 2. LANGUAGE — STRICT: keep original language everywhere
+- The `«clean_name»` MUST be in the SAME language as the source recipe
+- If the recipe is in English, write English in `«»`: `«olive oil»`, `«chicken thighs»`
+- If the recipe is in French, write French in `«»`: `«huile d'olive»`, `«cuisses de poulet»`
+- Title, description, ingredients, instructions: ALL stay in the ORIGINAL language
+- The `[full english translation]` is ALWAYS in English regardless of source language
+- Only the section headers (TITLE, INGREDIENTS, etc.) are in English (structural markers)
+- If the recipe mixes languages, keep both as-is
+- NEVER translate an English recipe's ingredients to French or vice versa
+
+## 3. TEXT PRESERVATION
+- Keep all measurements and temperatures EXACTLY as written
+- Do NOT invent or add information not present in the source
+- Do NOT change quantities or units
+- Keep original ingredient names (do not substitute or "improve")
+
+""" + _INGREDIENT_RULES + """## 5. INSTRUCTIONS EXTRACTION
 - Break into clear, numbered steps — each step = one main action
 - Highlight important values in bold:
   * Temperatures: "**180°C**"
@@ -273,3 +276,32 @@ Follow the structured format defined in your instructions exactly.
 ## Raw Recipe Content
 
 {recipe_text}"""
+
+
+# ═══════════════════════════════════════════════════════════════════
+# INGREDIENT ANNOTATION (schema.org fast path fallback)
+# ═══════════════════════════════════════════════════════════════════
+
+INGREDIENT_ANNOTATION_SYSTEM_PROMPT = """#ROLE
+You annotate recipe ingredient lines. The recipe itself was already extracted
+from schema.org data: you ONLY rewrite the numbered ingredient lines you are given.
+
+""" + _INGREDIENT_RULES + """
+#RESPONSE FORMAT
+
+For each input line, answer with the SAME number followed by the annotated line:
+
+1. - [quantity] [unit] «ingredient name in ORIGINAL language» [full english translation] {category}, preparation
+2. - ...
+
+If one input line holds several ingredients ("sel et poivre"), repeat its number
+on several lines, one ingredient each. Output nothing else.
+"""
+
+
+def get_ingredient_annotation_user_prompt(lines: list[str], language: str) -> str:
+    """Generate the user prompt for annotating schema.org ingredient lines."""
+    numbered = "\n".join(f"{i}. {line}" for i, line in enumerate(lines, 1))
+    return f"""Annotate these ingredient lines (recipe language: {language}).
+
+{numbered}"""
@@ -0,0 +1,143 @@
+"""
+Memo of CRF ingredient parses (Pass 1.5).
+
+The English lines written by Pass 1 repeat a lot across recipes ("2 tbsp
+olive oil", "1 onion, finely chopped"), and the CRF parse of a line only
+depends on the line and on the parser version. Parses are kept in:
+
+  - an in-process LRU (``maxsize`` lines)
+  - optionally a SQLite file shared by processes and runs
+
+Keys are the whitespace-normalized English line plus the parser version, so
+upgrading ingredient-parser-nlp (or the extraction code) never serves stale
+parses.
+
+Environment: ``CRF_MEMO_PATH`` enables the persistent memo.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAXSIZE = 20_000
+
+
+def normalize_line(line: str) -> str:
+    """Normalize an English ingredient line so whitespace-only differences share an entry."""
+    return " ".join(line.split())
+
+
+class CRFMemo:
+    """LRU + optional SQLite memo of CRF parses (JSON-serializable values)."""
+
+    def __init__(self, path: Optional[Path] = None, maxsize: int = DEFAULT_MAXSIZE):
+        """
+        Initialize the memo.
+
+        Args:
+            path: SQLite file of the persistent memo (None = in-process only)
+            maxsize: Number of lines kept in the in-process LRU
+        """
+        self.path = Path(path) if path else None
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._lru: "OrderedDict[str, list]" = OrderedDict()
+        self._local = threading.local()
+
+    @classmethod
+    def from_env(cls) -> "CRFMemo":
+        """Build a memo persisted at ``CRF_MEMO_PATH`` (in-process only when unset)."""
+        path = os.getenv("CRF_MEMO_PATH")
+        return cls(Path(path) if path else None)
+
+    @staticmethod
+    def make_key(line: str, version: str) -> str:
+        return f"{version}\x1f{normalize_line(line)}"
+
+    # ── Persistent layer ─────────────────────────────────────────────
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        if self.path is None:
+            return None
+        # Connections are per thread (and re-opened after a fork)
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(self.path, timeout=10)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("CREATE TABLE IF NOT EXISTS crf (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            except sqlite3.Error as e:
+                # The memo is an optimization — fall back to the in-process LRU
+                logger.warning(f"CRF memo unavailable at {self.path}: {e}")
+                self.path = None
+                return None
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    # ── Lookups ──────────────────────────────────────────────────────
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, list]:
+        """Cached parses of *keys* (missing keys are absent from the result)."""
+        found: Dict[str, list] = {}
+        missing: List[str] = []
+        for key in keys:
+            value = self._lru.get(key)
+            if value is None:
+                missing.append(key)
+            else:
+                self._lru.move_to_end(key)
+                found[key] = value
+
+        conn = self._connection() if missing else None
+        if conn is not None:
+            try:
+                # One query per 500 keys (SQLite variable limit)
+                for start in range(0, len(missing), 500):
+                    chunk = missing[start:start + 500]
+                    rows = conn.execute(
+                        f"SELECT key, value FROM crf WHERE key IN ({','.join('?' * len(chunk))})", chunk,
+                    ).fetchall()
+                    for key, value in rows:
+                        found[key] = json.loads(value)
+                        self._remember(key, found[key])
+            except (sqlite3.Error, json.JSONDecodeError) as e:
+                logger.warning(f"CRF memo read failed: {e}")
+
+        self.hits += len(found)
+        self.misses += len(set(missing) - found.keys())
+        return found
+
+    def put_many(self, values: Dict[str, list]) -> None:
+        """Store parses (one transaction for the persistent layer)."""
+        for key, value in values.items():
+            self._remember(key, value)
+        conn = self._connection() if values else None
+        if conn is not None:
+            try:
+                with conn:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO crf (key, value) VALUES (?, ?)",
+                        [(key, json.dumps(value, ensure_ascii=False)) for key, value in values.items()],
+                    )
+            except sqlite3.Error as e:
+                logger.warning(f"CRF memo write failed: {e}")
+
+    def _remember(self, key: str, value: list) -> None:
+        self._lru[key] = value
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.maxsize:
+            self._lru.popitem(last=False)
+
+    def clear(self) -> None:
+        """Forget the in-process entries (the persistent ones stay)."""
+        self._lru.clear()
@@ -0,0 +1,264 @@
+"""
+Deterministic graph repair — runs between the raw Pass 2 output and
+``Recipe.validate_graph``.
+
+Most graph validation failures are mechanical (a misspelled ref, a state
+produced twice, an ingredient nobody uses, steps listed out of order), yet
+each one used to cost a full LLM retry of the DAG generation (10–60 s).
+The repairs below fix them in place; the LLM is only asked again when the
+repaired graph still fails validation.
+
+Repairs, in order:
+  1. Rename duplicate produced states (later refs follow the latest producer)
+  2. Resolve refs with correct_step_references (suffix strip, name lookup)
+  3. Point finalState at a produced state
+  4. Reorder steps topologically (refs to states produced later)
+  5. Attach unused ingredients to the step that most plausibly uses them
+  6. Feed steps with empty ``uses`` the state of the previous step
+  7. Connect orphan states to the final step (and reorder again)
+
+Repairs are requested through the validation context of Recipe:
+``Recipe.model_validate(data, context={"graph_repairs": []})`` fills the list
+with the repairs applied.
+"""
+
+import heapq
+import logging
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from ..models.recipe import Ingredient, Step
+from ..shared import EQUIPMENT_KEYWORDS
+from .ingredient_parser import correct_step_references, resolve_ref
+
+logger = logging.getLogger(__name__)
+
+# Validation context key holding the list of applied repairs
+REPAIR_CONTEXT_KEY = "graph_repairs"
+
+_WORD_RE = re.compile(r"\w{4,}")
+
+
+@dataclass
+class GraphRepairReport:
+    """Deterministic repairs and LLM calls of one Pass 2 run."""
+
+    repairs: list[str] = field(default_factory=list)
+    llm_attempts: int = 0
+    llm_retries: int = 0
+    llm_seconds: float = 0.0
+
+    @property
+    def actions(self) -> Counter:
+        """Number of repairs per kind (rename_state, reorder_steps…)."""
+        return Counter(r.split(":", 1)[0] for r in self.repairs)
+
+    def summary(self) -> str:
+        actions = ", ".join(f"{name}×{count}" for name, count in sorted(self.actions.items()))
+        return (
+            f"{len(self.repairs)} graph repairs ({actions or 'none'}), "
+            f"{self.llm_attempts} LLM attempts ({self.llm_retries} retries) in {self.llm_seconds:.1f}s"
+        )
+
+
+def _is_equipment(step: Step) -> bool:
+    action = step.action.lower()
+    return any(kw in action for kw in EQUIPMENT_KEYWORDS)
+
+
+def _unique(base: str, taken: set[str]) -> str:
+    n = 2
+    while f"{base}_{n}" in taken:
+        n += 1
+    return f"{base}_{n}"
+
+
+def _rename_duplicate_states(steps: list[Step], final_state: str, taken: set[str], repairs: list[str]) -> str:
+    latest: dict[str, str] = {}
+    for step in steps:
+        # Refs read the latest version of a state produced so far
+        step.uses = [latest.get(ref, ref) for ref in step.uses]
+        step.requires = [latest.get(ref, ref) for ref in step.requires]
+        if step.produces in latest:
+            renamed = _unique(step.produces, taken)
+            repairs.append(f"rename_state: '{step.produces}' of step '{step.id}' → '{renamed}'")
+            taken.add(renamed)
+            latest[step.produces] = renamed
+            step.produces = renamed
+        else:
+            latest[step.produces] = step.produces
+    return latest.get(final_state, final_state)
+
+
+def _resolve_refs(steps: list[Step], ingredients: list[Ingredient], repairs: list[str]) -> None:
+    before = [(list(s.uses), list(s.requires)) for s in steps]
+    correct_step_references(
+        steps,
+        {ing.id for ing in ingredients},
+        {s.produces for s in steps},
+        ingredients=ingredients,
+    )
+    for step, (uses, requires) in zip(steps, before):
+        for old, new in ((uses, step.uses), (requires, step.requires)):
+            if old != new:
+                repairs.append(f"resolve_refs: step '{step.id}' {old} → {new}")
+
+
+def _consumed(steps: list[Step]) -> set[str]:
+    return {ref for s in steps for ref in s.uses + s.requires}
+
+
+def _fix_final_state(steps: list[Step], final_state: str, repairs: list[str]) -> str:
+    produced = {s.produces for s in steps}
+    if final_state in produced or not steps:
+        return final_state
+    resolved = resolve_ref(final_state, produced, {})
+    if resolved is None:
+        # The last state nobody consumes is the dish
+        consumed = _consumed(steps)
+        sinks = [s.produces for s in steps if s.produces not in consumed]
+        resolved = sinks[-1] if sinks else steps[-1].produces
+    repairs.append(f"final_state: '{final_state}' → '{resolved}'")
+    return resolved
+
+
+def _plausibility(ingredient: Ingredient, step: Step) -> int:
+    action = step.action.lower()
+    names = [n.lower() for n in (ingredient.name, ingredient.name_en, ingredient.id.replace("_", " ")) if n]
+    if any(name in action for name in names):
+        return 2
+    words = {w for name in names for w in _WORD_RE.findall(name)}
+    return 1 if any(w in action for w in words) else 0
+
+
+def _attach_unused_ingredients(steps: list[Step], ingredients: list[Ingredient], repairs: list[str]) -> None:
+    used = _consumed(steps)
+    for ingredient in ingredients:
+        if ingredient.optional or ingredient.id in used or not steps:
+            continue
+        best = max(steps, key=lambda s: _plausibility(ingredient, s))
+        if _plausibility(ingredient, best) == 0:
+            # No step names it: the first step transforming raw ingredients
+            ingredient_ids = {ing.id for ing in ingredients}
+            best = next(
+                (s for s in steps if not s.uses and not _is_equipment(s)),
+                next((s for s in steps if ingredient_ids & set(s.uses)), steps[0]),
+            )
+        best.uses.append(ingredient.id)
+        used.add(ingredient.id)
+        repairs.append(f"attach_ingredient: '{ingredient.id}' → step '{best.id}'")
+
+
+def _feed_empty_steps(steps: list[Step], repairs: list[str]) -> None:
+    for i, step in enumerate(steps):
+        if step.uses or i == 0 or _is_equipment(step):
+            continue
+        previous = next(
+            (s for s in reversed(steps[:i]) if s.subRecipe == step.subRecipe),
+            steps[i - 1],
+        )
+        step.uses = [previous.produces]
+        repairs.append(f"feed_step: step '{step.id}' uses '{previous.produces}'")
+
+
+def _connect_orphans(steps: list[Step], final_state: str, repairs: list[str]) -> None:
+    final_step = next((s for s in steps if s.produces == final_state), None)
+    if final_step is None:
+        return
+    consumed = _consumed(steps)
+    for step in steps:
+        if step is not final_step and step.produces not in consumed:
+            final_step.uses.append(step.produces)
+            repairs.append(f"connect_orphan: '{step.produces}' → step '{final_step.id}'")
+
+
+def _topological_order(steps: list[Step], repairs: list[str]) -> list[Step]:
+    producer = {s.produces: i for i, s in enumerate(steps)}
+    preds: list[set[int]] = [
+        {producer[ref] for ref in s.uses + s.requires if ref in producer and producer[ref] != i}
+        for i, s in enumerate(steps)
+    ]
+    succs: list[list[int]] = [[] for _ in steps]
+    for i, ps in enumerate(preds):
+        for p in ps:
+            succs[p].append(i)
+
+    indegree = [len(ps) for ps in preds]
+    # Kahn's algorithm, keeping the LLM order among ready steps
+    ready = [i for i, d in enumerate(indegree) if d == 0]
+    heapq.heapify(ready)
+    order: list[int] = []
+    while ready:
+        i = heapq.heappop(ready)
+        order.append(i)
+        for j in succs[i]:
+            indegree[j] -= 1
+            if indegree[j] == 0:
+                heapq.heappush(ready, j)
+
+    if len(order) < len(steps):
+        logger.warning("[Graph repair] Steps form a cycle — order left as is")
+        return steps
+    if order != list(range(len(steps))):
+        repairs.append(f"reorder_steps: {[steps[i].id for i in order]}")
+    return [steps[i] for i in order]
+
+
+def repair_graph(
+    ingredients: list[Ingredient],
+    steps: list[Step],
+    final_state: str,
+) -> tuple[list[Step], str, list[str]]:
+    """
+    Repair a recipe graph in place.
+
+    Args:
+        ingredients: Ingredients of the recipe
+        steps: Steps as generated (mutated)
+        final_state: finalState as generated
+
+    Returns:
+        (steps in their repaired order, finalState, repairs applied)
+    """
+    repairs: list[str] = []
+    taken = {ing.id for ing in ingredients} | {s.produces for s in steps}
+    final_state = _rename_duplicate_states(steps, final_state, taken, repairs)
+    _resolve_refs(steps, ingredients, repairs)
+    final_state = _fix_final_state(steps, final_state, repairs)
+    # Order first, so that "earliest plausible step" follows the dependencies
+    steps = _topological_order(steps, repairs)
+    _attach_unused_ingredients(steps, ingredients, repairs)
+    _feed_empty_steps(steps, repairs)
+    _connect_orphans(steps, final_state, repairs)
+    steps = _topological_order(steps, repairs)
+    return steps, final_state, repairs
+
+
+def repair_recipe_data(data: dict[str, Any], repairs: Optional[list[str]] = None) -> dict[str, Any]:
+    """
+    Repair the graph of raw recipe data (before Recipe validation).
+
+    Data whose ingredients or steps do not validate on their own is returned
+    unchanged: validation reports those errors.
+
+    Args:
+        data: Raw recipe dict (LLM output or model dump)
+        repairs: Filled with the repairs applied (replaced, not appended)
+    """
+    try:
+        ingredients = [Ingredient.model_validate(i) for i in data["ingredients"]]
+        steps = [Step.model_validate(s) for s in data["steps"]]
+        final_state = data["finalState"]
+    except Exception:
+        return data
+
+    steps, final_state, applied = repair_graph(ingredients, steps, final_state)
+    if repairs is not None:
+        repairs[:] = applied
+    if not applied:
+        return data
+    for repair in applied:
+        logger.info(f"[Graph repair] {repair}")
+    return {**data, "steps": [s.model_dump() for s in steps], "finalState": final_state}
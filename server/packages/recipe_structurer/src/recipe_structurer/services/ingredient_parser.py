@@ -7,6 +7,10 @@ Uses a combination of:
   - strangetom/ingredient-parser (CRF model) to parse qty/unit/name from the English translation
   - Deterministic ID correction: suffix strip + original-name lookup (replaces Levenshtein)
 
+The English lines of a recipe (or of several recipes) are CRF-parsed in one
+batch, and parses are memoized per normalized line and parser version
+(see crf_memo).
+
 The LLM (Pass 1) translates each ingredient line to English.
 The CRF parser deterministically extracts structured data from that English line.
 Each component does what it does best: LLM for translation, CRF for structure.
@@ -21,6 +25,7 @@ from unidecode import unidecode
 
 from ..models.recipe import Ingredient
 from ..shared import INGREDIENT_CATEGORIES
+from .crf_memo import CRFMemo, normalize_line
 
 logger = logging.getLogger(__name__)
 
@@ -28,17 +33,46 @@ logger = logging.getLogger(__name__)
 # CRF PARSER (lazy-loaded singleton)
 # ═══════════════════════════════════════════════════════════════════
 
-_parser_loaded = False
+# Bump when the fields extracted from a CRF result change (invalidates the memo)
+_CRF_EXTRACT_VERSION = 1
+
+_crf_module = None
+_crf_unavailable = False
+_memo: Optional[CRFMemo] = None
 
 
 def _ensure_parser():
-    """Ensure the ingredient-parser-nlp CRF model is loaded (happens on first import)."""
-    global _parser_loaded
-    if not _parser_loaded:
+    """Load the ingredient-parser-nlp CRF model once; None when it is not installed."""
+    global _crf_module, _crf_unavailable
+    if _crf_module is None and not _crf_unavailable:
         logger.info("Loading ingredient-parser-nlp (CRF model)...")
-        from ingredient_parser import parse_ingredient  # noqa: F401
-        _parser_loaded = True
+        try:
+            import ingredient_parser
+        except ImportError:
+            logger.debug("CRF parser not available, using English lines as fallback")
+            _crf_unavailable = True
+            return None
+        _crf_module = ingredient_parser
         logger.info("ingredient-parser-nlp loaded successfully")
+    return _crf_module
+
+
+def _parser_version(module) -> str:
+    return f"{getattr(module, '__version__', 'unknown')}+{_CRF_EXTRACT_VERSION}"
+
+
+def get_crf_memo() -> CRFMemo:
+    """Process-wide memo of CRF parses (persistent when CRF_MEMO_PATH is set)."""
+    global _memo
+    if _memo is None:
+        _memo = CRFMemo.from_env()
+    return _memo
+
+
+def set_crf_memo(memo: Optional[CRFMemo]) -> None:
+    """Replace the process-wide memo (None = rebuild from the environment on next use)."""
+    global _memo
+    _memo = memo
 
 
 # ═══════════════════════════════════════════════════════════════════
@@ -223,50 +257,117 @@ def _suffix_strip_match(ref: str, valid_ids: set[str]) -> Optional[str]:
     return None
 
 
-def _name_lookup_match(
-    ref: str,
-    name_to_id: dict[str, str],
-) -> Optional[str]:
-    """Try matching a ref against ingredient original-language names.
+_TOKEN_RE = re.compile(r"\w+")
+
+
+class RefResolver:
+    """
+    Name lookup of step references, built once per recipe.
+
+    Holds the normalized name table, an inverted index from word to the
+    names containing it, and the word-boundary pattern of every name, so a
+    lookup only checks the few names sharing words with the ref instead of
+    compiling a pattern per name.
 
-    Resolution order:
-      1. Exact match (case-insensitive, underscore-tolerant)
+    Semantics of the former per-ref scan:
+      1. Exact match (case-insensitive, underscores read as spaces)
       2. Word-boundary substring match — picks the shortest name that
          contains the ref (or vice-versa) to avoid "egg" matching
          "eggplant" when "egg" also exists.
     """
-    ref_normalized = ref.lower().replace("_", " ").strip()
-    if not ref_normalized:
-        return None
 
-    for name, ing_id in name_to_id.items():
-        name_normalized = name.lower().strip()
-        if ref_normalized == name_normalized:
-            return ing_id
-        if ref_normalized == name_normalized.replace(" ", "_"):
-            return ing_id
+    def __init__(self, name_to_id: dict[str, str]):
+        """
+        Compile the name table.
+
+        Args:
+            name_to_id: ingredient name (original or English) → ingredient ID
+        """
+        self._exact: dict[str, str] = {}
+        # (normalized name, id, \bname\b, word set), in name_to_id order
+        self._names: list[tuple[str, str, re.Pattern, frozenset[str]]] = []
+        self._index: dict[str, list[int]] = {}
+        # Names without any word char: candidates of every lookup
+        self._wordless: list[int] = []
+        for name, ing_id in name_to_id.items():
+            normalized = name.lower().strip()
+            self._exact.setdefault(normalized, ing_id)
+            if not normalized:
+                continue
+            i = len(self._names)
+            words = frozenset(_TOKEN_RE.findall(normalized))
+            self._names.append((normalized, ing_id, re.compile(rf"\b{re.escape(normalized)}\b"), words))
+            for word in words:
+                self._index.setdefault(word, []).append(i)
+            if not words:
+                self._wordless.append(i)
+        self._memo: dict[str, Optional[str]] = {}
+
+    def _candidates(self, ref_words: frozenset[str]) -> list[int]:
+        """
+        Names that can match the ref: when "\\bref\\b" occurs in a name, every
+        word of the ref is a word of the name, and conversely when the name
+        occurs in the ref. Either way they share a word (or have none).
+        """
+        if not ref_words:
+            return list(range(len(self._names)))
+        found = set(self._wordless)
+        for word in ref_words:
+            found.update(self._index.get(word, ()))
+        return sorted(found)
+
+    def lookup(self, ref: str) -> Optional[str]:
+        """Ingredient ID whose name matches *ref*, or None."""
+        ref_normalized = ref.lower().replace("_", " ").strip()
+        if not ref_normalized:
+            return None
+        if ref_normalized in self._memo:
+            return self._memo[ref_normalized]
+
+        match = self._exact.get(ref_normalized)
+        if match is None:
+            ref_words = frozenset(_TOKEN_RE.findall(ref_normalized))
+            ref_re = re.compile(rf"\b{re.escape(ref_normalized)}\b")
+            best_len = float("inf")
+            for i in self._candidates(ref_words):
+                name, ing_id, name_re, words = self._names[i]
+                if len(name) >= best_len:
+                    continue
+                if (
+                    (ref_words <= words and ref_re.search(name))
+                    or (words <= ref_words and name_re.search(ref_normalized))
+                ):
+                    best_len = len(name)
+                    match = ing_id
+
+        self._memo[ref_normalized] = match
+        return match
 
-    ref_re = re.compile(rf"\b{re.escape(ref_normalized)}\b")
-    best_id: Optional[str] = None
-    best_len = float("inf")
+    def resolve(self, ref: str, valid_ids: set[str]) -> Optional[str]:
+        """
+        Deterministic ref resolution chain:
+          1. Exact match against valid IDs
+          2. Suffix strip (_N) then exact match
+          3. Lookup against ingredient original-language names
+        Returns the resolved ID or None.
+        """
+        if ref in valid_ids:
+            return ref
+        return _suffix_strip_match(ref, valid_ids) or self.lookup(ref)
 
-    for name, ing_id in name_to_id.items():
-        name_normalized = name.lower().strip()
-        if not name_normalized:
-            continue
-        name_re = re.compile(rf"\b{re.escape(name_normalized)}\b")
-        if ref_re.search(name_normalized) or name_re.search(ref_normalized):
-            if len(name_normalized) < best_len:
-                best_len = len(name_normalized)
-                best_id = ing_id
 
-    return best_id
+def _name_lookup_match(
+    ref: str,
+    name_to_id: dict[str, str],
+) -> Optional[str]:
+    """Try matching a ref against ingredient original-language names (see RefResolver)."""
+    return RefResolver(name_to_id).lookup(ref)
 
 
 def resolve_ref(
     ref: str,
     valid_ids: set[str],
-    name_to_id: dict[str, str],
+    name_to_id: "dict[str, str] | RefResolver",
 ) -> Optional[str]:
     """
     Deterministic ref resolution chain:
@@ -274,39 +375,112 @@ def resolve_ref(
       2. Suffix strip (_N) then exact match
       3. Lookup against ingredient original-language names
     Returns the resolved ID or None.
+
+    Pass a RefResolver instead of the name table when resolving several
+    refs of the same recipe.
     """
-    if ref in valid_ids:
-        return ref
+    resolver = name_to_id if isinstance(name_to_id, RefResolver) else RefResolver(name_to_id)
+    return resolver.resolve(ref, valid_ids)
 
-    match = _suffix_strip_match(ref, valid_ids)
-    if match:
-        return match
 
-    match = _name_lookup_match(ref, name_to_id)
-    if match:
-        return match
+# ═══════════════════════════════════════════════════════════════════
+# MAIN PARSING FUNCTIONS
+# ═══════════════════════════════════════════════════════════════════
 
-    return None
+_OPTIONAL_MARKERS = ("optionnel", "optional", "à volonté")
 
 
-# ═══════════════════════════════════════════════════════════════════
-# MAIN PARSING FUNCTION
-# ═══════════════════════════════════════════════════════════════════
+def _crf_fields(result) -> list:
+    """[name_en, quantity, unit, preparation_en] of a CRF ParsedIngredient (JSON-serializable)."""
+    name_en = None
+    quantity = None
+    unit = None
+    preparation_en = None
 
-def parse_ingredient_line(line: str) -> Optional[Ingredient]:
+    if result.name:
+        name_en = result.name[0].text if isinstance(result.name, list) else result.name.text
+
+    if result.amount:
+        amt = result.amount[0]
+        try:
+            quantity = float(amt.quantity) if amt.quantity is not None else None
+        except (ValueError, TypeError):
+            if isinstance(amt.quantity, Fraction):
+                quantity = float(amt.quantity)
+
+        unit = normalize_unit(amt.unit)
+
+    if result.preparation:
+        if isinstance(result.preparation, list):
+            preparation_en = result.preparation[0].text if result.preparation else None
+        else:
+            preparation_en = result.preparation.text
+
+    return [name_en, quantity, unit, preparation_en]
+
+
+def parse_english_lines(en_lines: list[str]) -> list[Optional[list]]:
     """
-    Parse a single ingredient line from Pass 1 output into an Ingredient.
+    CRF-parse a batch of English ingredient lines.
 
-    Expected format from Pass 1:
-      "- 250g «champignons de Paris» [250g mushrooms, sliced] {produce}, émincés"
-      "- «sel» [salt] {spice} (à volonté)"
+    Lines are normalized and deduplicated, looked up in the memo, and only
+    the misses go through the CRF model (featurized and tagged in one
+    ``parse_multiple_ingredients`` call when the installed version has it).
 
-    Flow:
-      1. Extract «clean_name» → name (original language)
-      2. Extract [full english line] → send to CRF parser
-      3. CRF parser returns: qty, unit, name_en, preparation
-      4. Build Ingredient
+    Returns:
+        Per line [name_en, quantity, unit, preparation_en], or None when the
+        CRF parser is unavailable or failed on that line.
     """
+    module = _ensure_parser()
+    if module is None or not en_lines:
+        return [None] * len(en_lines)
+
+    memo = get_crf_memo()
+    version = _parser_version(module)
+    keys = [CRFMemo.make_key(line, version) for line in en_lines]
+    known = memo.get_many(dict.fromkeys(keys))
+
+    todo: dict[str, str] = {}
+    for key, line in zip(keys, en_lines):
+        if key not in known:
+            todo.setdefault(key, normalize_line(line))
+
+    if todo:
+        sentences = list(todo.values())
+        results: list = []
+        batch_parse = getattr(module, "parse_multiple_ingredients", None)
+        if batch_parse is not None and len(sentences) > 1:
+            try:
+                results = batch_parse(sentences)
+            except Exception as e:
+                logger.warning(f"Batched CRF parsing failed, parsing lines one by one: {e}")
+                results = []
+        if len(results) != len(sentences):
+            results = []
+            for sentence in sentences:
+                try:
+                    results.append(module.parse_ingredient(sentence))
+                except Exception as e:
+                    logger.error(f"CRF parser failed on '{sentence}': {e}")
+                    results.append(None)
+
+        parsed: dict[str, list] = {}
+        for key, result in zip(todo, results):
+            if result is None:
+                continue
+            try:
+                parsed[key] = _crf_fields(result)
+            except Exception as e:
+                logger.error(f"CRF parser failed on '{todo[key]}': {e}")
+        memo.put_many(parsed)
+        known.update(parsed)
+        logger.debug(f"CRF parsed {len(todo)} new lines ({len(en_lines) - len(todo)} from memo)")
+
+    return [known.get(key) for key in keys]
+
+
+def _extract_annotations(line: str) -> Optional[dict]:
+    """Annotations of a Pass 1 ingredient line, or None for lines without «»."""
     line = line.strip()
     if not line:
         return None
@@ -321,26 +495,17 @@ def parse_ingredient_line(line: str) -> Optional[Ingredient]:
         logger.debug(f"Skipping line without «» annotation: {line[:80]}")
         return None
 
-    name_original = name_guillemets.group(1).strip()
-
     # ── Extract annotations ────────────────────────────────────
     category_match = re.search(r"\{(\w+)\}", line)
-    category = category_match.group(1) if category_match else "other"
-
     en_matches = re.findall(r"\[([^\]]+)\]", line)
-    en_full_line = en_matches[0] if en_matches else ""
 
     line_lower = line.lower()
-    optional = (
-        "(optionnel)" in line_lower
-        or "(optional)" in line_lower
-        or "(à volonté)" in line_lower
-    )
+    optional = any(f"({marker})" in line_lower for marker in _OPTIONAL_MARKERS)
 
     notes = None
     for m in re.finditer(r"\(([^)]+)\)", line):
         text = m.group(1)
-        if text.lower() not in ("optionnel", "optional", "à volonté"):
+        if text.lower() not in _OPTIONAL_MARKERS:
             notes = text
             break
 
@@ -357,48 +522,28 @@ def parse_ingredient_line(line: str) -> Optional[Ingredient]:
         if prep_text:
             preparation_original = prep_text
 
-    # ── Parse English line with CRF parser ─────────────────────
-    quantity = None
-    unit = None
-    name_en = None
-    preparation_en = None
-
-    if en_full_line:
-        crf_available = False
-        try:
-            _ensure_parser()
-            from ingredient_parser import parse_ingredient
-            crf_available = True
-        except (ImportError, ModuleNotFoundError):
-            logger.debug("CRF parser not available, using English line as fallback")
-            name_en = en_full_line
-
-        if crf_available:
-            try:
-                result = parse_ingredient(en_full_line)
-
-                if result.name:
-                    name_en = result.name[0].text if isinstance(result.name, list) else result.name.text
-
-                if result.amount:
-                    amt = result.amount[0]
-                    try:
-                        quantity = float(amt.quantity) if amt.quantity is not None else None
-                    except (ValueError, TypeError):
-                        if isinstance(amt.quantity, Fraction):
-                            quantity = float(amt.quantity)
-
-                    unit = normalize_unit(amt.unit)
-
-                if result.preparation:
-                    if isinstance(result.preparation, list):
-                        preparation_en = result.preparation[0].text if result.preparation else None
-                    else:
-                        preparation_en = result.preparation.text
-
-            except Exception as e:
-                logger.error(f"CRF parser failed on '{en_full_line}': {e}")
-                name_en = en_full_line
+    return {
+        "name": name_guillemets.group(1).strip(),
+        "category": category_match.group(1) if category_match else "other",
+        "en_line": en_matches[0] if en_matches else "",
+        "optional": optional,
+        "notes": notes,
+        "preparation": preparation_original,
+    }
+
+
+def _build_ingredient(annotations: dict, crf: Optional[list]) -> Ingredient:
+    """Ingredient from the line annotations and the CRF parse of its English line."""
+    name_original = annotations["name"]
+    en_full_line = annotations["en_line"]
+    notes = annotations["notes"]
+    category = annotations["category"]
+
+    if crf is not None:
+        name_en, quantity, unit, preparation_en = crf
+    else:
+        # No CRF parse: the English line stands for the name
+        name_en, quantity, unit, preparation_en = en_full_line or None, None, None, None
 
     # ── Post-CRF quantity normalization ──────────────────────
     quantity_source: Optional[str] = None
@@ -409,7 +554,7 @@ def parse_ingredient_line(line: str) -> Optional[Ingredient]:
         notes = f"{modifier_note}; {existing_notes}" if existing_notes else modifier_note
 
     # ── Build Ingredient ─────────────────────────────────────
-    preparation = preparation_original or preparation_en
+    preparation = annotations["preparation"] or preparation_en
     final_name_en = name_en or en_full_line or name_original
     ingredient_id = make_ingredient_id(final_name_en)
 
@@ -432,19 +577,68 @@ def parse_ingredient_line(line: str) -> Optional[Ingredient]:
         category=category,
         preparation=preparation,
         notes=notes,
-        optional=optional,
+        optional=annotations["optional"],
         quantitySource=quantity_source,
     )
 
 
-def parse_ingredients_from_preformat(preformatted_text: str) -> list[Ingredient]:
+def parse_ingredient_lines(lines: list[str]) -> list[Optional[Ingredient]]:
     """
-    Extract and parse all ingredient lines from a Pass 1 preformatted output.
+    Parse a batch of ingredient lines from Pass 1 output.
 
-    Finds the INGREDIENTS section and parses each line using the CRF parser.
-    Returns a list of Ingredient objects with deduplicated IDs (suffix _2, _3, etc.).
-    Duplicate ingredients are kept separate to preserve preparation context for the DAG.
+    The annotations of every line are extracted first, then all English
+    lines go through the CRF parser in one batch (see parse_english_lines).
+
+    Returns:
+        One Ingredient per line, None for lines without «» annotations or
+        that failed to parse.
+    """
+    annotations: list[Optional[dict]] = []
+    for line in lines:
+        try:
+            annotations.append(_extract_annotations(line))
+        except Exception as e:
+            logger.error(f"Failed to parse ingredient line: '{line}' — {e}")
+            annotations.append(None)
+
+    with_en = [a for a in annotations if a is not None and a["en_line"]]
+    crf_by_line = dict(zip(
+        (id(a) for a in with_en),
+        parse_english_lines([a["en_line"] for a in with_en]),
+    ))
+
+    ingredients: list[Optional[Ingredient]] = []
+    for line, annotation in zip(lines, annotations):
+        if annotation is None:
+            ingredients.append(None)
+            continue
+        try:
+            ingredients.append(_build_ingredient(annotation, crf_by_line.get(id(annotation))))
+        except Exception as e:
+            logger.error(f"Failed to parse ingredient line: '{line}' — {e}")
+            ingredients.append(None)
+    return ingredients
+
+
+def parse_ingredient_line(line: str) -> Optional[Ingredient]:
     """
+    Parse a single ingredient line from Pass 1 output into an Ingredient.
+
+    Expected format from Pass 1:
+      "- 250g «champignons de Paris» [250g mushrooms, sliced] {produce}, émincés"
+      "- «sel» [salt] {spice} (à volonté)"
+
+    Flow:
+      1. Extract «clean_name» → name (original language)
+      2. Extract [full english line] → send to CRF parser
+      3. CRF parser returns: qty, unit, name_en, preparation
+      4. Build Ingredient
+    """
+    return parse_ingredient_lines([line])[0]
+
+
+def _ingredient_lines(preformatted_text: str) -> Optional[list[str]]:
+    """Ingredient lines of the INGREDIENTS section, or None when there is none."""
     ingredients_match = re.search(
         r"^INGREDIENTS:\s*\n(.*?)(?=\n(?:INSTRUCTIONS|TOOLS|NOTES):|\Z)",
         preformatted_text,
@@ -453,7 +647,7 @@ def parse_ingredients_from_preformat(preformatted_text: str) -> list[Ingredient]
 
     if not ingredients_match:
         logger.warning("No INGREDIENTS section found in preformatted text")
-        return []
+        return None
 
     ingredients_text = ingredients_match.group(1)
     lines = [l.strip() for l in ingredients_text.split("\n") if l.strip()]
@@ -467,39 +661,67 @@ def parse_ingredients_from_preformat(preformatted_text: str) -> list[Ingredient]
         elif l.startswith("- ") or (l and l[0].isdigit()):
             logger.debug(f"Ingredient line without «» annotations, keeping: {l[:80]}")
             ingredient_lines.append(l)
+    return ingredient_lines
 
-    logger.info(f"Found {len(ingredient_lines)} ingredient lines to parse")
 
+def _dedupe_ids(ingredients: list[Optional[Ingredient]]) -> list[Ingredient]:
+    """Drop unparsed lines and suffix repeated IDs (_1, _2, ...)."""
     parsed: list[Ingredient] = []
     seen_ids: dict[str, int] = {}
 
-    for line in ingredient_lines:
-        try:
-            ingredient = parse_ingredient_line(line)
-            if ingredient is None:
-                continue
-
-            base_id = ingredient.id
-            if base_id in seen_ids:
-                seen_ids[base_id] += 1
-                ingredient.id = f"{base_id}_{seen_ids[base_id]}"
-            else:
-                seen_ids[base_id] = 0
+    for ingredient in ingredients:
+        if ingredient is None:
+            continue
 
-            parsed.append(ingredient)
+        base_id = ingredient.id
+        if base_id in seen_ids:
+            seen_ids[base_id] += 1
+            ingredient.id = f"{base_id}_{seen_ids[base_id]}"
+        else:
+            seen_ids[base_id] = 0
 
-        except Exception as e:
-            logger.error(f"Failed to parse ingredient line: '{line}' — {e}")
-            continue
+        parsed.append(ingredient)
 
     logger.info(
         f"Parsed {len(parsed)} ingredients "
         f"({sum(1 for p in parsed if p.quantity is not None)} with quantities)"
     )
-
     return parsed
 
 
+def parse_ingredients_from_preformat(preformatted_text: str) -> list[Ingredient]:
+    """
+    Extract and parse all ingredient lines from a Pass 1 preformatted output.
+
+    Finds the INGREDIENTS section and parses its lines in one CRF batch.
+    Returns a list of Ingredient objects with deduplicated IDs (suffix _2, _3, etc.).
+    Duplicate ingredients are kept separate to preserve preparation context for the DAG.
+    """
+    return parse_ingredients_from_preformats([preformatted_text])[0]
+
+
+def parse_ingredients_from_preformats(preformatted_texts: list[str]) -> list[list[Ingredient]]:
+    """
+    Parse the ingredients of several Pass 1 outputs with a single CRF batch.
+
+    Used by bulk re-imports and benchmarks: lines shared by several recipes
+    are parsed once.
+
+    Returns:
+        The ingredients of each text, as parse_ingredients_from_preformat.
+    """
+    per_text = [_ingredient_lines(text) or [] for text in preformatted_texts]
+    logger.info(f"Found {sum(map(len, per_text))} ingredient lines to parse")
+
+    flat = parse_ingredient_lines([line for lines in per_text for line in lines])
+    results: list[list[Ingredient]] = []
+    start = 0
+    for lines in per_text:
+        results.append(_dedupe_ids(flat[start:start + len(lines)]))
+        start += len(lines)
+    return results
+
+
 def correct_step_references(
     steps: list,
     ingredient_ids: set[str],
@@ -529,13 +751,14 @@ def correct_step_references(
                 name_to_id[ing.name] = ing.id
             if ing.name_en:
                 name_to_id[ing.name_en] = ing.id
+    resolver = RefResolver(name_to_id)
 
     corrections = 0
 
     for step in steps:
         corrected_uses = []
         for ref in step.uses:
-            resolved = resolve_ref(ref, all_valid, name_to_id)
+            resolved = resolver.resolve(ref, all_valid)
             if resolved:
                 if resolved != ref:
                     logger.warning(
@@ -553,7 +776,7 @@ def correct_step_references(
 
         corrected_requires = []
         for ref in step.requires:
-            resolved = resolve_ref(ref, produced_states, name_to_id)
+            resolved = resolver.resolve(ref, produced_states)
             if resolved:
                 if resolved != ref:
                     logger.warning(
@@ -0,0 +1,191 @@
+"""
+Persistent content-hash cache for LLM responses (Pass 1, Pass 2, Pass 3).
+
+Each entry is keyed on everything that determines the answer:
+
+    (pass, model, prompt template hash, normalized input hash, temperature, variant)
+
+so re-importing an unchanged page, re-running the pipeline or a backfill
+costs no tokens, while any prompt or schema change invalidates the entries
+of that pass on its own. ``variant`` distinguishes independent samples of
+the same input (e.g. the reviewer's consensus calls).
+
+Layout: ``<cache_dir>/<pass>/<key>.json``, written atomically. Total size is
+bounded by ``max_bytes``; least recently used entries are evicted first.
+
+Bypass:
+  - ``read=False``  ignore existing entries but refresh them (``--refresh-llm-cache``)
+  - ``write=False`` read-only
+  - environment: ``LLM_CACHE_DIR`` enables the cache, ``LLM_CACHE_BYPASS=1`` sets read=False
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def normalize_input(text: str) -> str:
+    """Normalize prompt input so whitespace-only differences share an entry."""
+    return "\n".join(" ".join(line.split()) for line in text.strip().splitlines())
+
+
+class LLMResponseCache:
+    """On-disk LLM response cache with LRU size-bounded eviction."""
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        read: bool = True,
+        write: bool = True,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Root directory of the cache
+            max_bytes: Upper bound on the total size of cached responses
+            read: Serve cached responses (False = bypass, but still refresh entries)
+            write: Store new responses
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.read = read
+        self.write = write
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls) -> Optional["LLMResponseCache"]:
+        """Build a cache from ``LLM_CACHE_DIR`` / ``LLM_CACHE_BYPASS``, or None if unset."""
+        cache_dir = os.getenv("LLM_CACHE_DIR")
+        if not cache_dir:
+            return None
+        bypass = os.getenv("LLM_CACHE_BYPASS", "").lower() in ("1", "true", "yes")
+        return cls(Path(cache_dir), read=not bypass)
+
+    @staticmethod
+    def make_key(
+        pass_name: str,
+        model: str,
+        template: str,
+        input_text: str,
+        temperature: float,
+        variant: int = 0,
+    ) -> str:
+        """
+        Build the cache key of one LLM call.
+
+        Args:
+            pass_name: Pipeline pass ("preformat", "dag", "review"…)
+            model: Model identifier
+            template: Everything fixed by the code for this pass (system prompt,
+                response schema…) — hashed, so any change invalidates entries
+            input_text: Variable part of the prompt (normalized before hashing)
+            temperature: Sampling temperature
+            variant: Index of an independent sample of the same call
+        """
+        parts = [
+            pass_name,
+            model,
+            _sha256(template),
+            _sha256(normalize_input(input_text)),
+            f"{temperature:.3f}",
+            str(variant),
+        ]
+        return _sha256("\x1f".join(parts))
+
+    def _path(self, pass_name: str, key: str) -> Path:
+        return self.cache_dir / pass_name / f"{key}.json"
+
+    def get(self, pass_name: str, key: str) -> Optional[str]:
+        """Return the cached response for *key*, or None (miss, bypass, unreadable)."""
+        if not self.read:
+            return None
+        path = self._path(pass_name, key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                response = json.load(f)["response"]
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (json.JSONDecodeError, KeyError, OSError) as e:
+            logger.warning(f"Corrupt LLM cache entry {path.name}: {e}")
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)  # LRU bookkeeping
+        except OSError:
+            pass
+        self.hits += 1
+        logger.info(f"[LLM cache] {pass_name} hit ({key[:12]})")
+        return response
+
+    def put(self, pass_name: str, key: str, response: str, model: str = "") -> None:
+        """Store *response* under *key* (atomic write), then enforce the size bound."""
+        if not self.write:
+            return
+        path = self._path(pass_name, key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            payload = json.dumps(
+                {"pass": pass_name, "model": model, "created_at": time.time(), "response": response},
+                ensure_ascii=False,
+            )
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp", prefix=key[:12])
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    f.write(payload)
+                os.replace(tmp, path)
+            except BaseException:
+                try:
+                    os.unlink(tmp)
+                except OSError:
+                    pass
+                raise
+        except OSError as e:
+            # The cache is an optimization — never fail a pass on it
+            logger.warning(f"Could not write LLM cache entry: {e}")
+            return
+        self.evict()
+
+    def evict(self) -> int:
+        """Remove least recently used entries until the cache fits in ``max_bytes``.
+
+        Returns:
+            Number of entries removed.
+        """
+        entries = []
+        total = 0
+        for path in self.cache_dir.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+        if total <= self.max_bytes:
+            return 0
+
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        logger.info(f"[LLM cache] Evicted {removed} entries ({total} bytes kept)")
+        return removed
@@ -13,12 +13,14 @@ from openai import AsyncOpenAI
 
 from ..prompts.preformat import PREFORMAT_SYSTEM_PROMPT, get_preformat_user_prompt
 from ..exceptions import RecipeRejectedError
+from .llm_cache import LLMResponseCache
 
 logger = logging.getLogger(__name__)
 
 MAX_RETRIES = 2
 RETRY_DELAY_S = 3
 LLM_TIMEOUT_S = 120
+TEMPERATURE = 0.1
 
 
 async def preformat_recipe(
@@ -28,6 +30,7 @@ async def preformat_recipe(
     image_urls: Optional[List[str]] = None,
     max_tokens: int = 4096,
     extra_body: Optional[dict] = None,
+    cache: Optional[LLMResponseCache] = None,
 ) -> str:
     """
     Preformat raw recipe text into a clean structured text format.
@@ -44,6 +47,7 @@ async def preformat_recipe(
         recipe_text: Raw recipe content (from scraping, user input, etc.).
         image_urls: Optional list of image URLs found with the recipe.
         max_tokens: Maximum tokens for the response.
+        cache: Optional LLM response cache (keyed on prompt + input text).
 
     Returns:
         Preformatted structured text.
@@ -59,6 +63,16 @@ async def preformat_recipe(
         {"role": "user", "content": get_preformat_user_prompt(recipe_text, image_urls)},
     ]
 
+    cache_key = None
+    if cache:
+        cache_key = cache.make_key(
+            "preformat", model, PREFORMAT_SYSTEM_PROMPT, messages[1]["content"], TEMPERATURE,
+        )
+        cached = cache.get("preformat", cache_key)
+        if cached:
+            logger.info(f"Preformat served from LLM cache ({len(cached)} chars)")
+            return cached
+
     last_error: Optional[Exception] = None
 
     for attempt in range(1, MAX_RETRIES + 1):
@@ -68,7 +82,7 @@ async def preformat_recipe(
                     model=model,
                     messages=messages,
                     max_tokens=max_tokens,
-                    temperature=0.1,
+                    temperature=TEMPERATURE,
                     **({"extra_body": extra_body} if extra_body else {}),
                 ),
                 timeout=LLM_TIMEOUT_S,
@@ -95,6 +109,9 @@ async def preformat_recipe(
 
             logger.info(f"Preformat complete ({len(result)} chars output)")
             logger.debug(f"Preformat output preview: {result[:300]}...")
+            # Truncated outputs are not cached: a rerun may get a complete one
+            if cache and finish_reason != "length":
+                cache.put("preformat", cache_key, result, model=model)
             return result
 
         except RecipeRejectedError:
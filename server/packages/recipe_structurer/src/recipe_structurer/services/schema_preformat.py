@@ -0,0 +1,634 @@
+"""
+Schema.org fast path for Pass 1 (preformat without the LLM round-trip).
+
+When a page ships a complete schema.org/Recipe JSON-LD block, the Pass 1
+output format can be produced deterministically:
+
+  - metadata, tags, notes, tools and instructions come straight from the JSON-LD
+  - each ingredient line gets its «name» [english] {category} annotations from
+      1. the annotation cache (lines previously annotated by the LLM, kept in LLM_CACHE_DIR)
+      2. the seed dictionary (data/ingredient_dictionary.json) + unit/preparation tables
+      3. a single, small LLM call covering only the lines left over
+
+If the JSON-LD is incomplete, or the LLM fallback fails, ``preformat_from_schema``
+returns None and the caller runs the regular Pass 1.
+"""
+
+import asyncio
+import html
+import json
+import logging
+import os
+import re
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: saves are still atomic, merges are best effort
+    fcntl = None
+
+from openai import AsyncOpenAI
+
+from ..prompts.preformat import (
+    INGREDIENT_ANNOTATION_SYSTEM_PROMPT,
+    get_ingredient_annotation_user_prompt,
+)
+from ..shared import INGREDIENT_CATEGORIES, parse_iso8601_minutes
+
+logger = logging.getLogger(__name__)
+
+_DATA_DIR = Path(__file__).parent.parent / "data"
+DICTIONARY_PATH = _DATA_DIR / "ingredient_dictionary.json"
+ANNOTATION_CACHE_FILENAME = "ingredient_annotations.json"
+
+LLM_TIMEOUT_S = 60
+MIN_INGREDIENTS = 2
+
+
+# ═══════════════════════════════════════════════════════════════════
+# ANNOTATION CACHE
+# ═══════════════════════════════════════════════════════════════════
+
+class IngredientAnnotationCache:
+    """
+    Persistent map: raw schema.org ingredient line → annotated Pass 1 line(s).
+
+    Filled by the LLM fallback so that an ingredient line seen once never
+    needs the LLM again. Keys include the recipe language because the
+    «name» annotation stays in the source language.
+
+    The file is shared by concurrent import processes: ``save`` takes a lock,
+    merges this process's new entries into the current file and replaces it
+    atomically, so no process drops the entries written by another.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Args:
+            path: JSON file backing the cache (None keeps it in memory only)
+        """
+        self.path = Path(path) if path else None
+        self._data: dict[str, list[str]] = self._read() if self.path else {}
+        self._new: dict[str, list[str]] = {}
+
+    @classmethod
+    def from_env(cls) -> "IngredientAnnotationCache":
+        """Cache stored next to the LLM responses (``LLM_CACHE_DIR``); in memory when unset."""
+        cache_dir = os.getenv("LLM_CACHE_DIR")
+        return cls(Path(cache_dir) / ANNOTATION_CACHE_FILENAME if cache_dir else None)
+
+    @staticmethod
+    def _key(line: str, language: str) -> str:
+        return f"{language}|{' '.join(line.lower().split())}"
+
+    def _read(self) -> dict[str, list[str]]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return {k: v for k, v in json.load(f).items() if not k.startswith("_")}
+        except FileNotFoundError:
+            return {}
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning(f"Could not load ingredient annotation cache {self.path}: {e}")
+            return {}
+
+    def get(self, line: str, language: str) -> Optional[list[str]]:
+        return self._data.get(self._key(line, language))
+
+    def put(self, line: str, language: str, annotated: list[str]) -> None:
+        key = self._key(line, language)
+        self._data[key] = annotated
+        self._new[key] = annotated
+
+    def save(self) -> None:
+        """Merge new entries into the file atomically (no-op when nothing changed)."""
+        if not self._new or not self.path:
+            return
+        tmp = None
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path.with_suffix(".lock"), "w") as lock:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_EX)
+                merged = self._read()
+                merged.update(self._new)
+                fd, tmp = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp", prefix=self.path.stem)
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(merged, f, ensure_ascii=False, indent=1, sort_keys=True)
+                os.replace(tmp, self.path)
+            self._data.update(merged)
+            self._new.clear()
+        except OSError as e:
+            logger.warning(f"Could not save ingredient annotation cache: {e}")
+            if tmp and os.path.exists(tmp):
+                os.unlink(tmp)
+
+
+# ═══════════════════════════════════════════════════════════════════
+# DICTIONARY-BASED ANNOTATION
+# ═══════════════════════════════════════════════════════════════════
+
+@lru_cache(maxsize=1)
+def _load_dictionary() -> dict[str, dict]:
+    """Load the seed ingredient dictionary (``{"fr": {...}, "en": {...}}``)."""
+    try:
+        with open(DICTIONARY_PATH, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return {"fr": data.get("fr", {}), "en": data.get("en", {})}
+    except (json.JSONDecodeError, OSError) as e:
+        logger.warning(f"Could not load ingredient dictionary: {e}")
+        return {"fr": {}, "en": {}}
+
+
+# Source unit → English unit (as written in the [english] annotation)
+_UNITS = {
+    "fr": {
+        "cuillères à soupe": "tablespoons", "cuillère à soupe": "tablespoon",
+        "cuillères à café": "teaspoons", "cuillère à café": "teaspoon",
+        "c. à soupe": "tablespoon", "c. à s.": "tablespoon", "c.à.s": "tablespoon",
+        "c-à-s": "tablespoon", "càs": "tablespoon", "cs": "tablespoon",
+        "c. à café": "teaspoon", "c. à c.": "teaspoon", "c.à.c": "teaspoon",
+        "c-à-c": "teaspoon", "càc": "teaspoon", "cc": "teaspoon",
+        "gousses": "cloves", "gousse": "clove", "pincées": "pinches", "pincée": "pinch",
+        "bottes": "bunches", "botte": "bunch", "bouquet": "bunch",
+        "branches": "sprigs", "branche": "sprig", "brins": "sprigs", "brin": "sprig",
+        "tranches": "slices", "tranche": "slice", "feuilles": "leaves", "feuille": "leaf",
+        "boîtes": "cans", "boîte": "can", "verres": "glasses", "verre": "glass",
+        "sachets": "packets", "sachet": "packet", "poignées": "handfuls", "poignée": "handful",
+        "kg": "kg", "g": "g", "mg": "mg", "l": "l", "dl": "dl", "cl": "cl", "ml": "ml",
+    },
+    "en": {
+        "tablespoons": "tablespoons", "tablespoon": "tablespoon", "tbsp": "tbsp", "tbs": "tbsp",
+        "teaspoons": "teaspoons", "teaspoon": "teaspoon", "tsp": "tsp",
+        "cups": "cups", "cup": "cup", "cloves": "cloves", "clove": "clove",
+        "pinches": "pinches", "pinch": "pinch", "bunches": "bunches", "bunch": "bunch",
+        "sprigs": "sprigs", "sprig": "sprig", "slices": "slices", "slice": "slice",
+        "leaves": "leaves", "handfuls": "handfuls", "handful": "handful",
+        "pounds": "pounds", "pound": "pound", "lbs": "lb", "lb": "lb",
+        "ounces": "ounces", "ounce": "ounce", "oz": "oz",
+        "kg": "kg", "g": "g", "l": "l", "ml": "ml",
+    },
+}
+
+# French preparation → English (only these are translated deterministically)
+_PREPARATIONS_FR = {
+    "émincé": "sliced", "émincée": "sliced", "émincés": "sliced", "émincées": "sliced",
+    "haché": "minced", "hachée": "minced", "hachés": "minced", "hachées": "minced",
+    "ciselé": "finely chopped", "ciselée": "finely chopped", "ciselés": "finely chopped", "ciselées": "finely chopped",
+    "râpé": "grated", "râpée": "grated", "râpés": "grated", "râpées": "grated",
+    "pelé": "peeled", "pelée": "peeled", "pelés": "peeled", "pelées": "peeled",
+    "égoutté": "drained", "égouttée": "drained", "égouttés": "drained", "égouttées": "drained",
+    "fondu": "melted", "fondue": "melted", "ramolli": "softened", "pressé": "juiced",
+    "coupé en dés": "diced", "coupés en dés": "diced", "coupée en dés": "diced", "coupées en dés": "diced",
+    "en dés": "diced", "en cubes": "cubed", "en rondelles": "sliced into rounds",
+    "rincé": "rinsed", "rincées": "rinsed", "rincés": "rinsed", "écrasé": "crushed", "écrasées": "crushed",
+    "battu": "beaten", "battus": "beaten", "à température ambiante": "at room temperature",
+}
+
+_UNICODE_FRACTIONS = {"½": "1/2", "¼": "1/4", "¾": "3/4", "⅓": "1/3", "⅔": "2/3"}
+
+_QTY_RE = re.compile(
+    r"^(?P<qty>\d+(?:[.,]\d+)?(?:\s+\d+/\d+|/\d+)?(?:\s*(?:-|à|to)\s*\d+(?:[.,]\d+)?)?)\s*"
+)
+_ARTICLE_QTY_RE = re.compile(r"^(?:an?|one)\s+", re.IGNORECASE)
+_LINKING_WORDS_RE = re.compile(r"^(?:de\s+la\s+|de\s+l['’]|de\s+|d['’]|du\s+|des\s+|of\s+)", re.IGNORECASE)
+
+
+def _split_unit(rest: str, language: str) -> tuple[Optional[str], Optional[str], str]:
+    """Split a leading unit off *rest*; returns (source unit, english unit, remainder)."""
+    lowered = rest.lower()
+    for unit in sorted(_UNITS[language], key=len, reverse=True):
+        if lowered.startswith(unit):
+            after = rest[len(unit):]
+            if after and after[0].isalpha():
+                continue  # "g" of "gousse", "cs" of "cspéciale"…
+            return rest[:len(unit)], _UNITS[language][unit], after.strip()
+    return None, None, rest
+
+
+def annotate_ingredient_line(line: str, language: str) -> Optional[str]:
+    """
+    Annotate one schema.org ingredient line from the seed dictionary.
+
+    Args:
+        line: Raw ingredient line, e.g. "200 g de lentilles corail, rincées"
+        language: Recipe language ("fr" or "en"; anything else returns None)
+
+    Returns:
+        The Pass 1 line ("- 200 g «lentilles corail» [200 g red lentils, rinsed] {legume}, rincées"),
+        or None when any part cannot be annotated deterministically.
+    """
+    if language not in _UNITS:
+        return None
+    text = " ".join(line.split())
+    for symbol, fraction in _UNICODE_FRACTIONS.items():
+        text = text.replace(symbol, f" {fraction}").strip()
+    # Parentheses usually hold weights or alternatives that need judgement
+    if not text or any(c in text for c in "()[]{}«»") or " ou " in text or " or " in text:
+        return None
+
+    head, _, prep = text.partition(",")
+    prep = prep.strip()
+
+    qty = None
+    m = _QTY_RE.match(head)
+    if m:
+        qty = m.group("qty")
+        head = head[m.end():]
+    elif language == "en" and _ARTICLE_QTY_RE.match(head):
+        qty = "1"
+        head = _ARTICLE_QTY_RE.sub("", head)
+
+    unit_src, unit_en, name = _split_unit(head, language)
+    name = _LINKING_WORDS_RE.sub("", name).strip()
+    if not name:
+        return None
+
+    dictionary = _load_dictionary()[language]
+    entry = dictionary.get(name.lower())
+    if entry is None:
+        return None
+    if language == "fr":
+        name_en, category = entry
+        prep_en = _PREPARATIONS_FR.get(prep.lower()) if prep else None
+        if prep and prep_en is None:
+            return None
+    else:
+        name_en, category = name.lower(), entry
+        prep_en = prep or None
+    if category not in INGREDIENT_CATEGORIES:
+        return None
+
+    qty_en = qty.replace(",", ".") if qty else None
+    english = " ".join(p for p in (qty_en, unit_en, name_en) if p)
+    if prep_en:
+        english += f", {prep_en}"
+    elif qty is None and category == "spice":
+        english += ", to taste"
+
+    prefix = " ".join(p for p in (qty, unit_src) if p)
+    annotated = f"- {prefix + ' ' if prefix else ''}«{name}» [{english}] {{{category}}}"
+    if prep:
+        annotated += f", {prep}"
+    return annotated
+
+
+# ═══════════════════════════════════════════════════════════════════
+# LLM FALLBACK (only the lines the dictionary could not annotate)
+# ═══════════════════════════════════════════════════════════════════
+
+_NUMBERED_LINE_RE = re.compile(r"^\s*(\d+)[.)]\s*(.+)$")
+_ANNOTATED_RE = re.compile(r"«[^»]+».*\[[^\]]+\].*\{(\w+)\}")
+
+
+async def annotate_ingredients_llm(
+    client: AsyncOpenAI,
+    model: str,
+    lines: list[str],
+    language: str,
+    extra_body: Optional[dict] = None,
+) -> Optional[list[list[str]]]:
+    """
+    Annotate *lines* with one LLM call.
+
+    Returns:
+        One list of annotated lines per input line, or None if the call fails
+        or any line comes back without valid annotations.
+    """
+    messages = [
+        {"role": "system", "content": INGREDIENT_ANNOTATION_SYSTEM_PROMPT},
+        {"role": "user", "content": get_ingredient_annotation_user_prompt(lines, language)},
+    ]
+    try:
+        response = await asyncio.wait_for(
+            client.chat.completions.create(
+                model=model,
+                messages=messages,
+                max_tokens=min(4096, 80 * len(lines) + 200),
+                temperature=0.1,
+                **({"extra_body": extra_body} if extra_body else {}),
+            ),
+            timeout=LLM_TIMEOUT_S,
+        )
+        content = response.choices[0].message.content or ""
+    except Exception as e:
+        logger.warning(f"[Pass 1] Ingredient annotation call failed ({type(e).__name__}: {e})")
+        return None
+
+    results: list[list[str]] = [[] for _ in lines]
+    for raw in content.splitlines():
+        m = _NUMBERED_LINE_RE.match(raw)
+        if not m:
+            continue
+        index = int(m.group(1)) - 1
+        annotated = m.group(2).strip()
+        if not annotated.startswith("- "):
+            annotated = f"- {annotated}"
+        valid = _ANNOTATED_RE.search(annotated)
+        if 0 <= index < len(lines) and valid and valid.group(1) in INGREDIENT_CATEGORIES:
+            results[index].append(annotated)
+
+    missing = [lines[i] for i, r in enumerate(results) if not r]
+    if missing:
+        logger.warning(f"[Pass 1] Ingredient annotation incomplete, missing: {missing[:3]}")
+        return None
+    return results
+
+
+# ═══════════════════════════════════════════════════════════════════
+# METADATA HELPERS
+# ═══════════════════════════════════════════════════════════════════
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_SPACE_BEFORE_PUNCT_RE = re.compile(r"\s+([.,])")
+_FRENCH_HINTS = re.compile(
+    r"\b(?:de|du|des|le|la|les|et|à|au|aux|cuillères?|pincée|gousses?|une?)\b", re.IGNORECASE
+)
+_ENGLISH_HINTS = re.compile(
+    r"\b(?:of|the|and|to|cups?|tablespoons?|teaspoons?|tbsp|tsp|into|with)\b", re.IGNORECASE
+)
+_SERVINGS_RE = re.compile(
+    r"^\s*(\d+)(?:\s*(?:-|à|to)\s*\d+)?\s*(?:servings?|portions?|personnes?|people|persons|parts?|pers\.?)?\s*$",
+    re.IGNORECASE,
+)
+_SERVES_RE = re.compile(r"^\s*(?:serves|pour)\s+(\d+)", re.IGNORECASE)
+
+_RECIPE_TYPES = (
+    ("drink", ("drink", "boisson", "cocktail", "smoothie", "beverage")),
+    ("dessert", ("dessert", "cake", "gâteau", "cookie", "biscuit", "pâtisserie", "pastry", "sweet")),
+    ("appetizer", ("appetizer", "apéritif", "apéro", "snack", "amuse-bouche", "finger food")),
+    ("starter", ("starter", "entrée", "soup", "soupe", "potage", "salad", "salade")),
+    ("base", ("sauce", "condiment", "dressing", "vinaigrette", "base", "marinade")),
+    ("main_course", ("main", "plat", "dinner", "dîner", "lunch", "déjeuner")),
+)
+
+
+def clean_text(text: Any) -> str:
+    """Unescape HTML entities, drop tags and collapse whitespace."""
+    if not isinstance(text, str):
+        return ""
+    text = " ".join(_TAG_RE.sub(" ", html.unescape(text)).split())
+    return _SPACE_BEFORE_PUNCT_RE.sub(r"\1", text)
+
+
+def as_list(value: Any) -> list:
+    """A schema.org value that may be single or repeated, as a list."""
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def _names(value: Any) -> list[str]:
+    """Flatten schema.org Thing / text values (author, tool, keywords…) into names."""
+    names = []
+    for item in as_list(value):
+        if isinstance(item, dict):
+            item = item.get("name") or item.get("text")
+        item = clean_text(item)
+        if item:
+            names.append(item)
+    return names
+
+
+def detect_language(data: dict) -> str:
+    """Two-letter language of the recipe (``inLanguage``, else fr/en word heuristic)."""
+    declared = data.get("inLanguage")
+    if isinstance(declared, str) and len(declared) >= 2:
+        return declared[:2].lower()
+    sample = " ".join(clean_text(i) for i in as_list(data.get("recipeIngredient")))
+    sample += " " + clean_text(data.get("description"))
+    return text_language(sample)
+
+
+def text_language(text: str) -> str:
+    """``"fr"`` or ``"en"``, whichever has more function words in *text*."""
+    fr, en = len(_FRENCH_HINTS.findall(text)), len(_ENGLISH_HINTS.findall(text))
+    return "fr" if fr > en else "en"
+
+
+def parse_servings(value: Any) -> Optional[int]:
+    """Parse ``recipeYield`` into a serving count (None if it is not a serving count)."""
+    for item in as_list(value):
+        if isinstance(item, (int, float)) and item > 0:
+            return int(item)
+        text = clean_text(item) if isinstance(item, str) else ""
+        m = _SERVINGS_RE.match(text) or _SERVES_RE.match(text)
+        if m and int(m.group(1)) > 0:
+            return int(m.group(1))
+    return None
+
+
+def _difficulty(data: dict) -> str:
+    total = parse_iso8601_minutes(data.get("totalTime"))
+    if total is None:
+        prep = parse_iso8601_minutes(data.get("prepTime"))
+        cook = parse_iso8601_minutes(data.get("cookTime"))
+        total = (prep or 0) + (cook or 0) if (prep or cook) else None
+    if total is None:
+        return "medium"
+    if total < 30:
+        return "easy"
+    return "medium" if total <= 60 else "hard"
+
+
+def _recipe_type(data: dict) -> str:
+    categories = " ".join(_names(data.get("recipeCategory"))).lower()
+    for recipe_type, keywords in _RECIPE_TYPES:
+        if any(k in categories for k in keywords):
+            return recipe_type
+    return "main_course"
+
+
+def _keywords(data: dict) -> list[str]:
+    tags: list[str] = []
+    for raw in _names(data.get("keywords")) + _names(data.get("recipeCuisine")) + _names(data.get("recipeCategory")):
+        for tag in raw.split(","):
+            tag = tag.strip().lower()
+            if tag and tag not in tags:
+                tags.append(tag)
+    return tags[:10]
+
+
+def _image_url(data: dict, image_urls: Optional[list[str]]) -> str:
+    for item in as_list(data.get("image")):
+        url = item.get("url") if isinstance(item, dict) else item
+        if isinstance(url, str) and url.startswith(("http://", "https://")):
+            return url
+    return image_urls[0] if image_urls else ""
+
+
+# ═══════════════════════════════════════════════════════════════════
+# INSTRUCTIONS
+# ═══════════════════════════════════════════════════════════════════
+
+_HOURS_MINUTES_RE = re.compile(r"\b(\d+)\s*h\s*(\d{1,2})\b(?!\s*°)")
+_DURATION_RE = re.compile(
+    r"\b(\d+(?:[.,]\d+)?(?:\s*(?:-|à|to)\s*\d+(?:[.,]\d+)?)?)\s*"
+    r"(minutes?|mins?|min|heures?|hours?|hrs?|h)\b",
+    re.IGNORECASE,
+)
+_TEMPERATURE_RE = re.compile(r"\b(\d{2,3})\s*°\s*([CF])\b")
+_PASSIVE_HINTS = (
+    "enfourner", "au four", "laisser reposer", "laisser mijoter", "laisser cuire", "laisser lever",
+    "réfrigérer", "au réfrigérateur", "au frais", "mariner",
+    "bake", "roast", "simmer", "let rest", "let it rest", "let sit", "refrigerate", "chill",
+    "marinate", "let rise", "allow to rise",
+)
+
+
+def _emphasize(text: str) -> str:
+    """Bold times and temperatures the way the Pass 1 prompt does ("**20min**", "**180°C**")."""
+    text = _TEMPERATURE_RE.sub(lambda m: f"**{m.group(1)}°{m.group(2).upper()}**", text)
+    text = _HOURS_MINUTES_RE.sub(lambda m: f"**{m.group(1)}h{m.group(2)}min**", text)
+
+    def duration(m: re.Match) -> str:
+        value = re.sub(r"\s*(?:à|to)\s*", "-", m.group(1)).replace(" ", "")
+        unit = "min" if m.group(2).lower().startswith("m") else "h"
+        return f"**{value}{unit}**"
+
+    return _DURATION_RE.sub(duration, text)
+
+
+def _is_passive(text: str) -> bool:
+    lowered = text.lower()
+    return "**" in text and any(hint in lowered for hint in _PASSIVE_HINTS)
+
+
+def instruction_sections(value: Any) -> list[tuple[Optional[str], list[str]]]:
+    """Flatten ``recipeInstructions`` into (section name, step texts) pairs."""
+    sections: list[tuple[Optional[str], list[str]]] = [(None, [])]
+    for item in as_list(value):
+        if isinstance(item, str):
+            sections[-1][1].extend(t for t in (clean_text(l) for l in item.splitlines()) if t)
+        elif isinstance(item, dict) and item.get("@type") == "HowToSection":
+            steps = []
+            for sub in as_list(item.get("itemListElement")):
+                text = clean_text(sub.get("text") or sub.get("name")) if isinstance(sub, dict) else clean_text(sub)
+                if text:
+                    steps.append(text)
+            sections.append((clean_text(item.get("name")) or None, steps))
+        elif isinstance(item, dict):
+            text = clean_text(item.get("text") or item.get("name"))
+            if text:
+                sections[-1][1].append(text)
+    return [(name, steps) for name, steps in sections if steps]
+
+
+# ═══════════════════════════════════════════════════════════════════
+# FAST PATH
+# ═══════════════════════════════════════════════════════════════════
+
+def schema_is_complete(data: Optional[dict]) -> bool:
+    """True if *data* holds everything Pass 1 needs (name, servings, ingredients, steps)."""
+    if not data or not clean_text(data.get("name")):
+        return False
+    if parse_servings(data.get("recipeYield")) is None:
+        return False
+    ingredients = [i for i in as_list(data.get("recipeIngredient")) if clean_text(i)]
+    if len(ingredients) < MIN_INGREDIENTS:
+        return False
+    return bool(instruction_sections(data.get("recipeInstructions")))
+
+
+def build_preformatted_text(
+    data: dict,
+    ingredient_lines: list[str],
+    language: str,
+    image_urls: Optional[list[str]] = None,
+) -> str:
+    """Render the Pass 1 output format from schema.org data and annotated ingredient lines."""
+    author = _names(data.get("author"))
+    publisher = _names(data.get("publisher"))
+    description = clean_text(data.get("description"))
+    parts = [
+        f"TITLE: {clean_text(data.get('name'))}",
+        f"DESCRIPTION: {description}",
+        f"LANGUAGE: {language}",
+        f"SERVINGS: {parse_servings(data.get('recipeYield'))}",
+        f"DIFFICULTY: {_difficulty(data)}",
+        f"TYPE: {_recipe_type(data)}",
+        f"NATIONALITY: {', '.join(_names(data.get('recipeCuisine')))}",
+        f"AUTHOR: {author[0] if author else ''}",
+        f"SOURCE: {publisher[0] if publisher else ''}",
+        f"IMAGE_URL: {_image_url(data, image_urls)}",
+    ]
+
+    def section(title: str, items: list[str]) -> None:
+        if items:
+            parts.extend(["", f"{title}:"] + [f"- {item}" for item in items])
+
+    section("TAGS", _keywords(data))
+    section("NOTES", _names(data.get("recipeNotes") or data.get("notes")))
+    section("TOOLS", _names(data.get("tool")))
+
+    parts.extend(["", "INGREDIENTS:"] + ingredient_lines)
+
+    parts.extend(["", "INSTRUCTIONS:"])
+    sections = instruction_sections(data.get("recipeInstructions"))
+    for name, steps in sections:
+        if len(sections) > 1 or name:
+            parts.extend(["", f"**{name or 'Preparation'}:**"])
+        for i, step in enumerate(steps, 1):
+            text = _emphasize(step)
+            parts.append(f"{i}. {text}{' [PASSIVE]' if _is_passive(text) else ''}")
+
+    return "\n".join(parts)
+
+
+async def preformat_from_schema(
+    client: AsyncOpenAI,
+    model: str,
+    data: dict,
+    image_urls: Optional[list[str]] = None,
+    cache: Optional[IngredientAnnotationCache] = None,
+    extra_body: Optional[dict] = None,
+) -> Optional[str]:
+    """
+    Produce the Pass 1 preformatted text from schema.org/Recipe data.
+
+    Args:
+        client: AsyncOpenAI client (raw), used only for unannotated ingredient lines.
+        model: Model name to use for that fallback.
+        data: schema.org/Recipe JSON-LD dict.
+        image_urls: Optional list of image URLs found with the recipe.
+        cache: Annotation cache (read, and filled by the LLM fallback).
+
+    Returns:
+        Preformatted text, or None when the regular Pass 1 should run instead.
+    """
+    if not schema_is_complete(data):
+        return None
+
+    language = detect_language(data)
+    raw_lines = [clean_text(i) for i in as_list(data.get("recipeIngredient")) if clean_text(i)]
+
+    annotated: list[Optional[list[str]]] = []
+    for raw in raw_lines:
+        hit = cache.get(raw, language) if cache else None
+        if hit is None:
+            line = annotate_ingredient_line(raw, language)
+            hit = [line] if line else None
+        annotated.append(hit)
+
+    missing = [i for i, a in enumerate(annotated) if a is None]
+    logger.info(
+        f"[Pass 1] schema.org fast path ({language}): "
+        f"{len(raw_lines) - len(missing)}/{len(raw_lines)} ingredients annotated without LLM"
+    )
+    if missing:
+        llm_results = await annotate_ingredients_llm(
+            client, model, [raw_lines[i] for i in missing], language, extra_body,
+        )
+        if llm_results is None:
+            return None
+        for i, result in zip(missing, llm_results):
+            annotated[i] = result
+            if cache:
+                cache.put(raw_lines[i], language, result)
+        if cache:
+            cache.save()
+
+    ingredient_lines = [line for lines in annotated for line in lines]
+    return build_preformatted_text(data, ingredient_lines, language, image_urls)
@@ -0,0 +1,335 @@
+"""
+Token-budgeted compaction of recipe source text — before Pass 1 and Pass 3.
+
+Scraped blog pages carry the recipe inside life stories, ads and comment
+threads. Every prompt that quotes the source (Pass 1 preformat, Pass 3
+review) paid for all of it. Compaction keeps the lines that look like the
+recipe and drops the rest until the text fits a token budget:
+
+  1. Split the source into lines (Trafilatura emits one paragraph per line)
+  2. Score each line by recipe relevance:
+       - ingredient-list shape (bullet or leading quantity)
+       - quantities with units, temperatures, durations
+       - imperative cooking verbs (FR or EN, by the language of the text)
+       - section headings (Ingrédients, Préparation, Method…)
+       - word overlap with the schema.org/Recipe JSON-LD (or any vocabulary)
+       - comment / newsletter boilerplate counts against the line
+  3. Keep the best lines that fit the budget (ties go to lines next to
+     better ones, not to earlier text), in source order, with a
+     "[…]" marker where lines were dropped. The first line (title) always
+     stays, clipped to the budget when it alone exceeds it (text without
+     line breaks)
+
+The selection is deterministic (same text, same budget → same output), so
+LLM cache keys stay stable. CompactedText keeps the character offsets of
+every kept span: anything quoted from the compacted text maps back to the
+original source (``to_source`` / ``locate``).
+
+Sources that already fit the budget are returned unchanged.
+"""
+
+import logging
+import re
+import time
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Optional
+
+from .schema_preformat import as_list, clean_text, instruction_sections, text_language
+
+logger = logging.getLogger(__name__)
+
+# Rough size of a token for French / English prose (no tokenizer dependency)
+CHARS_PER_TOKEN = 4
+# Marker inserted where lines were dropped
+GAP_MARKER = "[…]"
+
+_LINE_RE = re.compile(r"[^\n]+")
+_WORD_RE = re.compile(r"[^\W\d_]{4,}")
+
+_BULLET_RE = re.compile(r"^\s*(?:[-•*▢□–]|\d+\s*[.)]\s)")
+_LEADING_QTY_RE = re.compile(r"^\s*(?:[-•*▢□–]\s*)?(?:\d+(?:[.,/]\d+)?|[½¼¾⅓⅔])")
+_QUANTITY_RE = re.compile(
+    r"\d+(?:[.,/]\d+)?\s*(?:kg|g|mg|ml|cl|dl|l|oz|lbs?|cups?|tbsp|tsp|tablespoons?|teaspoons?"
+    r"|c\.?\s?à\s?[sc]\.?|càs|càc|cuill[eè]res?|pinc[ée]es?|gousses?|cloves?|°\s?[CF]"
+    r"|min(?:utes?)?|h(?:eures?|ours?)?)\b",
+    re.IGNORECASE,
+)
+_HEADING_RE = re.compile(
+    r"^\W*(?:ingr[ée]dients?|pr[ée]paration|instructions?|[ée]tapes?|method|directions"
+    r"|steps|recette|recipe|notes?|ustensiles?|equipment|pour la .{1,30}|for the .{1,30})\W*$",
+    re.IGNORECASE,
+)
+# Cooking verbs by source language. Words that are also common prose
+# ("place", "let", "cover") are left out, and "pour" only counts in English
+# (in French it is the preposition)
+_VERBS = {
+    "fr": frozenset({
+        # infinitive / imperative, as written in recipes
+        "ajouter", "ajoutez", "mélanger", "mélangez", "cuire", "faites", "faire", "verser", "versez",
+        "préchauffer", "préchauffez", "couper", "coupez", "émincer", "émincez", "hacher", "hachez",
+        "éplucher", "épluchez", "peler", "pelez", "laisser", "laissez", "servir", "servez", "battre",
+        "battez", "fouetter", "fouettez", "incorporer", "incorporez", "égoutter", "égouttez", "saler",
+        "salez", "poivrer", "poivrez", "enfourner", "enfournez", "réserver", "réservez", "chauffer",
+        "chauffez", "porter", "portez", "mixer", "mixez", "étaler", "étalez", "dorer", "répartir",
+        "répartissez", "disposer", "disposez", "assaisonner", "assaisonnez", "retirer", "retirez",
+    }),
+    "en": frozenset({
+        "add", "mix", "stir", "bake", "cook", "pour", "preheat", "chop", "slice", "dice", "mince",
+        "peel", "whisk", "beat", "fold", "combine", "season", "serve", "simmer", "boil", "drain",
+        "heat", "roast", "fry", "saute", "sauté", "spread", "remove", "transfer", "knead",
+        "reduce", "grill", "toss", "melt", "blend", "bring",
+    }),
+}
+# Language unknown: both lists, without the words of one that are prose in the other
+_ANY_VERBS = (_VERBS["fr"] | _VERBS["en"]) - {"pour"}
+_BOILERPLATE_RE = re.compile(
+    r"\b(?:r[ée]pondre|reply|commentaires?|comments?|newsletter|abonnez|subscribe|cookies?"
+    r"|publicit[ée]|sponsored|partager|share|pinterest|facebook|instagram|signaler|log in"
+    r"|connexion)\b|@\w+|\b\d{1,2}/\d{1,2}/\d{2,4}\b",
+    re.IGNORECASE,
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of *text*."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def schema_vocabulary(structured_data: Optional[dict]) -> set[str]:
+    """Words of the schema.org/Recipe name, ingredients and instructions."""
+    if not structured_data:
+        return set()
+    texts = [clean_text(structured_data.get("name"))]
+    texts += [clean_text(line) for line in as_list(structured_data.get("recipeIngredient"))]
+    for _, steps in instruction_sections(structured_data.get("recipeInstructions")):
+        texts += steps
+    return vocabulary(texts)
+
+
+def vocabulary(texts: Iterable[Any]) -> set[str]:
+    """Lowercased words (4+ letters) of *texts*, for ``compact_source``."""
+    return {w.lower() for text in texts if text for w in _WORD_RE.findall(str(text))}
+
+
+def score_line(line: str, words: Optional[set[str]] = None, language: Optional[str] = None) -> float:
+    """
+    Recipe relevance of one source line (higher is more relevant).
+
+    Args:
+        line: One line of source text
+        words: Vocabulary of the recipe (JSON-LD or structured recipe)
+        language: "fr" or "en" (see ``text_language``); both verb lists
+            when None
+    """
+    stripped = line.strip()
+    if _HEADING_RE.match(stripped):
+        return 4.0
+
+    score = 0.0
+    if _LEADING_QTY_RE.match(stripped):
+        score += 3.0
+    elif _BULLET_RE.match(stripped):
+        # An unquantified ingredient ("- Persil frais") still outranks prose
+        # that merely mentions a cooking verb
+        score += 2.5
+    score += min(len(_QUANTITY_RE.findall(stripped)), 3)
+
+    verbs = _VERBS.get(language, _ANY_VERBS)
+    line_words = [w.lower() for w in _WORD_RE.findall(stripped)]
+    if line_words:
+        if line_words[0] in verbs:
+            score += 2.0
+        elif any(w in verbs for w in line_words):
+            score += 1.0
+        if words:
+            score += 3.0 * sum(w in words for w in line_words) / len(line_words)
+
+    score -= 2.0 * len(_BOILERPLATE_RE.findall(stripped))
+    # Long prose without any recipe signal is the life story
+    if score <= 0 and len(stripped) > 300:
+        score -= 1.0
+    return score
+
+
+@dataclass
+class CompactedText:
+    """
+    Source text cut to a token budget, with the offsets of what was kept.
+
+    ``spans`` holds (compacted offset, source offset, length) of every kept
+    line, in order; the text between spans is a newline or GAP_MARKER.
+    ``clipped`` is set when the first line was cut to fit the budget.
+    """
+
+    text: str
+    source_length: int
+    spans: list[tuple[int, int, int]] = field(default_factory=list)
+    lines_total: int = 0
+    lines_kept: int = 0
+    clipped: bool = False
+
+    @property
+    def compacted(self) -> bool:
+        return self.lines_kept < self.lines_total or self.clipped
+
+    @property
+    def tokens_before(self) -> int:
+        return (self.source_length + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+    @property
+    def tokens_after(self) -> int:
+        return estimate_tokens(self.text)
+
+    def to_source(self, offset: int) -> Optional[int]:
+        """Source offset of a compacted-text offset (None inside a gap marker)."""
+        index = bisect_right([start for start, _, _ in self.spans], offset) - 1
+        if index < 0:
+            return None
+        start, source_start, length = self.spans[index]
+        if offset - start > length:
+            return None
+        return source_start + offset - start
+
+    def locate(self, quote: str) -> Optional[int]:
+        """Source offset of *quote* found in the compacted text, or None."""
+        quote = quote.strip().strip('"“”«»\'').strip()
+        if not quote:
+            return None
+        offset = self.text.find(quote)
+        if offset < 0:
+            offset = self.text.lower().find(quote.lower())
+        return self.to_source(offset) if offset >= 0 else None
+
+
+def _identity(text: str) -> CompactedText:
+    lines = len(_LINE_RE.findall(text))
+    return CompactedText(text=text, source_length=len(text), spans=[(0, 0, len(text))],
+                         lines_total=lines, lines_kept=lines)
+
+
+def compact_source(
+    text: str,
+    max_tokens: int,
+    words: Optional[set[str]] = None,
+) -> CompactedText:
+    """
+    Cut *text* down to *max_tokens*, keeping its most recipe-like lines.
+
+    Args:
+        text: Source text (scraped main content or user input)
+        max_tokens: Token budget of the compacted text
+        words: Vocabulary of the recipe (see schema_vocabulary / vocabulary);
+            lines sharing words with it rank higher
+
+    Returns:
+        CompactedText (the text itself when it already fits)
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return _identity(text)
+
+    lines = [(m.start(), m.group()) for m in _LINE_RE.finditer(text) if m.group().strip()]
+    language = text_language(text)
+    scores = [score_line(line, words, language) for _, line in lines]
+    budget = max_tokens * CHARS_PER_TOKEN
+
+    # The first line (title) always stays, clipped when it alone is over budget
+    clipped = bool(lines) and len(lines[0][1]) + len(GAP_MARKER) + 1 > budget
+    if clipped:
+        start, line = lines[0]
+        lines[0] = (start, line[:max(budget - len(GAP_MARKER) - 1, 0)])
+
+    # Best lines first. Among equal scores, lines next to better ones (the
+    # rest of an ingredient list or a method) win, then shorter lines; the
+    # source position only makes the order deterministic
+    def neighbours(i: int) -> float:
+        return max(scores[i - 1] if i > 1 else 0.0, scores[i + 1] if i + 1 < len(lines) else 0.0)
+
+    ranking = sorted(range(1, len(lines)), key=lambda i: (-scores[i], -neighbours(i), len(lines[i][1]), i))
+    kept = {0} if lines else set()
+    used = len(lines[0][1]) if lines else 0
+    for i in ranking:
+        cost = len(lines[i][1]) + len(GAP_MARKER) + 2
+        if used + cost > budget:
+            continue
+        kept.add(i)
+        used += cost
+
+    parts: list[str] = []
+    spans: list[tuple[int, int, int]] = []
+    position = 0
+    previous = -1
+    for i in sorted(kept):
+        if parts:
+            separator = "\n" if i == previous + 1 and not (clipped and previous == 0) else f"\n{GAP_MARKER}\n"
+            parts.append(separator)
+            position += len(separator)
+        source_start, line = lines[i]
+        spans.append((position, source_start, len(line)))
+        parts.append(line)
+        position += len(line)
+        previous = i
+    if lines and (previous < len(lines) - 1 or (clipped and previous == 0)):
+        parts.append(f"\n{GAP_MARKER}")
+
+    return CompactedText(
+        text="".join(parts), source_length=len(text), spans=spans,
+        lines_total=len(lines), lines_kept=len(kept), clipped=clipped,
+    )
+
+
+@dataclass
+class CompactionStats:
+    """Prompt tokens removed by compaction over many sources (benchmarks)."""
+
+    name: str
+    texts: int = 0
+    compacted: int = 0
+    tokens_before: int = 0
+    tokens_after: int = 0
+    seconds: float = 0.0
+
+    def record(self, result: CompactedText, seconds: float) -> None:
+        self.texts += 1
+        self.compacted += result.compacted
+        self.tokens_before += result.tokens_before
+        self.tokens_after += result.tokens_after
+        self.seconds += seconds
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+    def summary(self) -> str:
+        share = self.tokens_saved / self.tokens_before if self.tokens_before else 0.0
+        return (
+            f"{self.name}: {self.compacted}/{self.texts} sources compacted, "
+            f"~{self.tokens_saved} of ~{self.tokens_before} source tokens removed ({share:.0%}), "
+            f"{self.seconds * 1000:.1f} ms spent"
+        )
+
+
+def compact_and_log(
+    text: str,
+    max_tokens: int,
+    label: str,
+    words: Optional[set[str]] = None,
+    stats: Optional[CompactionStats] = None,
+) -> CompactedText:
+    """
+    ``compact_source``, logging what was removed from this text.
+
+    Args:
+        label: Name of the prompt in the log line (e.g. "Pass 1")
+        stats: Totals to add the result to (reports over many sources)
+    """
+    started = time.perf_counter()
+    result = compact_source(text, max_tokens, words)
+    if stats is not None:
+        stats.record(result, time.perf_counter() - started)
+    if result.compacted:
+        logger.info(
+            f"[Compaction] {label}: kept {result.lines_kept}/{result.lines_total} lines, "
+            f"~{result.tokens_before} → ~{result.tokens_after} tokens"
+        )
+    return result
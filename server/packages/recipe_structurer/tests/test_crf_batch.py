@@ -0,0 +1,129 @@
+"""Tests for batched CRF ingredient parsing and its memo (Pass 1.5)."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from recipe_structurer.services import ingredient_parser
+from recipe_structurer.services.crf_memo import CRFMemo
+from recipe_structurer.services.ingredient_parser import (
+    parse_ingredient_line,
+    parse_ingredients_from_preformat,
+    parse_ingredients_from_preformats,
+)
+
+
+class FakeCRF:
+    """ingredient_parser stand-in: "<qty> <unit> <name>, <prep>" lines, counting parsed sentences."""
+
+    def __init__(self, version="1.0"):
+        self.__version__ = version
+        self.parsed: list[str] = []
+        self.batches = 0
+
+    def parse_ingredient(self, sentence):
+        self.parsed.append(sentence)
+        head, _, prep = sentence.partition(", ")
+        qty, unit, name = head.split(" ", 2)
+        return SimpleNamespace(
+            name=[SimpleNamespace(text=name)],
+            amount=[SimpleNamespace(quantity=qty, unit=unit)],
+            preparation=SimpleNamespace(text=prep) if prep else None,
+        )
+
+    def parse_multiple_ingredients(self, sentences):
+        self.batches += 1
+        return [self.parse_ingredient(s) for s in sentences]
+
+
+@pytest.fixture
+def crf(monkeypatch):
+    fake = FakeCRF()
+    monkeypatch.setattr(ingredient_parser, "_crf_module", fake)
+    monkeypatch.setattr(ingredient_parser, "_memo", CRFMemo())
+    return fake
+
+
+def _preformat(*lines):
+    return "INGREDIENTS:\n" + "\n".join(lines) + "\n\nINSTRUCTIONS:\n1. Mélanger"
+
+
+class TestBatchParsing:
+
+    def test_one_batch_per_recipe(self, crf):
+        result = parse_ingredients_from_preformat(_preformat(
+            "- 2 c-à-s «huile d'olive» [2 tablespoons olive oil] {oil}",
+            "- 1 «oignon» [1 whole onion, finely chopped] {produce}, émincé",
+            "- 100g «farine» [100 g flour] {pantry}",
+        ))
+        assert crf.batches == 1
+        assert [(i.id, i.quantity, i.unit) for i in result] == [
+            ("olive_oil", 2.0, "tbsp"), ("onion", 1.0, "whole"), ("flour", 100.0, "g"),
+        ]
+        # The original-language preparation wins over the English one
+        assert result[1].preparation == "émincé"
+
+    def test_lines_shared_across_recipes_are_parsed_once(self, crf):
+        texts = [
+            _preformat("- 2 c-à-s «huile d'olive» [2 tablespoons olive oil] {oil}",
+                       "- 100g «farine» [100 g flour] {pantry}"),
+            _preformat("- 2 c-à-s «huile» [2  tablespoons olive oil] {oil}",
+                       "- 1 «oeuf» [1 large egg] {egg}"),
+        ]
+        first, second = parse_ingredients_from_preformats(texts)
+        assert crf.parsed == ["2 tablespoons olive oil", "100 g flour", "1 large egg"]
+        assert [i.name for i in second] == ["huile", "oeuf"]
+
+        # Warm memo: no CRF call at all
+        assert [i.model_dump() for i in parse_ingredients_from_preformat(texts[0])] == [
+            i.model_dump() for i in first
+        ]
+        assert len(crf.parsed) == 3
+
+    def test_matches_single_line_parsing(self, crf):
+        lines = [
+            "- 250 g «champignons» [250 g mushrooms, sliced] {produce}, émincés",
+            "- 1 pinch «sel» [1 pinch salt] {spice} (à volonté)",
+            "Note sans annotation",
+            "- 200 ml «crème» [200 ml cream] {dairy}",
+        ]
+        batched = parse_ingredients_from_preformat(_preformat(*lines))
+        single = [parse_ingredient_line(line) for line in lines]
+        assert [i.model_dump() for i in batched] == [i.model_dump() for i in single if i is not None]
+
+    def test_failing_batch_falls_back_to_lines(self, crf, monkeypatch):
+        def broken_batch(sentences):
+            raise RuntimeError("boom")
+        monkeypatch.setattr(crf, "parse_multiple_ingredients", broken_batch)
+        result = parse_ingredients_from_preformat(_preformat(
+            "- 100g «farine» [100 g flour] {pantry}",
+            "- «sel» [salt] {spice}",
+        ))
+        # "salt" does not fit the fake grammar: that line keeps its English text
+        assert [(i.id, i.quantity) for i in result] == [("flour", 100.0), ("salt", None)]
+
+
+class TestCRFMemo:
+
+    def test_persistent_memo_survives_processes(self, crf, monkeypatch, tmp_path):
+        path = tmp_path / "crf.sqlite3"
+        monkeypatch.setattr(ingredient_parser, "_memo", CRFMemo(path))
+        parse_ingredient_line("- 100g «farine» [100 g flour] {pantry}")
+
+        monkeypatch.setattr(ingredient_parser, "_memo", CRFMemo(path))
+        ing = parse_ingredient_line("- 100g «farine» [100   g flour] {pantry}")
+        assert (ing.quantity, ing.unit) == (100.0, "g")
+        assert crf.parsed == ["100 g flour"]
+
+    def test_parser_version_invalidates_entries(self, crf, monkeypatch):
+        parse_ingredient_line("- 100g «farine» [100 g flour] {pantry}")
+        monkeypatch.setattr(crf, "__version__", "2.0")
+        parse_ingredient_line("- 100g «farine» [100 g flour] {pantry}")
+        assert crf.parsed == ["100 g flour", "100 g flour"]
+
+    def test_lru_is_bounded(self):
+        memo = CRFMemo(maxsize=2)
+        memo.put_many({"a": [1], "b": [2]})
+        memo.get_many(["a"])
+        memo.put_many({"c": [3]})
+        assert memo.get_many(["a", "b", "c"]) == {"a": [1], "c": [3]}
@@ -0,0 +1,115 @@
+"""Tests for the deterministic graph repair run before Pass 2 validation."""
+
+import pytest
+from pydantic import ValidationError
+
+from recipe_structurer.models.recipe import Recipe
+from recipe_structurer.services.graph_repair import GraphRepairReport, repair_recipe_data
+
+
+def _recipe(steps, ingredients=None, final_state="dish"):
+    return {
+        "metadata": {
+            "title": "Soupe", "description": "Une soupe", "servings": 2,
+            "difficulty": "easy", "recipeType": "main_course",
+        },
+        "ingredients": ingredients if ingredients is not None else [
+            {"id": "carrot", "name": "carotte", "name_en": "carrot", "category": "produce"},
+            {"id": "onion", "name": "oignon", "name_en": "onion", "category": "produce"},
+        ],
+        "steps": [{"stepType": "prep", **step} for step in steps],
+        "finalState": final_state,
+    }
+
+
+def _validate(data):
+    repairs: list[str] = []
+    recipe = Recipe.model_validate(data, context={"graph_repairs": repairs})
+    return recipe, repairs
+
+
+class TestRepairs:
+
+    def test_valid_graph_is_untouched(self):
+        data = _recipe([
+            {"id": "chop", "action": "Couper", "uses": ["carrot", "onion"], "produces": "chopped"},
+            {"id": "cook", "action": "Cuire", "uses": ["chopped"], "produces": "dish"},
+        ])
+        recipe, repairs = _validate(data)
+        assert repairs == []
+        assert repair_recipe_data(data) is data
+
+    def test_without_context_validation_still_fails(self):
+        data = _recipe([
+            {"id": "cook", "action": "Cuire", "uses": ["chopped"], "produces": "dish"},
+            {"id": "chop", "action": "Couper", "uses": ["carrot", "onion"], "produces": "chopped"},
+        ])
+        with pytest.raises(ValidationError):
+            Recipe.model_validate(data)
+
+    def test_steps_reordered_topologically(self):
+        recipe, repairs = _validate(_recipe([
+            {"id": "cook", "action": "Cuire", "uses": ["chopped"], "produces": "dish"},
+            {"id": "preheat", "action": "Préchauffer le four", "produces": "hot_oven"},
+            {"id": "chop", "action": "Couper", "uses": ["carrot", "onion"], "requires": ["hot_oven"],
+             "produces": "chopped"},
+        ]))
+        assert [s.id for s in recipe.steps] == ["preheat", "chop", "cook"]
+        assert any(r.startswith("reorder_steps") for r in repairs)
+
+    def test_refs_resolved_and_unused_ingredient_attached(self):
+        recipe, repairs = _validate(_recipe([
+            {"id": "chop", "action": "Émincer l'oignon", "uses": ["onion_2"], "produces": "chopped"},
+            {"id": "cook", "action": "Cuire avec la carotte", "uses": ["chopped"], "produces": "dish"},
+        ]))
+        assert recipe.steps[0].uses == ["onion"]
+        # "carotte" is named by the cook step
+        assert recipe.steps[1].uses == ["chopped", "carrot"]
+        assert {r.split(":")[0] for r in repairs} == {"resolve_refs", "attach_ingredient"}
+
+    def test_duplicate_states_renamed(self):
+        recipe, _ = _validate(_recipe([
+            {"id": "chop", "action": "Couper", "uses": ["carrot", "onion"], "produces": "veg"},
+            {"id": "sweat", "action": "Suer", "uses": ["veg"], "produces": "veg"},
+            {"id": "cook", "action": "Cuire", "uses": ["veg"], "produces": "dish"},
+        ]))
+        assert [(s.uses, s.produces) for s in recipe.steps] == [
+            (["carrot", "onion"], "veg"), (["veg"], "veg_2"), (["veg_2"], "dish"),
+        ]
+
+    def test_orphans_connected_and_final_state_fixed(self):
+        recipe, repairs = _validate(_recipe([
+            {"id": "chop", "action": "Couper", "uses": ["carrot"], "produces": "chopped"},
+            {"id": "fry", "action": "Frire", "uses": ["onion"], "produces": "fried_onions"},
+            {"id": "cook", "action": "Cuire", "uses": ["chopped"], "produces": "soup"},
+        ], final_state="the_soup"))
+        assert recipe.finalState == "soup"
+        assert recipe.steps[-1].uses == ["chopped", "fried_onions"]
+        assert any(r.startswith("connect_orphan") for r in repairs)
+
+    def test_empty_step_fed_by_previous_state(self):
+        recipe, _ = _validate(_recipe([
+            {"id": "chop", "action": "Couper", "uses": ["carrot", "onion"], "produces": "chopped"},
+            {"id": "rest", "action": "Laisser reposer", "produces": "rested"},
+            {"id": "cook", "action": "Cuire", "uses": ["rested"], "produces": "dish"},
+        ]))
+        assert recipe.steps[1].uses == ["chopped"]
+
+    def test_cycle_is_left_to_the_llm(self):
+        with pytest.raises(ValidationError):
+            _validate(_recipe([
+                {"id": "a", "action": "A", "uses": ["carrot", "b_out"], "produces": "a_out"},
+                {"id": "b", "action": "B", "uses": ["onion", "a_out"], "produces": "b_out"},
+                {"id": "c", "action": "C", "uses": ["b_out"], "produces": "dish"},
+            ]))
+
+
+def test_report_summary():
+    report = GraphRepairReport(
+        repairs=["attach_ingredient: 'salt' → step 'mix'", "reorder_steps: ['a']", "reorder_steps: ['b']"],
+        llm_attempts=2, llm_retries=1, llm_seconds=31.0,
+    )
+    assert report.actions == {"attach_ingredient": 1, "reorder_steps": 2}
+    assert report.summary() == (
+        "3 graph repairs (attach_ingredient×1, reorder_steps×2), 2 LLM attempts (1 retries) in 31.0s"
+    )
@@ -0,0 +1,105 @@
+"""Tests for the content-hash LLM response cache."""
+
+import os
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from recipe_structurer.services.llm_cache import LLMResponseCache
+from recipe_structurer.services.preformat import preformat_recipe
+
+
+class FakeClient:
+    """Minimal AsyncOpenAI stand-in counting completion calls."""
+
+    def __init__(self, content: str, finish_reason: str = "stop"):
+        self.calls = 0
+        self.content = content
+        self.finish_reason = finish_reason
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, **kwargs):
+        self.calls += 1
+        message = SimpleNamespace(content=self.content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason=self.finish_reason)])
+
+
+class TestKey:
+
+    def test_whitespace_does_not_change_key(self):
+        a = LLMResponseCache.make_key("dag", "m", "tpl", "Soupe\n  200 g  lentilles ", 0.1)
+        b = LLMResponseCache.make_key("dag", "m", "tpl", "Soupe\n200 g lentilles", 0.1)
+        assert a == b
+
+    @pytest.mark.parametrize("changes", [
+        {"pass_name": "review"}, {"model": "other"}, {"template": "tpl v2"},
+        {"input_text": "Tarte"}, {"temperature": 0.3}, {"variant": 1},
+    ])
+    def test_every_component_changes_key(self, changes):
+        base = dict(pass_name="dag", model="m", template="tpl", input_text="Soupe", temperature=0.1, variant=0)
+        assert LLMResponseCache.make_key(**base) != LLMResponseCache.make_key(**{**base, **changes})
+
+
+class TestStore:
+
+    def test_roundtrip_and_bypass(self, tmp_path):
+        cache = LLMResponseCache(tmp_path)
+        cache.put("dag", "k1", '{"a": 1}')
+        assert cache.get("dag", "k1") == '{"a": 1}'
+        assert cache.get("dag", "missing") is None
+
+        bypass = LLMResponseCache(tmp_path, read=False)
+        assert bypass.get("dag", "k1") is None
+        bypass.put("dag", "k1", '{"a": 2}')
+        assert cache.get("dag", "k1") == '{"a": 2}'
+
+        read_only = LLMResponseCache(tmp_path, write=False)
+        read_only.put("dag", "k2", "x")
+        assert cache.get("dag", "k2") is None
+
+    def test_lru_eviction(self, tmp_path):
+        cache = LLMResponseCache(tmp_path, max_bytes=600)
+        cache.put("review", "old", "a" * 200)
+        cache.put("review", "used", "b" * 200)
+        past = time.time() - 100
+        os.utime(tmp_path / "review" / "old.json", (past, past))
+        os.utime(tmp_path / "review" / "used.json", (past - 50, past - 50))
+        cache.get("review", "used")  # refreshes its recency
+
+        cache.put("review", "new", "c" * 200)
+
+        assert cache.get("review", "old") is None
+        assert cache.get("review", "used") is not None
+        assert cache.get("review", "new") is not None
+
+    def test_from_env(self, tmp_path, monkeypatch):
+        monkeypatch.delenv("LLM_CACHE_DIR", raising=False)
+        assert LLMResponseCache.from_env() is None
+        monkeypatch.setenv("LLM_CACHE_DIR", str(tmp_path))
+        monkeypatch.setenv("LLM_CACHE_BYPASS", "1")
+        cache = LLMResponseCache.from_env()
+        assert cache.cache_dir == tmp_path and not cache.read
+
+
+@pytest.mark.asyncio
+class TestPreformatCache:
+
+    async def test_second_call_is_free(self, tmp_path):
+        client = FakeClient("TITLE: Soupe\nINGREDIENTS:\n- «sel» [salt] {spice}")
+        cache = LLMResponseCache(tmp_path)
+
+        first = await preformat_recipe(client, "m", "Soupe aux lentilles", cache=cache)
+        second = await preformat_recipe(client, "m", "Soupe  aux lentilles\n", cache=cache)
+
+        assert first == second
+        assert client.calls == 1
+
+    async def test_truncated_output_not_cached(self, tmp_path):
+        client = FakeClient("TITLE: Soupe", finish_reason="length")
+        cache = LLMResponseCache(tmp_path)
+
+        await preformat_recipe(client, "m", "Soupe", cache=cache)
+        await preformat_recipe(client, "m", "Soupe", cache=cache)
+
+        assert client.calls == 2
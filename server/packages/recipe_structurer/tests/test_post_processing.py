@@ -14,6 +14,7 @@ These tests validate that:
 import pytest
 from recipe_structurer.models.recipe import Recipe, Metadata, Ingredient, Step
 from recipe_structurer.services.ingredient_parser import (
+    RefResolver,
     correct_step_references,
     resolve_ref,
     make_ingredient_id,
@@ -413,6 +414,64 @@ class TestResolveRef:
         assert resolve_ref("lemon", valid, name_to_id) is None
 
 
+def _reference_name_lookup(ref, name_to_id):
+    """Name lookup as it was: one regex compiled per name and per ref."""
+    import re
+
+    ref_normalized = ref.lower().replace("_", " ").strip()
+    if not ref_normalized:
+        return None
+    for name, ing_id in name_to_id.items():
+        if ref_normalized in (name.lower().strip(), name.lower().strip().replace(" ", "_")):
+            return ing_id
+    ref_re = re.compile(rf"\b{re.escape(ref_normalized)}\b")
+    best_id, best_len = None, float("inf")
+    for name, ing_id in name_to_id.items():
+        name_normalized = name.lower().strip()
+        if not name_normalized:
+            continue
+        name_re = re.compile(rf"\b{re.escape(name_normalized)}\b")
+        if (ref_re.search(name_normalized) or name_re.search(ref_normalized)) and len(name_normalized) < best_len:
+            best_id, best_len = ing_id, len(name_normalized)
+    return best_id
+
+
+class TestRefResolver:
+    """The precompiled resolver keeps the semantics of the per-ref scan."""
+
+    NAMES = [
+        "oignon", "oignon rouge", "Oignons", "ail", "gousse d'ail", "oeuf", "œufs", "egg", "eggplant",
+        "egg yolk", "crème fraîche", "crème", "1/2 cup", "grana padano", "Grana Padano cheese",
+        "sel", "sel de Guérande", "poivre noir", "huile d'olive", "olive oil", "(beurre)", "beurre",
+        "---", "pâte brisée", "pâte", "lait de coco", "coconut milk", "milk", "  Lemon  ",
+    ]
+
+    def test_matches_reference_lookup(self):
+        import random
+
+        rng = random.Random(47)
+        refs = [n.replace(" ", "_") for n in self.NAMES] + [
+            "onion", "oignon_rouge_2", "egg", "eggs", "yolk", "d_ail", "olive", "padano", "cup", "1_2",
+            "beurre_doux", "creme", "Crème_Fraîche", "lait", "coco", "---", "", "pate", "sel_fin", "poivre",
+        ]
+        for _ in range(300):
+            sample = rng.sample(self.NAMES, rng.randint(0, len(self.NAMES)))
+            name_to_id = {name: f"id_{i}" for i, name in enumerate(sample)}
+            resolver = RefResolver(name_to_id)
+            for ref in refs:
+                assert resolver.lookup(ref) == _reference_name_lookup(ref, name_to_id), (ref, sample)
+
+    def test_resolver_chain(self):
+        resolver = RefResolver({"oignon": "onions", "grana padano": "grana_padano_cheese"})
+        valid = {"onions", "salt_1", "grana_padano_cheese"}
+        assert resolver.resolve("onions", valid) == "onions"
+        assert resolver.resolve("salt_2", valid) == "salt_1"
+        assert resolver.resolve("oignon", valid) == "onions"
+        assert resolver.resolve("grana_padano", valid) == "grana_padano_cheese"
+        assert resolve_ref("oignon", valid, resolver) == "onions"
+        assert resolver.resolve("lemon", valid) is None
+
+
 # ═══════════════════════════════════════════════════════════════════
 # shared.py — ISO 8601 parsing and utilities
 # ═══════════════════════════════════════════════════════════════════
@@ -0,0 +1,188 @@
+"""
+Tests for the schema.org fast path of Pass 1 (no LLM preformat call).
+
+These tests validate that:
+- Complete JSON-LD is detected, incomplete JSON-LD falls back
+- Dictionary annotation produces lines Pass 1.5 can parse
+- Only unannotated lines go to the LLM, and their annotations are cached
+- The rendered text follows the Pass 1 output format
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from recipe_structurer.services.ingredient_parser import parse_ingredients_from_preformat
+from recipe_structurer.services.schema_preformat import (
+    IngredientAnnotationCache,
+    annotate_ingredient_line,
+    detect_language,
+    parse_servings,
+    preformat_from_schema,
+    schema_is_complete,
+)
+
+
+SCHEMA_FR = {
+    "@type": "Recipe",
+    "name": "Soupe de lentilles corail",
+    "description": "Une soupe &amp; <b>réconfortante</b>.",
+    "recipeYield": ["4", "4 personnes"],
+    "prepTime": "PT15M",
+    "cookTime": "PT30M",
+    "recipeCategory": "Soupe",
+    "recipeCuisine": "Indienne",
+    "keywords": "soupe, lentilles, hiver",
+    "author": {"@type": "Person", "name": "Marie"},
+    "image": ["https://example.com/soupe.jpg"],
+    "recipeIngredient": [
+        "200 g de lentilles corail, rincées",
+        "1 oignon, émincé",
+        "2 gousses d'ail",
+        "400 ml de lait de coco",
+        "sel",
+        "1 trait de jus de yuzu",
+    ],
+    "recipeInstructions": [
+        {"@type": "HowToStep", "text": "Faire revenir l'oignon et l'ail 5 minutes."},
+        {"@type": "HowToStep", "text": "Ajouter les lentilles et le lait de coco, laisser mijoter 20 à 25 min."},
+    ],
+}
+
+
+class FakeClient:
+    """Minimal AsyncOpenAI stand-in recording the annotation prompts."""
+
+    def __init__(self, content: str):
+        self.calls = []
+        self.content = content
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, **kwargs):
+        self.calls.append(kwargs)
+        message = SimpleNamespace(content=self.content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason="stop")])
+
+
+class TestCompleteness:
+
+    def test_complete_schema(self):
+        assert schema_is_complete(SCHEMA_FR)
+
+    def test_missing_instructions(self):
+        assert not schema_is_complete({**SCHEMA_FR, "recipeInstructions": []})
+
+    def test_non_serving_yield(self):
+        assert not schema_is_complete({**SCHEMA_FR, "recipeYield": "24 cookies"})
+
+    @pytest.mark.parametrize("value,expected", [
+        ("4", 4), (6, 6), (["4", "4 servings"], 4), ("Serves 2", 2), ("4-6 portions", 4), ("1 cake", None),
+    ])
+    def test_parse_servings(self, value, expected):
+        assert parse_servings(value) == expected
+
+    def test_detect_language(self):
+        assert detect_language(SCHEMA_FR) == "fr"
+        assert detect_language({"inLanguage": "en-US"}) == "en"
+        assert detect_language({"recipeIngredient": ["2 cups of flour", "1 tsp of salt"]}) == "en"
+
+
+class TestDictionaryAnnotation:
+
+    @pytest.mark.parametrize("line,expected", [
+        ("200 g de lentilles corail, rincées", "- 200 g «lentilles corail» [200 g red lentils, rinsed] {legume}, rincées"),
+        ("2 gousses d'ail", "- 2 gousses «ail» [2 cloves garlic] {produce}"),
+        ("1 c. à soupe d'huile d'olive", "- 1 c. à soupe «huile d'olive» [1 tablespoon olive oil] {oil}"),
+        ("½ cuillère à café de cumin", "- 1/2 cuillère à café «cumin» [1/2 teaspoon cumin] {spice}"),
+        ("sel", "- «sel» [salt, to taste] {spice}"),
+    ])
+    def test_french_lines(self, line, expected):
+        assert annotate_ingredient_line(line, "fr") == expected
+
+    def test_english_line_keeps_text(self):
+        assert (
+            annotate_ingredient_line("2 cloves garlic, minced", "en")
+            == "- 2 cloves «garlic» [2 cloves garlic, minced] {produce}, minced"
+        )
+        assert annotate_ingredient_line("a pinch of salt", "en") == "- 1 pinch «salt» [1 pinch salt] {spice}"
+
+    @pytest.mark.parametrize("line", [
+        "1 boîte (400 g) de tomates",   # weight hint needs judgement
+        "sel, poivre",                   # combined ingredients
+        "1 trait de jus de yuzu",        # not in dictionary
+        "1 oignon, finement ciselé",     # untranslated preparation
+    ])
+    def test_needs_llm(self, line):
+        assert annotate_ingredient_line(line, "fr") is None
+
+    def test_annotations_parse_in_pass_1_5(self):
+        line = annotate_ingredient_line("200 g de lentilles corail, rincées", "fr")
+        [ingredient] = parse_ingredients_from_preformat(f"INGREDIENTS:\n{line}\n\nINSTRUCTIONS:\n1. x")
+        assert ingredient.name == "lentilles corail"
+        assert ingredient.category == "legume"
+        assert ingredient.preparation == "rincées"
+
+
+class TestAnnotationCache:
+
+    def test_concurrent_saves_merge(self, tmp_path):
+        path = tmp_path / "annotations.json"
+        first, second = IngredientAnnotationCache(path), IngredientAnnotationCache(path)
+        first.put("1 citron", "fr", ["- 1 «citron» [1 lemon] {produce}"])
+        second.put("2 oeufs", "fr", ["- 2 «oeufs» [2 eggs] {egg}"])
+        first.save()
+        second.save()
+
+        reloaded = IngredientAnnotationCache(path)
+        assert reloaded.get("1 citron", "fr") and reloaded.get("2 oeufs", "fr")
+
+    def test_from_env(self, tmp_path, monkeypatch):
+        monkeypatch.delenv("LLM_CACHE_DIR", raising=False)
+        assert IngredientAnnotationCache.from_env().path is None
+        monkeypatch.setenv("LLM_CACHE_DIR", str(tmp_path))
+        assert IngredientAnnotationCache.from_env().path.parent == tmp_path
+
+
+@pytest.mark.asyncio
+class TestFastPath:
+
+    async def test_only_unknown_lines_reach_llm_and_are_cached(self, tmp_path):
+        client = FakeClient("1. - 1 trait «jus de yuzu» [1 dash yuzu juice] {produce}")
+        cache = IngredientAnnotationCache(tmp_path / "annotations.json")
+
+        text = await preformat_from_schema(client, "model", SCHEMA_FR, cache=cache)
+
+        assert len(client.calls) == 1
+        assert "1. 1 trait de jus de yuzu" in client.calls[0]["messages"][1]["content"]
+        assert "gousses" not in client.calls[0]["messages"][1]["content"]
+        assert "- 1 trait «jus de yuzu» [1 dash yuzu juice] {produce}" in text
+
+        # Second import: everything comes from the dictionary or the cache
+        reloaded = IngredientAnnotationCache(tmp_path / "annotations.json")
+        await preformat_from_schema(client, "model", SCHEMA_FR, cache=reloaded)
+        assert len(client.calls) == 1
+
+    async def test_rendered_format(self, tmp_path):
+        client = FakeClient("1. - 1 trait «jus de yuzu» [1 dash yuzu juice] {produce}")
+        text = await preformat_from_schema(client, "model", SCHEMA_FR, cache=IngredientAnnotationCache(None))
+
+        assert text.startswith("TITLE: Soupe de lentilles corail\nDESCRIPTION: Une soupe & réconfortante.")
+        assert "LANGUAGE: fr" in text
+        assert "SERVINGS: 4" in text
+        assert "DIFFICULTY: medium" in text
+        assert "TYPE: starter" in text
+        assert "AUTHOR: Marie" in text
+        assert "IMAGE_URL: https://example.com/soupe.jpg" in text
+        assert "- lentilles" in text
+        assert "1. Faire revenir l'oignon et l'ail **5min**." in text
+        assert "2. Ajouter les lentilles et le lait de coco, laisser mijoter **20-25min**. [PASSIVE]" in text
+        assert len(parse_ingredients_from_preformat(text)) == 6
+
+    async def test_llm_failure_falls_back(self):
+        client = FakeClient("Sorry, I cannot help with that.")
+        assert await preformat_from_schema(client, "model", SCHEMA_FR, cache=IngredientAnnotationCache(None)) is None
+
+    async def test_incomplete_schema_skips_llm(self):
+        client = FakeClient("")
+        assert await preformat_from_schema(client, "model", {"name": "x"}) is None
+        assert client.calls == []
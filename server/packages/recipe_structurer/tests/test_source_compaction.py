@@ -0,0 +1,139 @@
+"""Tests for the token-budgeted compaction of source text (Pass 1 / Pass 3 prompts)."""
+
+from recipe_structurer.services.source_compaction import (
+    GAP_MARKER,
+    CompactionStats,
+    compact_and_log,
+    compact_source,
+    estimate_tokens,
+    schema_vocabulary,
+    score_line,
+)
+
+STORY = (
+    "Cet été, en rentrant de vacances chez ma grand-mère, j'ai repensé à ces après-midis "
+    "passés dans sa cuisine, entre les confitures et les histoires de famille. "
+) * 3
+RECIPE = [
+    "Tarte aux pommes de Mamie",
+    STORY,
+    "Ingrédients",
+    "- 200 g de farine",
+    "- 100 g de beurre",
+    "- 4 pommes",
+    STORY,
+    "Préparation",
+    "1. Préchauffer le four à 180°C.",
+    "2. Mélanger la farine et le beurre, puis étaler la pâte.",
+    "3. Disposer les pommes et enfourner 35 min.",
+    "Répondre · 12/03/2024 @julie58 Trop bonne cette recette, merci !",
+    STORY,
+]
+
+
+def _source() -> str:
+    return "\n".join(RECIPE)
+
+
+class TestScoring:
+
+    def test_recipe_lines_outrank_prose_and_comments(self):
+        story, comment = score_line(STORY), score_line(RECIPE[11])
+        for line in RECIPE[2:6] + RECIPE[7:11]:
+            assert score_line(line) > max(story, comment), line
+
+    def test_schema_overlap_raises_the_score(self):
+        words = schema_vocabulary({
+            "name": "Tarte aux pommes",
+            "recipeIngredient": ["4 pommes Golden"],
+            "recipeInstructions": [{"@type": "HowToStep", "text": "Disposer les pommes"}],
+        })
+        line = "Les pommes Golden se tiennent bien à la cuisson"
+        assert score_line(line, words) > score_line(line)
+
+
+class TestCompaction:
+
+    def test_text_within_budget_is_unchanged(self):
+        text = _source()
+        result = compact_source(text, estimate_tokens(text))
+        assert result.text == text and not result.compacted
+        assert result.to_source(42) == 42
+
+    def test_keeps_recipe_lines_in_order(self):
+        text = _source()
+        result = compact_source(text, 75)
+        assert result.compacted
+        assert result.tokens_after <= 75 < result.tokens_before
+        kept = [line for line in result.text.split("\n") if line != GAP_MARKER]
+        assert kept == [RECIPE[0]] + RECIPE[2:6] + RECIPE[7:11]
+        assert STORY not in result.text and "@julie58" not in result.text
+
+    def test_offsets_map_back_to_the_source(self):
+        text = _source()
+        result = compact_source(text, 75)
+        for start, source_start, length in result.spans:
+            assert result.text[start:start + length] == text[source_start:source_start + length]
+
+        quote = "étaler la pâte"
+        assert result.locate(f"« {quote} »") == text.index(quote)
+        assert result.locate("Mélanger LA farine") == text.index("Mélanger la farine")
+        assert result.locate("grand-mère") is None
+        assert result.to_source(result.text.index(GAP_MARKER) + 1) is None
+
+    def test_first_line_over_budget_is_clipped(self):
+        text = STORY * 4 + "\n" + "\n".join(RECIPE[2:6])
+        result = compact_source(text, 75)
+        assert result.compacted and result.clipped
+        assert result.tokens_after <= 75
+        assert result.text.endswith(f"\n{GAP_MARKER}")
+        assert text.startswith(result.text[:-len(GAP_MARKER) - 1])
+
+        single = compact_source(STORY * 4, 75)
+        assert single.clipped and single.lines_kept == single.lines_total == 1
+        assert single.tokens_after <= 75 and single.text.endswith(GAP_MARKER)
+
+    def test_deterministic(self):
+        assert compact_source(_source(), 75) == compact_source(_source(), 75)
+
+
+def test_stats_summary():
+    stats = CompactionStats("Pass 3")
+    compact_and_log(_source(), 75, "Pass 3", stats=stats)
+    compact_and_log("Court", 75, "Pass 3", stats=stats)
+    assert (stats.texts, stats.compacted) == (2, 1)
+    assert stats.tokens_saved > 0
+    assert stats.summary().startswith("Pass 3: 1/2 sources compacted")
+
+
+class TestUnquantifiedBullets:
+    """Bare ingredient bullets below a long story must not lose to the story."""
+
+    STORY_LINES = [
+        f"Souvenir {n} : des moules pour mamie."
+        for n in range(1, 9)
+    ]
+    RECIPE_LINES = [
+        "Ingrédients",
+        "- 1 kg de moules",
+        "- Persil frais",
+        "- Sel et poivre",
+        "Préparation",
+        "1. Laver les moules.",
+        "2. Cuire 10 min à couvert.",
+    ]
+
+    def test_bullets_outrank_story_lines(self):
+        for story in self.STORY_LINES:
+            assert score_line("- Persil frais", language="fr") > score_line(story, language="fr")
+
+    def test_bullets_are_kept_below_a_long_story(self):
+        lines = ["Moules marinières"] + self.STORY_LINES + self.RECIPE_LINES
+        text = "\n".join(lines)
+        # Room for the recipe lines, not for a story line more
+        budget = estimate_tokens(f"\n{GAP_MARKER}\n".join([lines[0]] + self.RECIPE_LINES)) + 3
+
+        result = compact_source(text, budget)
+
+        kept = [line for line in result.text.split("\n") if line != GAP_MARKER]
+        assert kept == [lines[0]] + self.RECIPE_LINES
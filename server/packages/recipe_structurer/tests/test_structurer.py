@@ -446,6 +446,25 @@ class TestModels:
         assert len(recipe.steps) == 4
 
 
+class TestParsedIngredients:
+    """Pass 1 context handed to the ingredients callback before Pass 2"""
+
+    def test_from_preformat(self):
+        from recipe_structurer.generator import ParsedIngredients
+        from recipe_structurer.prompts.unified import FEW_SHOT_PREFORMATTED_INPUT
+
+        ingredients = [Ingredient(id="onion", name="oignon", name_en="onion", category="produce")]
+        parsed = ParsedIngredients.from_preformat(ingredients, FEW_SHOT_PREFORMATTED_INPUT)
+
+        assert parsed.ingredients is ingredients
+        # Empty header fields (IMAGE_URL) are left out
+        assert parsed.metadata == {
+            "title": "Poulet à la crème et champignons", "servings": 4, "recipeType": "main_course",
+        }
+        assert parsed.steps[0] == {"action": "Assaisonner les cuisses de poulet avec le sel et le poivre. (**2min**)"}
+        assert all(not step["action"].startswith("**") for step in parsed.steps)
+
+
 # =============================================================================
 # Integration Tests (With API calls)
 # =============================================================================
@@ -0,0 +1,85 @@
+"""
+Micro-benchmark of the page parsing step of WebScraper.scrape_url.
+
+Compares the former path (BeautifulSoup "html.parser" for JSON-LD / title /
+images, then Trafilatura re-parsing the raw HTML) with the current one
+(a single lxml parse shared by every extractor, Trafilatura included).
+
+Usage:
+    cd server/packages/web_scraper
+    poetry run python scripts/bench_parsing.py                 # bundled fixtures
+    poetry run python scripts/bench_parsing.py page1.html ...  # saved pages
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import trafilatura
+from bs4 import BeautifulSoup
+
+from web_scraper.parsing import page_title, parse_html
+from web_scraper.scraper import WebScraper
+
+_FIXTURES_DIR = Path(__file__).parent.parent / "tests" / "fixtures"
+
+_TRAFILATURA_KWARGS = dict(
+    include_comments=False,
+    include_tables=True,
+    include_links=False,
+    favor_recall=True,
+)
+
+
+def bs4_path(html: str, url: str) -> None:
+    """Former implementation: html.parser tree + Trafilatura on the raw string."""
+    soup = BeautifulSoup(html, "html.parser")
+    data = WebScraper._extract_schema_recipe(soup)
+    page_title(soup)
+    WebScraper._collect_image_candidates(soup, url, data)
+    trafilatura.extract(html, **_TRAFILATURA_KWARGS)
+
+
+def lxml_path(html: str, url: str) -> None:
+    """Current implementation: one lxml tree shared by all extractors."""
+    doc = parse_html(html)
+    data = WebScraper._extract_schema_recipe(doc)
+    page_title(doc)
+    WebScraper._collect_image_candidates(doc, url, data)
+    trafilatura.extract(doc, **_TRAFILATURA_KWARGS)
+
+
+def bench(fn, html: str, repeat: int) -> float:
+    """Return the best per-call time of *fn* over *repeat* runs, in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(html, "https://example.com/recette/")
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    """Entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark HTML parsing paths")
+    parser.add_argument("pages", nargs="*", type=Path, help="Saved HTML pages (default: test fixtures)")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per page (best time is kept)")
+    args = parser.parse_args()
+
+    pages = args.pages or sorted(_FIXTURES_DIR.glob("*.html"))
+    if not pages:
+        parser.error(f"no HTML pages given and none found in {_FIXTURES_DIR}")
+
+    print(f"{'page':<30} {'size':>8} {'bs4 (ms)':>10} {'lxml (ms)':>10} {'speedup':>8}")
+    for path in pages:
+        html = path.read_text(encoding="utf-8", errors="replace")
+        old = bench(bs4_path, html, args.repeat)
+        new = bench(lxml_path, html, args.repeat)
+        print(f"{path.name[:30]:<30} {len(html) // 1024:>6}kB {old:>10.2f} {new:>10.2f} {old / new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 """Recipe scraper package for extracting recipe content from websites."""
 
 from .scraper import WebScraper
-from .models import AuthPreset, WebContent
+from .models import AuthPreset, WebContent, CachedPage
+from .cache import ResponseCache, normalize_url
 
-__all__ = ["WebScraper", "AuthPreset", "WebContent"] 
\ No newline at end of file
+__all__ = ["WebScraper", "AuthPreset", "WebContent", "CachedPage", "ResponseCache", "normalize_url"] 
\ No newline at end of file
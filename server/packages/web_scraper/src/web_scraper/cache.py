@@ -0,0 +1,262 @@
+"""On-disk HTTP response cache for scraped pages.
+
+Layout under ``cache_dir``::
+
+    entries/<sha256(normalized url)>.json   # metadata (validators, timestamps)
+    bodies/<sha256(body)>.bin               # raw page bytes, content-addressed
+
+Bodies are content-addressed so that several URLs serving the same page
+(redirects, tracking parameters) share a single file on disk. Entries are
+small JSON documents written atomically, so concurrent importer subprocesses
+can share one cache directory safely.
+
+Freshness model:
+  - younger than ``ttl_seconds``     → served as-is, no network round-trip
+  - older                            → revalidated with If-None-Match /
+                                       If-Modified-Since (304 keeps the body)
+  - older than ``max_age_seconds``   → evicted
+  - total body size > ``max_bytes``  → least-recently-used entries evicted
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import httpx
+
+from .models import CachedPage
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 24 * 3600
+DEFAULT_MAX_AGE_SECONDS = 30 * 24 * 3600
+DEFAULT_MAX_BYTES = 500 * 1024 * 1024
+
+# Query parameters that never change the served content
+_TRACKING_PARAMS = {"fbclid", "gclid", "mc_cid", "mc_eid", "ref", "igshid"}
+
+# Response headers worth keeping alongside the body
+_KEPT_HEADERS = ("content-type", "etag", "last-modified", "cache-control", "date")
+
+
+def normalize_url(url: str) -> str:
+    """Normalize a URL into a stable cache key.
+
+    Lowercases scheme and host, drops default ports, fragments and tracking
+    parameters (``utm_*``, ``fbclid``…) and sorts the remaining query string.
+
+    >>> normalize_url("HTTPS://Example.com:443/Recette?utm_source=x&b=2&a=1#top")
+    'https://example.com/Recette?a=1&b=2'
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    port = parts.port
+    if port and not ((scheme == "http" and port == 80) or (scheme == "https" and port == 443)):
+        host = f"{host}:{port}"
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in _TRACKING_PARAMS
+    )
+    return urlunsplit((scheme, host, parts.path or "/", urlencode(query), ""))
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    """Write *data* to *path* atomically (write tmp + rename)."""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp", prefix=path.stem)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+class ResponseCache:
+    """Content-addressed on-disk cache of raw HTML responses."""
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_age_seconds: float = DEFAULT_MAX_AGE_SECONDS,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding ``entries/`` and ``bodies/``
+            ttl_seconds: Age under which an entry is served without revalidation
+            max_age_seconds: Age above which an entry is evicted
+            max_bytes: Upper bound on the total size of cached bodies
+        """
+        self.cache_dir = Path(cache_dir)
+        self.ttl_seconds = ttl_seconds
+        self.max_age_seconds = max_age_seconds
+        self.max_bytes = max_bytes
+        self._entries_dir = self.cache_dir / "entries"
+        self._bodies_dir = self.cache_dir / "bodies"
+        self._entries_dir.mkdir(parents=True, exist_ok=True)
+        self._bodies_dir.mkdir(parents=True, exist_ok=True)
+
+    # ── Paths ────────────────────────────────────────────────────────
+
+    def _entry_path(self, url: str) -> Path:
+        key = hashlib.sha256(normalize_url(url).encode("utf-8")).hexdigest()
+        return self._entries_dir / f"{key}.json"
+
+    def _body_path(self, body_hash: str) -> Path:
+        return self._bodies_dir / f"{body_hash}.bin"
+
+    # ── Lookup ───────────────────────────────────────────────────────
+
+    def get(self, url: str) -> Optional[CachedPage]:
+        """Return the cached entry for *url*, or None if absent / unreadable."""
+        path = self._entry_path(url)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                page = CachedPage(**json.load(f))
+        except FileNotFoundError:
+            return None
+        except (json.JSONDecodeError, OSError, ValueError) as e:
+            logger.warning(f"Corrupt cache entry for {url}: {e}")
+            return None
+        if not self._body_path(page.body_hash).exists():
+            return None
+        return page
+
+    def read_body(self, page: CachedPage) -> str:
+        """Decode the cached body of *page*."""
+        raw = self._body_path(page.body_hash).read_bytes()
+        return raw.decode(page.encoding or "utf-8", errors="replace")
+
+    def is_fresh(self, page: CachedPage) -> bool:
+        """True if *page* can be served without revalidation."""
+        return (time.time() - page.fetched_at) < self.ttl_seconds
+
+    @staticmethod
+    def conditional_headers(page: CachedPage) -> Dict[str, str]:
+        """Build If-None-Match / If-Modified-Since headers for *page*."""
+        headers: Dict[str, str] = {}
+        if page.etag:
+            headers["If-None-Match"] = page.etag
+        if page.last_modified:
+            headers["If-Modified-Since"] = page.last_modified
+        return headers
+
+    # ── Writes ───────────────────────────────────────────────────────
+
+    def _write_entry(self, page: CachedPage) -> None:
+        _atomic_write(
+            self._entry_path(page.url),
+            json.dumps(page.model_dump(), ensure_ascii=False).encode("utf-8"),
+        )
+
+    def store(self, url: str, response: httpx.Response) -> CachedPage:
+        """Store a 200 response for *url* and return its cache entry."""
+        body = response.content
+        body_hash = hashlib.sha256(body).hexdigest()
+        body_path = self._body_path(body_hash)
+        if not body_path.exists():
+            _atomic_write(body_path, body)
+
+        now = time.time()
+        page = CachedPage(
+            url=normalize_url(url),
+            final_url=str(response.url),
+            status_code=response.status_code,
+            headers={k: response.headers[k] for k in _KEPT_HEADERS if k in response.headers},
+            etag=response.headers.get("etag"),
+            last_modified=response.headers.get("last-modified"),
+            encoding=response.encoding,
+            body_hash=body_hash,
+            size=len(body),
+            fetched_at=now,
+            accessed_at=now,
+        )
+        self._write_entry(page)
+        self.evict()
+        return page
+
+    def refresh(self, page: CachedPage, response: Optional[httpx.Response] = None) -> CachedPage:
+        """Mark *page* as revalidated (after a 304), updating its validators."""
+        updates: Dict[str, object] = {"fetched_at": time.time(), "accessed_at": time.time()}
+        if response is not None:
+            if response.headers.get("etag"):
+                updates["etag"] = response.headers["etag"]
+            if response.headers.get("last-modified"):
+                updates["last_modified"] = response.headers["last-modified"]
+        page = page.model_copy(update=updates)
+        self._write_entry(page)
+        return page
+
+    def touch(self, page: CachedPage) -> None:
+        """Record an access so LRU eviction keeps *page* around."""
+        try:
+            self._write_entry(page.model_copy(update={"accessed_at": time.time()}))
+        except OSError as e:
+            logger.debug(f"Could not update cache access time for {page.url}: {e}")
+
+    # ── Eviction ─────────────────────────────────────────────────────
+
+    def evict(self) -> int:
+        """Drop expired entries, then LRU entries until under ``max_bytes``.
+
+        Bodies are removed once no entry references them anymore.
+
+        Returns:
+            Number of entries removed.
+        """
+        now = time.time()
+        entries: list[tuple[Path, CachedPage]] = []
+        removed = 0
+        for path in self._entries_dir.glob("*.json"):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    page = CachedPage(**json.load(f))
+            except (json.JSONDecodeError, OSError, ValueError):
+                path.unlink(missing_ok=True)
+                removed += 1
+                continue
+            if now - page.fetched_at > self.max_age_seconds:
+                path.unlink(missing_ok=True)
+                removed += 1
+                continue
+            entries.append((path, page))
+
+        referenced = {page.body_hash: page.size for _, page in entries}
+        total = sum(referenced.values())
+        if total > self.max_bytes:
+            entries.sort(key=lambda item: item[1].accessed_at)
+            while entries and total > self.max_bytes:
+                path, page = entries.pop(0)
+                path.unlink(missing_ok=True)
+                removed += 1
+                if not any(p.body_hash == page.body_hash for _, p in entries):
+                    referenced.pop(page.body_hash, None)
+                    total -= page.size
+
+        for body_path in self._bodies_dir.glob("*.bin"):
+            if body_path.stem in referenced:
+                continue
+            try:
+                # Leave bodies another process may be about to reference alone
+                if now - body_path.stat().st_mtime > 60:
+                    body_path.unlink(missing_ok=True)
+            except OSError:
+                pass
+
+        if removed:
+            logger.info(f"HTTP cache eviction removed {removed} entries ({total} bytes kept)")
+        return removed
@@ -8,6 +8,20 @@ class WebContent(BaseModel):
     image_urls: List[str]
     structured_data: Optional[Dict[str, Any]] = None
 
+class CachedPage(BaseModel):
+    """Metadata of a page stored in the on-disk HTTP response cache."""
+    url: str  # Normalized URL (cache key)
+    final_url: str  # URL after redirects
+    status_code: int
+    headers: Dict[str, str] = {}
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    encoding: Optional[str] = None
+    body_hash: str  # sha256 of the raw body (content address)
+    size: int
+    fetched_at: float  # Last download or successful revalidation (epoch seconds)
+    accessed_at: float  # Last read, for LRU eviction
+
 class AuthPreset(BaseModel):
     """Authentication preset for a website."""
     type: str  # "cookie", "basic", "bearer", "apikey"
@@ -0,0 +1,71 @@
+"""HTML parsing helpers shared by schema, image and content extraction.
+
+Pages are parsed once with lxml (C-backed, already required by trafilatura)
+and the resulting tree is reused by every extractor, including trafilatura
+itself, which accepts an lxml tree and works on its own copy. BeautifulSoup
+stays as a fallback for markup lxml refuses; the helpers below accept either
+kind of document so callers don't need to care which parser was used.
+"""
+
+import logging
+from typing import Iterator, List, Optional, Union
+
+import lxml.html
+from bs4 import BeautifulSoup
+from lxml import etree
+
+logger = logging.getLogger(__name__)
+
+Document = Union[lxml.html.HtmlElement, BeautifulSoup]
+
+_HTML_PARSER = lxml.html.HTMLParser(encoding="utf-8", remove_comments=True)
+_INVISIBLE_TAGS = ("script", "style", "noscript", "template")
+
+
+def parse_html(html: str) -> Document:
+    """Parse *html* with lxml, falling back to BeautifulSoup's html.parser.
+
+    The text is re-encoded to UTF-8 bytes so that pages carrying an XML
+    encoding declaration (which lxml refuses on ``str`` input) still parse.
+    """
+    try:
+        tree = lxml.html.document_fromstring(
+            html.encode("utf-8", errors="replace"), parser=_HTML_PARSER
+        )
+        if tree is not None:
+            return tree
+    except (etree.ParserError, ValueError) as e:
+        logger.warning("lxml could not parse page (%s), falling back to BeautifulSoup", e)
+    return BeautifulSoup(html, "html.parser")
+
+
+def iter_tags(doc: Document, name: str) -> Iterator:
+    """Iterate over the *name* elements of *doc*; each supports ``.get(attr)``."""
+    if isinstance(doc, BeautifulSoup):
+        return iter(doc.find_all(name))
+    return doc.iter(name)
+
+
+def json_ld_texts(doc: Document) -> Iterator[str]:
+    """Yield the raw text of every ``<script type="application/ld+json">``."""
+    for script in iter_tags(doc, "script"):
+        if (script.get("type") or "").strip().lower() != "application/ld+json":
+            continue
+        text = script.string if isinstance(doc, BeautifulSoup) else script.text
+        if text:
+            yield text
+
+
+def page_title(doc: Document) -> str:
+    """Return the stripped ``<title>`` text, or an empty string."""
+    if isinstance(doc, BeautifulSoup):
+        return doc.title.string.strip() if doc.title and doc.title.string else ""
+    return (doc.findtext(".//title") or "").strip()
+
+
+def visible_text(doc: Document) -> List[str]:
+    """Return the non-empty visible text fragments of *doc*, in document order."""
+    if isinstance(doc, BeautifulSoup):
+        return [t.strip() for t in doc.stripped_strings if t.strip()]
+    excluded = " and ".join(f"not(ancestor::{tag})" for tag in _INVISIBLE_TAGS)
+    return [t.strip() for t in doc.xpath(f"//text()[{excluded}]") if t.strip()]
@@ -1,4 +1,4 @@
-from typing import Any, Dict, Optional, List
+from typing import Any, Dict, Optional, List, Tuple
 import json
 import logging
 import httpx
@@ -10,18 +10,43 @@ from pathlib import Path
 
 from .models import WebContent, AuthPreset
 from .auth import AuthManager
+from .cache import ResponseCache
+from .parsing import Document, iter_tags, json_ld_texts, page_title, parse_html, visible_text
 
 logger = logging.getLogger(__name__)
 
+# Image candidate ranking
+MAX_IMAGE_CANDIDATES = 10  # URLs handed to the structurer
+MAX_IMAGE_PROBES = 3  # HEAD requests sent at most per page
+MAX_PROBES_PER_HOST = 2  # concurrent HEAD requests per image host
+_SCHEMA_IMAGE_SCORE = 1000.0
+_META_IMAGE_SCORE = 500.0
+_NOISE_PENALTY = 400.0
+_META_IMAGE_PROPERTIES = {"og:image", "og:image:url", "og:image:secure_url", "twitter:image"}
+_IMAGE_NOISE_HINTS = ("logo", "icon", "avatar", "sprite", "badge", "emoji", "gravatar", "pixel", "spinner")
+
+
+def _int_attr(value: Any) -> int:
+    """Parse an HTML size attribute like ``"640"`` or ``"640px"`` (0 if unparseable)."""
+    if not value:
+        return 0
+    digits = str(value).strip().removesuffix("px")
+    return int(digits) if digits.isdigit() else 0
+
 class WebScraper:
     """Service for scraping recipe content from websites."""
     
-    def __init__(self, auth_presets_path: Optional[Path] = None):
+    def __init__(
+        self,
+        auth_presets_path: Optional[Path] = None,
+        cache: Optional[ResponseCache] = None,
+    ):
         """
         Initialize the web scraper.
         
         Args:
             auth_presets_path: Optional path to the auth presets file
+            cache: Optional on-disk HTTP response cache for page bodies
         """
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
@@ -34,9 +59,11 @@ class WebScraper:
             timeout=30.0
         )
         self.auth_manager = AuthManager(self.client, auth_presets_path)
+        self.cache = cache
+        self._probe_semaphores: Dict[str, asyncio.Semaphore] = {}
 
     @staticmethod
-    def _extract_schema_recipe(soup: BeautifulSoup) -> Optional[Dict[str, Any]]:
+    def _extract_schema_recipe(doc: Document) -> Optional[Dict[str, Any]]:
         """
         Extract schema.org/Recipe structured data from JSON-LD script tags.
 
@@ -48,11 +75,8 @@ class WebScraper:
         Returns:
             Parsed JSON-LD dict with @type=Recipe, or None if not found.
         """
-        for script in soup.find_all("script", type="application/ld+json"):
+        for text in json_ld_texts(doc):
             try:
-                text = script.string
-                if not text:
-                    continue
                 data = json.loads(text)
 
                 # Direct Recipe object
@@ -81,63 +105,183 @@ class WebScraper:
 
         return None
 
-    async def _extract_images(self, soup: BeautifulSoup, base_url: str) -> List[str]:
-        """Extract image URLs from the page."""
-        images = []
-        tasks = []
+    # ── Image candidates ─────────────────────────────────────────────
 
-        for img in soup.find_all("img"):
-            src = img.get("src", "")
-            if src:
-                # Skip SVG data URIs or invalid URL formats that cause problems
-                if src.startswith(("/image/svg+xml", "data:image/svg+xml")):
-                    continue
-                    
-                if not src.startswith(("http://", "https://")):
-                    src = urljoin(base_url, src)
-                
-                async def check_image(url):
-                    try:
-                        r = await self.client.head(url)
-                        if r.status_code == 200:
-                            images.append(url)
-                    except (httpx.HTTPError, ValueError):
-                        # Catch both HTTPError and ValueError (for invalid URLs)
-                        pass
-
-                tasks.append(check_image(src))
-
-        # Exécute toutes les vérifications d'images en parallèle
-        await asyncio.gather(*tasks)
-        return images
+    @staticmethod
+    def _schema_image_urls(value: Any) -> List[str]:
+        """Flatten a schema.org ``image`` value (str, ImageObject or list) into URLs."""
+        if isinstance(value, str):
+            return [value]
+        if isinstance(value, dict):
+            url = value.get("url") or value.get("contentUrl")
+            return [url] if isinstance(url, str) else []
+        if isinstance(value, list):
+            urls: List[str] = []
+            for item in value:
+                urls.extend(WebScraper._schema_image_urls(item))
+            return urls
+        return []
 
-    async def scrape_url(
+    @staticmethod
+    def _largest_srcset_url(srcset: str) -> Tuple[Optional[str], int]:
+        """Return the widest entry of a ``srcset`` attribute and its width (0 if unknown)."""
+        best_url, best_width = None, -1
+        for entry in srcset.split(","):
+            parts = entry.strip().split()
+            if not parts:
+                continue
+            width = 0
+            if len(parts) > 1 and parts[1].endswith("w") and parts[1][:-1].isdigit():
+                width = int(parts[1][:-1])
+            if width > best_width:
+                best_url, best_width = parts[0], width
+        return best_url, max(best_width, 0)
+
+    @staticmethod
+    def _collect_image_candidates(
+        doc: Document,
+        base_url: str,
+        structured_data: Optional[Dict[str, Any]] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        Rank the images of a page without any network call.
+
+        Scores, highest first:
+          - schema.org Recipe ``image``             (authored by the site for the recipe)
+          - ``og:image`` / ``twitter:image``        (the page's share picture)
+          - ``<img>`` tags, by declared size (width/height attributes or srcset)
+
+        Icons, logos, avatars, tracking pixels and SVGs are skipped.
+
+        Returns:
+            (absolute URL, score) pairs sorted by decreasing score, deduplicated.
+        """
+        scores: Dict[str, float] = {}
+
+        def add(url: Optional[str], score: float) -> None:
+            if not url:
+                return
+            url = url.strip()
+            if not url or url.startswith(("data:", "/image/svg+xml")):
+                return
+            url = urljoin(base_url, url)
+            if not url.startswith(("http://", "https://")):
+                return
+            path = urlparse(url).path.lower()
+            if path.endswith(".svg"):
+                return
+            if any(hint in path for hint in _IMAGE_NOISE_HINTS):
+                score -= _NOISE_PENALTY
+            scores[url] = max(scores.get(url, float("-inf")), score)
+
+        if structured_data:
+            for url in WebScraper._schema_image_urls(structured_data.get("image")):
+                add(url, _SCHEMA_IMAGE_SCORE)
+
+        for meta in iter_tags(doc, "meta"):
+            if (meta.get("property") or meta.get("name")) in _META_IMAGE_PROPERTIES:
+                add(meta.get("content"), _META_IMAGE_SCORE)
+
+        for position, img in enumerate(iter_tags(doc, "img")):
+            src = img.get("src") or ""
+            # Lazy-loading plugins keep the real URL in a data-* attribute
+            for attr in ("data-src", "data-lazy-src", "data-original"):
+                if img.get(attr):
+                    src = img.get(attr)
+                    break
+
+            width = _int_attr(img.get("width"))
+            height = _int_attr(img.get("height"))
+            if width and height and width * height <= 4:
+                continue  # tracking pixel
+
+            srcset = img.get("srcset") or img.get("data-srcset") or ""
+            srcset_url, srcset_width = WebScraper._largest_srcset_url(srcset) if srcset else (None, 0)
+            if srcset_url and (not src or srcset_width > width):
+                src, width = srcset_url, srcset_width
+
+            if width and height:
+                area = width * height
+            elif width:
+                area = width * width * 0.66
+            else:
+                area = 0
+            # Size dominates; among unsized images, earlier in the page wins
+            score = min(area / 10_000, _META_IMAGE_SCORE - 1) - position * 0.01
+            add(src, score)
+
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        """Per-host semaphore bounding concurrent image probes."""
+        host = urlparse(url).netloc
+        if host not in self._probe_semaphores:
+            self._probe_semaphores[host] = asyncio.Semaphore(MAX_PROBES_PER_HOST)
+        return self._probe_semaphores[host]
+
+    async def _probe_image(self, url: str) -> bool:
+        """HEAD *url*; False only when the server clearly says the image is gone."""
+        async with self._host_semaphore(url):
+            try:
+                r = await self.client.head(url)
+            except (httpx.HTTPError, ValueError):
+                # Catch both HTTPError and ValueError (for invalid URLs)
+                return False
+        # Some CDNs refuse HEAD (403/405) while serving GET fine
+        return r.status_code < 400 or r.status_code in (403, 405)
+
+    async def _extract_images(
         self,
-        url: str,
-        auth_preset: Optional[AuthPreset] = None
-    ) -> WebContent:
+        doc: Document,
+        base_url: str,
+        structured_data: Optional[Dict[str, Any]] = None,
+        max_images: int = MAX_IMAGE_CANDIDATES,
+        max_probes: int = MAX_IMAGE_PROBES,
+    ) -> List[str]:
         """
-        Scrape recipe content from a URL.
-        
+        Extract the most likely recipe image URLs from the page, best first.
+
+        Candidates are ranked without touching the network. Only when the best
+        candidate does not come from page metadata (schema.org / og:image) are
+        the top ``max_probes`` candidates checked with a HEAD request, bounded
+        per host, so that a dead ``<img>`` does not end up first.
+
         Args:
-            url: The URL to scrape
-            auth_preset: Optional authentication preset
-            
+            doc: Parsed page (lxml tree or BeautifulSoup)
+            base_url: URL of the page, used to resolve relative URLs
+            structured_data: schema.org Recipe JSON-LD, if any
+            max_images: Maximum number of URLs returned
+            max_probes: Maximum number of HEAD requests sent
+
         Returns:
-            WebContent object containing the scraped content
-            
+            Ranked list of absolute image URLs
+        """
+        ranked = self._collect_image_candidates(doc, base_url, structured_data)[:max_images]
+        if not ranked:
+            return []
+
+        images = [url for url, _ in ranked]
+        if ranked[0][1] >= _META_IMAGE_SCORE or max_probes <= 0:
+            return images
+
+        to_probe = images[:max_probes]
+        alive = await asyncio.gather(*(self._probe_image(url) for url in to_probe))
+        dead = {url for url, ok in zip(to_probe, alive) if not ok}
+        if dead:
+            logger.debug("Dropped %d unreachable image(s) for %s", len(dead), base_url)
+        return [url for url in images if url not in dead]
+
+    async def _get_with_retry(self, url: str, headers: Optional[Dict[str, str]] = None) -> httpx.Response:
+        """GET *url* with retry on 429 / 5xx and transport errors.
+
         Raises:
-            ValueError: If the URL cannot be fetched
+            ValueError: If the URL cannot be fetched after retries
         """
-        # Set up authentication if needed
-        await self.auth_manager.setup_authentication(url, auth_preset)
-        
-        # Fetch the page with retry on 429 / 5xx
         max_retries = 3
         response = None
         for attempt in range(max_retries + 1):
             try:
-                response = await self.client.get(url)
+                response = await self.client.get(url, headers=headers)
                 if response.status_code == 429 or response.status_code >= 500:
                     if attempt == max_retries:
                         response.raise_for_status()
@@ -149,7 +293,8 @@ class WebScraper:
                     )
                     await asyncio.sleep(delay)
                     continue
-                response.raise_for_status()
+                if response.status_code != 304:
+                    response.raise_for_status()
                 break
             except httpx.HTTPError as e:
                 if attempt == max_retries:
@@ -157,14 +302,69 @@ class WebScraper:
                 delay = 2 ** (attempt + 1)
                 logger.warning("HTTP error for %s: %s — retrying in %ds", url, e, delay)
                 await asyncio.sleep(delay)
+        return response
+
+    async def _fetch_html(self, url: str, use_cache: bool = True) -> str:
+        """
+        Fetch the HTML of *url*, going through the response cache if configured.
+
+        Fresh cache entries are served without any request. Stale ones are
+        revalidated with If-None-Match / If-Modified-Since; a 304 reuses the
+        cached body. Every 200 response is written back to the cache.
+        """
+        cached = self.cache.get(url) if (self.cache and use_cache) else None
+        if cached and self.cache.is_fresh(cached):
+            logger.info("HTTP cache hit for %s (fresh)", url)
+            self.cache.touch(cached)
+            return self.cache.read_body(cached)
+
+        headers = self.cache.conditional_headers(cached) if cached else None
+        response = await self._get_with_retry(url, headers=headers)
+
+        if response.status_code == 304 and cached:
+            logger.info("HTTP cache hit for %s (revalidated, 304)", url)
+            self.cache.refresh(cached, response)
+            return self.cache.read_body(cached)
+
+        if self.cache:
+            try:
+                self.cache.store(url, response)
+            except OSError as e:
+                # The cache is an optimization — never fail the scrape on it
+                logger.warning("Could not write HTTP cache entry for %s: %s", url, e)
+        return response.text
+
+    async def scrape_url(
+        self,
+        url: str,
+        auth_preset: Optional[AuthPreset] = None,
+        use_cache: bool = True,
+    ) -> WebContent:
+        """
+        Scrape recipe content from a URL.
+        
+        Args:
+            url: The URL to scrape
+            auth_preset: Optional authentication preset
+            use_cache: Read from the HTTP response cache when one is configured
+            
+        Returns:
+            WebContent object containing the scraped content
+            
+        Raises:
+            ValueError: If the URL cannot be fetched
+        """
+        # Set up authentication if needed
+        await self.auth_manager.setup_authentication(url, auth_preset)
         
-        html = response.text
+        html = await self._fetch_html(url, use_cache=use_cache)
 
-        # Parse with BeautifulSoup (needed for image extraction, JSON-LD, and title fallback)
-        soup = BeautifulSoup(html, "html.parser")
+        # Parse once (lxml, BeautifulSoup fallback); the tree is shared by
+        # JSON-LD, title, image and Trafilatura extraction
+        doc = parse_html(html)
 
         # Extract structured data (schema.org/Recipe JSON-LD) — most reliable source
-        structured_data = self._extract_schema_recipe(soup)
+        structured_data = self._extract_schema_recipe(doc)
         if structured_data:
             logger.info(
                 "Found schema.org/Recipe JSON-LD for %s (keys: %s)",
@@ -175,26 +375,26 @@ class WebScraper:
         title = ""
         if structured_data and structured_data.get("name"):
             title = str(structured_data["name"]).strip()
-        elif soup.title and soup.title.string:
-            title = soup.title.string.strip()
+        else:
+            title = page_title(doc)
 
         # Extract main content with Trafilatura (removes boilerplate: nav, footer, ads, comments)
+        # (Trafilatura copies an lxml tree before cleaning it, so doc stays intact)
         main_content = trafilatura.extract(
-            html,
+            html if isinstance(doc, BeautifulSoup) else doc,
             include_comments=False,
             include_tables=True,
             include_links=False,
             favor_recall=True,
         )
 
-        # Fallback to BeautifulSoup if Trafilatura returns nothing
+        # Fallback to the raw visible text if Trafilatura returns nothing
         if not main_content:
-            logger.warning("Trafilatura returned empty content for %s, falling back to BeautifulSoup", url)
-            texts = [t.strip() for t in soup.stripped_strings if t.strip()]
-            main_content = "\n".join(texts)
+            logger.warning("Trafilatura returned empty content for %s, falling back to visible text", url)
+            main_content = "\n".join(visible_text(doc))
 
-        # Extract images in parallel (still uses BeautifulSoup)
-        image_urls = await self._extract_images(soup, url)
+        # Rank images (network only for a few HEAD probes, if at all)
+        image_urls = await self._extract_images(doc, url, structured_data)
         
         return WebContent(
             title=title,
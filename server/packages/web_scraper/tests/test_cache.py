@@ -0,0 +1,105 @@
+import time
+
+import httpx
+import pytest
+
+from web_scraper.cache import ResponseCache, normalize_url
+from web_scraper.scraper import WebScraper
+
+PAGE = """<html><head><title>Soupe aux lentilles</title></head>
+<body><article><h1>Soupe aux lentilles</h1><p>Faire revenir les oignons.</p></article></body></html>"""
+
+
+def _scraper_with_transport(handler, cache: ResponseCache) -> WebScraper:
+    scraper = WebScraper(cache=cache)
+    scraper.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return scraper
+
+
+def test_normalize_url():
+    """Tracking params, fragments, default ports and param order don't change the key."""
+    a = normalize_url("HTTPS://Example.com:443/recette?utm_source=nl&b=2&a=1#comments")
+    b = normalize_url("https://example.com/recette?a=1&b=2")
+    assert a == b == "https://example.com/recette?a=1&b=2"
+    assert normalize_url("https://example.com") == "https://example.com/"
+
+
+@pytest.mark.asyncio
+async def test_fresh_entry_skips_network(tmp_path):
+    """A fresh cache entry is served without any request."""
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(200, text=PAGE, headers={"ETag": '"v1"'})
+
+    scraper = _scraper_with_transport(handler, ResponseCache(tmp_path))
+    first = await scraper._fetch_html("https://example.com/soupe")
+    second = await scraper._fetch_html("https://example.com/soupe?utm_medium=email")
+
+    assert first == second == PAGE
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_revalidates_with_validators(tmp_path):
+    """A stale entry sends If-None-Match / If-Modified-Since and reuses the body on 304."""
+    seen_headers = []
+
+    def handler(request):
+        seen_headers.append(dict(request.headers))
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(
+            200, text=PAGE,
+            headers={"ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"},
+        )
+
+    scraper = _scraper_with_transport(handler, ResponseCache(tmp_path, ttl_seconds=0))
+    await scraper._fetch_html("https://example.com/soupe")
+    html = await scraper._fetch_html("https://example.com/soupe")
+
+    assert html == PAGE
+    assert len(seen_headers) == 2
+    assert seen_headers[1]["if-none-match"] == '"v1"'
+    assert seen_headers[1]["if-modified-since"] == "Mon, 01 Jan 2024 00:00:00 GMT"
+
+
+@pytest.mark.asyncio
+async def test_use_cache_false_bypasses_cache(tmp_path):
+    """use_cache=False always fetches, but still refreshes the cache."""
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(200, text=PAGE)
+
+    scraper = _scraper_with_transport(handler, ResponseCache(tmp_path))
+    await scraper._fetch_html("https://example.com/soupe")
+    await scraper._fetch_html("https://example.com/soupe", use_cache=False)
+
+    assert len(calls) == 2
+    assert "if-none-match" not in calls[1].headers
+
+
+def test_size_eviction_drops_least_recently_used(tmp_path):
+    """When bodies exceed max_bytes, the least recently accessed entry goes first."""
+    cache = ResponseCache(tmp_path, max_bytes=150)
+    request = httpx.Request("GET", "https://example.com/")
+
+    cache.store("https://example.com/a", httpx.Response(200, content=b"a" * 100, request=request))
+    time.sleep(0.01)
+    cache.store("https://example.com/b", httpx.Response(200, content=b"b" * 100, request=request))
+
+    assert cache.get("https://example.com/a") is None
+    assert cache.get("https://example.com/b") is not None
+    assert len(list((tmp_path / "bodies").glob("*.bin"))) >= 1
+
+
+def test_max_age_eviction(tmp_path):
+    """Entries older than max_age_seconds are removed."""
+    cache = ResponseCache(tmp_path, max_age_seconds=-1)
+    request = httpx.Request("GET", "https://example.com/")
+    cache.store("https://example.com/a", httpx.Response(200, content=b"x" * 10, request=request))
+
+    assert cache.get("https://example.com/a") is None
@@ -0,0 +1,53 @@
+from pathlib import Path
+
+import httpx
+import pytest
+from bs4 import BeautifulSoup
+
+from web_scraper.parsing import json_ld_texts, page_title, parse_html, visible_text
+from web_scraper.scraper import WebScraper
+
+FIXTURE = (Path(__file__).parent / "fixtures" / "recipe_page.html").read_text(encoding="utf-8")
+URL = "https://example-cuisine.fr/soupe-lentilles/"
+
+
+def test_lxml_and_bs4_extract_the_same_data():
+    """The fast lxml path and the BeautifulSoup fallback agree on every extractor."""
+    tree = parse_html(FIXTURE)
+    soup = BeautifulSoup(FIXTURE, "html.parser")
+    assert not isinstance(tree, BeautifulSoup)
+
+    assert page_title(tree) == page_title(soup) == "Soupe de lentilles corail au lait de coco | Le Blog Cuisine"
+    assert list(json_ld_texts(tree)) == list(json_ld_texts(soup))
+    assert WebScraper._extract_schema_recipe(tree) == WebScraper._extract_schema_recipe(soup)
+    assert (
+        WebScraper._collect_image_candidates(tree, URL, None)
+        == WebScraper._collect_image_candidates(soup, URL, None)
+    )
+    assert not any("dataLayer" in t for t in visible_text(tree))
+
+
+def test_xml_declaration_is_parsed():
+    """lxml refuses str input with an encoding declaration; parse_html copes."""
+    doc = parse_html('<?xml version="1.0" encoding="utf-8"?><html><head><title>Tarte</title></head></html>')
+    assert page_title(doc) == "Tarte"
+
+
+@pytest.mark.asyncio
+async def test_scrape_url_offline():
+    """End-to-end scrape of the fixture page with a single shared parse."""
+    def handler(request):
+        if request.method == "HEAD":
+            return httpx.Response(200)
+        return httpx.Response(200, text=FIXTURE, headers={"Content-Type": "text/html; charset=utf-8"})
+
+    scraper = WebScraper()
+    scraper.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    scraper.auth_manager.client = scraper.client
+
+    content = await scraper.scrape_url(URL)
+
+    assert content.title == "Soupe de lentilles corail au lait de coco"
+    assert content.structured_data["recipeYield"] == "4"
+    assert content.image_urls[0] == "https://example-cuisine.fr/wp-content/uploads/2024/01/soupe-lentilles.jpg"
+    assert "lentilles corail" in content.main_content
@@ -57,3 +57,62 @@ async def test_image_extraction():
     assert content.image_urls
     for img_url in content.image_urls:
         assert img_url.startswith(("http://", "https://"))
+
+
+GALLERY_PAGE = """<html><head>
+<meta property="og:image" content="https://cdn.example.com/og.jpg">
+</head><body>
+<img src="/static/logo.png" width="200" height="80">
+<img src="https://track.example.com/p.gif" width="1" height="1">
+<img src="data:image/svg+xml;base64,AAAA">
+<img src="/small.jpg" width="100" height="100">
+<img data-src="/lazy-big.jpg" src="/placeholder.gif" width="1200" height="800">
+<img src="/thumb.jpg" srcset="/thumb.jpg 300w, /hero-1600.jpg 1600w">
+</body></html>"""
+
+
+def test_image_candidates_are_ranked_without_network():
+    """schema.org image first, then og:image, then <img> by declared size."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(GALLERY_PAGE, "html.parser")
+    structured = {"@type": "Recipe", "image": {"@type": "ImageObject", "url": "/recipe.jpg"}}
+    ranked = [url for url, _ in WebScraper._collect_image_candidates(soup, "https://example.com/r", structured)]
+
+    assert ranked[:4] == [
+        "https://example.com/recipe.jpg",
+        "https://cdn.example.com/og.jpg",
+        "https://example.com/hero-1600.jpg",
+        "https://example.com/lazy-big.jpg",
+    ]
+    assert ranked[-1] == "https://example.com/static/logo.png"
+    assert "https://track.example.com/p.gif" not in ranked
+    assert not any(url.startswith("data:") for url in ranked)
+
+
+@pytest.mark.asyncio
+async def test_image_probing_is_bounded():
+    """Only the top candidates are probed, and only without a metadata image."""
+    import httpx
+    from bs4 import BeautifulSoup
+
+    probed = []
+
+    def handler(request):
+        probed.append(str(request.url))
+        status = 404 if request.url.path == "/img0.jpg" else 200
+        return httpx.Response(status)
+
+    scraper = WebScraper()
+    scraper.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    page = "".join(f'<img src="/img{i}.jpg" width="{1000 - i}" height="500">' for i in range(50))
+    soup = BeautifulSoup(page, "html.parser")
+
+    images = await scraper._extract_images(soup, "https://example.com/", max_probes=3)
+    assert len(probed) == 3
+    assert images[0] == "https://example.com/img1.jpg"
+    assert "https://example.com/img0.jpg" not in images
+
+    probed.clear()
+    await scraper._extract_images(soup, "https://example.com/", {"image": "https://example.com/hero.jpg"})
+    assert probed == []
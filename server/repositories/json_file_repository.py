@@ -6,6 +6,7 @@ without reading every file on startup.
 """
 
 import glob as glob_module
+import hashlib
 import json
 import logging
 import os
@@ -14,11 +15,28 @@ from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 import aiofiles
+from recipe_scraper.enrichment.seasons import MONTHS
 
 from .recipe_repository import RecipeRepository
 
 logger = logging.getLogger(__name__)
 
+# Length of the content hash versioning image URLs (/api/images/{size}/{slug}.{hash}.webp)
+IMAGE_HASH_LENGTH = 12
+_IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".gif", ".webp", ".svg")
+
+
+def image_hash(path: Path) -> Optional[str]:
+    """Content hash of an image file, None if it cannot be read."""
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 16), b""):
+                digest.update(chunk)
+    except OSError:
+        return None
+    return digest.hexdigest()[:IMAGE_HASH_LENGTH]
+
 
 class JsonFileRepository(RecipeRepository):
 
@@ -30,6 +48,8 @@ class JsonFileRepository(RecipeRepository):
 
         self._url_index: Dict[str, str] = {}
         self._recipes_cache: Optional[List[Dict[str, Any]]] = None
+        # Month name -> {slug: list entry} of the recipes peaking that month
+        self._month_index: Dict[str, Dict[str, Dict[str, Any]]] = {month: {} for month in MONTHS}
         self._load_or_rebuild_index()
 
     # ── Path resolution ───────────────────────────────────────────────
@@ -81,6 +101,12 @@ class JsonFileRepository(RecipeRepository):
         self._refresh_stale_entries()
         return self._recipes_cache or []
 
+    async def list_in_month(self, month: str) -> List[Dict[str, Any]]:
+        if self._recipes_cache is None:
+            self._load_or_rebuild_index()
+        self._refresh_stale_entries()
+        return list(self._month_index.get(month, {}).values())
+
     async def get_by_slug(self, slug: str) -> Optional[Dict[str, Any]]:
         file_path = self._recipes_path / f"{slug}.recipe.json"
         if not file_path.exists():
@@ -157,6 +183,7 @@ class JsonFileRepository(RecipeRepository):
 
         self._recipes_cache = []
         self._url_index = {}
+        self._index_months()
         self._persist_index()
         return count
 
@@ -185,7 +212,17 @@ class JsonFileRepository(RecipeRepository):
                 with open(self._index_path, "r") as f:
                     index_data = json.load(f)
                 self._recipes_cache = index_data.get("recipes", [])
+                # Indexes written before image hashes existed
+                backfilled = False
+                for entry in self._recipes_cache:
+                    entry.pop("_monthMask", None)  # superseded by the month index
+                    if "imageHash" not in entry:
+                        entry["imageHash"] = self._find_image_hash(entry["slug"])
+                        backfilled = True
                 self._url_index = index_data.get("url_index", {})
+                self._index_months()
+                if backfilled:
+                    self._persist_index()
                 logger.info(
                     f"Index loaded: {len(self._recipes_cache)} recipes, "
                     f"{len(self._url_index)} URL entries"
@@ -195,6 +232,13 @@ class JsonFileRepository(RecipeRepository):
                 logger.warning(f"Index file corrupt, rebuilding: {e}")
         self._rebuild_index()
 
+    def _find_image_hash(self, slug: str) -> Optional[str]:
+        for ext in _IMAGE_EXTENSIONS:
+            path = self._images_path / f"{slug}{ext}"
+            if path.exists():
+                return image_hash(path)
+        return None
+
     def _rebuild_index(self) -> None:
         t0 = time.monotonic()
         recipe_files = list(self._recipes_path.glob("*.recipe.json"))
@@ -217,6 +261,7 @@ class JsonFileRepository(RecipeRepository):
 
         self._recipes_cache = recipes
         self._url_index = url_index
+        self._index_months()
         self._persist_index()
 
         elapsed = time.monotonic() - t0
@@ -225,6 +270,20 @@ class JsonFileRepository(RecipeRepository):
             f"({len(recipes)} recipes, {len(url_index)} URLs)"
         )
 
+    def _index_months(self) -> None:
+        self._month_index = {month: {} for month in MONTHS}
+        for entry in self._recipes_cache or []:
+            self._index_entry_months(entry)
+
+    def _index_entry_months(self, entry: Dict[str, Any]) -> None:
+        for month in entry.get("peakMonths") or []:
+            if month in self._month_index:
+                self._month_index[month][entry["slug"]] = entry
+
+    def _unindex_months(self, slug: str) -> None:
+        for entries in self._month_index.values():
+            entries.pop(slug, None)
+
     def _persist_index(self) -> None:
         index_data = {
             "recipes": self._recipes_cache or [],
@@ -287,6 +346,7 @@ class JsonFileRepository(RecipeRepository):
                 logger.warning(f"Failed to refresh index for {fp}: {e}")
 
         if dirty:
+            self._index_months()
             self._persist_index()
             logger.info(
                 f"Index refreshed: {len(stale_files)} updated, "
@@ -302,6 +362,8 @@ class JsonFileRepository(RecipeRepository):
             self._recipes_cache = []
         self._recipes_cache = [r for r in self._recipes_cache if r["slug"] != slug]
         self._recipes_cache.append(entry)
+        self._unindex_months(slug)
+        self._index_entry_months(entry)
 
         url = recipe_data.get("metadata", {}).get("sourceUrl")
         if url and slug:
@@ -311,6 +373,7 @@ class JsonFileRepository(RecipeRepository):
     def _remove_from_index(self, slug: str) -> None:
         if self._recipes_cache is not None:
             self._recipes_cache = [r for r in self._recipes_cache if r["slug"] != slug]
+        self._unindex_months(slug)
         self._url_index = {u: s for u, s in self._url_index.items() if s != slug}
         self._persist_index()
 
@@ -338,6 +401,8 @@ class JsonFileRepository(RecipeRepository):
         except OSError:
             mtime = 0.0
 
+        image = metadata.get("image")
+
         return {
             "title": metadata.get("title", "Untitled"),
             "sourceImageUrl": metadata.get("sourceImageUrl", ""),
@@ -362,6 +427,7 @@ class JsonFileRepository(RecipeRepository):
             "quick": metadata.get("quick", False),
             "difficulty": metadata.get("difficulty", ""),
             "slug": slug,
+            "imageHash": image_hash(file_path.parent / image) if image else None,
             "nutritionTags": metadata.get("nutritionTags") or [],
             "nutritionPerServing": JsonFileRepository._slim_nutrition(
                 metadata.get("nutritionPerServing")
@@ -19,6 +19,11 @@ class RecipeRepository(ABC):
         """Return lightweight metadata entries for every recipe."""
         ...
 
+    @abstractmethod
+    async def list_in_month(self, month: str) -> List[Dict[str, Any]]:
+        """Return the summaries of the recipes whose peak months include *month*."""
+        ...
+
     @abstractmethod
     async def get_by_slug(self, slug: str) -> Optional[Dict[str, Any]]:
         """Return the full recipe dict, or None if not found."""
@@ -0,0 +1,56 @@
+"""
+Generate the image variants (thumbnail, small, medium, large) of every
+original recipe image that has none yet or whose original changed since.
+
+Runs the same process-pool pipeline as the server and updates its manifest,
+so the images route only serves existing files afterwards.
+
+Usage:
+    python -m scripts.backfill_image_variants [--workers 8] [--force] [--avif]
+    python -m scripts.backfill_image_variants --slugs tarte-tatin,ratatouille
+"""
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+SERVER_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(SERVER_ROOT))
+
+from services.image_pipeline import ImagePipeline
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+logger = logging.getLogger(__name__)
+
+DATA_DIR = SERVER_ROOT / "data"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill recipe image variants")
+    parser.add_argument("--images-dir", type=Path, default=DATA_DIR / "recipes" / "images")
+    parser.add_argument("--cache-dir", type=Path, default=DATA_DIR / "images" / "cache")
+    parser.add_argument("--slugs", type=str, default="", help="Comma-separated image stems (default: all)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--force", action="store_true", help="Regenerate up-to-date variants too")
+    parser.add_argument("--avif", action="store_true", help="Also write AVIF variants")
+    args = parser.parse_args()
+
+    pipeline = ImagePipeline(args.images_dir, args.cache_dir, workers=args.workers, avif=args.avif or None)
+    stems = [s.strip() for s in args.slugs.split(",") if s.strip()] or None
+
+    start = time.perf_counter()
+    try:
+        stats = pipeline.backfill(stems, force=args.force)
+    finally:
+        pipeline.shutdown()
+    logger.info(
+        f"{stats['generated']} generated, {stats['skipped']} up to date, "
+        f"{stats['failed']} failed in {time.perf_counter() - start:.1f}s"
+    )
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,19 +1,22 @@
 """
 Backfill script: resolve all not_found ingredients in the nutrition cache.
 
-Reads nutrition_cache.json, extracts non-composite not_found entries,
-runs them through NutritionResolver (USDA -> Perplexity), and saves
-resolved entries to resolved_ingredients.json.
+Reads the nutrition namespace of the cache store, extracts non-composite
+not_found entries, runs them through NutritionResolver (USDA -> Perplexity),
+and saves resolved entries to the resolved_ingredients namespace.
+
+With --expired, only retries the not_found entries whose TTL has expired
+(NutritionResolver.retry_expired) — meant to run periodically, e.g. from cron.
 
 After this script, run `python -m scripts.re_enrich_nutrition --all`
 to recompute nutrition profiles for all recipes.
 
 Usage:
     python -m scripts.backfill_nutrition_resolver [--dry-run] [--limit N]
+    python -m scripts.backfill_nutrition_resolver --expired [--limit N]
 """
 
 import asyncio
-import json
 import logging
 import sys
 from pathlib import Path
@@ -33,26 +36,14 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-CACHE_FILE = (
-    SERVER_ROOT
-    / "packages"
-    / "recipe_scraper"
-    / "src"
-    / "recipe_scraper"
-    / "data"
-    / "nutrition_cache.json"
-)
-
-
 def load_not_found_names() -> list[str]:
     """Extract non-composite not_found entries from the cache."""
-    with open(CACHE_FILE, "r", encoding="utf-8") as f:
-        cache = json.load(f)
+    from recipe_scraper.services.cache_store import CacheStore
+
+    cache = CacheStore.shared().items("nutrition")
 
     names = []
     for key, entry in cache.items():
-        if key.startswith("_"):
-            continue
         if not isinstance(entry, dict):
             continue
         if entry.get("not_found") and entry.get("reason") != "composite":
@@ -64,7 +55,7 @@ def load_not_found_names() -> list[str]:
 async def run_backfill(names: list[str], dry_run: bool = False) -> None:
     from recipe_scraper.services.nutrition_resolver import NutritionResolver
 
-    resolver = NutritionResolver()
+    resolver = NutritionResolver.shared()
 
     logger.info(f"{'[DRY-RUN] ' if dry_run else ''}Backfilling {len(names)} not_found ingredients")
 
@@ -80,8 +71,20 @@ async def run_backfill(names: list[str], dry_run: bool = False) -> None:
             logger.info(f"    ... and {len(real) - 20} more")
         return
 
-    results = await resolver.resolve_batch(names)
+    results = await resolver.resolve_batch(names, retry_negative=True)
+    report(results)
+
 
+async def run_expired(limit: int | None = None) -> None:
+    from recipe_scraper.services.nutrition_resolver import NutritionResolver
+
+    results = await NutritionResolver.shared().retry_expired(limit)
+    logger.info(f"Retried {len(results)} expired not_found entries")
+    report(results)
+
+
+def report(results: dict) -> None:
+    """Log the outcome of a resolution batch."""
     resolved = sum(1 for v in results.values() if v is not None)
     failed = sum(1 for v in results.values() if v is None)
 
@@ -114,6 +117,10 @@ def main():
         if idx + 1 < len(sys.argv):
             limit = int(sys.argv[idx + 1])
 
+    if "--expired" in sys.argv:
+        asyncio.run(run_expired(limit))
+        return
+
     names = load_not_found_names()
     logger.info(f"Found {len(names)} not_found entries in cache")
 
@@ -1,5 +1,5 @@
 """
-Backfill mineral data for resolved_ingredients.json using USDA FDC API.
+Backfill mineral data for resolved ingredients using USDA FDC API.
 
 Each resolved ingredient has an fdc_id. This script fetches the detailed
 nutrient profile from USDA and copies mineral values into the entry.
@@ -9,23 +9,23 @@ Usage:
 """
 
 import asyncio
-import json
 import logging
 import os
 import sys
-from datetime import datetime
 from pathlib import Path
 
 import httpx
 
 SERVER_ROOT = Path(__file__).parent.parent
 sys.path.insert(0, str(SERVER_ROOT))
+sys.path.insert(0, str(SERVER_ROOT / "packages" / "recipe_scraper" / "src"))
+
+from recipe_scraper.services.cache_store import CacheStore
 
 logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
 logger = logging.getLogger(__name__)
 
-DATA_DIR = SERVER_ROOT / "packages" / "recipe_scraper" / "src" / "recipe_scraper" / "data"
-RESOLVED_FILE = DATA_DIR / "resolved_ingredients.json"
+RESOLVED_NAMESPACE = "resolved_ingredients"
 
 USDA_BASE = "https://api.nal.usda.gov/fdc/v1"
 
@@ -65,10 +65,8 @@ async def main():
         logger.error("USDA_API_KEY not set")
         sys.exit(1)
 
-    with open(RESOLVED_FILE) as f:
-        data = json.load(f)
-
-    entries = {k: v for k, v in data.items() if not k.startswith("_")}
+    store = CacheStore.shared()
+    entries = store.items(RESOLVED_NAMESPACE)
     to_update = {
         k: v for k, v in entries.items()
         if v.get("fdc_id") and v.get("calcium_mg") is None
@@ -81,6 +79,7 @@ async def main():
         return
 
     updated = 0
+    updated_entries = {}
     errors = 0
     batch_size = 5
 
@@ -103,10 +102,11 @@ async def main():
                     continue
 
                 if result:
-                    data[key].update(result)
+                    entries[key].update(result)
+                    updated_entries[key] = entries[key]
                     updated += 1
                     if updated <= 5 or updated % 100 == 0:
-                        entry = data[key]
+                        entry = entries[key]
                         logger.info(
                             f"  [{updated}] '{key}' (fdc={entry['fdc_id']}): "
                             f"Ca={result.get('calcium_mg')} Fe={result.get('iron_mg')} "
@@ -119,11 +119,8 @@ async def main():
     logger.info(f"\nDone: {updated} updated, {errors} errors")
 
     if not dry_run and updated > 0:
-        data["_meta"] = data.get("_meta", {})
-        data["_meta"]["minerals_backfilled_at"] = datetime.now().isoformat()
-        with open(RESOLVED_FILE, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        logger.info(f"Saved to {RESOLVED_FILE}")
+        store.set_many(RESOLVED_NAMESPACE, updated_entries)
+        logger.info(f"Saved {updated} entries to {store.path}")
     elif dry_run:
         logger.info("[DRY-RUN] No files modified")
 
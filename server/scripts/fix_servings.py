@@ -7,6 +7,10 @@ based on recipe title, type, ingredients list, and total calorie count.
 The LLM returns a structured JSON with the corrected servings and a short
 rationale. Results are cached to avoid re-processing.
 
+Not a stage of the library re-enrichment engine: it only looks at a filtered
+subset of suspect recipes, needs an LLM answer for each and keeps its own
+answer cache (constants/servings_fixes.json).
+
 Usage:
     python -m scripts.fix_servings [--dry-run] [--limit N] [--threshold 800]
 """
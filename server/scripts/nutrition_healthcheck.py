@@ -40,15 +40,7 @@ from typing import Any
 # ── Paths ────────────────────────────────────────────────────────────
 
 RECIPES_DIR = Path(__file__).parent.parent / "data" / "recipes"
-NUTRITION_CACHE_PATH = (
-    Path(__file__).parent.parent
-    / "packages"
-    / "recipe_scraper"
-    / "src"
-    / "recipe_scraper"
-    / "data"
-    / "nutrition_cache.json"
-)
+RECIPE_SCRAPER_SRC = Path(__file__).parent.parent / "packages" / "recipe_scraper" / "src"
 
 # ── Constants ────────────────────────────────────────────────────────
 
@@ -94,13 +86,24 @@ def load_all_recipes() -> list[tuple[Path, dict[str, Any]]]:
     return recipes
 
 
+def _recipe_scraper_importable() -> None:
+    if str(RECIPE_SCRAPER_SRC) not in sys.path:
+        sys.path.insert(0, str(RECIPE_SCRAPER_SRC))
+
+
 def load_nutrition_cache() -> dict[str, Any]:
-    if not NUTRITION_CACHE_PATH.exists():
-        return {}
-    with open(NUTRITION_CACHE_PATH) as f:
-        cache = json.load(f)
-    cache.pop("_meta", None)
-    return cache
+    _recipe_scraper_importable()
+    from recipe_scraper.services.cache_store import CacheStore
+
+    return CacheStore.shared().items("nutrition")
+
+
+def load_ingredient_dictionary():
+    """IngredientDictionary: nutrition cache keys are canonical names."""
+    _recipe_scraper_importable()
+    from recipe_scraper.services.ingredient_dictionary import IngredientDictionary
+
+    return IngredientDictionary.shared()
 
 
 # ── Layer 1 — Recipe-level checks ───────────────────────────────────
@@ -422,13 +425,14 @@ def check_calorie_density(
     title = meta.get("title", "?")
     details = nps.get("ingredientDetails", [])
     issues: list[dict] = []
+    dictionary = load_ingredient_dictionary()
 
     for det in details:
         name_en = (det.get("nameEn") or "").lower().strip()
         if not name_en:
             continue
 
-        cache_entry = nutrition_cache.get(name_en)
+        cache_entry = nutrition_cache.get(dictionary.canonical(name_en))
         if not cache_entry:
             continue
 
@@ -0,0 +1,53 @@
+"""
+Recompute enrichment stages over the whole recipe library.
+
+Stages: diets, seasons, times, nutrition, minerals (see
+recipe_scraper.library_enricher). Ingredient names are matched once per
+run, files are processed by a process pool and only changed files are
+rewritten.
+
+Usage:
+    python -m scripts.re_enrich_library --stages nutrition [--dry-run]
+    python -m scripts.re_enrich_library --stages diets,seasons,times --workers 8
+    python -m scripts.re_enrich_library --stages minerals --limit 50
+"""
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+SERVER_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(SERVER_ROOT))
+sys.path.insert(0, str(SERVER_ROOT / "packages" / "recipe_scraper" / "src"))
+
+from recipe_scraper.library_enricher import STAGES, LibraryEnricher
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+logger = logging.getLogger(__name__)
+
+RECIPES_DIR = SERVER_ROOT / "data" / "recipes"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Library-wide recipe re-enrichment")
+    parser.add_argument("--stages", default=",".join(STAGES),
+                        help=f"Comma-separated stages among {', '.join(STAGES)}")
+    parser.add_argument("--recipes-dir", type=Path, default=RECIPES_DIR)
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--limit", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    engine = LibraryEnricher(stages=stages, workers=args.workers, dry_run=args.dry_run)
+
+    start = time.perf_counter()
+    stats = engine.run(args.recipes_dir, limit=args.limit)
+    logger.info(f"{len(stats['changed'])} files changed in {time.perf_counter() - start:.1f}s")
+    return 1 if stats["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,6 +9,10 @@ Steps per recipe:
   5. Recompute nutritionPerServing + tags
   6. Servings sanity check
 
+Not a stage of the library re-enrichment engine, whose stages need no LLM
+(steps 2-3 are per-recipe LLM calls with confidence gating). For a
+deterministic recompute, use: python -m scripts.re_enrich_library --stages nutrition
+
 Usage:
     cd server
     poetry run python scripts/re_enrich_nutrition.py --all          # all recipes
@@ -30,6 +34,7 @@ sys.path.insert(0, str(SERVER_ROOT))
 sys.path.insert(0, str(SERVER_ROOT / "packages" / "recipe_scraper" / "src"))
 
 from recipe_scraper.recipe_enricher import RecipeEnricher
+from recipe_scraper.services.ingredient_dictionary import IngredientDictionary
 from recipe_scraper.services.nutrition_matcher import NutritionMatcher
 from recipe_scraper.enrichment.nutrition import (
     _load_weight_cache,
@@ -134,16 +139,15 @@ async def re_enrich_recipe(
     nutrition_data = matcher.match_batch(names_en)
 
     # Step 3b: resolve unknowns via NutritionResolver (USDA → Perplexity)
+    dictionary = IngredientDictionary.shared()
     unknown_names = [
         n for n in names_en
-        if n.strip().lower() not in nutrition_data
-        or nutrition_data.get(n.strip().lower()) is None
+        if nutrition_data.get(dictionary.canonical(n)) is None
     ]
     if unknown_names:
         try:
             from recipe_scraper.services.nutrition_resolver import NutritionResolver
-            resolver = NutritionResolver()
-            resolved = await resolver.resolve_batch(unknown_names)
+            resolved = await NutritionResolver.shared().resolve_batch(unknown_names)
             for key, entry in resolved.items():
                 if entry is not None:
                     nutrition_data[key] = {
@@ -1,3 +1,5 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
@@ -7,6 +9,7 @@ from api.routes.images import router as images_router
 from api.routes.constants import router as constants_router
 from api.routes.authors import router as authors_router
 from api.routes.recipe_files import router as recipe_files_router
+from api.dependencies import start_image_pipeline, stop_image_pipeline
 from dotenv import load_dotenv
 import os
 
@@ -16,7 +19,18 @@ load_dotenv()
 # Configuration du port
 port = int(os.getenv("PORT", "3001"))
 
-app = FastAPI(title="Recipe API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Le pipeline d'images et son pool de processus vivent aussi longtemps que l'app
+    start_image_pipeline()
+    try:
+        yield
+    finally:
+        stop_image_pipeline()
+
+
+app = FastAPI(title="Recipe API", lifespan=lifespan)
 
 app.add_middleware(GZipMiddleware, minimum_size=1000)
 
@@ -0,0 +1,137 @@
+"""In-memory index of the original recipe images and their variants.
+
+Built with one directory scan at startup and kept current by the write
+paths (imports, uploads, deletions), so resolving an image name on a
+request makes no filesystem call. Keys are lowercased file stems; a sorted
+key list answers the prefix lookups used for truncated or mangled names.
+"""
+
+import bisect
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+ORIGINAL_EXTENSIONS = (".jpg", ".jpeg", ".png", ".gif", ".webp", ".svg")
+
+# Length of the name prefix used by the fuzzy lookup
+_PREFIX_LENGTH = 40
+
+
+@dataclass
+class ImageEntry:
+    """An original image and its generated variants."""
+
+    original: Path
+    mtime: float
+    # size → manifest variant (dimensions, files)
+    variants: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    # mtime and sha256 of the original the variants were generated from
+    variants_mtime: Optional[float] = None
+    sha256: Optional[str] = None
+
+    @property
+    def is_svg(self) -> bool:
+        return self.original.suffix.lower() == ".svg"
+
+    @property
+    def current(self) -> bool:
+        """Whether the variants were generated from the current original."""
+        return self.variants_mtime is not None and self.variants_mtime == self.mtime
+
+
+class ImageIndex:
+    """Lowercased stem → ImageEntry, with prefix lookups."""
+
+    def __init__(self, originals_dir: Path) -> None:
+        self.originals_dir = Path(originals_dir)
+        self._entries: Dict[str, ImageEntry] = {}
+        self._keys: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def entries(self) -> List[ImageEntry]:
+        return list(self._entries.values())
+
+    # ── Writes ────────────────────────────────────────────────────────
+
+    def build(self) -> None:
+        """Index every original of the images folder (one directory scan)."""
+        self._entries = {}
+        if self.originals_dir.exists():
+            paths = [p for p in self.originals_dir.iterdir() if p.suffix.lower() in ORIGINAL_EXTENSIONS]
+            # Same stem under several extensions: the first extension of ORIGINAL_EXTENSIONS wins
+            paths.sort(key=lambda p: ORIGINAL_EXTENSIONS.index(p.suffix.lower()))
+            for path in paths:
+                key = path.stem.lower()
+                if key not in self._entries and path.is_file():
+                    self._entries[key] = ImageEntry(path, path.stat().st_mtime)
+        self._keys = sorted(self._entries)
+        logger.info(f"Image index built: {len(self._entries)} originals")
+
+    def add(self, path: Path) -> ImageEntry:
+        """Index a newly written original (replaces the entry of the same stem)."""
+        key = path.stem.lower()
+        mtime = path.stat().st_mtime
+        entry = self._entries.get(key)
+        if entry is not None and entry.original == path:
+            entry.mtime = mtime
+            return entry
+        if entry is None:
+            bisect.insort(self._keys, key)
+        entry = self._entries[key] = ImageEntry(path, mtime)
+        return entry
+
+    def refresh(self, stem: str) -> Optional[ImageEntry]:
+        """Re-index the original named *stem* after it was written by another process."""
+        for ext in ORIGINAL_EXTENSIONS:
+            path = self.originals_dir / f"{stem}{ext}"
+            if path.exists():
+                entry = self._entries.get(stem.lower())
+                if entry is not None and entry.original == path and entry.mtime == path.stat().st_mtime:
+                    return entry
+                return self.add(path)
+        self.remove(stem)
+        return None
+
+    def remove(self, stem: str) -> Optional[ImageEntry]:
+        key = stem.lower()
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            del self._keys[bisect.bisect_left(self._keys, key)]
+        return entry
+
+    def clear(self) -> None:
+        self._entries = {}
+        self._keys = []
+
+    def set_variants(self, stem: str, variants: Dict[str, Dict[str, Any]], mtime: float,
+                     sha256: Optional[str] = None) -> None:
+        entry = self._entries.get(stem.lower())
+        if entry is not None:
+            entry.variants = variants
+            entry.variants_mtime = mtime
+            entry.sha256 = sha256
+
+    # ── Lookups ───────────────────────────────────────────────────────
+
+    def get(self, stem: str) -> Optional[ImageEntry]:
+        return self._entries.get(stem.lower())
+
+    def find(self, name: str) -> Optional[ImageEntry]:
+        """
+        Entry of an image name: exact (case-insensitive) stem, else the
+        first stem starting with the first 40 characters of the name.
+        """
+        key = name.lower()
+        entry = self._entries.get(key)
+        if entry is not None or not key:
+            return entry
+        prefix = key[:_PREFIX_LENGTH]
+        pos = bisect.bisect_left(self._keys, prefix)
+        if pos < len(self._keys) and self._keys[pos].startswith(prefix):
+            return self._entries[self._keys[pos]]
+        return None
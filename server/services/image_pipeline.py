@@ -0,0 +1,294 @@
+"""Eager image-variant pipeline.
+
+When an original recipe image is saved (recipe import, upload), its
+thumbnail/small/medium/large WebP variants (and AVIF ones when enabled) are
+generated in a process pool, so the images route only serves files that
+already exist. A manifest (``manifest.json`` in the cache directory) records
+the dimensions and content hashes of each original and its variants.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from PIL import Image, features
+
+from services.image_index import ImageEntry, ImageIndex
+
+logger = logging.getLogger(__name__)
+
+# Bounding boxes of the generated variants (largest first: each one is
+# resized from the decoded original)
+VARIANT_SIZES = {
+    "large": (1200, 1200),
+    "medium": (800, 800),
+    "small": (400, 400),
+    "thumbnail": (200, 200),
+}
+
+_MANIFEST_FILENAME = "manifest.json"
+_WEBP_QUALITY = 85
+_AVIF_QUALITY = 60
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def resize_image(img: Image.Image, size: tuple[int, int]) -> Image.Image:
+    """Resize an image to fit in *size*, keeping its ratio (Lanczos)."""
+    img_ratio = img.width / img.height
+    target_ratio = size[0] / size[1]
+    if img_ratio > target_ratio:
+        new_width = size[0]
+        new_height = int(new_width / img_ratio)
+    else:
+        new_height = size[1]
+        new_width = int(new_height * img_ratio)
+    return img.resize((max(new_width, 1), max(new_height, 1)), Image.Resampling.LANCZOS)
+
+
+def generate_variants(original_path: str, cache_dir: str, avif: bool = False) -> Dict[str, Any]:
+    """
+    Generate every variant of an original image (runs in a worker process).
+
+    Variants are written atomically to ``{cache_dir}/{size}/{stem}.webp``
+    (and ``.avif``).
+
+    Returns:
+        Manifest entry: original dimensions and hash, and per variant its
+        file names, dimensions and hash.
+    """
+    original = Path(original_path)
+    cache = Path(cache_dir)
+    entry: Dict[str, Any] = {
+        "original": original.name,
+        "sha256": _sha256(original),
+        "mtime": original.stat().st_mtime,
+        "variants": {},
+    }
+    if original.suffix.lower() == ".svg":
+        return entry
+
+    with Image.open(original) as img:
+        entry["width"], entry["height"] = img.size
+        # Flatten transparency on white, like the client backgrounds
+        if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
+            img = img.convert("RGBA")
+            background = Image.new("RGB", img.size, (255, 255, 255))
+            background.paste(img, mask=img.split()[-1])
+            img = background
+        elif img.mode != "RGB":
+            img = img.convert("RGB")
+
+        for size, box in VARIANT_SIZES.items():
+            resized = resize_image(img, box)
+            target_dir = cache / size
+            target_dir.mkdir(parents=True, exist_ok=True)
+            formats = [("webp", "WEBP", {"quality": _WEBP_QUALITY, "method": 6})]
+            if avif:
+                formats.append(("avif", "AVIF", {"quality": _AVIF_QUALITY}))
+            variant: Dict[str, Any] = {"width": resized.width, "height": resized.height, "files": {}}
+            for ext, fmt, options in formats:
+                target = target_dir / f"{original.stem}.{ext}"
+                tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+                resized.save(tmp, fmt, **options)
+                tmp.replace(target)
+                variant["files"][ext] = {"name": target.name, "sha256": _sha256(target)}
+            entry["variants"][size] = variant
+    return entry
+
+
+class ImagePipeline:
+    """Generates image variants in the background and tracks them in a manifest."""
+
+    def __init__(self, originals_dir: Path, cache_dir: Path, workers: Optional[int] = None,
+                 avif: Optional[bool] = None) -> None:
+        """
+        Initialize the pipeline.
+
+        Args:
+            originals_dir: Folder of the original recipe images
+            cache_dir: Folder of the variants (one subfolder per size)
+            workers: Worker processes (default: min(4, CPU count))
+            avif: Also write AVIF variants (default: IMAGE_AVIF env var,
+                when Pillow supports it)
+        """
+        self.originals_dir = Path(originals_dir)
+        self.cache_dir = Path(cache_dir)
+        self._workers = workers or min(4, os.cpu_count() or 1)
+        if avif is None:
+            avif = os.getenv("IMAGE_AVIF", "").lower() in ("1", "true", "yes")
+        self.avif = avif and features.check("avif")
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._inflight: Dict[str, "asyncio.Future[Optional[Dict[str, Any]]]"] = {}
+        self._manifest: Dict[str, Dict[str, Any]] = self._load_manifest()
+        self.index = ImageIndex(self.originals_dir)
+        self.index.build()
+        for stem, entry in self._manifest.items():
+            indexed = self.index.get(stem)
+            if indexed is not None and indexed.original.name == entry.get("original"):
+                self.index.set_variants(stem, entry.get("variants", {}), entry.get("mtime"), entry.get("sha256"))
+
+    # ── Manifest ──────────────────────────────────────────────────────
+
+    @property
+    def _manifest_path(self) -> Path:
+        return self.cache_dir / _MANIFEST_FILENAME
+
+    def _load_manifest(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self._manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Image manifest unreadable, starting over: {e}")
+            return {}
+
+    def _persist_manifest(self) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._manifest_path.with_suffix(".tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._manifest, f, separators=(",", ":"))
+            tmp_path.replace(self._manifest_path)
+        except OSError as e:
+            logger.error(f"Failed to persist image manifest: {e}")
+            tmp_path.unlink(missing_ok=True)
+
+    def manifest_entry(self, stem: str) -> Optional[Dict[str, Any]]:
+        return self._manifest.get(stem)
+
+    def is_current(self, stem: str) -> bool:
+        """Whether the variants of *stem* were generated from its current original."""
+        entry = self.index.get(stem)
+        return entry is not None and entry.current
+
+    def forget(self, stem: str) -> None:
+        """Drop a deleted original and its variants."""
+        self.index.remove(stem)
+        entry = self._manifest.pop(stem, None)
+        if entry is None:
+            return
+        for size, variant in entry.get("variants", {}).items():
+            for file in variant.get("files", {}).values():
+                (self.cache_dir / size / file["name"]).unlink(missing_ok=True)
+        self._persist_manifest()
+
+    def clear(self) -> None:
+        """Forget every original (the images folder was emptied)."""
+        for entry in self._manifest.values():
+            for size, variant in entry.get("variants", {}).items():
+                for file in variant.get("files", {}).values():
+                    (self.cache_dir / size / file["name"]).unlink(missing_ok=True)
+        self._manifest = {}
+        self._persist_manifest()
+        self.index.clear()
+
+    # ── Generation ────────────────────────────────────────────────────
+
+    def start(self) -> None:
+        """Start the worker processes now instead of on the first submitted image."""
+        self._pool()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self._workers)
+        return self._executor
+
+    def submit(self, original: Path) -> "asyncio.Future[Optional[Dict[str, Any]]]":
+        """
+        Generate the variants of a written original in the process pool.
+
+        Concurrent submissions of the same image share one generation.
+        """
+        key = original.stem
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._generate(self.index.add(original)))
+            self._inflight[key] = future
+            future.add_done_callback(lambda f: self._inflight.pop(key, None))
+        return future
+
+    def submit_stem(self, stem: str) -> Optional["asyncio.Future[Optional[Dict[str, Any]]]"]:
+        """Schedule the variants of an original written by another process (e.g. the scraper)."""
+        entry = self.index.refresh(stem)
+        if entry is None or entry.current:
+            return None
+        return self.submit(entry.original)
+
+    async def _generate(self, image: ImageEntry) -> Optional[Dict[str, Any]]:
+        loop = asyncio.get_running_loop()
+        original = image.original
+        try:
+            entry = await loop.run_in_executor(
+                self._pool(), generate_variants, str(original), str(self.cache_dir), self.avif,
+            )
+        except Exception as e:
+            logger.error(f"Variant generation failed for {original.name}: {e}")
+            return None
+        self._record(original.stem, entry)
+        logger.info(f"Image variants generated for {original.name}")
+        return entry
+
+    def _record(self, stem: str, entry: Dict[str, Any], persist: bool = True) -> None:
+        self._manifest[stem] = entry
+        self.index.set_variants(stem, entry["variants"], entry["mtime"], entry["sha256"])
+        if persist:
+            self._persist_manifest()
+
+    async def ensure(self, image: ImageEntry) -> ImageEntry:
+        """*image* with current variants, generating them first if they are missing or stale."""
+        if not image.current and not image.is_svg:
+            await self.submit(image.original)
+        return self.index.get(image.original.stem) or image
+
+    def backfill(self, stems: Optional[Iterable[str]] = None, force: bool = False) -> Dict[str, int]:
+        """
+        Generate the missing variants of the whole library (blocking).
+
+        Args:
+            stems: Originals to process (default: every original image)
+            force: Regenerate current variants too
+
+        Returns:
+            Counts of generated, skipped and failed originals.
+        """
+        if stems is None:
+            images = self.index.entries()
+        else:
+            images = [e for e in map(self.index.get, stems) if e is not None]
+        todo: List[Path] = [e.original for e in images if force or not e.current]
+        stats = {"generated": 0, "skipped": len(images) - len(todo), "failed": 0}
+
+        futures = {
+            self._pool().submit(generate_variants, str(p), str(self.cache_dir), self.avif): p
+            for p in todo
+        }
+        for done, (future, original) in enumerate(futures.items(), 1):
+            try:
+                self._record(original.stem, future.result(), persist=False)
+                stats["generated"] += 1
+            except Exception as e:
+                logger.error(f"Variant generation failed for {original.name}: {e}")
+                stats["failed"] += 1
+            if done % 100 == 0:
+                logger.info(f"{done}/{len(todo)} originals processed")
+                self._persist_manifest()
+        self._persist_manifest()
+        return stats
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
@@ -15,6 +15,7 @@ from fastapi import HTTPException
 from models.requests import ManualRecipeRequest
 from recipe_structurer import RecipeRejectedError, PIPELINE_VERSION
 from repositories import RecipeRepository
+from services.image_pipeline import ImagePipeline
 from services.progress_service import ProgressService
 
 logger = logging.getLogger(__name__)
@@ -33,8 +34,9 @@ _SUBPROCESS_BUFFER_LIMIT = 1024 * 1024  # 1 MB
 class RecipeService:
     _subprocess_semaphore = asyncio.Semaphore(30)
 
-    def __init__(self, repo: RecipeRepository) -> None:
+    def __init__(self, repo: RecipeRepository, image_pipeline: Optional[ImagePipeline] = None) -> None:
         self.repo = repo
+        self.image_pipeline = image_pipeline
         self.progress_service = _progress_service
         self.generation_tasks: Dict[str, asyncio.Task] = {}
         self._cleanup_lock = asyncio.Lock()
@@ -76,37 +78,55 @@ class RecipeService:
     async def list_recipes(self, include_private: bool = False) -> List[Dict[str, Any]]:
         try:
             summaries = await self.repo.list_summaries()
-
-            if not include_private:
-                config = self._load_authors_config()
-                if "public" in config and config["public"]:
-                    summaries = [
-                        r for r in summaries
-                        if self._author_matches(r.get("author", ""), config["public"])
-                    ]
-                elif "private" in config and config["private"]:
-                    summaries = [
-                        r for r in summaries
-                        if not self._author_matches(r.get("author", ""), config["private"])
-                    ]
-
-            return summaries
+            return summaries if include_private else self._public_only(summaries)
         except Exception as e:
             logger.error(f"Error listing recipes: {e}")
             return []
 
+    async def list_in_season(self, month: str, include_private: bool = False) -> List[Dict[str, Any]]:
+        """Recipes whose peak months include *month* (a name from MONTHS)."""
+        try:
+            summaries = await self.repo.list_in_month(month)
+            return summaries if include_private else self._public_only(summaries)
+        except Exception as e:
+            logger.error(f"Error listing recipes in season: {e}")
+            return []
+
+    def _public_only(self, summaries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        config = self._load_authors_config()
+        if "public" in config and config["public"]:
+            return [
+                r for r in summaries
+                if self._author_matches(r.get("author", ""), config["public"])
+            ]
+        if "private" in config and config["private"]:
+            return [
+                r for r in summaries
+                if not self._author_matches(r.get("author", ""), config["private"])
+            ]
+        return summaries
+
     async def delete_recipe(self, slug: str) -> None:
         deleted = await self.repo.delete(slug)
         if not deleted:
             raise HTTPException(status_code=404, detail="Recipe not found")
+        if self.image_pipeline:
+            self.image_pipeline.forget(slug)
 
     async def delete_all_recipes(self) -> None:
         try:
             await self.repo.delete_all()
+            if self.image_pipeline:
+                self.image_pipeline.clear()
         except Exception as e:
             logger.error(f"Error deleting all recipes: {e}")
             raise HTTPException(status_code=500, detail=str(e))
 
+    def _schedule_image_variants(self, slug: str) -> None:
+        """Generate the image variants of a freshly saved recipe in the background."""
+        if self.image_pipeline:
+            self.image_pipeline.submit_stem(slug)
+
     def invalidate_list_cache(self) -> None:
         """No-op kept for backward compatibility."""
         pass
@@ -375,6 +395,7 @@ class RecipeService:
                     return
 
                 self.repo.index_recipe(slug)
+                self._schedule_image_variants(slug)
 
                 for step_name in step_names:
                     await self.progress_service.update_step(
@@ -497,6 +518,7 @@ class RecipeService:
                     return
 
                 self.repo.index_recipe(slug)
+                self._schedule_image_variants(slug)
 
                 for step_name in step_names:
                     await self.progress_service.update_step(
@@ -579,6 +601,7 @@ class RecipeService:
                     return
 
                 self.repo.index_recipe(slug)
+                self._schedule_image_variants(slug)
 
                 for step_name in step_names:
                     await self.progress_service.update_step(
@@ -0,0 +1,150 @@
+"""Tests for the eager image-variant pipeline."""
+
+import asyncio
+
+import pytest
+from PIL import Image
+
+from services.image_pipeline import VARIANT_SIZES, ImagePipeline, generate_variants
+
+
+@pytest.fixture
+def dirs(tmp_path):
+    originals = tmp_path / "recipes" / "images"
+    originals.mkdir(parents=True)
+    Image.new("RGBA", (1600, 900), (200, 40, 40, 128)).save(originals / "tarte.png")
+    return originals, tmp_path / "images" / "cache"
+
+
+def test_generate_variants_records_dimensions_and_hashes(dirs):
+    originals, cache = dirs
+    entry = generate_variants(str(originals / "tarte.png"), str(cache))
+
+    assert (entry["width"], entry["height"]) == (1600, 900)
+    assert set(entry["variants"]) == set(VARIANT_SIZES)
+    large = entry["variants"]["large"]
+    assert (large["width"], large["height"]) == (1200, 675)
+    with Image.open(cache / "thumbnail" / "tarte.webp") as img:
+        assert img.size == (200, 112)
+    assert len(large["files"]["webp"]["sha256"]) == 64
+
+
+async def test_concurrent_submissions_share_one_generation(dirs):
+    originals, cache = dirs
+    pipeline = ImagePipeline(originals, cache, workers=1)
+    try:
+        first = pipeline.submit_stem("tarte")
+        second = pipeline.submit(originals / "tarte.png")
+        assert first is second
+        entry = await first
+    finally:
+        pipeline.shutdown()
+
+    assert pipeline.is_current("tarte")
+    assert pipeline.submit_stem("tarte") is None
+    # The manifest survives a restart
+    assert ImagePipeline(originals, cache).manifest_entry("tarte") == entry
+
+
+def test_backfill_skips_current_originals(dirs):
+    originals, cache = dirs
+    Image.new("RGB", (300, 300)).save(originals / "soupe.jpg")
+    pipeline = ImagePipeline(originals, cache, workers=2)
+    try:
+        assert pipeline.backfill() == {"generated": 2, "skipped": 0, "failed": 0}
+        assert pipeline.backfill() == {"generated": 0, "skipped": 2, "failed": 0}
+    finally:
+        pipeline.shutdown()
+
+    pipeline.forget("soupe")
+    assert not (cache / "small" / "soupe.webp").exists()
+
+
+def test_index_resolves_names_without_filesystem_calls(dirs, monkeypatch):
+    originals, cache = dirs
+    long_name = "gateau-au-chocolat-et-aux-noisettes-de-ma-grand-mere-version-2"
+    Image.new("RGB", (10, 10)).save(originals / f"{long_name}.jpg")
+    index = ImagePipeline(originals, cache).index
+
+    def no_fs(*args, **kwargs):
+        raise AssertionError("filesystem call")
+
+    monkeypatch.setattr("pathlib.Path.exists", no_fs)
+    monkeypatch.setattr("pathlib.Path.stat", no_fs)
+    assert index.find("TARTE").original.name == "tarte.png"
+    assert index.find(long_name[:45] + "-truncated").original.name == f"{long_name}.jpg"
+    assert index.find("tart").original.name == "tarte.png"
+    assert index.find("soupe") is None
+
+
+def test_index_follows_writes(dirs):
+    originals, cache = dirs
+    pipeline = ImagePipeline(originals, cache)
+    Image.new("RGB", (10, 10)).save(originals / "soupe.jpg")
+    assert pipeline.index.find("soupe") is None
+    assert pipeline.index.refresh("soupe").original.name == "soupe.jpg"
+    (originals / "soupe.jpg").unlink()
+    pipeline.forget("soupe")
+    assert pipeline.index.find("soupe") is None
+
+
+async def test_straggler_request_gets_the_variant(dirs):
+    from api.routes.images import resolve_image
+
+    originals, cache = dirs
+    pipeline = ImagePipeline(originals, cache, workers=1)
+    try:
+        resolved = await asyncio.gather(*(resolve_image(pipeline, "tarte", "small") for _ in range(3)))
+    finally:
+        pipeline.shutdown()
+    assert [r.path for r in resolved] == [cache / "small" / "tarte.webp"] * 3
+
+
+async def test_hashed_urls_are_immutable(dirs):
+    from fastapi import FastAPI
+    from httpx import ASGITransport, AsyncClient
+
+    from api.dependencies import get_image_pipeline
+    from api.routes.images import router
+    from repositories.json_file_repository import image_hash
+
+    originals, cache = dirs
+    pipeline = ImagePipeline(originals, cache, workers=1)
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_image_pipeline] = lambda: pipeline
+    url_hash = image_hash(originals / "tarte.png")
+
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            hashed = await client.get(f"/api/images/small/tarte.{url_hash}.webp")
+            plain = await client.get("/api/images/small/tarte")
+            stale = await client.get("/api/images/small/tarte.0123456789ab.webp")
+            revalidated = await client.get("/api/images/small/tarte", headers={"If-None-Match": plain.headers["etag"]})
+            partial = await client.get("/api/images/small/tarte", headers={"Range": "bytes=0-9"})
+    finally:
+        pipeline.shutdown()
+
+    assert hashed.status_code == 200 and hashed.headers["content-type"] == "image/webp"
+    assert "immutable" in hashed.headers["cache-control"]
+    assert plain.headers["cache-control"] == "no-cache" and stale.headers["cache-control"] == "no-cache"
+    assert hashed.headers["etag"] == plain.headers["etag"]
+    assert revalidated.status_code == 304
+    assert partial.status_code == 206 and len(partial.content) == 10
+
+
+def test_app_pipeline_starts_and_stops_its_pool(tmp_path, monkeypatch):
+    import api.dependencies as dependencies
+    from repositories import JsonFileRepository
+
+    monkeypatch.setattr(dependencies, "_repository", JsonFileRepository(str(tmp_path)))
+    monkeypatch.setattr(dependencies, "_image_pipeline", None)
+    with pytest.raises(RuntimeError):
+        dependencies.get_image_pipeline()
+
+    pipeline = dependencies.start_image_pipeline()
+    assert dependencies.get_image_pipeline() is pipeline
+    assert pipeline._executor is not None
+
+    dependencies.stop_image_pipeline()
+    assert pipeline._executor is None